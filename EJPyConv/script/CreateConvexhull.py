@@ -4,7 +4,7 @@ Tool name : 凸包の作成
 Source    : CreateConvexhull.py
 Author    : Esri Japan Corporation
 Created   : 2018/12/14
-Updated   :
+Updated   : 2026/10/19
 """
 
 class AlreadyExistError(Exception):
@@ -13,6 +13,10 @@ class AlreadyExistError(Exception):
 import arcpy
 import sys
 import os
+from ejpyconv import profiling
+from ejpyconv.geometry import from_wkb
+from ejpyconv.progress import Progress
+import numpy as np
 
 
 def setup_create_convexhull():
@@ -26,18 +30,231 @@ def setup_create_convexhull():
     group_field_name = arcpy.GetParameterAsText(3)
     create_buffer = arcpy.GetParameter(4)
     buffer_num = arcpy.GetParameter(5)
+    # 凹包のパラメーターがツールに定義されていない場合は従来通り凸包を作成
+    hull_type = u"CONVEX"
+    alpha = 0
+    bounding_attr = False
+    if arcpy.GetArgumentCount() > 6:
+        hull_type = arcpy.GetParameterAsText(6) or u"CONVEX"
+    if arcpy.GetArgumentCount() > 7:
+        alpha = arcpy.GetParameter(7) or 0
+    if arcpy.GetArgumentCount() > 8:
+        bounding_attr = arcpy.GetParameter(8)
 
-    create_convexhull(in_pt_fc, out_pt_fc, group_field, group_field_name, create_buffer, buffer_num)
+    create_convexhull(in_pt_fc, out_pt_fc, group_field, group_field_name, create_buffer, buffer_num,
+                      hull_type, alpha, bounding_attr)
 
 
-def create_convexhull(in_pt_fc, out_pt_fc, group_field, group_field_name, create_buffer, buffer_num):
+def build_rings(start, end):
+    """
+    メソッド名 : build_rings メソッド
+    引数 1     : 境界の有向辺の始点インデックスの配列
+    引数 2     : 境界の有向辺の終点インデックスの配列
+    概要       : 境界の有向辺をつなげてリングを作成
+    """
+    following = {}
+    for s, e in zip(start.tolist(), end.tolist()):
+        following.setdefault(s, []).append(e)
+
+    # 各頂点の入次数と出次数は等しいため、始点に戻るまでたどれば閉じたリングになる
+    rings = []
+    while following:
+        first = next(iter(following))
+        ring = [first]
+        current = first
+        while True:
+            ends = following[current]
+            e = ends.pop()
+            if len(ends) == 0:
+                del following[current]
+            if e == first:
+                break
+            ring.append(e)
+            current = e
+        rings.append(ring)
+
+    return rings
+
+
+def concave_hull(xy, alpha, spref):
+    """
+    メソッド名 : concave_hull メソッド
+    引数 1     : ポイント座標の配列
+    引数 2     : 三角形の外接円半径の上限（0 以下の場合は外接円半径の中央値の 2 倍）
+    引数 3     : 空間参照
+    概要       : ドロネー三角形分割による凹包（アルファシェイプ）の作成
+                 作成できない場合は None を返す
+    """
+    if xy is None or len(xy) < 3:
+        return None
+
+    # scipy は読み込みに時間がかかるため、凹包・最小外接矩形の作成時に読み込む
+    from scipy.spatial import Delaunay
+
+    try:
+        tri = Delaunay(xy)
+    except (RuntimeError, ValueError):
+        # 一直線上のポイントなどで三角形分割できない場合
+        return None
+
+    simplices = tri.simplices.copy()
+    neighbors = tri.neighbors.copy()
+    a = xy[simplices[:, 0]]
+    b = xy[simplices[:, 1]]
+    c = xy[simplices[:, 2]]
+    cross = (b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) - (b[:, 1] - a[:, 1]) * (c[:, 0] - a[:, 0])
+
+    # 三角形の外接円半径
+    with np.errstate(divide="ignore", invalid="ignore"):
+        radius = (np.hypot(*(b - c).T) * np.hypot(*(c - a).T) * np.hypot(*(a - b).T)) / (2.0 * np.abs(cross))
+
+    if alpha <= 0:
+        alpha = 2.0 * np.median(radius[np.isfinite(radius)])
+
+    # 三角形の頂点の並びを反時計回りにそろえる（隣接三角形も同じく入れ替え）
+    cw = cross < 0
+    simplices[cw] = simplices[cw][:, [0, 2, 1]]
+    neighbors[cw] = neighbors[cw][:, [0, 2, 1]]
+
+    # 外接円半径が上限未満の三角形を残す
+    keep = radius < alpha
+    if not keep.any():
+        return None
+
+    # 頂点 k の対辺 (k+1 → k+2) の向こう側の三角形が存在しないか残らない場合、その辺は境界
+    # （外周は反時計回り、穴は時計回りの有向辺になる）
+    kept_neighbors = neighbors[keep]
+    boundary = (kept_neighbors == -1) | ~keep[kept_neighbors]
+    start = simplices[keep][:, [1, 2, 0]][boundary]
+    end = simplices[keep][:, [2, 0, 1]][boundary]
+
+    rings = build_rings(start, end)
+
+    # ArcGIS のポリゴンは外周が時計回り、穴が反時計回りのため反転して作成
+    polygon = arcpy.Array()
+    for ring in rings:
+        ring.reverse()
+        ring.append(ring[0])
+        polygon.add(arcpy.Array([arcpy.Point(x, y) for x, y in xy[ring].tolist()]))
+
+    return arcpy.Polygon(polygon, spref)
+
+
+def hull_coordinates(hull):
+    """
+    メソッド名 : hull_coordinates メソッド
+    引数 1     : 包のポリゴン
+    概要       : 包の頂点から凸包の頂点座標の配列（反時計回り）を取得
+    """
+    xy = np.array([(pnt.X, pnt.Y) for part in hull for pnt in part if pnt], dtype=np.float64)
+    xy = np.unique(xy, axis=0)
+    if len(xy) < 3:
+        return xy
+
+    from scipy.spatial import ConvexHull
+    try:
+        return xy[ConvexHull(xy).vertices]
+    except (RuntimeError, ValueError):
+        # 一直線上の頂点の場合は両端の頂点のみ
+        return xy[[0, -1]]
+
+
+def min_area_rectangle(xy):
+    """
+    メソッド名 : min_area_rectangle メソッド
+    引数 1     : 凸包の頂点座標の配列（反時計回り）
+    概要       : 回転キャリパー法で面積最小の外接矩形を求め、幅・長さ・向きを返す
+                 向きは長辺の方向で、北から時計回りの角度（0 以上 180 未満）
+    """
+    if len(xy) < 2:
+        return 0.0, 0.0, 0.0
+
+    # 最小外接矩形は凸包のいずれかの辺と同じ向きになるため、各辺の向きに回転して外接矩形を計算
+    edges = np.roll(xy, -1, axis=0) - xy
+    edges = edges[np.hypot(edges[:, 0], edges[:, 1]) > 0]
+    angles = np.arctan2(edges[:, 1], edges[:, 0])
+    cos = np.cos(angles)[:, np.newaxis]
+    sin = np.sin(angles)[:, np.newaxis]
+    u = xy[:, 0] * cos + xy[:, 1] * sin
+    v = xy[:, 1] * cos - xy[:, 0] * sin
+    side_u = u.max(axis=1) - u.min(axis=1)
+    side_v = v.max(axis=1) - v.min(axis=1)
+    k = int(np.argmin(side_u * side_v))
+
+    # 長辺の向きを北から時計回りの角度で表す
+    angle = angles[k] if side_u[k] >= side_v[k] else angles[k] + np.pi / 2.0
+    orientation = (90.0 - np.degrees(angle)) % 180.0
+
+    return float(min(side_u[k], side_v[k])), float(max(side_u[k], side_v[k])), float(orientation)
+
+
+def circle_from(points):
+    """
+    メソッド名 : circle_from メソッド
+    引数 1     : 円周上の 1～3 点の座標のリスト
+    概要       : 指定した点を通る最小の円の中心と半径を返す
+    """
+    if len(points) == 1:
+        return points[0], 0.0
+    if len(points) == 2:
+        (ax, ay), (bx, by) = points
+        return ((ax + bx) / 2.0, (ay + by) / 2.0), np.hypot(ax - bx, ay - by) / 2.0
+
+    (ax, ay), (bx, by), (cx, cy) = points
+    d = 2.0 * (ax * (by - cy) + bx * (cy - ay) + cx * (ay - by))
+    if d == 0.0:
+        # 一直線上の 3 点は最も離れた 2 点を直径とする
+        pairs = [(points[0], points[1]), (points[0], points[2]), (points[1], points[2])]
+        return max((circle_from(list(pair)) for pair in pairs), key=lambda circle: circle[1])
+    ux = ((ax * ax + ay * ay) * (by - cy) + (bx * bx + by * by) * (cy - ay) + (cx * cx + cy * cy) * (ay - by)) / d
+    uy = ((ax * ax + ay * ay) * (cx - bx) + (bx * bx + by * by) * (ax - cx) + (cx * cx + cy * cy) * (bx - ax)) / d
+    return (ux, uy), np.hypot(ax - ux, ay - uy)
+
+
+def min_enclosing_circle(xy):
+    """
+    メソッド名 : min_enclosing_circle メソッド
+    引数 1     : 凸包の頂点座標の配列
+    概要       : Welzl のアルゴリズム（逐次添加法）で最小包含円を求め、直径を返す
+    """
+    if len(xy) == 0:
+        return 0.0
+
+    # 実行ごとに結果が変わらないよう固定の乱数で並べ替え
+    points = [tuple(pnt) for pnt in xy[np.random.RandomState(0).permutation(len(xy))].tolist()]
+
+    def outside(pnt, circle):
+        (cx, cy), r = circle
+        return np.hypot(pnt[0] - cx, pnt[1] - cy) > r * (1.0 + 1e-12)
+
+    circle = circle_from([points[0]])
+    for i in range(1, len(points)):
+        if outside(points[i], circle):
+            circle = circle_from([points[i]])
+            for j in range(i):
+                if outside(points[j], circle):
+                    circle = circle_from([points[i], points[j]])
+                    for k in range(j):
+                        if outside(points[k], circle):
+                            circle = circle_from([points[i], points[j], points[k]])
+
+    return float(circle[1] * 2.0)
+
+
+def create_convexhull(in_pt_fc, out_pt_fc, group_field, group_field_name, create_buffer, buffer_num,
+                      hull_type=u"CONVEX", alpha=0, bounding_attr=False):
     """
     メソッド名 : create_convexhull メソッド
     引数 1     : 入力フィーチャ
     引数 2     : 出力フィーチャ
-    引数 3     : グループ化のフィールド名
-    引数 4     : バッファーの距離
-    概要       : ポイントを包含する凸包の作成
+    引数 3     : グループ化の有無
+    引数 4     : グループ化のフィールド名
+    引数 5     : バッファー作成の有無
+    引数 6     : バッファーの距離
+    引数 7     : 作成する包の種類（CONVEX：凸包、CONCAVE：凹包）
+    引数 8     : 凹包の三角形の外接円半径の上限（0 以下の場合は自動）
+    引数 9     : 最小外接矩形・最小包含円の属性の出力有無
+    概要       : ポイントを包含する凸包（凹包）の作成
     """
     try:
         arcpy.AddMessage(u"処理開始：")
@@ -76,28 +293,58 @@ def create_convexhull(in_pt_fc, out_pt_fc, group_field, group_field_name, create
             if (field.type != u"OID") and (field.type != u"Geometry"):
                 fieldlist.append(field.basename)
 
+        # 最小外接矩形の幅・長さ・向きと最小包含円の直径のフィールドを追加
+        bounding_fields = []
+        if bounding_attr == True:
+            bounding_fields = [u"MBG_Width", u"MBG_Length", u"MBG_Orientation", u"MBG_Diameter"]
+            for field_name in bounding_fields:
+                arcpy.AddField_management(tmppoly, field_name, u"DOUBLE")
+
+        # 凹包の場合は、ディゾルブしたマルチポイントの WKB からグループのポイント座標の配列を取得
+        # （入力のポイントを読み直さない）
+        search_fields = list(fieldlist)
+        if hull_type == u"CONCAVE":
+            search_fields.append(u"SHAPE@WKB")
+            alpha = float(alpha)
+
         # フィーチャクラスの検索カーソル作成
-        incur = arcpy.da.SearchCursor(multipoint, fieldlist)
+        incur = arcpy.da.SearchCursor(multipoint, search_fields)
         # フィーチャクラスの挿入カーソル作成
-        outcur = arcpy.da.InsertCursor(tmppoly, fieldlist)
+        outcur = arcpy.da.InsertCursor(tmppoly, fieldlist + bounding_fields)
 
         # 処理件数表示用の変数
         i = 0
         num = int(arcpy.GetCount_management(multipoint).getOutput(0))
+        progress = Progress(num)
+        ngcnt = 0
 
         for inrow in incur:
             i = i + 1
-            if (i == 1) or (i == num) or (i % 1000 == 1):
-                s = u"{0}/{1}の処理中・・・".format(i, num)
-                arcpy.AddMessage(s)
+            progress.update(i)
+
+            copyrow = list(inrow[:len(fieldlist)])
+            hull = None
+            if hull_type == u"CONCAVE":
+                points = from_wkb(inrow[-1])
+                hull = concave_hull(points.xy if points is not None else None, alpha, spref)
+                if hull is None:
+                    ngcnt += 1
+            # 凹包が作成できない場合は凸包を作成
+            if hull is None:
+                hull = inrow[0].convexHull()
+            copyrow[0] = hull
 
-            if inrow[0].pointCount < 3:
-                pass
+            # 包の頂点から最小外接矩形と最小包含円を計算
+            if bounding_attr == True:
+                hull_xy = hull_coordinates(hull)
+                copyrow.extend(min_area_rectangle(hull_xy))
+                copyrow.append(min_enclosing_circle(hull_xy))
 
-            copyrow = list(inrow)
-            copyrow[0] = inrow[0].convexHull()
             outcur.insertRow(tuple(copyrow))
 
+        if ngcnt != 0:
+            arcpy.AddWarning(u"凹包を作成できなかった{0}件のグループは凸包で出力しました".format(ngcnt))
+
         # バッファ
         if create_buffer == True:
             arcpy.Buffer_analysis(tmppoly, out_pt_fc, buffer_num)
@@ -120,4 +367,5 @@ def create_convexhull(in_pt_fc, out_pt_fc, group_field, group_field_name, create
 
 
 if __name__ == u'__main__':
-    setup_create_convexhull()
+    with profiling.profile(u"CreateConvexhull", arcpy.GetParameterAsText(1)):
+        setup_create_convexhull()
@@ -4,7 +4,7 @@ Tool name : 内向きバッファーの作成
 Source    : CreateInsideBuffer.py
 Author    : Esri Japan Corporation
 Created   : 2018/12/14
-Updated   :
+Updated   : 2026/10/19
 """
 
 class AlreadyExistError(Exception):
@@ -14,6 +14,12 @@ class AlreadyExistError(Exception):
 import arcpy
 import sys
 import os
+from ejpyconv.fieldinfo import create_fieldinfo, unique_field_name, workspace_type
+from ejpyconv import profiling
+from ejpyconv.progress import Progress
+import math
+import itertools
+import multiprocessing
 
 
 def setup_create_inside_buffer():
@@ -23,17 +29,209 @@ def setup_create_inside_buffer():
     """
     in_poly_fc = arcpy.GetParameterAsText(0)
     out_poly_fc = arcpy.GetParameterAsText(1)
-    buffer_distace = arcpy.GetParameter(2)
+    # 複数の距離はセミコロン区切りで指定
+    buffer_distace = arcpy.GetParameterAsText(2)
+    # 距離フィールドのパラメーターがツールに定義されていない場合は既定のフィールド名を使用
+    distance_field = u""
+    if arcpy.GetArgumentCount() > 3:
+        distance_field = arcpy.GetParameterAsText(3)
+    # 並列処理のプロセス数（1 以下の場合は逐次処理）
+    workers = 1
+    if arcpy.GetArgumentCount() > 4:
+        workers = arcpy.GetParameter(4) or 1
+    # フィーチャごとの距離を格納した入力フィールド（指定時はバッファーの距離より優先）
+    buffer_field = u""
+    if arcpy.GetArgumentCount() > 5:
+        buffer_field = arcpy.GetParameterAsText(5)
 
-    create_inside_buffer(in_poly_fc, out_poly_fc, buffer_distace)
+    create_inside_buffer(in_poly_fc, out_poly_fc, buffer_distace, distance_field, workers, buffer_field)
 
 
-def create_inside_buffer(in_poly_fc, out_poly_fc, buffer_distace):
+def parse_distances(buffer_distace):
+    """
+    メソッド名 : parse_distances メソッド
+    引数 1     : バッファーの距離（数値、数値のリスト、またはセミコロン区切りの文字列）
+    概要       : バッファーの距離を重複のない昇順のリストに変換
+    """
+    if isinstance(buffer_distace, (list, tuple)):
+        distances = buffer_distace
+    else:
+        distances = str(buffer_distace).split(u";")
+
+    return sorted(set(float(d) for d in distances if str(d).strip() != u""))
+
+
+def inscribed_radius_limit(polygon):
+    """
+    メソッド名 : inscribed_radius_limit メソッド
+    引数 1     : 入力ポリゴン
+    概要       : ポリゴンの内接円の半径の上限を、外接矩形の短辺の半分と
+                 面積が等しい円の半径の小さい方で見積もる
+    """
+    extent = polygon.extent
+    return min(extent.width / 2.0, extent.height / 2.0, math.sqrt(polygon.area / math.pi))
+
+
+def inside_rings(polygon, distances):
+    """
+    メソッド名 : inside_rings メソッド
+    引数 1     : 入力ポリゴン
+    引数 2     : バッファーの距離のリスト（昇順）
+    概要       : 距離ごとに重ならない内向きバッファーのリングを作成
+                 (距離, リング) のリストと、作成できなかった距離（すべて作成できた場合は None）を返す
+    """
+    rings = []
+    if polygon is None or len(distances) == 0:
+        return rings, None
+
+    outer = polygon
+    # 内接円の半径の上限以上の距離は、バッファーを作成するまでもなく範囲を超える
+    limit = inscribed_radius_limit(polygon)
+    for distance in distances:
+        inbuffer = None
+        if distance < limit:
+            inbuffer = polygon.buffer(distance * -1)
+        # 内向きバッファーがポリゴンの範囲を超えた場合、残りの範囲をそのままリングとする
+        if inbuffer is None or inbuffer.area == 0.0:
+            rings.append((distance, outer))
+            return rings, distance
+        rings.append((distance, outer.difference(inbuffer)))
+        outer = inbuffer
+
+    return rings, None
+
+
+# ワーカープロセスで使用する空間参照
+WORKER_SPREF = None
+
+
+def init_worker(spref_string):
+    """
+    メソッド名 : init_worker メソッド
+    引数 1     : 空間参照の文字列表現
+    概要       : ワーカープロセスの初期化（空間参照の復元）
+    """
+    global WORKER_SPREF
+    WORKER_SPREF = arcpy.SpatialReference()
+    WORKER_SPREF.loadFromString(spref_string)
+
+
+def inside_rings_worker(args):
+    """
+    メソッド名 : inside_rings_worker メソッド
+    引数 1     : (入力ポリゴンの WKB, バッファーの距離のリスト)
+    概要       : ワーカープロセスで内向きバッファーのリングを作成し、WKB で返す
+    """
+    wkb, distances = args
+    if wkb is None:
+        return [], None
+
+    polygon = arcpy.FromWKB(bytearray(wkb), WORKER_SPREF)
+    rings, ng = inside_rings(polygon, distances)
+    return [(distance, bytes(ring.WKB)) for distance, ring in rings], ng
+
+
+def row_distances(inrow, distances, buffer_index):
+    """
+    メソッド名 : row_distances メソッド
+    引数 1     : 入力行
+    引数 2     : バッファーの距離のリスト（昇順）
+    引数 3     : フィーチャごとの距離のインデックス（None の場合は共通の距離を使用）
+    概要       : 入力行に適用するバッファーの距離のリストを取得
+    """
+    if buffer_index is None:
+        return distances
+
+    value = inrow[buffer_index]
+    if value is None or value <= 0:
+        return []
+    return [float(value)]
+
+
+def iter_inside_rings(incur, distances, spref, workers, buffer_index=None):
+    """
+    メソッド名 : iter_inside_rings メソッド
+    引数 1     : 入力フィーチャの検索カーソル
+    引数 2     : バッファーの距離のリスト（昇順）
+    引数 3     : 空間参照
+    引数 4     : 並列処理のプロセス数
+    引数 5     : フィーチャごとの距離のインデックス（None の場合は共通の距離を使用）
+    概要       : 入力行ごとに (行, リングのリスト, 作成できなかった距離) を
+                 カーソルの順序のまま返す
+                 並列処理の場合、ジオメトリは WKB でワーカープロセスとやり取りする
+    """
+    if workers <= 1:
+        for inrow in incur:
+            rings, ng = inside_rings(inrow[-1], row_distances(inrow, distances, buffer_index))
+            yield inrow, rings, ng
+        return
+
+    # ArcGIS Pro から実行した場合、sys.executable は ArcGISPro.exe になるため Python を指定
+    if os.name == "nt":
+        multiprocessing.set_executable(os.path.join(sys.exec_prefix, "python.exe"))
+
+    def submit(rows):
+        tasks = [(row[-1], row_distances(row, distances, buffer_index)) for row in rows]
+        return pool.map_async(inside_rings_worker, tasks, chunksize=16)
+
+    chunk = workers * 256
+    pool = multiprocessing.Pool(workers, initializer=init_worker, initargs=(spref.exportToString(),))
+    try:
+        # 次のチャンクをワーカーで処理している間に、前のチャンクを書き込む
+        rows = list(itertools.islice(incur, chunk))
+        pending = submit(rows)
+        while len(rows) != 0:
+            results = pending.get()
+            next_rows = list(itertools.islice(incur, chunk))
+            if len(next_rows) != 0:
+                pending = submit(next_rows)
+            for inrow, (rings, ng) in zip(rows, results):
+                yield inrow, rings, ng
+            rows = next_rows
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def write_failed_table(out_poly_fc, failed):
+    """
+    メソッド名 : write_failed_table メソッド
+    引数 1     : 出力フィーチャ
+    引数 2     : 作成できなかったフィーチャの (OBJECTID, 距離) のリスト
+    概要       : 内向きバッファーを作成できなかったフィーチャの一覧をテーブルに出力
+    """
+    out_ws = os.path.dirname(out_poly_fc)
+    out_name = os.path.basename(out_poly_fc)
+    # GeoPackage/SQLite のフィーチャクラス名の main. は除く（featureio.split_sqlite_path と同じ）
+    if out_name.lower().startswith(u"main."):
+        out_name = out_name[5:]
+    if workspace_type(out_ws) == "FileSystem":
+        if out_name.lower().endswith(u".shp"):
+            out_name = out_name[:-4]
+        table_name = out_name + u"_failed.dbf"
+    else:
+        table_name = out_name + u"_failed"
+
+    table = arcpy.CreateUniqueName(table_name, out_ws)
+    arcpy.CreateTable_management(out_ws, os.path.basename(table))
+    arcpy.AddField_management(table, u"ORIG_FID", u"LONG")
+    arcpy.AddField_management(table, u"BUFF_DIST", u"DOUBLE")
+    with arcpy.da.InsertCursor(table, [u"ORIG_FID", u"BUFF_DIST"]) as outcur:
+        for row in failed:
+            outcur.insertRow(row)
+
+    return table
+
+
+def create_inside_buffer(in_poly_fc, out_poly_fc, buffer_distace, distance_field=u"", workers=1, buffer_field=u""):
     """
     メソッド名 : create_inside_buffer メソッド
     引数 1     : 入力フィーチャ
     引数 2     : 出力フィーチャ
-    引数 3     : バッファーの距離
+    引数 3     : バッファーの距離（複数指定可）
+    引数 4     : 距離を格納するフィールド名（省略時、距離が 1 つの場合はフィールドを追加しない）
+    引数 5     : 並列処理のプロセス数（1 以下の場合は逐次処理）
+    引数 6     : フィーチャごとの距離を格納した入力フィールド名（指定時はバッファーの距離より優先）
     概要       : 内向きバッファーの作成
     """
     try:
@@ -43,33 +241,93 @@ def create_inside_buffer(in_poly_fc, out_poly_fc, buffer_distace):
         out_fc_name = os.path.basename(out_poly_fc)
         out_ws = os.path.dirname(out_poly_fc)
 
-        # 出力データの作成
-        arcpy.CopyFeatures_management(in_poly_fc,out_poly_fc)
+        # ワークスペースにすでに同一のフィーチャクラス名がないかチェック
+        if arcpy.Exists(out_poly_fc):
+            raise AlreadyExistError
+
+        if buffer_field != u"":
+            distances = []
+        else:
+            distances = parse_distances(buffer_distace)
+        if (len(distances) > 1 or buffer_field != u"") and distance_field == u"":
+            distance_field = u"BUFF_DIST"
+
+        # カーソル作成に使用するフィールド情報を create_fieldinfo 関数を用いて取得
+        search_fields_name, search_fields_type, use_fields_name, spref, row_transform = create_fieldinfo(in_poly_fc, out_poly_fc, "POLYGON")
+
+        # 距離フィールドの追加（入力からコピーしたフィールドと同じ名前の場合は別の名前にする）
+        out_fields_name = list(use_fields_name)
+        if distance_field != u"":
+            field_name = unique_field_name(out_poly_fc, distance_field)
+            if field_name != distance_field:
+                arcpy.AddWarning(u"{0} フィールドはすでに存在するため、距離は {1} フィールドに出力します".format(distance_field, field_name))
+                distance_field = field_name
+            arcpy.AddField_management(out_poly_fc, distance_field, u"DOUBLE")
+            out_fields_name.insert(-1, distance_field)
+
+        # 検索カーソルの先頭に OBJECTID とフィーチャごとの距離のフィールドを追加
+        prefix_fields = [u"OID@"]
+        buffer_index = None
+        if buffer_field != u"":
+            prefix_fields.append(buffer_field)
+            buffer_index = 1
+        search_fields_name = prefix_fields + search_fields_name
+        prefix = len(prefix_fields)
+
+        # 並列処理の場合、ジオメトリは WKB で読み書きする
+        workers = int(workers)
+        if workers > 1:
+            search_fields_name = search_fields_name[:-1] + [u"SHAPE@WKB"]
+            out_fields_name = out_fields_name[:-1] + [u"SHAPE@WKB"]
+
+        # 距離のないフィーチャの距離フィールドの値（Shape ファイルは NULL 値を格納できないため 0）
+        no_distance = 0 if workspace_type(out_ws) == "FileSystem" else None
 
-        outcur = arcpy.da.UpdateCursor(out_poly_fc,["SHAPE@"])
-        
         i = 0
-        num = int(arcpy.GetCount_management(out_poly_fc).getOutput(0))
-        ngcnt = 0
+        num = int(arcpy.GetCount_management(in_poly_fc).getOutput(0))
+        progress = Progress(num)
+        failed = []
+        passed = 0
+
+        # 入力ジオメトリを 1 回だけ読み込み、すべての距離のリングを挿入
+        with arcpy.da.SearchCursor(in_poly_fc, search_fields_name) as incur:
+            with arcpy.da.InsertCursor(out_poly_fc, out_fields_name) as outcur:
+                for fullrow, rings, ng in iter_inside_rings(incur, distances, spref, workers, buffer_index):
+                    i = i + 1
+                    progress.update(i)
+
+                    inrow = fullrow[prefix:]
+
+                    # 属性値のコピー（出力がShape ファイルの場合は NULL 値を空白や 0 に置き換え）
+                    newValue = row_transform(inrow)
 
-        # バッファ作成
-        for inrow in outcur:
-            i = i + 1
-            if (i == 1) or (i == num) or (i % 1000 == 1):
-                s = u"{0}/{1}の処理中・・・".format(i, num)
-                arcpy.AddMessage(s)
+                    # 距離が指定されていない（NULL または 0 以下）、またはジオメトリが NULL のフィーチャは、
+                    # 元のジオメトリのまま出力
+                    if len(rings) == 0:
+                        failed.append((fullrow[0], fullrow[buffer_index] if buffer_index is not None else None))
+                        passed += 1
+                        if distance_field != u"":
+                            outcur.insertRow(tuple(newValue[:-1]) + (no_distance, newValue[-1]))
+                        else:
+                            outcur.insertRow(tuple(newValue))
+                        continue
+                    if ng is not None:
+                        failed.append((fullrow[0], ng))
 
-            inbuffer = inrow[0].buffer(float(buffer_distace) * -1)
-            if inbuffer.area == 0.0:
-                ngcnt += 1
-            else:
-                outcur.updateRow([inrow[0].difference(inbuffer)])
+                    for distance, ring in rings:
+                        if distance_field != u"":
+                            outcur.insertRow(tuple(newValue[:-1]) + (distance, ring))
+                        else:
+                            outcur.insertRow(tuple(newValue[:-1]) + (ring,))
 
-        if ngcnt != 0:
-            arcpy.AddWarning("内向きバッファのサイズが元のポリゴンの範囲を超えていたため、作成できなかったデータがあります")
+        if passed != 0:
+            arcpy.AddWarning(u"距離が指定されていない、またはジオメトリが NULL のため、元のジオメトリのまま出力したデータが{0}件あります".format(passed))
 
-        # 後始末
-        del outcur
+        # 作成できなかったフィーチャの一覧をテーブルに出力
+        if len(failed) != 0:
+            table = write_failed_table(out_poly_fc, failed)
+            arcpy.AddWarning(u"内向きバッファのサイズが元のポリゴンの範囲を超えていた、または距離が指定されていなかったため、"
+                             u"作成できなかったデータが{0}件あります（{1}）".format(len(failed), table))
 
         arcpy.AddMessage(u"処理終了：")
 
@@ -84,4 +342,5 @@ def create_inside_buffer(in_poly_fc, out_poly_fc, buffer_distace):
 
 
 if __name__ == u'__main__':
-    setup_create_inside_buffer()
+    with profiling.profile(u"CreateInsideBuffer", arcpy.GetParameterAsText(1)):
+        setup_create_inside_buffer()
@@ -4,7 +4,7 @@ Tool name : ポリゴン同士重なる領域を削除
 Source    : DelOverlapPoly.py
 Author    : Esri Japan Corporation
 Created   : 2019/6/21
-Updated   :
+Updated   : 2026/10/19
 """
 
 class AlreadyExistError(Exception):
@@ -14,6 +14,7 @@ class AlreadyExistError(Exception):
 import arcpy
 import sys
 import os
+from ejpyconv import profiling
 
 
 def setup_del_overlap_poly():
@@ -71,4 +72,5 @@ def del_overlap_poly(in_poly_fc1, in_poly_fc2, out_poly_fc):
 
 
 if __name__ == u'__main__':
-    setup_del_overlap_poly()
+    with profiling.profile(u"DelOverlapPoly", arcpy.GetParameterAsText(2)):
+        setup_del_overlap_poly()
@@ -4,7 +4,7 @@ Tool name : ラインの中間点をポイントへ変換
 Source    : LineMidPtToPt.py
 Author    : Esri Japan Corporation
 Created   : 2018/12/14
-Updated   : 2021/03/19
+Updated   : 2026/10/19
 """
 
 class AlreadyExistError(Exception):
@@ -14,148 +14,158 @@ class AlreadyExistError(Exception):
 import arcpy
 import sys
 import os
+from ejpyconv import featureio, profiling
+from ejpyconv.fieldinfo import add_fields, create_fieldinfo
+from ejpyconv.geometry import from_json
+from ejpyconv.progress import Progress
+import numpy as np
 
 
-# フィーチャクラスの作成と属性情報コピーの準備
-def create_fieldinfo(in_line_fc, out_pt_fc):
+# 位置の種類（FRACTION：割合、DISTANCE：始点からの距離、INTERVAL：一定間隔）
+POSITION_TYPES = (u"FRACTION", u"DISTANCE", u"INTERVAL")
+
+
+def parse_positions(position):
     """
-    メソッド名 : create_fieldinfo メソッド
-    引数 1     : 入力フィーチャ
-    引数 2     : 出力フィーチャクラス
-    概要       : カーソル作成に用いるフィールド情報を作成
+    メソッド名 : parse_positions メソッド
+    引数 1     : ライン上の位置（数値、数値のリスト、またはセミコロン区切りの文字列）
+    概要       : ライン上の位置を昇順のリストに変換
     """
-    # 出力パスの取得
-    out_ws = os.path.dirname(out_pt_fc)
-    out_fc_name = os.path.basename(out_pt_fc)
-
-    # 入力データの情報を取得
-    in_fc_name = os.path.basename(in_line_fc)
-    in_ws = os.path.dirname(in_line_fc)
-    in_desc = arcpy.Describe(in_line_fc)
-    in_fields = in_desc.Fields
-    # ポリゴンから座標系を取得
-    spref = in_desc.spatialReference
-
-    # フィーチャクラスの作成
-    arcpy.CreateFeatureclass_management(out_ws, out_fc_name, "POINT", in_line_fc, "", "", spref)
-
-    # 変数定義
-    search_fields_name = []
-    search_fields_type = []
-    del_fields = []
-    use_fields = []
-
-    # 属性情報コピーの準備
-    for i, field in enumerate(in_fields):
-        if (field.type == u"OID") or (field.type == u"Geometry"):
-            pass
-        # 出力が Shape ファイルの場合は、削除対象
-        elif field.name.lower() == "shape_length" or field.name.lower() == "shape_area":
-            del_fields.append(i)
-        else:
-            search_fields_name.append(field.name)
-            search_fields_type.append(field.type)
-            # 属性情報コピーの対象となるフィールドのインデックス番号を取得
-            use_fields.append(i)
-            
-    out_fields = arcpy.ListFields(out_pt_fc)
+    if isinstance(position, (list, tuple)):
+        positions = position
+    else:
+        positions = str(position).split(u";")
+
+    return sorted(float(p) for p in positions if str(p).strip() != u"")
 
-    # 出力がShape ファイルの場合
-    if arcpy.Describe(out_ws).workspacetype == "FileSystem":
 
-        # 入力もShape ファイルの場合はスルー。
-        # Shape_Length、Shape_Area フィールドは削除
-        if arcpy.Describe(in_desc.path).workspacetype != "FileSystem":
-            if len(del_fields) != 0:
-                del_fields_name = [out_fields[index].name for index in del_fields]
-                arcpy.DeleteField_management(out_pt_fc, del_fields_name)
+def station_distances(total, positions, position_type=u"FRACTION"):
+    """
+    メソッド名 : station_distances メソッド
+    引数 1     : パートの長さ
+    引数 2     : ライン上の位置のリスト
+    引数 3     : 位置の種類（FRACTION：割合、DISTANCE：始点からの距離、INTERVAL：一定間隔）
+    概要       : ポイントを発生させる始点からの距離の配列を返す
+                 INTERVAL の場合は始点から位置の先頭の値の間隔で、終点も含める
+    """
+    if position_type == u"INTERVAL":
+        interval = positions[0]
+        distances = np.arange(0.0, total, interval)
+        if len(distances) == 0 or distances[-1] < total:
+            distances = np.append(distances, total)
+        return distances
 
-        # 属性情報コピーの対象とするフィールド名のリストを作成
-        # （インデックス番号を用いて Shape ファイルで短くなった名前を取得）
-        use_fields_name = [out_fields[index].name for index in use_fields]
-        use_fields_name.append("SHAPE@")
+    distances = np.asarray(positions, dtype=np.float64)
+    if position_type == u"FRACTION":
+        distances = distances * total
+    return np.clip(distances, 0.0, total)
 
-    # 出力が GDB の場合は、入力データと同じフィールド構造を使用
-    else:
-        use_fields_name = search_fields_name
 
-    search_fields_name.append("SHAPE@")
+def setup_linemiddlepoint_point():
+    """
+    メソッド名 : setup_linemiddlepoint_point メソッド
+    概要       : ラインの中間点のポイントへの変換に用いる入力情報の作成
+    """
+    in_line_fc = arcpy.GetParameterAsText(0)
+    out_pt_fc = arcpy.GetParameterAsText(1)
+    # 位置のパラメーターがツールに定義されていない場合は中間点（割合 0.5）
+    # 複数の位置はセミコロン区切りで指定
+    position = u"0.5"
+    position_type = u"FRACTION"
+    if arcpy.GetArgumentCount() > 2:
+        position = arcpy.GetParameterAsText(2) or u"0.5"
+    if arcpy.GetArgumentCount() > 3:
+        position_type = arcpy.GetParameterAsText(3) or u"FRACTION"
 
-    return search_fields_name, search_fields_type, use_fields_name, spref
+    linemiddlepoint_point(in_line_fc, out_pt_fc, position, position_type)
 
 
-def linemiddlepoint_point():
+def linemiddlepoint_point(in_line_fc, out_pt_fc, position=u"0.5", position_type=u"FRACTION"):
     """
     メソッド名 : linemiddlepoint_point
-    概要       : ラインの中間点からポイントへ変換
+    引数 1     : 入力ラインフィーチャ
+    引数 2     : 出力フィーチャ
+    引数 3     : 位置（複数の場合はセミコロン区切り）
+    引数 4     : 位置の種類（FRACTION：割合、DISTANCE：始点からの距離、INTERVAL：一定間隔）
+    概要       : ラインの中間点（または指定した割合・距離・間隔の位置）からポイントへ変換
     """
     try:
         arcpy.AddMessage(u"処理開始：")
         
-        in_line_fc = arcpy.GetParameterAsText(0)
-        out_pt_fc = arcpy.GetParameterAsText(1)
-
-        # ワークスペース
-        wstype = arcpy.Describe(os.path.dirname(out_pt_fc)).workspacetype
+        # 位置と位置の種類の確認（位置の種類は大文字・小文字を区別しない）
+        positions = parse_positions(position)
+        if len(positions) == 0:
+            raise ValueError(u"位置を 1 つ以上指定してください")
+        if position_type.upper() not in POSITION_TYPES:
+            raise ValueError(u"位置の種類が不正です：{0}（{1} のいずれかを指定してください）".format(
+                position_type, u"、".join(POSITION_TYPES)))
+        position_type = position_type.upper()
+        if position_type == u"INTERVAL" and positions[0] <= 0:
+            raise ValueError(u"間隔には 0 より大きい値を指定してください")
 
         # ワークスペースにすでに同一のフィーチャクラス名がないかチェック
-        if arcpy.Exists(out_pt_fc):
+        if featureio.exists(out_pt_fc):
             raise AlreadyExistError
 
         # カーソル作成に使用するフィールド情報を create_fieldinfo 関数を用いて取得
-        search_fields_name, search_fields_type, use_fields_name, spref = create_fieldinfo(in_line_fc, out_pt_fc)
+        search_fields_name, search_fields_type, use_fields_name, spref, row_transform = create_fieldinfo(in_line_fc, out_pt_fc, "POINT")
+
+        # 2026.10.19: 変更 - パートごとに Polyline を作成せず、頂点の座標配列から位置を計算するため
+        # 入力ジオメトリは JSON で読み込み、ポイントは XY 座標で挿入
+        search_fields_name = search_fields_name[:-1] + [u"SHAPE@JSON"]
+        use_fields_name = use_fields_name[:-1] + [u"SHAPE@XY"]
+
+        # 始点からの距離（メジャー）とパートの長さに対する割合のフィールドを追加
+        # （入力と同じ名前のフィールドがある場合は別の名前にする）
+        station_fields, renamed = add_fields(out_pt_fc, [(u"MEASURE", u"DOUBLE"), (u"FRACTION", u"DOUBLE")])
+        for field_name, new_name in renamed:
+            arcpy.AddWarning(u"{0} フィールドはすでに存在するため、{1} フィールドに出力します".format(field_name, new_name))
+        use_fields_name = use_fields_name[:-1] + station_fields + use_fields_name[-1:]
 
-        # 2021.03.19: 追記 - 座標系をインプットから取得
-        #Polyline 作成時の引数に、座標系を指定していないと、ジオメトリが空になり、multiLine.positionAlongLine で例外が発生する場合がある
-        spref = arcpy.Describe(in_line_fc).spatialReference
-        
         # 2021.03.19: 変更 - 例外発生時にロックが残ってしまうので、with に変更
         # フィーチャクラスの検索カーソル作成
         #incur = arcpy.da.SearchCursor(in_line_fc, search_fields_name)
         # フィーチャクラスの挿入カーソル作成
         #outcur = arcpy.da.InsertCursor(out_pt_fc, use_fields_name)
-        with arcpy.da.SearchCursor(in_line_fc, search_fields_name) as incur:
+        with featureio.search_cursor(in_line_fc, search_fields_name) as incur:
             
-            with arcpy.da.InsertCursor(out_pt_fc, use_fields_name) as outcur:
+            with featureio.insert_cursor(out_pt_fc, use_fields_name) as outcur:
                 
                 i = 0
-                num = int(arcpy.GetCount_management(in_line_fc).getOutput(0))
+                num = featureio.get_count(in_line_fc)
+                progress = Progress(num)
 
                 # フィーチャ(ジオメトリ)の数
                 for inrow in incur:
                     i = i + 1
-                    if (i == 1) or (i == num) or (i % 1000 == 1):
-                        s = u"{0}/{1}の処理中・・・".format(i, num)
-                        arcpy.AddMessage(s)
-
-                    newValue = []
-                    # 出力がShape ファイルの場合、NULL 値を格納できないため
-                    # フィールドのタイプに合わせて、空白や 0 を格納する
-                    if wstype == "FileSystem":
-                        for j, value in enumerate(inrow):
-                            if value == None:
-                                if search_fields_type[j] == "String":
-                                    newValue.append("")
-                                elif search_fields_type[j] in ["Double", "Integer", "Single", "SmallInteger"]:
-                                    newValue.append(0)
-                                else:
-                                    newValue.append(value)
-                            else:
-                                newValue.append(value)
-                    # GDB は NULL 値を格納可能
-                    else:
-                        newValue = list(inrow)
-
-                    # パートの数
-                    for part in inrow[-1]:
-                        # マルチラインに対してそれぞれ中間点を取るためにパートからラインを生成する（パートを考慮する必要がなければ inrow[-1] に対して中間点を取ればよい)
-                        multiLine = arcpy.Polyline(
-                                    arcpy.Array([coords for coords in part]),spref) # 2021.03.19: Poline 作成時の空間参照を指定に変更
-                        #            arcpy.Array([coords for coords in part]))
-                        # ジオメトリにラインの中間点ポイントを格納
-                        newValue[-1] = multiLine.positionAlongLine(0.5,True)
-                        # リストからタプルに変換してインサート
-                        outcur.insertRow(tuple(newValue))
+                    progress.update(i)
+
+                    # 属性値のコピー（出力がShape ファイルの場合は NULL 値を空白や 0 に置き換え）
+                    newValue = row_transform(inrow)
+
+                    attributes = tuple(newValue[:-1])
+
+                    geometry = from_json(inrow[-1])
+                    if geometry is None:
+                        continue
+
+                    # マルチラインに対してそれぞれ中間点を取るため、頂点を持つパートごとに位置を計算
+                    lengths = geometry.ring_lengths()
+                    parts = np.flatnonzero(np.diff(geometry.ring_offsets) > 0)
+                    if len(parts) == 0:
+                        continue
+                    stations = [station_distances(lengths[k], positions, position_type) for k in parts]
+                    distances = np.concatenate(stations)
+                    part_indices = np.repeat(parts, [len(station) for station in stations])
+
+                    # すべてのパートの位置を累積距離の配列からまとめて補間
+                    points = geometry.interpolate(part_indices, distances)
+                    part_lengths = lengths[part_indices]
+                    fractions = np.where(part_lengths > 0.0, distances / np.where(part_lengths > 0.0, part_lengths, 1.0), 0.0)
+
+                    # ジオメトリにライン上のポイントの XY 座標を格納してインサート
+                    for xy, distance, fraction in zip(points.tolist(), distances.tolist(), fractions.tolist()):
+                        outcur.insertRow(attributes + (distance, fraction, tuple(xy)))
 
 #        # 2021.03.19: with に変更したので不要
 #        del outcur
@@ -171,4 +181,5 @@ def linemiddlepoint_point():
 
 
 if __name__ == "__main__":
-    linemiddlepoint_point()
+    with profiling.profile(u"LineMidPtToPt", arcpy.GetParameterAsText(1)):
+        setup_linemiddlepoint_point()
@@ -4,7 +4,7 @@ Tool name : ラインの始終点をポイントへ変換
 Source    : LineStartingAndEndingPtToPt.py
 Author    : Esri Japan Corporation
 Created   : 2018/12/14
-Updated   : 2024/08/20
+Updated   : 2026/10/19
 """
 
 class AlreadyExistError(Exception):
@@ -14,143 +14,193 @@ class AlreadyExistError(Exception):
 import arcpy
 import sys
 import os
+import math
+from ejpyconv import featureio, profiling
+from ejpyconv.fieldinfo import add_fields, create_fieldinfo
+from ejpyconv.geometry import json_vertices
+from ejpyconv.progress import Progress
 
 
-# フィーチャクラスの作成と属性情報コピーの準備
-def create_fieldinfo(in_line_fc, out_pt_fc):
+def part_endpoints(part, out_type):
     """
-    メソッド名 : create_fieldinfo メソッド
-    引数 1     : 入力フィーチャ
-    引数 2     : 出力フィーチャクラス
-    概要       : カーソル作成に用いるフィールド情報を作成
+    メソッド名 : part_endpoints メソッド
+    引数 1     : パートの頂点の XY 座標のリスト
+    引数 2     : 出力する端点（BOTH、START、END）
+    概要       : パートの始点・終点の XY 座標のリストを取得
     """
-    # 出力パスの取得
-    out_ws = os.path.dirname(out_pt_fc)
-    out_fc_name = os.path.basename(out_pt_fc)
-
-    # 入力データの情報を取得
-    in_fc_name = os.path.basename(in_line_fc)
-    in_ws = os.path.dirname(in_line_fc)
-    in_desc = arcpy.Describe(in_line_fc)
-    in_fields = in_desc.Fields
-    # ポリゴンから座標系を取得
-    spref = in_desc.spatialReference
-
-    # フィーチャクラスの作成
-    arcpy.CreateFeatureclass_management(out_ws, out_fc_name, "POINT", in_line_fc, "", "", spref)
-
-    # 変数定義
-    search_fields_name = []
-    search_fields_type = []
-    del_fields = []
-    use_fields = []
-
-    # 属性情報コピーの準備
-    for i, field in enumerate(in_fields):
-        if (field.type == u"OID") or (field.type == u"Geometry"):
-            pass
-        # 出力が Shape ファイルの場合は、削除対象
-        elif field.name.lower() == "shape_length" or field.name.lower() == "shape_area":
-            del_fields.append(i)
-        else:
-            search_fields_name.append(field.name)
-            search_fields_type.append(field.type)
-            # 属性情報コピーの対象となるフィールドのインデックス番号を取得
-            use_fields.append(i)
-            
-    out_fields = arcpy.ListFields(out_pt_fc)
-
-    # 出力がShape ファイルの場合
-    if arcpy.Describe(out_ws).workspacetype == "FileSystem":
-
-        # 入力もShape ファイルの場合はスルー。
-        # Shape_Length、Shape_Area フィールドは削除
-        if arcpy.Describe(in_desc.path).workspacetype != "FileSystem":
-            if len(del_fields) != 0:
-                del_fields_name = [out_fields[index].name for index in del_fields]
-                arcpy.DeleteField_management(out_pt_fc, del_fields_name)
-
-        # 属性情報コピーの対象とするフィールド名のリストを作成
-        # （インデックス番号を用いて Shape ファイルで短くなった名前を取得）
-        use_fields_name = [out_fields[index].name for index in use_fields]
-        use_fields_name.append("SHAPE@")
-
-    # 出力が GDB の場合は、入力データと同じフィールド構造を使用
-    else:
-        use_fields_name = search_fields_name
-
-    search_fields_name.append("SHAPE@")
-
-    return search_fields_name, search_fields_type, use_fields_name, spref
-
-
-def lineendpoint_point():
+    endpoints = []
+    if len(part) == 0:
+        return endpoints
+    if out_type == 'BOTH' or out_type == 'START':
+        endpoints.append(part[0])
+    if out_type == 'BOTH' or out_type == 'END':
+        endpoints.append(part[-1])
+    return endpoints
+
+
+def node_cell(xy, tolerance):
+    """
+    メソッド名 : node_cell メソッド
+    引数 1     : XY 座標
+    引数 2     : 許容距離（格子の幅）
+    概要       : 端点の検索に使用する格子のセルのキーを作成
+    """
+    return (int(math.floor(xy[0] / tolerance)), int(math.floor(xy[1] / tolerance)))
+
+
+def find_node(grid, xy, tolerance):
+    """
+    メソッド名 : find_node メソッド
+    引数 1     : 格子のセルごとのノードのリストの辞書
+    引数 2     : 端点の XY 座標
+    引数 3     : 許容距離
+    概要       : 端点から許容距離以内にあるノード（最初に集約した端点の位置）のうち、最も近いものを取得
+                 格子の幅は許容距離のため、端点のセルと周囲の 8 セルのノードだけを比較する
+                 許容距離以内のノードがない場合は None
+    """
+    cx, cy = node_cell(xy, tolerance)
+    nearest = None
+    nearest_d2 = tolerance * tolerance
+    for dx in (-1, 0, 1):
+        for dy in (-1, 0, 1):
+            for node in grid.get((cx + dx, cy + dy), ()):
+                d2 = (node[0][0] - xy[0]) ** 2 + (node[0][1] - xy[1]) ** 2
+                if d2 <= nearest_d2:
+                    nearest = node
+                    nearest_d2 = d2
+    return nearest
+
+
+def oid_list_text(oids, length):
+    """
+    メソッド名 : oid_list_text メソッド
+    引数 1     : OBJECTID のリスト
+    引数 2     : フィールドの長さ
+    概要       : OBJECTID のリストをカンマ区切りの文字列に変換（フィールドの長さを超える場合は省略）
+    """
+    text = u",".join(str(oid) for oid in oids)
+    if len(text) > length:
+        text = text[:length - 3].rsplit(u",", 1)[0] + u",.."
+    return text
+
+
+def setup_lineendpoint_point():
+    """
+    メソッド名 : setup_lineendpoint_point メソッド
+    概要       : ラインの終始点のポイントへの変換に用いる入力情報の作成
+    """
+    in_line_fc = arcpy.GetParameterAsText(0)
+    out_pt_fc = arcpy.GetParameterAsText(1)
+    out_type = arcpy.GetParameterAsText(2)
+    # 端点の集約のパラメーターがツールに定義されていない場合は集約しない
+    dissolve_node = False
+    tolerance = 0
+    if arcpy.GetArgumentCount() > 3:
+        dissolve_node = arcpy.GetParameter(3)
+    if arcpy.GetArgumentCount() > 4:
+        tolerance = arcpy.GetParameter(4) or 0
+
+    lineendpoint_point(in_line_fc, out_pt_fc, out_type, dissolve_node, tolerance)
+
+
+def lineendpoint_point(in_line_fc, out_pt_fc, out_type, dissolve_node=False, tolerance=0):
     """
     メソッド名 : lineendpoint_point メソッド
+    引数 1     : 入力ラインフィーチャ
+    引数 2     : 出力フィーチャ
+    引数 3     : 出力する端点（BOTH：始点と終点、START：始点、END：終点）
+    引数 4     : 同じ位置の端点の集約有無
+    引数 5     : 端点を集約する許容距離（0 の場合は座標が一致する端点のみ集約）
     概要       : ラインの終始点からポイントへ変換
     """
     try:
         arcpy.AddMessage(u"処理開始：")
 
-        in_line_fc = arcpy.GetParameterAsText(0)
-        out_pt_fc = arcpy.GetParameterAsText(1)
-        out_type = arcpy.GetParameterAsText(2)
-
-        # ワークスペース
-        wstype = arcpy.Describe(os.path.dirname(out_pt_fc)).workspacetype
-
         # ワークスペースにすでに同一のフィーチャクラス名がないかチェック
-        if arcpy.Exists(out_pt_fc):
+        if featureio.exists(out_pt_fc):
             raise AlreadyExistError
 
         # カーソル作成に使用するフィールド情報を create_fieldinfo 関数を用いて取得
-        search_fields_name, search_fields_type, use_fields_name, spref = create_fieldinfo(in_line_fc, out_pt_fc)
+        search_fields_name, search_fields_type, use_fields_name, spref, row_transform = create_fieldinfo(in_line_fc, out_pt_fc, "POINT")
+
+        # 入力ジオメトリは JSON で読み込み、ポイントは XY 座標で挿入
+        # 端点の集約のため、検索カーソルの先頭に OBJECTID を追加
+        search_fields_name = [u"OID@"] + search_fields_name[:-1] + [u"SHAPE@JSON"]
+        use_fields_name = use_fields_name[:-1] + [u"SHAPE@XY"]
+
+        # 端点を集約する場合は、接続するラインの端点の数、ラインの数、ラインの OBJECTID のフィールドを追加
+        # （入力と同じ名前のフィールドがある場合は別の名前にする）
+        if dissolve_node == True:
+            oid_length = 254
+            node_fields, renamed = add_fields(out_pt_fc, [(u"DEGREE", u"LONG"), (u"LINE_CNT", u"LONG"),
+                                                          (u"LINE_OIDS", u"TEXT", oid_length)])
+            for field_name, new_name in renamed:
+                arcpy.AddWarning(u"{0} フィールドはすでに存在するため、{1} フィールドに出力します".format(field_name, new_name))
+            use_fields_name = use_fields_name[:-1] + node_fields + use_fields_name[-1:]
+            tolerance = float(tolerance)
+            # 集約した端点（ノード）のリストと、座標（許容距離が 0 の場合）または格子のセルごとのノード
+            nodes = []
+            node_index = {}
 
         # フィーチャクラスの検索カーソル作成
-        incur = arcpy.da.SearchCursor(in_line_fc, search_fields_name)
+        incur = featureio.search_cursor(in_line_fc, search_fields_name)
         # フィーチャクラスの挿入カーソル作成
-        outcur = arcpy.da.InsertCursor(out_pt_fc, use_fields_name)
+        outcur = featureio.insert_cursor(out_pt_fc, use_fields_name)
 
         i = 0
-        num = int(arcpy.GetCount_management(in_line_fc).getOutput(0))
+        num = featureio.get_count(in_line_fc)
+        progress = Progress(num)
 
         # フィーチャ(ジオメトリ)の数
         for inrow in incur:
             i = i + 1
-            if (i == 1) or (i == num) or (i % 1000 == 1):
-                s = u"{0}/{1}の処理中・・・".format(i, num)
-                arcpy.AddMessage(s)
-
-            newValue = []
-            # 出力がShape ファイルの場合、NULL 値を格納できないため
-            # フィールドのタイプに合わせて、空白や 0 を格納する
-            if wstype == "FileSystem":
-                for j, value in enumerate(inrow):
-                    if value == None:
-                        if search_fields_type[j] == "String":
-                            newValue.append("")
-                        elif search_fields_type[j] in ["Double", "Integer", "Single", "SmallInteger"]:
-                            newValue.append(0)
-                        else:
-                            newValue.append(value)
-                    else:
-                        newValue.append(value)
-            # GDB は NULL 値を格納可能
-            else:
-                newValue = list(inrow)
+            progress.update(i)
+
+            oid = inrow[0]
+            inrow = inrow[1:]
+
+            # 属性値のコピー（出力がShape ファイルの場合は NULL 値を空白や 0 に置き換え）
+            newValue = row_transform(inrow)
+
+            attributes = tuple(newValue[:-1])
 
             # パートの数
-            for part in inrow[-1]:
-                if out_type == 'BOTH' or out_type == 'START':
-                    # ジオメトリにラインの始点ポイントを格納
-                    newValue[-1] = arcpy.PointGeometry(part[0], spref)
-                    # リストからタプルに変換してインサート
-                    outcur.insertRow(tuple(newValue))
-                if out_type == 'BOTH' or out_type == 'END':
-                    # ジオメトリにラインの終点ポイントを格納
-                    newValue[-1] = arcpy.PointGeometry(part[part.count - 1], spref)
-                    # リストからタプルに変換してインサート
-                    outcur.insertRow(tuple(newValue))
+            for part in json_vertices(inrow[-1], u"paths"):
+                # ジオメトリにラインの始点・終点の XY 座標を格納
+                for xy in part_endpoints(part, out_type):
+                    if dissolve_node == True:
+                        # 許容距離以内のノードに端点を集約（位置と属性値は最初に集約した端点のものを使用）
+                        if tolerance > 0:
+                            node = find_node(node_index, xy, tolerance)
+                        else:
+                            node = node_index.get(xy)
+                        if node is None:
+                            node = [xy, attributes, 1, [oid]]
+                            nodes.append(node)
+                            if tolerance > 0:
+                                node_index.setdefault(node_cell(xy, tolerance), []).append(node)
+                            else:
+                                node_index[xy] = node
+                        else:
+                            node[2] += 1
+                            if node[3][-1] != oid:
+                                node[3].append(oid)
+                    else:
+                        # リストからタプルに変換してインサート
+                        outcur.insertRow(attributes + (xy,))
+
+        # 集約した端点をノードごとに 1 つインサート
+        if dissolve_node == True:
+            truncated = 0
+            for xy, attributes, degree, oids in nodes:
+                oid_text = oid_list_text(oids, oid_length)
+                # oid_list_text は省略した場合、末尾を ,.. にする
+                if oid_text.endswith(u",.."):
+                    truncated += 1
+                outcur.insertRow(attributes + (degree, len(oids), oid_text, xy))
+            if truncated != 0:
+                arcpy.AddWarning(u"ラインの OBJECTID がフィールドの長さ（{0} 文字）を超えたため、{1} フィールドで一部を省略したポイントが{2}件あります".format(
+                    oid_length, node_fields[2], truncated))
         # 後始末
         del outcur
         del incur
@@ -165,4 +215,5 @@ def lineendpoint_point():
 
 
 if __name__ == "__main__":
-    lineendpoint_point()
+    with profiling.profile(u"LineStartingAndEndingPtToPt", arcpy.GetParameterAsText(1)):
+        setup_lineendpoint_point()
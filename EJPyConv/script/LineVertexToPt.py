@@ -4,7 +4,7 @@ Tool name : ラインの頂点をポイントへ変換
 Source    : LineVertexToPt.py
 Author    : Esri Japan Corporation
 Created   : 2018/12/14
-Updated   :
+Updated   : 2026/10/19
 """
 
 class AlreadyExistError(Exception):
@@ -14,138 +14,72 @@ class AlreadyExistError(Exception):
 import arcpy
 import sys
 import os
+from ejpyconv import featureio, profiling
+from ejpyconv.fieldinfo import create_fieldinfo
+from ejpyconv.geometry import from_json
+from ejpyconv.progress import Progress
 
 
-# フィーチャクラスの作成と属性情報コピーの準備
-def create_fieldinfo(in_line_fc, out_pt_fc):
+def setup_linevertex_point():
     """
-    メソッド名 : create_fieldinfo メソッド
-    引数 1     : 入力フィーチャ
-    引数 2     : 出力フィーチャクラス
-    概要       : カーソル作成に用いるフィールド情報を作成
+    メソッド名 : setup_linevertex_point メソッド
+    概要       : ラインの頂点のポイントへの変換に用いる入力情報の作成
     """
-    # 出力パスの取得
-    out_ws = os.path.dirname(out_pt_fc)
-    out_fc_name = os.path.basename(out_pt_fc)
-
-    # 入力データの情報を取得
-    in_fc_name = os.path.basename(in_line_fc)
-    in_ws = os.path.dirname(in_line_fc)
-    in_desc = arcpy.Describe(in_line_fc)
-    in_fields = in_desc.Fields
-    # ポリゴンから座標系を取得
-    spref = in_desc.spatialReference
-
-    # フィーチャクラスの作成
-    arcpy.CreateFeatureclass_management(out_ws, out_fc_name, "POINT", in_line_fc, "", "", spref)
-
-    # 変数定義
-    search_fields_name = []
-    search_fields_type = []
-    del_fields = []
-    use_fields = []
-
-    # 属性情報コピーの準備
-    for i, field in enumerate(in_fields):
-        if (field.type == u"OID") or (field.type == u"Geometry"):
-            pass
-        # 出力が Shape ファイルの場合は、削除対象
-        elif field.name.lower() == "shape_length" or field.name.lower() == "shape_area":
-            del_fields.append(i)
-        else:
-            search_fields_name.append(field.name)
-            search_fields_type.append(field.type)
-            # 属性情報コピーの対象となるフィールドのインデックス番号を取得
-            use_fields.append(i)
-            
-    out_fields = arcpy.ListFields(out_pt_fc)
-
-    # 出力がShape ファイルの場合
-    if arcpy.Describe(out_ws).workspacetype == "FileSystem":
-
-        # 入力もShape ファイルの場合はスルー。
-        # Shape_Length、Shape_Area フィールドは削除
-        if arcpy.Describe(in_desc.path).workspacetype != "FileSystem":
-            if len(del_fields) != 0:
-                del_fields_name = [out_fields[index].name for index in del_fields]
-                arcpy.DeleteField_management(out_pt_fc, del_fields_name)
-
-        # 属性情報コピーの対象とするフィールド名のリストを作成
-        # （インデックス番号を用いて Shape ファイルで短くなった名前を取得）
-        use_fields_name = [out_fields[index].name for index in use_fields]
-        use_fields_name.append("SHAPE@")
-
-    # 出力が GDB の場合は、入力データと同じフィールド構造を使用
-    else:
-        use_fields_name = search_fields_name
-
-    search_fields_name.append("SHAPE@")
-
-    return search_fields_name, search_fields_type, use_fields_name, spref
-
-
-def linevertex_point():
+    in_line_fc = arcpy.GetParameterAsText(0)
+    out_pt_fc = arcpy.GetParameterAsText(1)
+
+    linevertex_point(in_line_fc, out_pt_fc)
+
+
+def linevertex_point(in_line_fc, out_pt_fc):
     """
     メソッド名 : linevertex_point メソッド
+    引数 1     : 入力ラインフィーチャ
+    引数 2     : 出力フィーチャ
     概要       : ラインの頂点からポイントへ変換
     """
     try:
         arcpy.AddMessage(u"処理開始：")
 
-        in_line_fc = arcpy.GetParameterAsText(0)
-        out_pt_fc = arcpy.GetParameterAsText(1)
-
-        # ワークスペース
-        wstype = arcpy.Describe(os.path.dirname(out_pt_fc)).workspacetype
-
         # ワークスペースにすでに同一のフィーチャクラス名がないかチェック
-        if arcpy.Exists(out_pt_fc):
+        if featureio.exists(out_pt_fc):
             raise AlreadyExistError
 
         # カーソル作成に使用するフィールド情報を create_fieldinfo 関数を用いて取得
-        search_fields_name, search_fields_type, use_fields_name, spref = create_fieldinfo(in_line_fc, out_pt_fc)
+        search_fields_name, search_fields_type, use_fields_name, spref, row_transform = create_fieldinfo(in_line_fc, out_pt_fc, "POINT")
+
+        # 入力ジオメトリは JSON で座標配列として読み込み、ポイントは XY 座標で挿入
+        search_fields_name = search_fields_name[:-1] + [u"SHAPE@JSON"]
+        use_fields_name = use_fields_name[:-1] + [u"SHAPE@XY"]
 
         # フィーチャクラスの検索カーソル作成
-        incur = arcpy.da.SearchCursor(in_line_fc, search_fields_name)
+        incur = featureio.search_cursor(in_line_fc, search_fields_name)
         # フィーチャクラスの挿入カーソル作成
-        outcur = arcpy.da.InsertCursor(out_pt_fc, use_fields_name)
+        outcur = featureio.insert_cursor(out_pt_fc, use_fields_name)
 
         i = 0
-        num = int(arcpy.GetCount_management(in_line_fc).getOutput(0))
+        num = featureio.get_count(in_line_fc)
+        progress = Progress(num)
 
         # フィーチャ(ジオメトリ)の数
         for inrow in incur:
             i = i + 1
-            if (i == 1) or (i == num) or (i % 1000 == 1):
-                s = u"{0}/{1}の処理中・・・".format(i, num)
-                arcpy.AddMessage(s)
-
-            newValue = []
-            # 出力がShape ファイルの場合、NULL 値を格納できないため
-            # フィールドのタイプに合わせて、空白や 0 を格納する
-            if wstype == "FileSystem":
-                for j, value in enumerate(inrow):
-                    if value == None:
-                        if search_fields_type[j] == "String":
-                            newValue.append("")
-                        elif search_fields_type[j] in ["Double", "Integer", "Single", "SmallInteger"]:
-                            newValue.append(0)
-                        else:
-                            newValue.append(value)
-                    else:
-                        newValue.append(value)
-            # GDB は NULL 値を格納可能
-            else:
-                newValue = list(inrow)
-
-            # パートの数
-            for part in inrow[-1]:
-                # 頂点座標の数
-                for pnt in part:
-                    # ジオメトリにラインの頂点のポイントを格納
-                    newValue[-1] = arcpy.PointGeometry(arcpy.Point(pnt.X, pnt.Y), spref)
-                    # リストからタプルに変換してインサート
-                    outcur.insertRow(tuple(newValue))
+            progress.update(i)
+
+            # 属性値のコピー（出力がShape ファイルの場合は NULL 値を空白や 0 に置き換え）
+            newValue = row_transform(inrow)
+
+            # 属性値はフィーチャごとに 1 回だけタプルに変換
+            attributes = tuple(newValue[:-1])
+
+            geometry = from_json(inrow[-1])
+            if geometry is None:
+                continue
+
+            # すべてのパートの頂点座標の数
+            for xy in geometry.xy.tolist():
+                # ジオメトリにラインの頂点の XY 座標を格納してインサート
+                outcur.insertRow(attributes + (tuple(xy),))
         # 後始末
         del outcur
         del incur
@@ -160,4 +94,5 @@ def linevertex_point():
 
 
 if __name__ == "__main__":
-    linevertex_point()
+    with profiling.profile(u"LineVertexToPt", arcpy.GetParameterAsText(1)):
+        setup_linevertex_point()
@@ -4,7 +4,7 @@ Tool name : ポリゴンの重心点をポイントへ変換
 Source    : PolyCenterToPt.py
 Author    : Esri Japan Corporation
 Created   : 2018/12/14
-Updated   :
+Updated   : 2026/10/19
 """
 
 class AlreadyExistError(Exception):
@@ -14,134 +14,193 @@ class AlreadyExistError(Exception):
 import arcpy
 import sys
 import os
+from ejpyconv.fieldinfo import create_fieldinfo
+from ejpyconv.geometry import POLYGON, from_rings, json_vertices
+from ejpyconv import profiling
+from ejpyconv.progress import Progress
+import heapq
+import numpy as np
 
 
-# フィーチャクラスの作成と属性情報コピーの準備
-def create_fieldinfo(in_poly_fc, out_pt_fc):
+def signed_distance(x, y, segments):
     """
-    メソッド名 : create_fieldinfo メソッド
-    引数 1     : 入力ポリゴン
-    引数 2     : 出力ポイント
-    概要       : カーソル作成に用いるフィールド情報の作成
+    メソッド名 : signed_distance メソッド
+    引数 1     : ポイントの X 座標の配列
+    引数 2     : ポイントの Y 座標の配列
+    引数 3     : ポリゴンのすべてのリングの辺の始点・終点の座標の配列 (ax, ay, bx, by)
+    概要       : ポイントからポリゴンの辺までの最短距離の配列（ポリゴンの外側は負）
     """
-    # 出力パスの取得
-    out_ws = os.path.dirname(out_pt_fc)
-    out_fc_name = os.path.basename(out_pt_fc)
-
-    # 入力データの情報を取得
-    in_fc_name = os.path.basename(in_poly_fc)
-    in_ws = os.path.dirname(in_poly_fc)
-    in_desc = arcpy.Describe(in_poly_fc)
-    in_fields = in_desc.Fields
-    # ポリゴンから座標系を取得
-    spref = in_desc.spatialReference
-
-    # フィーチャクラスの作成
-    arcpy.CreateFeatureclass_management(out_ws, out_fc_name, "POINT", in_poly_fc, "", "", spref)
-
-    # 変数定義
-    search_fields_name = []
-    search_fields_type = []
-    del_fields = []
-    use_fields = []
-
-    # 属性情報コピーの準備
-    for i, field in enumerate(in_fields):
-        if (field.type == u"OID") or (field.type == u"Geometry"):
-            pass
-        # 出力が Shape ファイルの場合は、削除対象
-        elif field.name.lower() == "shape_length" or field.name.lower() == "shape_area":
-            del_fields.append(i)
-        else:
-            search_fields_name.append(field.name)
-            search_fields_type.append(field.type)
-            # 属性情報コピーの対象となるフィールドのインデックス番号を取得
-            use_fields.append(i)
-            
-    out_fields = arcpy.ListFields(out_pt_fc)
+    ax, ay, bx, by = segments
+    x = np.asarray(x, dtype=np.float64)[:, np.newaxis]
+    y = np.asarray(y, dtype=np.float64)[:, np.newaxis]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # 内外判定（ポイントから右方向の半直線と交わる辺の数が奇数なら内側）
+        crosses = ((ay > y) != (by > y)) & (x < (bx - ax) * (y - ay) / (by - ay) + ax)
+        inside = np.count_nonzero(crosses, axis=1) % 2 == 1
 
-    # 出力がShape ファイルの場合
-    if arcpy.Describe(out_ws).workspacetype == "FileSystem":
+        # 辺までの距離
+        dx = bx - ax
+        dy = by - ay
+        length2 = dx * dx + dy * dy
+        t = np.where(length2 > 0.0, ((x - ax) * dx + (y - ay) * dy) / length2, 0.0)
+    t = np.clip(t, 0.0, 1.0)
+    distance = np.sqrt(np.min((ax + t * dx - x) ** 2 + (ay + t * dy - y) ** 2, axis=1))
 
-        # 入力もShape ファイルの場合はスルー。
-        # Shape_Length、Shape_Area フィールドは削除
-        if arcpy.Describe(in_desc.path).workspacetype != "FileSystem":
-            if len(del_fields) != 0:
-                del_fields_name = [out_fields[index].name for index in del_fields]
-                arcpy.DeleteField_management(out_pt_fc, del_fields_name)
+    return np.where(inside, distance, -distance)
 
-        # 属性情報コピーの対象とするフィールド名のリストを作成
-        # （インデックス番号を用いて Shape ファイルで短くなった名前を取得）
-        use_fields_name = [out_fields[index].name for index in use_fields]
-        use_fields_name.append("SHAPE@")
 
-    # 出力が GDB の場合は、入力データと同じフィールド構造を使用
-    else:
-        use_fields_name = search_fields_name
+def pole_of_inaccessibility(rings, precision=0):
+    """
+    メソッド名 : pole_of_inaccessibility メソッド
+    引数 1     : ポリゴンのリングの頂点の XY 座標のリスト
+    引数 2     : 精度（0 以下の場合は外接矩形の長辺の 1/1000）
+    概要       : ポリゴンの辺から最も遠い内側の点（到達不能極）を、優先度付きキューによる
+                 セルの分割（polylabel）で求め、XY 座標と辺までの距離を返す
+    """
+    rings = [np.asarray(ring, dtype=np.float64) for ring in rings if len(ring) > 1]
+    if len(rings) == 0:
+        return None, 0.0
+
+    xy = np.concatenate(rings)
+    # リングは始終点が重複しているため、隣り合う頂点を辺の始点・終点とする
+    start = np.concatenate([ring[:-1] for ring in rings])
+    end = np.concatenate([ring[1:] for ring in rings])
+    segments = (start[:, 0], start[:, 1], end[:, 0], end[:, 1])
+    minx, miny = xy.min(axis=0)
+    maxx, maxy = xy.max(axis=0)
+    width = maxx - minx
+    height = maxy - miny
+    cell_size = min(width, height)
+    if cell_size == 0.0:
+        return (float(minx), float(miny)), 0.0
+    if precision <= 0:
+        precision = max(width, height) / 1000.0
+
+    # ポリゴンの重心（穴を除いた面積の重心）を初期の最良点とする
+    best = from_rings(rings, POLYGON).centroid()
+    best_distance = signed_distance([best[0]], [best[1]], segments)[0]
+
+    # 外接矩形の中心の方が辺から遠い場合はそちらを最良点とする
+    center = (minx + width / 2.0, miny + height / 2.0)
+    center_distance = signed_distance([center[0]], [center[1]], segments)[0]
+    if center_distance > best_distance:
+        best, best_distance = center, center_distance
+
+    # 外接矩形をセルで覆い、セル内の最大距離（中心の距離 + 半対角線）の大きい順に分割
+    h = cell_size / 2.0
+    cx, cy = np.meshgrid(np.arange(minx, maxx, cell_size) + h, np.arange(miny, maxy, cell_size) + h)
+    cx = cx.ravel()
+    cy = cy.ravel()
+    distances = signed_distance(cx, cy, segments)
+
+    # 実行ごとに結果が変わらないよう、同じ最大距離のセルは追加した順に取り出す
+    queue = []
+    counter = 0
+    for px, py, d in zip(cx.tolist(), cy.tolist(), distances.tolist()):
+        heapq.heappush(queue, (-(d + h * np.sqrt(2.0)), counter, px, py, h, d))
+        counter += 1
+
+    while queue:
+        max_distance, _, px, py, h, d = heapq.heappop(queue)
+        if d > best_distance:
+            best, best_distance = (px, py), d
+
+        # 最大距離が最良点の距離 + 精度以下のセルは分割しない（以降のセルも同様）
+        if -max_distance - best_distance <= precision:
+            break
+
+        h = h / 2.0
+        children_x = np.array([px - h, px + h, px - h, px + h])
+        children_y = np.array([py - h, py - h, py + h, py + h])
+        children_d = signed_distance(children_x, children_y, segments)
+        for qx, qy, qd in zip(children_x.tolist(), children_y.tolist(), children_d.tolist()):
+            heapq.heappush(queue, (-(qd + h * np.sqrt(2.0)), counter, qx, qy, h, qd))
+            counter += 1
+
+    return (float(best[0]), float(best[1])), float(best_distance)
+
+
+def setup_polygon_point():
+    """
+    メソッド名：setup_polygon_point メソッド
+    概要      ：ポリゴンの重心点のポイントへの変換に用いる入力情報の作成
+    """
+    in_poly_fc = arcpy.GetParameterAsText(0)
+    out_pt_fc = arcpy.GetParameterAsText(1)
+    label_point_flg = arcpy.GetParameter(2)
+    # 到達不能極のパラメーターがツールに定義されていない場合は従来通り
+    pole_flg = False
+    precision = 0
+    if arcpy.GetArgumentCount() > 3:
+        pole_flg = arcpy.GetParameter(3)
+    if arcpy.GetArgumentCount() > 4:
+        precision = arcpy.GetParameter(4) or 0
 
-    search_fields_name.append("SHAPE@")
+    polygon_point(in_poly_fc, out_pt_fc, label_point_flg, pole_flg, precision)
 
-    return search_fields_name, search_fields_type, use_fields_name, spref
 
-def polygon_point():
+def polygon_point(in_poly_fc, out_pt_fc, label_point_flg=False, pole_flg=False, precision=0):
     """
     メソッド名：polygon_point メソッド
-    概要      ：ポリゴンの重心点からポイントに変換
+    引数 1    ：入力ポリゴンフィーチャ
+    引数 2    ：出力フィーチャ
+    引数 3    ：ラベルポイントの使用有無
+    引数 4    ：到達不能極の使用有無
+    引数 5    ：到達不能極の精度（0 以下の場合は自動）
+    概要      ：ポリゴンの重心点（ラベルポイント、到達不能極）からポイントに変換
     """
     try:
         arcpy.AddMessage(u"処理開始：")
 
-        in_poly_fc = arcpy.GetParameterAsText(0)
-        out_pt_fc = arcpy.GetParameterAsText(1)
-        label_point_flg = arcpy.GetParameter(2)
-
-        wstype = arcpy.Describe(os.path.dirname(out_pt_fc)).workspacetype
-
         # ポリゴンをテンプレートにしてポイントフィーチャクラスを作成し
         # 出力ポイントフィーチャクラスから抽出するフィールドのリストを作成
         if arcpy.Exists(out_pt_fc):
             raise AlreadyExistError
 
         # カーソル作成に使用するフィールド情報を create_fieldinfo 関数を用いて取得
-        search_fields_name, search_fields_type, use_fields_name, spref = create_fieldinfo(in_poly_fc, out_pt_fc)
+        search_fields_name, search_fields_type, use_fields_name, spref, row_transform = create_fieldinfo(in_poly_fc, out_pt_fc, "POINT")
+
+        # 重心点の場合は、ポリゴンのジオメトリを取得せずに SHAPE@XY（centroid の座標）を取得
+        # ポイントはいずれの場合も XY 座標で挿入
+        # 到達不能極の場合は、JSON でリングの座標配列を取得し、辺までの距離のフィールドを追加
+        if (pole_flg == True):
+            search_fields_name = search_fields_name[:-1] + [u"SHAPE@JSON"]
+            arcpy.AddField_management(out_pt_fc, u"POLE_DIST", u"DOUBLE")
+            use_fields_name = use_fields_name[:-1] + [u"POLE_DIST", u"SHAPE@XY"]
+            precision = float(precision)
+        elif (label_point_flg == False):
+            search_fields_name = search_fields_name[:-1] + [u"SHAPE@XY"]
+            use_fields_name = use_fields_name[:-1] + [u"SHAPE@XY"]
+        else:
+            use_fields_name = use_fields_name[:-1] + [u"SHAPE@XY"]
 
         incur = arcpy.da.SearchCursor(in_poly_fc, search_fields_name)
         outcur = arcpy.da.InsertCursor(out_pt_fc, use_fields_name)
 
         i = 0
         num = int(arcpy.GetCount_management(in_poly_fc).getOutput(0))
+        progress = Progress(num)
 
         for inrow in incur:
             i = i + 1
-            if (i == 1) or (i == num) or (i % 1000 == 1):
-                s = u"{0}/{1}の処理中・・・".format(i, num)
-                arcpy.AddMessage(s)
-
-            newValue = []
-            # 出力がShape ファイルの場合、NULL 値を格納できないため
-            # フィールドのタイプに合わせて、空白や 0 を格納する
-            if wstype == "FileSystem":
-                for j, value in enumerate(inrow):
-                    if value == None:
-                        if search_fields_type[j] == "String":
-                            newValue.append("")
-                        elif search_fields_type[j] in ["Double", "Integer", "Single", "SmallInteger"]:
-                            newValue.append(0)
-                        else:
-                            newValue.append(value)
-                    else:
-                        newValue.append(value)
-            # GDB は NULL 値を格納可能
-            else:
-                newValue = list(inrow)
+            progress.update(i)
+
+            # 属性値のコピー（出力がShape ファイルの場合は NULL 値を空白や 0 に置き換え）
+            newValue = row_transform(inrow)
 
             # オプションによって処理を分岐
-            if (label_point_flg == False):
-                # ジオメトリにポリゴンのcentroidポイントを格納
-                newValue[-1] = arcpy.PointGeometry(inrow[-1].centroid, spref)
-            else:
-                # ジオメトリにポリゴンのlabelPointポイントを格納
-                newValue[-1] = arcpy.PointGeometry(inrow[-1].labelPoint, spref)
+            if (pole_flg == True):
+                # ジオメトリにポリゴンの到達不能極の XY 座標、辺までの距離を格納
+                pole, distance = pole_of_inaccessibility(json_vertices(inrow[-1], u"rings"), precision)
+                newValue[-1:] = [distance, pole]
+            elif (label_point_flg == False):
+                # ジオメトリにポリゴンのcentroidの XY 座標を格納（SHAPE@XY の値をそのまま使用）
+                pass
+            elif inrow[-1] is not None:
+                # ジオメトリにポリゴンのlabelPointの XY 座標を格納
+                label_point = inrow[-1].labelPoint
+                newValue[-1] = (label_point.X, label_point.Y)
             # リストからタプルに変換してインサート
             outcur.insertRow(tuple(newValue))
         # 後始末
@@ -150,7 +209,7 @@ def polygon_point():
 
         arcpy.AddMessage(u"処理終了：")
     except AlreadyExistError:
-        arcpy.AddError(u"{0}に{1}はすでに存在しています".format(out_pt_fc, out_fc_name))
+        arcpy.AddError(u"{0}はすでに存在しています".format(out_pt_fc))
     except arcpy.ExecuteError:
         arcpy.AddError(arcpy.GetMessages(2))
     except Exception as e:
@@ -158,5 +217,6 @@ def polygon_point():
 
 
 if __name__ == "__main__":
-    polygon_point()
+    with profiling.profile(u"PolyCenterToPt", arcpy.GetParameterAsText(1)):
+        setup_polygon_point()
 
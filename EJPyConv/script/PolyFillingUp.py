@@ -4,7 +4,7 @@ Tool name : ポリゴンを穴埋め
 Source    : PolyFillingUp.py
 Author    : Esri Japan Corporation
 Created   : 2019/6/21
-Updated   : 2022/7/13
+Updated   : 2026/10/19
 """
 
 class AlreadyExistError(Exception):
@@ -14,6 +14,11 @@ class AlreadyExistError(Exception):
 import arcpy
 import sys
 import os
+from ejpyconv import featureio, profiling
+from ejpyconv.fieldinfo import add_fields, create_fieldinfo
+from ejpyconv.geometry import from_rings
+from ejpyconv.progress import Progress
+import json
 
 
 def setup_poly_filling_up():
@@ -23,15 +28,98 @@ def setup_poly_filling_up():
     """
     in_poly_fc = arcpy.GetParameterAsText(0)
     out_poly_fc = arcpy.GetParameterAsText(1)
+    # 穴埋めの条件のパラメーターがツールに定義されていない場合はすべての穴を埋める
+    min_area = 0
+    max_area = 0
+    max_percent = 0
+    if arcpy.GetArgumentCount() > 2:
+        min_area = arcpy.GetParameter(2) or 0
+    if arcpy.GetArgumentCount() > 3:
+        max_area = arcpy.GetParameter(3) or 0
+    if arcpy.GetArgumentCount() > 4:
+        max_percent = arcpy.GetParameter(4) or 0
 
-    poly_filling_up(in_poly_fc, out_poly_fc)
+    poly_filling_up(in_poly_fc, out_poly_fc, min_area, max_area, max_percent)
 
 
-def poly_filling_up(in_poly_fc, out_poly_fc):
+def curve_rings(geometry):
+    """
+    メソッド名 : curve_rings メソッド
+    引数 1     : 曲線を含むポリゴンの JSON の辞書
+    概要       : ポリゴンのパートの頂点からリングの座標のリストを作成
+    """
+    rings = []
+    for part in arcpy.AsShape(geometry, True):
+        ring = []
+        # Nullになるポイントで interior ring が区切られる
+        for pnt in part:
+            if pnt == None:
+                rings.append(ring)
+                ring = []
+            else:
+                ring.append([pnt.X, pnt.Y])
+        rings.append(ring)
+
+    return rings
+
+
+def fill_holes(shape_json, min_area=0, max_area=0, max_percent=0):
+    """
+    メソッド名 : fill_holes メソッド
+    引数 1     : 入力ポリゴンの JSON
+    引数 2     : 穴埋めする穴の最小面積（0 の場合は制限なし）
+    引数 3     : 穴埋めする穴の最大面積（0 の場合は制限なし）
+    引数 4     : 穴埋めする穴の exterior ring の面積に対する最大割合（%、0 の場合は制限なし）
+    概要       : 条件に合う interior ring を削除した JSON と、穴の数、穴埋めした面積、残った穴の数を返す
+                 ArcGIS の JSON では exterior ring が時計回り、interior ring が反時計回りで、
+                 interior ring は直前の exterior ring の穴となる
+    """
+    if shape_json is None:
+        return None, 0, 0.0, 0
+
+    geometry = json.loads(shape_json)
+    # 曲線を含むポリゴンは頂点からリングを作成
+    if u"curveRings" in geometry:
+        geometry = {u"rings": curve_rings(geometry), u"spatialReference": geometry.get(u"spatialReference")}
+
+    rings = geometry.get(u"rings")
+    if not rings:
+        return shape_json, 0, 0.0, 0
+
+    new_rings = []
+    hole_count = 0
+    filled_area = 0.0
+    shell_area = 0.0
+    # リングごとの符号付き面積をまとめて計算
+    for ring, area in zip(rings, from_rings(rings, u"polygon").ring_areas().tolist()):
+        if area < 0.0:
+            shell_area = -area
+            new_rings.append(ring)
+            continue
+
+        hole_count += 1
+        if (min_area > 0 and area < min_area) or (max_area > 0 and area > max_area) or \
+                (max_percent > 0 and shell_area > 0.0 and area / shell_area * 100.0 > max_percent):
+            new_rings.append(ring)
+        else:
+            filled_area += area
+
+    # 穴埋めしなかった場合はそのまま
+    if len(new_rings) == len(rings):
+        return shape_json, hole_count, 0.0, hole_count
+
+    geometry[u"rings"] = new_rings
+    return json.dumps(geometry), hole_count, float(filled_area), hole_count - (len(rings) - len(new_rings))
+
+
+def poly_filling_up(in_poly_fc, out_poly_fc, min_area=0, max_area=0, max_percent=0):
     """
     メソッド名 : poly_filling_up メソッド
     引数 1     : 入力フィーチャ
     引数 2     : 出力フィーチャ
+    引数 3     : 穴埋めする穴の最小面積（0 の場合は制限なし）
+    引数 4     : 穴埋めする穴の最大面積（0 の場合は制限なし）
+    引数 5     : 穴埋めする穴の exterior ring の面積に対する最大割合（%、0 の場合は制限なし）
     概要       : ポリゴンを穴埋め
     """
     try:
@@ -40,42 +128,49 @@ def poly_filling_up(in_poly_fc, out_poly_fc):
         in_ws = os.path.dirname(in_poly_fc)
         out_fc_name = os.path.basename(out_poly_fc)
         out_ws = os.path.dirname(out_poly_fc)
-        spatial_ref = arcpy.Describe(in_poly_fc).spatialReference
-
-        # 出力データの作成
-        arcpy.CopyFeatures_management(in_poly_fc, out_poly_fc)
-
-        outcur = arcpy.da.UpdateCursor(out_poly_fc, "SHAPE@")
-
-        for inrow in outcur:
-            polygon = arcpy.Array()
-            for part in inrow[0]:
-                new_part = arcpy.Array()
-                # Nullになるポイント(interior ring の最初)を取得
-                null_point = 0
-                i = 0
-                for i in range(len(part)):
-                    if part[i] == None:
-                        null_point = i
-                        break
-                # 穴あきポリゴンでない場合パートの数そのまま
-                if null_point == 0:
-                    polygon.add(part)
-                # 穴あきポリゴンの場合パートの数をinterior ringの一つ前のポイントまでに
-                else:
-                    j = 0
-                    for j in range(null_point):
-                        new_part.add(part[j])
-                    polygon.add(new_part)
-            if len(polygon) > 0:
-                new_poly = arcpy.Polygon(polygon, spatial_ref)
-                inrow[0] = new_poly
-                outcur.updateRow(inrow)
-
-        # 後始末
-        del outcur
+
+        # ワークスペースにすでに同一のフィーチャクラス名がないかチェック
+        if featureio.exists(out_poly_fc):
+            raise AlreadyExistError
+
+        # カーソル作成に使用するフィールド情報を create_fieldinfo 関数を用いて取得
+        search_fields_name, search_fields_type, use_fields_name, spatial_ref, row_transform = create_fieldinfo(in_poly_fc, out_poly_fc, "POLYGON")
+
+        # ジオメトリは JSON で読み書きし、リングの座標配列を直接扱う
+        search_fields_name = search_fields_name[:-1] + [u"SHAPE@JSON"]
+        use_fields_name = use_fields_name[:-1] + [u"SHAPE@JSON"]
+
+        # 穴の数、穴埋めした面積、残った穴の数のフィールドを追加（入力と同じ名前のフィールドがある場合は別の名前にする）
+        hole_fields, renamed = add_fields(out_poly_fc, [(u"HOLE_CNT", u"LONG"), (u"FILL_AREA", u"DOUBLE"),
+                                                        (u"REMAIN_CNT", u"LONG")])
+        for field_name, new_name in renamed:
+            arcpy.AddWarning(u"{0} フィールドはすでに存在するため、{1} フィールドに出力します".format(field_name, new_name))
+        use_fields_name = use_fields_name[:-1] + hole_fields + use_fields_name[-1:]
+
+        min_area = float(min_area)
+        max_area = float(max_area)
+        max_percent = float(max_percent)
+
+        i = 0
+        num = featureio.get_count(in_poly_fc)
+        progress = Progress(num)
+
+        with featureio.search_cursor(in_poly_fc, search_fields_name) as incur:
+            with featureio.insert_cursor(out_poly_fc, use_fields_name) as outcur:
+                for inrow in incur:
+                    i = i + 1
+                    progress.update(i)
+
+                    # 属性値のコピー（出力がShape ファイルの場合は NULL 値を空白や 0 に置き換え）
+                    newValue = row_transform(inrow)
+
+                    shape_json, hole_count, filled_area, remain_count = fill_holes(
+                        inrow[-1], min_area, max_area, max_percent)
+                    outcur.insertRow(tuple(newValue[:-1]) + (hole_count, filled_area, remain_count, shape_json))
 
         arcpy.AddMessage(u"処理終了：")
+    except AlreadyExistError:
+        arcpy.AddError(u"{0}はすでに存在しています".format(out_poly_fc))
     except arcpy.ExecuteError:
         arcpy.AddError(arcpy.GetMessages(2))
     except Exception as e:
@@ -83,4 +178,5 @@ def poly_filling_up(in_poly_fc, out_poly_fc):
 
 
 if __name__ == u'__main__':
-    setup_poly_filling_up()
+    with profiling.profile(u"PolyFillingUp", arcpy.GetParameterAsText(1)):
+        setup_poly_filling_up()
@@ -4,7 +4,7 @@ Tool name : ポリゴンの頂点をポイントへ変換
 Source    : PolyVertexToPt.py
 Author    : Esri Japan Corporation
 Created   : 2018/12/14
-Updated   : 2019/2/14
+Updated   : 2026/10/19
 """
 
 class AlreadyExistError(Exception):
@@ -14,169 +14,115 @@ class AlreadyExistError(Exception):
 import arcpy
 import sys
 import os
+from ejpyconv import featureio, profiling
+from ejpyconv.fieldinfo import add_fields, create_fieldinfo
+from ejpyconv.geometry import from_json
+from ejpyconv.progress import Progress
 
 
-# フィーチャクラスの作成と属性情報コピーの準備
-def create_fieldinfo(in_poly_fc, out_pt_fc):
+def setup_polyvertex_point():
     """
-    メソッド名 : create_fieldinfo メソッド
-    引数 1     : 入力フィーチャ
-    引数 2     : 出力フィーチャクラス
-    概要       : カーソル作成に用いるフィールド情報を作成
+    メソッド名 : setup_polyvertex_point メソッド
+    概要       : ポリゴンの頂点のポイントへの変換に用いる入力情報の作成
     """
-    # 出力パスの取得
-    out_ws = os.path.dirname(out_pt_fc)
-    out_fc_name = os.path.basename(out_pt_fc)
-
-    # 入力データの情報を取得
-    in_fc_name = os.path.basename(in_poly_fc)
-    in_ws = os.path.dirname(in_poly_fc)
-    in_desc = arcpy.Describe(in_poly_fc)
-    in_fields = in_desc.Fields
-    # ポリゴンから座標系を取得
-    spref = in_desc.spatialReference
-
-    # フィーチャクラスの作成
-    arcpy.CreateFeatureclass_management(out_ws, out_fc_name, "POINT", in_poly_fc, "", "", spref)
-
-    # 変数定義
-    search_fields_name = []
-    search_fields_type = []
-    del_fields = []
-    use_fields = []
-
-    # 属性情報コピーの準備
-    for i, field in enumerate(in_fields):
-        if (field.type == u"OID") or (field.type == u"Geometry"):
-            pass
-        # 出力が Shape ファイルの場合は、削除対象
-        elif field.name.lower() == "shape_length" or field.name.lower() == "shape_area":
-            del_fields.append(i)
-        else:
-            search_fields_name.append(field.name)
-            search_fields_type.append(field.type)
-            # 属性情報コピーの対象となるフィールドのインデックス番号を取得
-            use_fields.append(i)
-            
-    out_fields = arcpy.ListFields(out_pt_fc)
-
-    # 出力がShape ファイルの場合
-    if arcpy.Describe(out_ws).workspacetype == "FileSystem":
-
-        # 入力もShape ファイルの場合はスルー。
-        # Shape_Length、Shape_Area フィールドは削除
-        if arcpy.Describe(in_desc.path).workspacetype != "FileSystem":
-            if len(del_fields) != 0:
-                del_fields_name = [out_fields[index].name for index in del_fields]
-                arcpy.DeleteField_management(out_pt_fc, del_fields_name)
-
-        # 属性情報コピーの対象とするフィールド名のリストを作成
-        # （インデックス番号を用いて Shape ファイルで短くなった名前を取得）
-        use_fields_name = [out_fields[index].name for index in use_fields]
-        use_fields_name.append("SHAPE@")
-
-    # 出力が GDB の場合は、入力データと同じフィールド構造を使用
-    else:
-        use_fields_name = search_fields_name
-
-    search_fields_name.append("SHAPE@")
-
-    return search_fields_name, search_fields_type, use_fields_name, spref
-
-def polyvertex_point():
+    in_poly_fc = arcpy.GetParameterAsText(0)
+    out_pt_fc = arcpy.GetParameterAsText(1)
+    overlap = arcpy.GetParameter(2)
+
+    polyvertex_point(in_poly_fc, out_pt_fc, overlap)
+
+
+def polyvertex_point(in_poly_fc, out_pt_fc, overlap=False):
     """
     メソッド名 : polyvertex_point メソッド
+    引数 1     : 入力ポリゴンフィーチャ
+    引数 2     : 出力フィーチャ
+    引数 3     : 重複する始終点の出力有無
     概要       : ポリゴンの頂点からポイントへ変換
     """
 
     try:
         arcpy.AddMessage(u"処理開始：")
 
-        in_poly_fc = arcpy.GetParameterAsText(0)
-        out_pt_fc = arcpy.GetParameterAsText(1)
-        overlap = arcpy.GetParameter(2)
-
-        # ワークスペース
-        wstype = arcpy.Describe(os.path.dirname(out_pt_fc)).workspacetype
-
         # ワークスペースにすでに同一のフィーチャクラス名がないかチェック
-        if arcpy.Exists(out_pt_fc):
+        if featureio.exists(out_pt_fc):
             raise AlreadyExistError
 
         # カーソル作成に使用するフィールド情報を create_fieldinfo 関数を用いて取得
-        search_fields_name, search_fields_type, use_fields_name, spref = create_fieldinfo(in_poly_fc, out_pt_fc)
+        search_fields_name, search_fields_type, use_fields_name, spref, row_transform = create_fieldinfo(in_poly_fc, out_pt_fc, "POINT")
+
+        # 入力ジオメトリは JSON で座標配列として読み込み、ポイントは XY 座標で挿入
+        search_fields_name = search_fields_name[:-1] + [u"SHAPE@JSON"]
+        use_fields_name = use_fields_name[:-1] + [u"SHAPE@XY"]
+
+        # パート番号、パート内のリング番号、リング内の頂点番号、interior ring かどうか、内角のフィールドを追加
+        # （入力と同じ名前のフィールドがある場合は別の名前にする）
+        vertex_fields, renamed = add_fields(out_pt_fc, [(u"PART_IDX", u"LONG"), (u"RING_IDX", u"LONG"),
+                                                        (u"VERTEX_IDX", u"LONG"), (u"IS_HOLE", u"SHORT"),
+                                                        (u"ANGLE", u"DOUBLE")])
+        for field_name, new_name in renamed:
+            arcpy.AddWarning(u"{0} フィールドはすでに存在するため、{1} フィールドに出力します".format(field_name, new_name))
+        use_fields_name = use_fields_name[:-1] + vertex_fields + use_fields_name[-1:]
 
         # フィーチャクラスの検索カーソル作成
-        incur = arcpy.da.SearchCursor(in_poly_fc, search_fields_name)
+        incur = featureio.search_cursor(in_poly_fc, search_fields_name)
         # フィーチャクラスの挿入カーソル作成
-        outcur = arcpy.da.InsertCursor(out_pt_fc, use_fields_name)
+        outcur = featureio.insert_cursor(out_pt_fc, use_fields_name)
 
         i = 0
-        num = int(arcpy.GetCount_management(in_poly_fc).getOutput(0))
+        num = featureio.get_count(in_poly_fc)
+        progress = Progress(num)
 
         # フィーチャ(ジオメトリ)の数
         for inrow in incur:
             i = i + 1
-            if (i == 1) or (i == num) or (i % 1000 == 1):
-                s = u"{0}/{1}の処理中・・・".format(i, num)
-                arcpy.AddMessage(s)
-
-
-            newValue = []
-            # 出力がShape ファイルの場合、NULL 値を格納できないため
-            # フィールドのタイプに合わせて、空白や 0 を格納する
-            if wstype == "FileSystem":
-                for j, value in enumerate(inrow):
-                    if value == None:
-                        if search_fields_type[j] == "String":
-                            newValue.append("")
-                        elif search_fields_type[j] in ["Double", "Integer", "Single", "SmallInteger"]:
-                            newValue.append(0)
-                        else:
-                            newValue.append(value)
-                    else:
-                        newValue.append(value)
-            # GDB は NULL 値を格納可能
-            else:
-                newValue = list(inrow)
-
-            # パートの数
-            for part in inrow[-1]:
-
-                dflg = 0
-                innercnt = 0
-
-                # ドーナツ型のポリゴンかチェック
-                for pnt in part:
-                    if pnt:
-                        innercnt = innercnt + 1
-                    else:
-                        dflg = 1
-                        break
+            progress.update(i)
 
-                if overlap == True:
-                    # ドーナツなら削る処理
-                    if dflg == 1:
-                        # part から innercnt の 1つ前の要素数の場所を削除
-                        part.remove(innercnt-1)
 
-                    # 最後のポイントを削除
-                    part.remove(len(part)-1)
+            # 属性値のコピー（出力がShape ファイルの場合は NULL 値を空白や 0 に置き換え）
+            newValue = row_transform(inrow)
+
+            # 属性値はフィーチャごとに 1 回だけタプルに変換
+            attributes = tuple(newValue[:-1])
+
+            geometry = from_json(inrow[-1])
+            if geometry is None:
+                continue
+
+            # リングの種類と頂点の内角は、すべてのリングをまとめて配列で計算
+            holes = geometry.is_hole().tolist()
+            angles = geometry.vertex_angles().tolist()
+            vertices = geometry.xy.tolist()
+            offsets = geometry.ring_offsets.tolist()
+
+            part_index = -1
+            ring_index = 0
+
+            # リング（exterior ring と interior ring）の数
+            for k, is_hole in enumerate(holes):
+                # exterior ring から新しいパートが始まる
+                if is_hole:
+                    ring_index += 1
+                else:
+                    part_index += 1
+                    ring_index = 0
+
+                # 重複する始終点は、リングの最後の頂点を除く
+                start, end = offsets[k], offsets[k + 1]
+                if overlap == True:
+                    end = max(end - 1, start)
 
                 # 頂点座標の数
-                for pnt in part:
-                    if pnt:
-                        # ジオメトリにポリゴンのcentroidポイントを格納
-                        newValue[-1] = arcpy.PointGeometry(arcpy.Point(pnt.X, pnt.Y), spref)
-                        # リストからタプルに変換してインサート
-                        outcur.insertRow(tuple(newValue))
+                for vertex_index, j in enumerate(range(start, end)):
+                    # ジオメトリにポリゴンの頂点の XY 座標を格納してインサート
+                    outcur.insertRow(attributes + (part_index, ring_index, vertex_index, int(is_hole), angles[j], tuple(vertices[j])))
         # 後始末
         del outcur
         del incur
 
         arcpy.AddMessage(u"処理終了：")
     except AlreadyExistError:
-        arcpy.AddError(u"{0}に{1}はすでに存在しています".format(out_pt_fc, out_fc_name))
+        arcpy.AddError(u"{0}はすでに存在しています".format(out_pt_fc))
     except arcpy.ExecuteError:
         arcpy.AddError(arcpy.GetMessages(2))
     except Exception as e:
@@ -184,4 +130,5 @@ def polyvertex_point():
 
 
 if __name__ == "__main__":
-    polyvertex_point()
+    with profiling.profile(u"PolyVertexToPt", arcpy.GetParameterAsText(1)):
+        setup_polyvertex_point()
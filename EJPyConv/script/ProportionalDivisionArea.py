@@ -4,12 +4,14 @@ Tool name : 面積を按分
 Source    : ProportionalDivisionArea.py
 Author    : Esri Japan Corporation
 Created   : 2019/12/26
-Updated   :
+Updated   : 2026/10/19
 """
 
 import sys
 import os
 import arcpy
+from ejpyconv import profiling
+from ejpyconv.progress import Progress
 
 
 class AlreadyExistError(Exception):
@@ -19,18 +21,27 @@ class FeatureCountError(Exception):
     pass
 
 
-#面積按分に用いる入力情報の作成
-    
-IN_POLY_FC = arcpy.GetParameterAsText(0)
-REF_POLY_FC = arcpy.GetParameterAsText(1)
-FIELDS = arcpy.GetParameterAsText(2)
-OUT_POLY_FC = arcpy.GetParameterAsText(3)
-LIMIT = 10000
+# 処理の対象件数の上限（環境変数 EJPYCONV_LIMIT で変更可能）
+LIMIT = int(os.environ.get(u"EJPYCONV_LIMIT") or 10000)
+
+
+def setup_proportional_division_area():
+    """
+    メソッド名：setup_proportional_division_area メソッド
+    概要　　　： 面積按分に用いる入力情報の作成
+    """
+    in_poly_fc = arcpy.GetParameterAsText(0)
+    ref_poly_fc = arcpy.GetParameterAsText(1)
+    fields = arcpy.GetParameterAsText(2)
+    out_poly_fc = arcpy.GetParameterAsText(3)
+
+    proportional_division_area(in_poly_fc, ref_poly_fc, fields, out_poly_fc)
+
 
 def check(out_poly_fc, overlap):
 
     # 同一のフィーチャクラス名がないかチェック
-    if arcpy.Exists(OUT_POLY_FC):
+    if arcpy.Exists(out_poly_fc):
         raise AlreadyExistError
 
     # 入力ポリゴンの数が10000件以上の場合メッセージを出す
@@ -41,13 +52,13 @@ def check(out_poly_fc, overlap):
     return count
 
 
-def create_temporary_data():
+def create_temporary_data(ref_poly_fc, fields):
     
     # テンポラリ データの作成
-    arcpy.CopyFeatures_management(REF_POLY_FC, r"in_memory\Copy")
+    arcpy.CopyFeatures_management(ref_poly_fc, r"in_memory\Copy")
 
-    # 選択したフィールド（FIELDS）が"Shape_Area"もしくは"Shape_Length"だった場合メモリ上にフィールドがコピーされないため、新しいフィールド"Area","Length"を追加し、フィールド演算で値を格納
-    fields = FIELDS.split(";")
+    # 選択したフィールド（fields）が"Shape_Area"もしくは"Shape_Length"だった場合メモリ上にフィールドがコピーされないため、新しいフィールド"Area","Length"を追加し、フィールド演算で値を格納
+    fields = fields.split(";")
     if "Shape_Area" in fields:
         arcpy.AddField_management(r"in_memory\Copy", "Area", "DOUBLE")
         arcpy.CalculateField_management(r"in_memory\Copy", "Area", "!Shape!.area", "PYTHON3")
@@ -59,7 +70,7 @@ def create_temporary_data():
     arcpy.CalculateField_management(r"in_memory\Copy", "area", "!Shape!.area", "PYTHON3")
 
 
-def proportional_division_area():
+def proportional_division_area(in_poly_fc, ref_poly_fc, fields, out_poly_fc):
     """
     メソッド名：proportional_division_area メソッド
     引数 1    : 入力フィーチャ
@@ -72,34 +83,35 @@ def proportional_division_area():
         arcpy.AddMessage("処理開始：")
         
         # 空間検索で入力ポリゴンと重なっている参照ポリゴンのフィーチャを選択
-        overlap = arcpy.SelectLayerByLocation_management(IN_POLY_FC, "INTERSECT", REF_POLY_FC)
+        overlap = arcpy.SelectLayerByLocation_management(in_poly_fc, "INTERSECT", ref_poly_fc)
         # 同一フィーチャクラス名、重なるフィーチャ数のチェック
-        count = check(OUT_POLY_FC, overlap)
+        count = check(out_poly_fc, overlap)
         # テンポラリデータの作成
-        create_temporary_data()
+        create_temporary_data(ref_poly_fc, fields)
         # 出力フィーチャクラスの作成
-        arcpy.CreateFeatureclass_management(os.path.dirname(OUT_POLY_FC), os.path.basename(OUT_POLY_FC), "POLYGON", "", "", "", arcpy.Describe(IN_POLY_FC).spatialReference)
+        arcpy.CreateFeatureclass_management(os.path.dirname(out_poly_fc), os.path.basename(out_poly_fc), "POLYGON", "", "", "", arcpy.Describe(in_poly_fc).spatialReference)
         
         # 入力フィールドが複数の場合フィールドごとに分割しフィールドの追加
         field_list = ["SHAPE@"]
         
-        for field in FIELDS.split(";"):
+        for field in fields.split(";"):
             if field == "Shape_Area":
                 field = "Area"
             elif field == "Shape_Length":
                 field = "Length"
-            arcpy.AddField_management(OUT_POLY_FC, field, "DOUBLE")
+            arcpy.AddField_management(out_poly_fc, field, "DOUBLE")
             field_list.append(field)
 
-        field_count = len(FIELDS.split(";"))
+        field_count = len(fields.split(";"))
         n = 0
+        progress = Progress(count)
 
         # 面積按分
-        with arcpy.da.InsertCursor(OUT_POLY_FC, field_list) as outcur:
+        with arcpy.da.InsertCursor(out_poly_fc, field_list) as outcur:
             with arcpy.da.SearchCursor(overlap, ["SHAPE@"]) as incur:
                 for inrow in incur:   
                     n = n + 1
-                    arcpy.AddMessage("{0}/{1}の処理中・・・".format(n, count)) 
+                    progress.update(n)
 
                     arcpy.Clip_analysis(r"in_memory\Copy", inrow[0], r"in_memory\Clip")
                     new_value_list = []
@@ -120,7 +132,7 @@ def proportional_division_area():
         
         arcpy.AddMessage("処理終了：")
     except AlreadyExistError:
-        arcpy.AddError("{0}はすでに存在しています".format(OUT_POLY_FC))
+        arcpy.AddError("{0}はすでに存在しています".format(out_poly_fc))
     except FeatureCountError:
         arcpy.AddError(u"処理の対象件数が上限{0}件を超えています。".format(LIMIT))
     except arcpy.ExecuteError:
@@ -130,4 +142,5 @@ def proportional_division_area():
 
 
 if __name__ == u'__main__':
-    proportional_division_area()
\ No newline at end of file
+    with profiling.profile(u"ProportionalDivisionArea", arcpy.GetParameterAsText(3)):
+        setup_proportional_division_area()
\ No newline at end of file
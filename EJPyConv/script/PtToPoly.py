@@ -4,7 +4,7 @@ Tool name : ポイントをポリゴンへ変換
 Source    : PtToPoly.py
 Author    : Esri Japan Corporation
 Created   : 2018/12/14
-Updated   :
+Updated   : 2026/10/19
 """
 
 class AlreadyExistError(Exception):
@@ -14,104 +14,51 @@ class AlreadyExistError(Exception):
 import arcpy
 import sys
 import os
+from ejpyconv.fieldinfo import create_fieldinfo, describe, workspace_type
+from ejpyconv.geometry import from_json
+from ejpyconv import profiling
+from ejpyconv.progress import Progress
 from itertools import groupby
 
 
-# フィーチャクラスの作成と属性情報コピーの準備
-def create_fieldinfo(in_pt_fc, out_pt_fc, group_field_name, sort_field_name):
+def point_vertices(shape, multipoint):
     """
-    メソッド名 : create_fieldinfo メソッド
-    引数 1     : 入力フィーチャ
-    引数 2     : 出力フィーチャクラス
-    引数 3     : グループフィールド
-    引数 4     : 順序結合フィールド
-    概要       : カーソル作成に用いるフィールド情報を作成
+    メソッド名 : point_vertices メソッド
+    引数 1     : ポイントの XY 座標、またはマルチポイントの JSON
+    引数 2     : マルチポイントかどうか
+    概要       : ポイントの XY 座標のリストを返す（NULL の場合は空のリスト）
     """
-    # 出力パスの取得
-    out_dir = os.path.dirname(out_pt_fc)
-    out_name = os.path.basename(out_pt_fc)
-
-    # 入力データの情報を取得
-    in_desc = arcpy.Describe(in_pt_fc)
-    sr = in_desc.spatialReference
-    shape_field = in_desc.ShapeFieldName
-    oid_field = in_desc.OIDFieldName
-    in_fields = in_desc.Fields
-
-    # フィーチャクラスの作成
-    arcpy.CreateFeatureclass_management(out_dir, out_name, "POLYGON", in_pt_fc, "", "", sr)
-
-    # 変数定義
-    search_fields_name = []
-    search_fields_type = []
-    del_fields = []
-    use_fields = []
-    sortindex = 0
-    groupindex = 0
-    indexcnt = 0
-
-    # 属性情報コピーの準備
-    for i, field in enumerate(in_fields):
-        if (field.type == u"OID") or (field.type == u"Geometry"):
-            pass
-        # 出力が Shape ファイルの場合は、削除対象
-        elif field.name.lower() == "shape_length" or field.name.lower() == "shape_area":
-            del_fields.append(i)
-        else:
-            search_fields_name.append(field.name)
-            search_fields_type.append(field.type)
-            # 属性情報コピーの対象となるフィールドのインデックス番号を取得
-            use_fields.append(i)
-            
-            # グループ化で使用するフィールドのインデックス番号を取得
-            if field.name == group_field_name:
-                groupindex = indexcnt
-
-            # ソートで使用するフィールドのインデックス番号を取得
-            if field.name == sort_field_name:
-                sortindex = indexcnt
-
-            indexcnt += 1
-
+    if shape is None:
+        return []
+    if multipoint:
+        return from_json(shape).xy.tolist()
+    return [shape]
 
-    out_fields = arcpy.ListFields(out_pt_fc)
 
-    # 出力がShape ファイルの場合
-    if arcpy.Describe(out_dir).workspacetype == "FileSystem":
-
-        # 入力もShape ファイルの場合はスルー。
-        # Shape_Length、Shape_Area フィールドは削除
-        if arcpy.Describe(in_desc.path).workspacetype != "FileSystem":
-            if len(del_fields) != 0:
-                del_fields_name = [out_fields[index].name for index in del_fields]
-                arcpy.DeleteField_management(out_pt_fc, del_fields_name)
-
-        # 属性情報コピーの対象とするフィールド名のリストを作成
-        # （インデックス番号を用いて Shape ファイルで短くなった名前を取得）
-        use_fields_name = [out_fields[index].name for index in use_fields]
-        use_fields_name.append("SHAPE@")
-
-    # 出力が GDB の場合は、入力データと同じフィールド構造を使用
-    else:
-        use_fields_name = search_fields_name
-
-    search_fields_name.append("SHAPE@")
+def setup_point_polygon():
+    """
+    メソッド名 : setup_point_polygon メソッド
+    概要       : ポイントのポリゴンへの変換に用いる入力情報の作成
+    """
+    in_pt_fc = arcpy.GetParameterAsText(0)
+    out_pt_fc = arcpy.GetParameterAsText(1)
+    group_field_name = arcpy.GetParameterAsText(2)
+    sort_field_name = arcpy.GetParameterAsText(3)
 
-    return search_fields_name, search_fields_type, use_fields_name, groupindex, sortindex
+    point_polygon(in_pt_fc, out_pt_fc, group_field_name, sort_field_name)
 
 
-def point_polygon():
+def point_polygon(in_pt_fc, out_pt_fc, group_field_name=u"", sort_field_name=u""):
     """
     メソッド名 : point_polygon メソッド
+    引数 1     : 入力ポイントフィーチャ
+    引数 2     : 出力フィーチャ
+    引数 3     : グループ化のフィールド名（空文字の場合はすべてのポイントで 1 つのポリゴン）
+    引数 4     : ソートのフィールド名（空文字の場合は入力の順）
     概要       : ポイントからポリゴンへ変換
     """
     try:
-        in_pt_fc = arcpy.GetParameterAsText(0)
-        out_pt_fc = arcpy.GetParameterAsText(1)
-        group_field_name = arcpy.GetParameterAsText(2)
-        sort_field_name = arcpy.GetParameterAsText(3)
-
-        wstype = arcpy.Describe(os.path.dirname(out_pt_fc)).workspacetype
+        wstype = workspace_type(os.path.dirname(out_pt_fc))
 
         # ワークスペースにすでに同一のフィーチャクラス名がないかチェック
         if wstype != "FileSystem":
@@ -119,7 +66,19 @@ def point_polygon():
                 raise AlreadyExistError
 
         # カーソル作成に使用するフィールド情報を create_fieldinfo 関数を用いて取得
-        search_fields_name, search_fields_type, use_fields_name, groupindex, sortindex = create_fieldinfo(in_pt_fc, out_pt_fc, group_field_name, sort_field_name)
+        search_fields_name, search_fields_type, use_fields_name, spref, row_transform = create_fieldinfo(in_pt_fc, out_pt_fc, "POLYGON")
+
+        # グループ化・ソートで使用するフィールドのインデックス番号を取得
+        groupindex = search_fields_name.index(group_field_name) if group_field_name in search_fields_name else 0
+        sortindex = search_fields_name.index(sort_field_name) if sort_field_name in search_fields_name else 0
+
+        # ポイントは XY 座標（マルチポイントは JSON の座標配列）で読み込み、
+        # arcpy のジオメトリは出力するポリゴンだけ作成
+        multipoint = describe(in_pt_fc).shapeType == u"Multipoint"
+        if multipoint:
+            search_fields_name = search_fields_name[:-1] + [u"SHAPE@JSON"]
+        else:
+            search_fields_name = search_fields_name[:-1] + [u"SHAPE@XY"]
 
         # フィーチャクラスの検索カーソル作成
         input_cur = arcpy.da.SearchCursor(in_pt_fc, search_fields_name)
@@ -129,6 +88,7 @@ def point_polygon():
         # 処理件数表示用の変数
         i = 0        
         num = int(arcpy.GetCount_management(in_pt_fc).getOutput(0))
+        progress = Progress(num)
 
         # グループフィールドを指定しているか判定
         group_flg = True
@@ -151,33 +111,15 @@ def point_polygon():
 
                 for inrow in group_list:
                     i = i + 1 
-                    if (i == 1) or (i == num) or (i % 1000 == 1):
-                        s = u"{0}/{1}の処理中・・・".format(i, num)
-                        arcpy.AddMessage(s)
-
-                    newValue = []
-                    # 出力がShape ファイルの場合、NULL 値を格納できないため
-                    # フィールドのタイプに合わせて、空白や 0 を格納する
-                    if wstype == "FileSystem":
-                        for j, value in enumerate(inrow[:-1]):
-                            if value == None:
-                                if search_fields_type[j] == "String":
-                                    newValue.append("")
-                                elif search_fields_type[j] in ["Double", "Integer", "Single", "SmallInteger"]:
-                                    newValue.append(0)
-                                else:
-                                    newValue.append(value)
-                            else:
-                                newValue.append(value)
-                    # GDB は NULL 値を格納可能
-                    else:
-                        newValue = list(inrow[:-1])
-
-                    for pnt in inrow[-1]:
-                        geom.append(pnt)
+                    progress.update(i)
+
+                    # 属性値のコピー（出力がShape ファイルの場合は NULL 値を空白や 0 に置き換え）
+                    newValue = row_transform(inrow[:-1])
+
+                    geom.extend(point_vertices(inrow[-1], multipoint))
 
                 # ジオメトリを格納
-                newValue.append(arcpy.Polygon(arcpy.Array([coords for coords in geom])))
+                newValue.append(arcpy.Polygon(arcpy.Array([arcpy.Point(x, y) for x, y in geom])))
                 # リストからタプルに変換してインサート
                 output_cur.insertRow(tuple(newValue))
                 del geom
@@ -185,33 +127,15 @@ def point_polygon():
             geom = []
             for inrow in point_list:
                 i = i + 1 
-                if (i == 1) or (i == num) or (i % 1000 == 1):
-                    s = u"{0}/{1}の処理中・・・".format(i, num)
-                    arcpy.AddMessage(s)
-
-                newValue = []
-                # 出力がShape ファイルの場合、NULL 値を格納できないため
-                # フィールドのタイプに合わせて、空白や 0 を格納する
-                if wstype == "FileSystem":
-                    for j, value in enumerate(inrow[:-1]):
-                        if value == None:
-                            if search_fields_type[j] == "String":
-                                newValue.append("")
-                            elif search_fields_type[j] in ["Double", "Integer", "Single", "SmallInteger"]:
-                                newValue.append(0)
-                            else:
-                                newValue.append(value)
-                        else:
-                            newValue.append(value)
-                # GDB は NULL 値を格納可能
-                else:
-                    newValue = list(inrow[:-1])
-
-                for pnt in inrow[-1]:
-                    geom.append(pnt)
+                progress.update(i)
+
+                # 属性値のコピー（出力がShape ファイルの場合は NULL 値を空白や 0 に置き換え）
+                newValue = row_transform(inrow[:-1])
+
+                geom.extend(point_vertices(inrow[-1], multipoint))
 
             # ジオメトリを格納
-            newValue.append(arcpy.Polygon(arcpy.Array([coords for coords in geom])))
+            newValue.append(arcpy.Polygon(arcpy.Array([arcpy.Point(x, y) for x, y in geom])))
             # リストからタプルに変換してインサート
             output_cur.insertRow(tuple(newValue))
             del geom
@@ -223,7 +147,7 @@ def point_polygon():
         arcpy.AddMessage(u"処理終了：")
 
     except AlreadyExistError:
-        arcpy.AddError(u"{0}に{1}はすでに存在しています".format(out_ws, out_fc_name))
+        arcpy.AddError(u"{0}はすでに存在しています".format(out_pt_fc))
     except arcpy.ExecuteError:
         arcpy.AddError(arcpy.GetMessages(2))
     except Exception as e:
@@ -231,5 +155,6 @@ def point_polygon():
 
 
 if __name__ == "__main__":
-    point_polygon()
+    with profiling.profile(u"PtToPoly", arcpy.GetParameterAsText(1)):
+        setup_point_polygon()
 
@@ -4,12 +4,14 @@ Tool name : スパイダーグラフの作成
 Source    : SpiderGraph.py
 Author    : Esri Japan Corporation
 Created   : 2019/12/26
-Updated   :
+Updated   : 2026/10/19
 """
 
 import sys
 import os
 import arcpy
+from ejpyconv import profiling
+from ejpyconv.progress import Progress
 
 
 class AlreadyExistError(Exception):
@@ -19,55 +21,65 @@ class FeatureCountError(Exception):
     pass
 
 
-#スパイダーグラフに用いる入力情報の作成
-    
-IN_PT_FC = arcpy.GetParameterAsText(0)
-REF_PT_FC = arcpy.GetParameterAsText(1)
-OUT_LINE_FC = arcpy.GetParameterAsText(2)
-LIMIT = 10000
+# 処理の対象件数の上限（環境変数 EJPYCONV_LIMIT で変更可能）
+LIMIT = int(os.environ.get(u"EJPYCONV_LIMIT") or 10000)
+
+
+def setup_spider_graph():
+    """
+    メソッド名： setup_spider_graph メソッド
+    概要　　　： スパイダーグラフに用いる入力情報の作成
+    """
+    in_pt_fc = arcpy.GetParameterAsText(0)
+    ref_pt_fc = arcpy.GetParameterAsText(1)
+    out_line_fc = arcpy.GetParameterAsText(2)
+
+    spider_graph(in_pt_fc, ref_pt_fc, out_line_fc)
+
 
-def check():
+def check(in_pt_fc, out_line_fc):
 
     # 同一のフィーチャクラス名がないかチェック
-    if arcpy.Exists(OUT_LINE_FC):
+    if arcpy.Exists(out_line_fc):
         raise AlreadyExistError
 
     # 入力ポイントの数が10000件以上の場合メッセージを出す
-    count = int(arcpy.GetCount_management(IN_PT_FC).getOutput(0))
+    count = int(arcpy.GetCount_management(in_pt_fc).getOutput(0))
     if count > LIMIT:
         raise FeatureCountError
 
     return count
 
-def spider_graph():
+def spider_graph(in_pt_fc, ref_pt_fc, out_line_fc):
     """
     メソッド名： spider_graph メソッド
     引数 1    : 入力ポイント
     引数 2    : 参照ポイント
-    引数 4    : 出力フィーチャクラス
+    引数 3    : 出力フィーチャクラス
     概要　　　： スパイダーグラフの作成
     """
     try:
         arcpy.AddMessage("処理開始：")
         
         # 同一フィーチャクラス名、入力フィーチャ数のチェック
-        count = check()
+        count = check(in_pt_fc, out_line_fc)
     
         # 出力フィーチャクラスの作成
-        arcpy.CreateFeatureclass_management(os.path.dirname(OUT_LINE_FC), os.path.basename(OUT_LINE_FC), "POLYLINE", "", "", "", arcpy.Describe(IN_PT_FC).spatialReference)
+        arcpy.CreateFeatureclass_management(os.path.dirname(out_line_fc), os.path.basename(out_line_fc), "POLYLINE", "", "", "", arcpy.Describe(in_pt_fc).spatialReference)
 
         # 入力ポイントのOIDを始点ID、参照ポイントのOIDを終点IDとしてフィールドの追加
-        arcpy.AddField_management(OUT_LINE_FC, "始点ID" , "LONG")
-        arcpy.AddField_management(OUT_LINE_FC, "終点ID" , "LONG")
+        arcpy.AddField_management(out_line_fc, "始点ID" , "LONG")
+        arcpy.AddField_management(out_line_fc, "終点ID" , "LONG")
 
         # スパイダーグラフの作成
-        with arcpy.da.InsertCursor(OUT_LINE_FC, ["SHAPE@", "始点ID", "終点ID"]) as outcur:
-            with arcpy.da.SearchCursor(IN_PT_FC, ["OID@", "SHAPE@"]) as incur:
+        with arcpy.da.InsertCursor(out_line_fc, ["SHAPE@", "始点ID", "終点ID"]) as outcur:
+            with arcpy.da.SearchCursor(in_pt_fc, ["OID@", "SHAPE@"]) as incur:
+                progress = Progress(count)
                 # 入力ポイント分繰り返し
                 for n, inrow in enumerate(incur, start=1):   
-                    arcpy.AddMessage("{0}/{1}の処理中・・・".format(n, count)) 
+                    progress.update(n)
                     
-                    with arcpy.da.SearchCursor(REF_PT_FC, ["OID@","SHAPE@"]) as refcur:
+                    with arcpy.da.SearchCursor(ref_pt_fc, ["OID@","SHAPE@"]) as refcur:
                         newvalue_list = None
                         # 参照ポイント分繰り返し
                         for refrow in refcur:
@@ -92,7 +104,7 @@ def spider_graph():
         
         arcpy.AddMessage("処理終了：")
     except AlreadyExistError:
-        arcpy.AddError("{0}はすでに存在しています".format(OUT_LINE_FC))
+        arcpy.AddError("{0}はすでに存在しています".format(out_line_fc))
     except FeatureCountError:
         arcpy.AddError("処理の対象件数が上限{0}件を超えています。".format(LIMIT))
     except arcpy.ExecuteError:
@@ -102,4 +114,5 @@ def spider_graph():
 
 
 if __name__ == u'__main__':
-    spider_graph()
\ No newline at end of file
+    with profiling.profile(u"SpiderGraph", arcpy.GetParameterAsText(2)):
+        setup_spider_graph()
\ No newline at end of file
@@ -4,13 +4,14 @@ Tool name : ティーセンポリゴンの作成
 Source    : Thiessen.py
 Author    : Esri Japan Corporation
 Created   : 2019/12/26
-Updated   : 2022/5/20
+Updated   : 2026/10/19
 """
 
 import sys
 import os
 import arcpy
-from scipy.spatial import Voronoi
+from ejpyconv import profiling
+from ejpyconv.progress import Progress
 
 
 class AlreadyExistError(Exception):
@@ -20,34 +21,47 @@ class FeatureCountError(Exception):
     pass
 
 
-#ティーセンポリゴンに用いる入力情報の作成
-IN_PT_FC = arcpy.GetParameterAsText(0)
-OUT_POLY_FC = arcpy.GetParameterAsText(1)
-LIMIT = 50000
-count = 0
+# 処理の対象件数の上限（環境変数 EJPYCONV_LIMIT で変更可能）
+LIMIT = int(os.environ.get(u"EJPYCONV_LIMIT") or 50000)
 
-def check():
+
+def setup_thiessen():
+    """
+    概要　　　： ティーセンポリゴンに用いる入力情報の作成
+    """
+    in_pt_fc = arcpy.GetParameterAsText(0)
+    out_poly_fc = arcpy.GetParameterAsText(1)
+
+    thiessen(in_pt_fc, out_poly_fc)
+
+
+def check(in_pt_fc, out_poly_fc):
     """
     概要　　　： 同一の出力フィーチャクラス名がないか、
-    　　　　　　 入力ポイントが処理の上限数以上ないかチェックします。
+    　　　　　　 入力ポイントが処理の上限数以上ないかチェックし、入力ポイントの数を返します。
     """
 
     # 同一のフィーチャクラス名がないかチェック
-    if arcpy.Exists(OUT_POLY_FC):
+    if arcpy.Exists(out_poly_fc):
         raise AlreadyExistError
         
     # 入力ポイントの数が10000件以上の場合メッセージを出す
-    global count
-    count = int(arcpy.GetCount_management(IN_PT_FC).getOutput(0))
+    count = int(arcpy.GetCount_management(in_pt_fc).getOutput(0))
     if count > LIMIT:
         raise FeatureCountError
 
-def create_voronoi(point_list, out):
+    return count
+
+def create_voronoi(point_list, out, in_pt_fc, out_poly_fc):
     """
     概要　　　： ティーセンポリゴンを作成します。
-    引数１    : point_list　入力ポイント（IN_PT_FC）の座標のリスト
-    引数２    : outcur　ティーセンポリゴンを挿入するカーソルオブジェクト
+    引数１    : point_list　入力ポイント（in_pt_fc）の座標のリスト
+    引数２    : out　ティーセンポリゴンを挿入する一時フィーチャクラス
+    引数３    : in_pt_fc　入力ポイント
+    引数４    : out_poly_fc　出力フィーチャクラス
     """
+    # scipy は読み込みに時間がかかるため、ティーセンの作成時に読み込む
+    from scipy.spatial import Voronoi
     
     # voronoi関数をそのまま実行すると端点にティーセンポリゴンが作成されないため、ティーセンポリゴン作成用ポイントを追加
     x = [x[0] for x in point_list]
@@ -72,13 +86,13 @@ def create_voronoi(point_list, out):
     # ティーセンポリゴンの頂点の組み合わせを抽出
     vor_verticies = [r for r in vor.regions if -1 not in r and r]
 
+    progress = Progress(len(vor_verticies))
     with arcpy.da.InsertCursor(out, ["SHAPE@"]) as outcur:
         # 抽出した頂点の組み合わせから頂点の座標を取得してティーセンポリゴンを作成
         for n, region in enumerate(vor_verticies, start=1):
-            arcpy.AddMessage("{0}/{1}の処理中・・・".format(n, count))
+            progress.update(n)
             coordinates = [vor.vertices[region]]
             coordinates_list = coordinates[0].tolist()
-            arcpy.AddMessage(coordinates_list)
             outcur.insertRow([coordinates_list])
 
     # 作成したボロノイ図を整えるためのクリップする範囲を計算
@@ -93,42 +107,44 @@ def create_voronoi(point_list, out):
                          arcpy.Point(Xmax, Ymin), 
                          arcpy.Point(Xmin, Ymin), 
                          arcpy.Point(Xmin, Ymax)])
-    clip_poly = arcpy.Polygon(array, spatial_reference=arcpy.Describe(IN_PT_FC).spatialReference)
+    clip_poly = arcpy.Polygon(array, spatial_reference=arcpy.Describe(in_pt_fc).spatialReference)
        
     # クリップしフィーチャクラスを出力
-    arcpy.Clip_analysis(out, clip_poly, OUT_POLY_FC)
+    arcpy.Clip_analysis(out, clip_poly, out_poly_fc)
     arcpy.Delete_management(out)
 
 
-def thiessen():
+def thiessen(in_pt_fc, out_poly_fc):
     """
     概要　　　： ティーセンポリゴンの作成に用いる入力ポイントの座標を取得します。
+    引数１    : in_pt_fc　入力ポイント
+    引数２    : out_poly_fc　出力フィーチャクラス
     """
     try:
         arcpy.AddMessage("処理開始：")
         
         # 同一フィーチャクラス名、入力フィーチャ数のチェック
-        check()
+        count = check(in_pt_fc, out_poly_fc)
         
         # メモリ上にフィーチャクラス作成
         arcpy.CreateFeatureclass_management("memory", "out", "POLYGON", "", "", "",
-                                            arcpy.Describe(IN_PT_FC).spatialReference) 
+                                            arcpy.Describe(in_pt_fc).spatialReference) 
         out = "memory/out"
         point_list = []
 
         # 入力ポイントのXYをリストに格納
-        with arcpy.da.SearchCursor(IN_PT_FC, ["SHAPE@"]) as incur:
+        with arcpy.da.SearchCursor(in_pt_fc, ["SHAPE@"]) as incur:
             for inrow in incur:   
                 point_list.append((inrow[0].centroid.X, inrow[0].centroid.Y))
 
             #入力ポイント数が2件以上のときcreate_voronoiメソッドでティーセンポリゴンの作成、2件以下のときは処理を終了する
             if count >= 2:
-                create_voronoi(point_list, out)
+                create_voronoi(point_list, out, in_pt_fc, out_poly_fc)
                 arcpy.AddMessage("処理終了：")
             else:
                 arcpy.AddMessage("作成されるティーセンポリゴンは0件のため処理を終了します。")
     except AlreadyExistError:
-        arcpy.AddError("{0}はすでに存在しています".format(OUT_POLY_FC))
+        arcpy.AddError("{0}はすでに存在しています".format(out_poly_fc))
     except FeatureCountError:
         arcpy.AddError("処理の対象件数が上限{0}件を超えています。".format(LIMIT))
     except arcpy.ExecuteError:
@@ -137,4 +153,5 @@ def thiessen():
         arcpy.AddError("ティーセンポリゴンの作成に失敗しました。")
 
 if __name__ == '__main__':
-    thiessen()
\ No newline at end of file
+    with profiling.profile(u"Thiessen", arcpy.GetParameterAsText(1)):
+        setup_thiessen()
\ No newline at end of file
@@ -0,0 +1,8 @@
+﻿# coding:utf-8
+"""
+Tool name : EJPyConv 共通モジュール
+Source    : ejpyconv/__init__.py
+Author    : Esri Japan Corporation
+Created   : 2026/10/19
+Updated   :
+"""
@@ -0,0 +1,420 @@
+﻿# coding:utf-8
+"""
+Tool name : EJPyConv 共通モジュール（一括実行）
+Source    : ejpyconv/batch.py
+Author    : Esri Japan Corporation
+Created   : 2026/10/19
+Updated   : 2026/10/19
+
+複数の入力データセットに同じツールを、プロセス プールで並列に実行する
+プロセス数は CPU のコア数と空きメモリ（1 プロセスあたりのメモリの目安）で制限する
+入力ごとの件数、処理時間、エラーを一覧表（CSV）に出力する
+
+使用例    : python -m ejpyconv.batch PolyToLine "D:/city/*.gdb/parcel" --output "D:/out/{workspace}.gpkg/{name}_line"
+            python -m ejpyconv.batch PolyCenterToPt --inputs-file inputs.txt --output "D:/out/center.gdb/{workspace}_{name}"
+            python -m ejpyconv.batch SplitLineAtPt "D:/road/*.shp" --output "D:/out/{name}_split.shp" ^
+                --params "[\"{in}\", \"D:/road/points.shp\", \"{out}\"]"
+            入力は、データセットのパス、ファイルのワイルドカード（*.shp など）、ワークスペース内のワイルドカード
+            （*.gdb/parcel、city.gpkg/road_* など）を指定
+            出力のパスには {name}（入力のデータセット名）、{workspace}（入力のワークスペース名）、
+            {dir}（入力のワークスペースのパス）、{index}（入力の番号）を指定できる
+            --params はツールのパラメータのリスト（{in} は入力、{out} は出力に置き換え）
+            省略時は [入力, 出力]（出力が 2 番目のパラメータのツールのみ）
+            GeoPackage/SQLite のデータセット名の main. は省略でき、city.gpkg/main.* と city.gpkg/* は同じ
+            --fake-arcpy はドライラン（ejpyconv.fakearcpy のメモリ上で実行し、出力は保存しない）
+            一覧表の out_count はメモリ上の出力の件数で、再実行しても --skip-existing で実行を省略できない
+"""
+
+import argparse
+import csv
+import fnmatch
+import glob
+import json
+import os
+import sqlite3
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from ejpyconv import featureio, tools, worker
+
+
+# ワークスペース（ファイル ジオデータベース、エンタープライズ ジオデータベース、GeoPackage/SQLite）の拡張子
+WORKSPACE_EXTENSIONS = (u".gdb", u".sde") + tuple(featureio.SQLITE_EXTENSIONS)
+
+# 既定の 1 プロセスあたりのメモリの目安（MB、arcpy を読み込んだプロセスの大きさ）
+DEFAULT_MEMORY_PER_PROCESS = 1024
+
+# 一覧表の列
+SUMMARY_COLUMNS = (u"index", u"input", u"output", u"status", u"in_count", u"out_count",
+                   u"wall_time", u"queued", u"pid", u"message")
+
+
+# ---------------------------------------------------------------------------
+# 入力と出力
+# ---------------------------------------------------------------------------
+
+def split_workspace(path):
+    """
+    メソッド名 : split_workspace メソッド
+    引数 1     : データセットのパス
+    概要       : ワークスペースのパスとワークスペース内のデータセット名に分割（ワークスペース内でない場合は None）
+    """
+    parts = path.replace(u"\\", u"/").split(u"/")
+    for k, part in enumerate(parts[:-1]):
+        if part.lower().endswith(WORKSPACE_EXTENSIONS):
+            return u"/".join(parts[:k + 1]), u"/".join(parts[k + 1:])
+    return None, None
+
+
+def strip_main(name):
+    """
+    メソッド名 : strip_main メソッド
+    引数 1     : データセット名
+    概要       : GeoPackage/SQLite のデータセット名の先頭の main. を除く
+    """
+    return name[5:] if name.lower().startswith(u"main.") else name
+
+
+def list_featureclasses(workspace):
+    """
+    メソッド名 : list_featureclasses メソッド
+    引数 1     : ワークスペース（またはフィーチャ データセット）のパス
+    概要       : ワークスペース内のフィーチャクラス名のリスト
+                 arcpy を使用できない場合は GeoPackage/SQLite のテーブルのみ
+    """
+    try:
+        import arcpy
+        arcpy.env.workspace = workspace
+        return list(arcpy.ListFeatureClasses() or [])
+    except (ImportError, AttributeError):
+        pass
+    db_path, _ = featureio.split_sqlite_path(workspace)
+    if db_path is None or not os.path.exists(db_path):
+        return []
+    conn = sqlite3.connect(db_path)
+    try:
+        if conn.execute(u"SELECT 1 FROM sqlite_master WHERE type = 'table' "
+                        u"AND name = 'gpkg_contents'").fetchone() is not None:
+            rows = conn.execute(u"SELECT table_name FROM gpkg_contents WHERE data_type = 'features'")
+        else:
+            rows = conn.execute(u"SELECT name FROM sqlite_master WHERE type = 'table' "
+                                u"AND name NOT LIKE 'sqlite_%'")
+        return [row[0] for row in rows]
+    finally:
+        conn.close()
+
+
+def expand_inputs(patterns):
+    """
+    メソッド名 : expand_inputs メソッド
+    引数 1     : 入力のパス、またはワイルドカードのリスト
+    概要       : ワイルドカードを展開した入力のパスのリスト（重複は除く）
+    """
+    inputs = []
+    for pattern in patterns:
+        if not glob.has_magic(pattern):
+            inputs.append(pattern)
+            continue
+        workspace, name = split_workspace(pattern)
+        if workspace is None:
+            # ファイル（シェープファイルなど）のワイルドカード
+            inputs.extend(sorted(glob.glob(pattern)))
+            continue
+        # ワークスペースのワイルドカードを展開してから、ワークスペース内のデータセット名を照合
+        folder, name = os.path.split(name)
+        # データセット名は main. の有無にかかわらず照合（arcpy は main. 付き、SQLite の一覧は main. なし）
+        name = strip_main(name).lower()
+        for ws in sorted(glob.glob(workspace)) if glob.has_magic(workspace) else [workspace]:
+            ws = ws.replace(u"\\", u"/")
+            container = ws + u"/" + folder if folder else ws
+            for fc in sorted(list_featureclasses(container)):
+                if fnmatch.fnmatch(strip_main(fc).lower(), name):
+                    inputs.append(container + u"/" + fc)
+    return list(OrderedDict.fromkeys(inputs))
+
+
+def output_path(pattern, in_path, index):
+    """
+    メソッド名 : output_path メソッド
+    引数 1     : 出力のパスのパターン
+    引数 2     : 入力のパス
+    引数 3     : 入力の番号（1 から）
+    概要       : 入力のデータセット名、ワークスペース名から出力のパスを作成
+    """
+    workspace, name = split_workspace(in_path)
+    if workspace is None:
+        workspace = os.path.dirname(in_path)
+        name = os.path.splitext(os.path.basename(in_path))[0]
+    else:
+        name = strip_main(os.path.basename(name))
+    return pattern.format(name=name, workspace=os.path.splitext(os.path.basename(workspace))[0],
+                          dir=workspace, index=index)
+
+
+def create_workspace(path):
+    """
+    メソッド名 : create_workspace メソッド
+    引数 1     : 出力のデータセットのパス
+    概要       : 出力のワークスペース（フォルダ、GeoPackage/SQLite、ファイル ジオデータベース）がない場合は作成
+    """
+    workspace, _ = split_workspace(path)
+    if workspace is None:
+        folder = os.path.dirname(path)
+        if folder and not os.path.isdir(folder):
+            os.makedirs(folder)
+        return
+    if os.path.exists(workspace):
+        return
+    folder = os.path.dirname(workspace)
+    if folder and not os.path.isdir(folder):
+        os.makedirs(folder)
+    if workspace.lower().endswith(u".gdb"):
+        import arcpy
+        arcpy.CreateFileGDB_management(folder, os.path.basename(workspace))
+    elif workspace.lower().endswith(tuple(featureio.SQLITE_EXTENSIONS)):
+        # 空の GeoPackage/SQLite を作成
+        featureio.SQLiteBackend().connect(workspace).close()
+
+
+def tool_params(params, in_path, out_path):
+    """
+    メソッド名 : tool_params メソッド
+    引数 1     : パラメータのリスト（{in}、{out} を含む）
+    引数 2     : 入力のパス
+    引数 3     : 出力のパス
+    概要       : パラメータの {in}、{out} を入力、出力のパスに置き換え
+    """
+    return [param.replace(u"{in}", in_path).replace(u"{out}", out_path) if isinstance(param, str) else param
+            for param in params]
+
+
+# ---------------------------------------------------------------------------
+# 実行
+# ---------------------------------------------------------------------------
+
+def available_memory_mb():
+    """
+    メソッド名 : available_memory_mb メソッド
+    概要       : 空きメモリ（MB、取得できない場合は None）
+    """
+    try:
+        import psutil
+        return psutil.virtual_memory().available / 1024.0 / 1024.0
+    except ImportError:
+        pass
+    if os.path.exists(u"/proc/meminfo"):
+        with open(u"/proc/meminfo") as f:
+            for line in f:
+                if line.startswith(u"MemAvailable:"):
+                    return int(line.split()[1]) / 1024.0
+    if sys.platform == u"win32":
+        import ctypes
+
+        class MEMORYSTATUSEX(ctypes.Structure):
+            _fields_ = [(u"dwLength", ctypes.c_ulong), (u"dwMemoryLoad", ctypes.c_ulong),
+                        (u"ullTotalPhys", ctypes.c_ulonglong), (u"ullAvailPhys", ctypes.c_ulonglong),
+                        (u"ullTotalPageFile", ctypes.c_ulonglong), (u"ullAvailPageFile", ctypes.c_ulonglong),
+                        (u"ullTotalVirtual", ctypes.c_ulonglong), (u"ullAvailVirtual", ctypes.c_ulonglong),
+                        (u"ullAvailExtendedVirtual", ctypes.c_ulonglong)]
+
+        status = MEMORYSTATUSEX()
+        status.dwLength = ctypes.sizeof(MEMORYSTATUSEX)
+        if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+            return status.ullAvailPhys / 1024.0 / 1024.0
+    return None
+
+
+def pool_size(jobs, processes=0, memory_per_process=DEFAULT_MEMORY_PER_PROCESS):
+    """
+    メソッド名 : pool_size メソッド
+    引数 1     : ジョブの数
+    引数 2     : プロセス数の上限（0 の場合は CPU のコア数）
+    引数 3     : 1 プロセスあたりのメモリの目安（MB、0 の場合はメモリで制限しない）
+    概要       : CPU のコア数、空きメモリ、ジョブの数から、プロセス プールのプロセス数を決定
+    """
+    size = processes or os.cpu_count() or 1
+    memory = available_memory_mb()
+    if memory is not None and memory_per_process > 0:
+        size = min(size, max(int(memory // memory_per_process), 1))
+    return max(min(size, jobs), 1)
+
+
+def run_item(job):
+    """
+    メソッド名 : run_item メソッド
+    引数 1     : ジョブの辞書（ejpyconv.worker.run_job のジョブに input、output、skip_existing を追加）
+    概要       : プールのプロセスでツールを実行し、入力と出力の件数を追加した結果を返す
+    """
+    if job.get(u"skip_existing") and featureio.exists(job[u"output"]):
+        return OrderedDict([(u"id", job[u"id"]), (u"tool", job[u"tool"]), (u"status", u"skipped"),
+                            (u"message", u"出力がすでに存在します"), (u"pid", os.getpid())])
+    result = worker.run_job(job)
+    for key, path in ((u"in_count", job[u"input"]), (u"out_count", job[u"output"])):
+        if key == u"out_count" and result[u"status"] != u"ok":
+            continue
+        try:
+            result[key] = featureio.get_count(path)
+        except Exception:
+            result[key] = None
+    return result
+
+
+def run_batch(tool, inputs, output, params=None, processes=0, memory_per_process=DEFAULT_MEMORY_PER_PROCESS,
+              skip_existing=False, fake_arcpy=False, report=None):
+    """
+    メソッド名 : run_batch メソッド
+    引数 1     : ツール名
+    引数 2     : 入力のパスのリスト（ワイルドカードは展開済み）
+    引数 3     : 出力のパスのパターン
+    引数 4     : パラメータのリスト（{in}、{out} を含む、None の場合は [{in}, {out}]）
+    引数 5     : プロセス数の上限（0 の場合は CPU のコア数）
+    引数 6     : 1 プロセスあたりのメモリの目安（MB）
+    引数 7     : True の場合は出力がすでにあるジョブを実行しない
+    引数 8     : True の場合は arcpy を ejpyconv.fakearcpy に置き換えて実行（ドライラン、出力は保存しない）
+    引数 9     : ジョブの完了ごとに結果の辞書を渡して呼び出す関数
+    概要       : 入力ごとにツールを並列に実行し、一覧表の行（入力の順）のリストを返す
+    """
+    if params is None:
+        if tools.output_index(tool) != 1:
+            raise ValueError(u"{0} は出力が 2 番目のパラメータではないため、パラメータを指定してください".format(tool))
+        params = [u"{in}", u"{out}"]
+
+    jobs = []
+    for index, in_path in enumerate(inputs, start=1):
+        out_path = output_path(output, in_path, index)
+        jobs.append({u"id": index, u"tool": tool, u"input": in_path, u"output": out_path,
+                     u"params": tool_params(params, in_path, out_path), u"skip_existing": skip_existing})
+    outputs = [job[u"output"] for job in jobs]
+    duplicates = sorted(set(path for path in outputs if outputs.count(path) > 1))
+    if duplicates:
+        raise ValueError(u"出力のパスが重複しています：{0}".format(u", ".join(duplicates)))
+    if not jobs:
+        return []
+
+    # 出力のワークスペースは並列に作成しないよう、実行前に作成
+    for path in OrderedDict.fromkeys(outputs):
+        create_workspace(path)
+
+    rows = {}
+    size = pool_size(len(jobs), processes, memory_per_process)
+    with ProcessPoolExecutor(size, initializer=worker.init_process, initargs=(fake_arcpy,)) as executor:
+        futures = {}
+        for job in jobs:
+            job[u"submitted"] = time.time()
+            futures[executor.submit(run_item, job)] = job
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                # プロセスの異常終了などでジョブの結果を取得できない場合
+                result = OrderedDict([(u"status", u"error"), (u"message", u"{0}: {1}".format(type(e).__name__, e))])
+            row = OrderedDict((column, result.get(column)) for column in SUMMARY_COLUMNS)
+            row[u"index"], row[u"input"], row[u"output"] = job[u"id"], job[u"input"], job[u"output"]
+            row[u"message"] = row[u"message"] or u""
+            rows[job[u"id"]] = row
+            if report is not None:
+                report(row)
+    return [rows[index] for index in sorted(rows)]
+
+
+def write_summary(rows, path):
+    """
+    メソッド名 : write_summary メソッド
+    引数 1     : 一覧表の行のリスト
+    引数 2     : CSV ファイルのパス
+    概要       : 一覧表を CSV（Excel で開けるよう BOM 付きの UTF-8）に出力
+    """
+    with open(path, u"w", encoding=u"utf-8-sig", newline=u"") as f:
+        writer = csv.writer(f)
+        writer.writerow(SUMMARY_COLUMNS)
+        for row in rows:
+            writer.writerow([u"" if row[column] is None else
+                             u"{0:.3f}".format(row[column]) if isinstance(row[column], float) else row[column]
+                             for column in SUMMARY_COLUMNS])
+
+
+def format_row(row):
+    def number(value, pattern):
+        return pattern.format(value) if value is not None else u"-"
+    return u"{0:>5} {1:<8} {2:>9} {3:>9} {4:>10}  {5}  {6}".format(
+        row[u"index"], row[u"status"], number(row[u"in_count"], u"{0}"), number(row[u"out_count"], u"{0}"),
+        number(row[u"wall_time"], u"{0:.3f}s"), row[u"input"], row[u"message"])
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog=u"python -m ejpyconv.batch",
+                                     description=u"複数の入力データセットに EJPyConv ツールを並列に実行")
+    parser.add_argument(u"tool", help=u"ツール名（{0}）".format(u", ".join(tools.names())))
+    parser.add_argument(u"inputs", nargs=u"*", help=u"入力のパス、またはワイルドカード")
+    parser.add_argument(u"--inputs-file", default=u"", help=u"入力のパスを 1 行に 1 つ記載したテキスト ファイル")
+    parser.add_argument(u"--output", required=True,
+                        help=u"出力のパスのパターン（{name}、{workspace}、{dir}、{index} を置き換え）")
+    parser.add_argument(u"--params", default=u"",
+                        help=u"ツールのパラメータの JSON のリスト（{in} は入力、{out} は出力に置き換え）")
+    parser.add_argument(u"--processes", type=int, default=0, help=u"プロセス数の上限（既定は CPU のコア数）")
+    parser.add_argument(u"--memory-per-process", type=float, default=DEFAULT_MEMORY_PER_PROCESS,
+                        help=u"1 プロセスあたりのメモリの目安（MB、空きメモリからプロセス数を制限、0 の場合は制限しない）")
+    parser.add_argument(u"--skip-existing", action=u"store_true",
+                        help=u"出力がすでにある入力は実行しない（--fake-arcpy では出力を保存しないため効果なし）")
+    parser.add_argument(u"--summary", default=u"batch_summary.csv", help=u"一覧表の CSV ファイル")
+    parser.add_argument(u"--fake-arcpy", action=u"store_true",
+                        help=u"ドライラン：arcpy の代わりに ejpyconv.fakearcpy（メモリ上の代替モジュール、shapely が必要）"
+                             u"で実行し、出力は保存しない（出力のワークスペースは作成する）")
+    options = parser.parse_args(argv)
+
+    if options.tool not in tools.TOOLS:
+        parser.error(u"ツール名が不正です：{0}".format(options.tool))
+    patterns = list(options.inputs)
+    if options.inputs_file:
+        with open(options.inputs_file, encoding=u"utf-8-sig") as f:
+            patterns.extend(line.strip() for line in f if line.strip())
+    if not patterns:
+        parser.error(u"入力を指定してください")
+    options.patterns = patterns
+    if options.params:
+        options.params = json.loads(options.params)
+        if not isinstance(options.params, list):
+            parser.error(u"--params は JSON のリストで指定してください")
+    else:
+        options.params = None
+        if tools.output_index(options.tool) != 1:
+            parser.error(u"{0} は --params でパラメータを指定してください".format(options.tool))
+    return options
+
+
+def main(argv=None):
+    options = parse_args(argv)
+    inputs = expand_inputs(options.patterns)
+    if not inputs:
+        print(u"入力がありません：{0}".format(u", ".join(options.patterns)))
+        return 1
+    size = pool_size(len(inputs), options.processes, options.memory_per_process)
+    print(u"{0}：入力 {1} 件、プロセス数 {2}".format(options.tool, len(inputs), size))
+    if options.fake_arcpy:
+        print(u"ドライラン：--fake-arcpy のため出力は保存しません")
+    sys.stdout.flush()
+
+    def report(row):
+        print(format_row(row))
+        sys.stdout.flush()
+
+    start = time.perf_counter()
+    rows = run_batch(options.tool, inputs, options.output, options.params, options.processes,
+                     options.memory_per_process, options.skip_existing, options.fake_arcpy, report)
+    elapsed = time.perf_counter() - start
+    write_summary(rows, options.summary)
+
+    counts = OrderedDict((status, sum(1 for row in rows if row[u"status"] == status))
+                         for status in (u"ok", u"error", u"skipped"))
+    total = sum(row[u"wall_time"] or 0 for row in rows)
+    print(u"合計：{0} 件（成功 {1}、失敗 {2}、スキップ {3}）処理時間の合計 {4:.3f}s、経過時間 {5:.3f}s".format(
+        len(rows), counts[u"ok"], counts[u"error"], counts[u"skipped"], total, elapsed))
+    print(u"一覧表：{0}".format(options.summary))
+    return 1 if counts[u"error"] else 0
+
+
+if __name__ == u"__main__":
+    sys.exit(main())
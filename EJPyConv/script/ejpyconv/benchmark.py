@@ -0,0 +1,419 @@
+﻿# coding:utf-8
+"""
+Tool name : EJPyConv 共通モジュール（ベンチマーク）
+Source    : ejpyconv/benchmark.py
+Author    : Esri Japan Corporation
+Created   : 2026/10/19
+Updated   : 2026/10/19
+
+使用例    : python -m ejpyconv.benchmark --sizes 1000,10000 --baseline baseline.json
+            合成データで各ツールを実行し、処理時間、ピーク メモリ、1 秒あたりのフィーチャ数を JSON に出力
+            --baseline の結果より --threshold の割合を超えて遅くなったツールがある場合は終了コード 1
+            ツールのスクリプトは arcpy を必要とするため、arcpy がない環境では --fake-arcpy を指定しない限り実行できない
+            1 件も計測できなかった場合は終了コード 2
+            --fake-arcpy を指定すると ArcGIS がない環境でも ejpyconv.fakearcpy で実行し、arcpy の呼び出し回数も出力（shapely が必要）
+            --profile を指定すると ejpyconv.profiling の段階ごとの処理時間も出力（レポートは workdir/profile/<フィーチャ数>）
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import runpy
+import subprocess
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+
+from ejpyconv import datagen, featureio, profiling
+
+
+# ツールのスクリプトを置くフォルダ
+SCRIPT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 既定のフィーチャ数
+DEFAULT_SIZES = (1000, 10000, 100000, 1000000)
+
+# 既定の許容する処理時間の増加の割合
+DEFAULT_THRESHOLD = 0.2
+
+# 比較の対象とする最小の処理時間（秒、これより短い結果は誤差が大きいため比較しない）
+MIN_WALL_TIME = 0.05
+
+# ツールごとの入力の合成データとパラメータ（{in0}、{in1} は入力、{out} は出力のパス）
+# GetParameter で取得する Boolean のパラメータは、False の場合は空文字
+CASES = OrderedDict([
+    (u"CreateConvexhull", ([u"random_points"], [u"{in0}", u"{out}", u"true", u"GROUP_ID", u"", u"0"])),
+    (u"CreateInsideBuffer", ([u"polygons_with_holes"], [u"{in0}", u"{out}", u"5"])),
+    (u"CutPolyWithLine", ([u"grid_parcels", u"road_network"], [u"{in0}", u"{in1}", u"{out}"])),
+    (u"DelOverlapPoly", ([u"grid_parcels", u"polygons_with_holes"], [u"{in0}", u"{in1}", u"{out}"])),
+    (u"LineJunctionPtToPt", ([u"road_network"], [u"{in0}", u"{out}", u""])),
+    (u"LineMidPtToPt", ([u"road_network"], [u"{in0}", u"{out}", u"0.5", u"FRACTION"])),
+    (u"LineStartingAndEndingPtToPt", ([u"road_network"], [u"{in0}", u"{out}", u"BOTH"])),
+    (u"LineVertexToPt", ([u"road_network"], [u"{in0}", u"{out}"])),
+    (u"PolyCenterToPt", ([u"polygons_with_holes"], [u"{in0}", u"{out}", u""])),
+    (u"PolyFillingUp", ([u"polygons_with_holes"], [u"{in0}", u"{out}"])),
+    (u"PolyToLine", ([u"polygons_with_holes"], [u"{in0}", u"{out}"])),
+    (u"PolyVertexToPt", ([u"polygons_with_holes"], [u"{in0}", u"{out}", u""])),
+    (u"ProportionalDivisionArea", ([u"polygons_with_holes", u"grid_parcels"], [u"{in0}", u"{in1}", u"POP", u"{out}"])),
+    (u"PtToPoly", ([u"random_points"], [u"{in0}", u"{out}", u"GROUP_ID", u"SORT_NO"])),
+    (u"SpiderGraph", ([u"random_points", u"center_points"], [u"{in0}", u"{in1}", u"{out}"])),
+    (u"SplitLineAtPt", ([u"road_network", u"road_points"], [u"{in0}", u"{in1}", u"{out}"])),
+    (u"Thiessen", ([u"random_points"], [u"{in0}", u"{out}"])),
+])
+
+
+def peak_rss_mb():
+    """
+    メソッド名 : peak_rss_mb メソッド
+    概要       : 実行中のプロセスのピーク メモリ（MB）を取得（取得できない場合は None）
+    """
+    # Linux の ru_maxrss は fork 元のプロセスのピークを引き継ぐため、exec でリセットされる VmHWM を使用
+    if os.path.exists(u"/proc/self/status"):
+        with open(u"/proc/self/status") as f:
+            for line in f:
+                if line.startswith(u"VmHWM:"):
+                    return int(line.split()[1]) / 1024.0
+    try:
+        import resource
+    except ImportError:
+        resource = None
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS はバイト、それ以外は KB
+        return peak / 1048576.0 if sys.platform == u"darwin" else peak / 1024.0
+    # Windows は psutil がある場合のみ取得
+    try:
+        import psutil
+    except ImportError:
+        return None
+    info = psutil.Process().memory_info()
+    return getattr(info, u"peak_wset", info.rss) / 1048576.0
+
+
+def case_paths(tool, size, workdir, seed):
+    """
+    メソッド名 : case_paths メソッド
+    引数 1     : ツール名
+    引数 2     : フィーチャ数
+    引数 3     : 合成データを置くフォルダ
+    引数 4     : 乱数のシード
+    概要       : 入力の合成データを作成し、入力と出力のパスを取得
+    """
+    generators, _ = CASES[tool]
+    inputs = [datagen.generate(name, size, workdir, seed) for name in generators]
+    out_db = os.path.join(workdir, u"{0}_{1}_{2}.gpkg".format(tool, size, seed))
+    return inputs, out_db, out_db + u"/main.out"
+
+
+def run_case(tool, size, workdir, seed, fake_arcpy=False):
+    """
+    メソッド名 : run_case メソッド
+    引数 1     : ツール名
+    引数 2     : フィーチャ数
+    引数 3     : 合成データを置くフォルダ
+    引数 4     : 乱数のシード
+    引数 5     : True の場合は arcpy を ejpyconv.fakearcpy に置き換えて実行
+    概要       : ツールのスクリプトを実行して計測結果の辞書を返す（ピーク メモリを計測するため子プロセスで実行）
+    """
+    result = OrderedDict([(u"tool", tool), (u"size", size), (u"status", u"ok"), (u"message", u""),
+                          (u"wall_time", None), (u"peak_rss_mb", None), (u"baseline_rss_mb", None),
+                          (u"features_per_sec", None), (u"out_count", None)])
+    if fake_arcpy:
+        from ejpyconv import fakearcpy
+        arcpy = fakearcpy.install()
+    else:
+        try:
+            import arcpy
+        except ImportError:
+            result[u"status"] = u"skipped"
+            result[u"message"] = u"arcpy を使用できません"
+            return result
+
+    inputs, out_db, out_fc = case_paths(tool, size, workdir, seed)
+    if os.path.exists(out_db):
+        os.remove(out_db)
+    # 出力のワークスペース（空の GeoPackage）を作成
+    featureio.SQLiteBackend().connect(out_db).close()
+    if fake_arcpy:
+        # 入力の読み込みは計測に含めない
+        for path in inputs:
+            fakearcpy.workspace.find(path)
+        fakearcpy.calls.clear()
+    _, params = CASES[tool]
+    values = dict((u"in{0}".format(j), path) for j, path in enumerate(inputs))
+    values[u"out"] = out_fc
+    script = os.path.join(SCRIPT_DIR, tool + u".py")
+
+    # ツールは例外を AddError で出力するため、AddError の内容でエラーを判定
+    errors = []
+    add_error = arcpy.AddError
+
+    def record_error(message):
+        errors.append(u"{0}".format(message))
+        add_error(message)
+
+    arcpy.AddError = record_error
+    result[u"baseline_rss_mb"] = peak_rss_mb()
+    sys.argv = [script] + [param.format(**values) for param in params]
+    start = time.perf_counter()
+    try:
+        runpy.run_path(script, run_name=u"__main__")
+    except SystemExit:
+        pass
+    except Exception as e:
+        errors.append(u"{0}: {1}".format(type(e).__name__, e))
+    finally:
+        arcpy.AddError = add_error
+    wall_time = time.perf_counter() - start
+
+    result[u"wall_time"] = wall_time
+    result[u"peak_rss_mb"] = peak_rss_mb()
+    if fake_arcpy:
+        result[u"calls"] = OrderedDict(sorted(fakearcpy.calls.items()))
+    if errors:
+        # 失敗したケースは途中で終了しているため、1 秒あたりのフィーチャ数は出力しない
+        result[u"status"] = u"error"
+        result[u"message"] = errors[0]
+    elif fake_arcpy:
+        result[u"features_per_sec"] = size / wall_time if wall_time > 0 else None
+        # 出力はメモリ上だけに作成される
+        if arcpy.Exists(out_fc):
+            result[u"out_count"] = int(arcpy.GetCount_management(out_fc).getOutput(0))
+    else:
+        result[u"features_per_sec"] = size / wall_time if wall_time > 0 else None
+        backend = featureio.SQLiteBackend()
+        try:
+            if backend.exists(out_fc):
+                result[u"out_count"] = backend.get_count(out_fc)
+        finally:
+            backend.close()
+    if profiling.enabled():
+        path = profiling.report_path(tool, out_fc)
+        if os.path.exists(path):
+            with open(path, encoding=u"utf-8") as f:
+                result[u"profile"] = json.load(f, object_pairs_hook=OrderedDict)[u"stages"]
+    # 出力は件数のみ記録して削除（合成データは次回の計測で再利用するため残す）
+    if os.path.exists(out_db):
+        os.remove(out_db)
+    return result
+
+
+def spawn_case(tool, size, options):
+    """
+    メソッド名 : spawn_case メソッド
+    引数 1     : ツール名
+    引数 2     : フィーチャ数
+    引数 3     : コマンドラインのオプション
+    概要       : 子プロセスで run_case を実行して計測結果の辞書を返す
+    """
+    fd, result_path = tempfile.mkstemp(suffix=u".json", dir=options.workdir)
+    os.close(fd)
+    env = dict(os.environ)
+    env[u"PYTHONPATH"] = os.pathsep.join([SCRIPT_DIR] + [p for p in [env.get(u"PYTHONPATH")] if p])
+    env[featureio.BACKEND_ENV] = options.backend
+    if options.limit:
+        env[u"EJPYCONV_LIMIT"] = str(options.limit)
+    if options.profile:
+        env[profiling.PROFILE_ENV] = os.path.join(options.workdir, u"profile", str(size))
+    command = [sys.executable, u"-m", u"ejpyconv.benchmark", u"--run-case", tool, u"--sizes", str(size),
+               u"--seed", str(options.seed), u"--workdir", options.workdir, u"--output", result_path]
+    if options.fake_arcpy:
+        command.append(u"--fake-arcpy")
+    try:
+        with open(os.devnull, u"w") as devnull:
+            process = subprocess.run(command, cwd=SCRIPT_DIR, env=env, stdout=devnull,
+                                     stderr=subprocess.PIPE, timeout=options.timeout)
+        if os.path.getsize(result_path) == 0:
+            stderr = process.stderr.decode(u"utf-8", u"replace").strip().splitlines()
+            return OrderedDict([(u"tool", tool), (u"size", size), (u"status", u"error"),
+                                (u"message", stderr[-1] if stderr else u"終了コード {0}".format(process.returncode))])
+        with open(result_path, encoding=u"utf-8") as f:
+            return json.load(f, object_pairs_hook=OrderedDict)
+    except subprocess.TimeoutExpired:
+        return OrderedDict([(u"tool", tool), (u"size", size), (u"status", u"timeout"),
+                            (u"message", u"{0} 秒を超えました".format(options.timeout))])
+    finally:
+        os.remove(result_path)
+
+
+def run_benchmark(options):
+    """
+    メソッド名 : run_benchmark メソッド
+    引数 1     : コマンドラインのオプション
+    概要       : ツールとフィーチャ数の組み合わせごとに計測し、結果のリストを返す
+                 エラー、タイムアウトになったツールは、それより大きいフィーチャ数を実行しない
+    """
+    results = []
+    for tool in options.tools:
+        stopped = None
+        for size in options.sizes:
+            if stopped is not None:
+                result = OrderedDict([(u"tool", tool), (u"size", size), (u"status", u"skipped"),
+                                      (u"message", u"{0} 件で {1}".format(stopped[u"size"], stopped[u"status"]))])
+            else:
+                try:
+                    case_paths(tool, size, options.workdir, options.seed)
+                    # 繰り返す場合は処理時間が最短の結果を採用
+                    runs = [spawn_case(tool, size, options) for _ in range(max(options.repeat, 1))]
+                    result = min(runs, key=lambda run: run.get(u"wall_time") or float(u"inf"))
+                except Exception as e:
+                    result = OrderedDict([(u"tool", tool), (u"size", size), (u"status", u"error"),
+                                          (u"message", u"合成データの作成に失敗しました：{0}".format(e))])
+                if result[u"status"] in (u"error", u"timeout"):
+                    stopped = result
+            results.append(result)
+            print(format_result(result))
+            sys.stdout.flush()
+    return results
+
+
+def format_result(result):
+    def number(value, pattern):
+        return pattern.format(value) if value is not None else u"-"
+    return u"{0:<28} {1:>9} {2:<8} {3:>10} {4:>10} {5:>12}  {6}".format(
+        result[u"tool"], result[u"size"], result[u"status"],
+        number(result.get(u"wall_time"), u"{0:.3f}s"), number(result.get(u"peak_rss_mb"), u"{0:.1f}MB"),
+        number(result.get(u"features_per_sec"), u"{0:.0f}/s"), result.get(u"message", u""))
+
+
+def compare(results, baseline, threshold):
+    """
+    メソッド名 : compare メソッド
+    引数 1     : 計測結果のリスト
+    引数 2     : 基準とする計測結果のリスト
+    引数 3     : 許容する処理時間の増加の割合（0.2 の場合は 20%）
+    概要       : 基準より処理時間が threshold の割合を超えて増えた結果、基準では成功して今回失敗した結果を取得
+    """
+    base = dict(((result[u"tool"], result[u"size"]), result) for result in baseline)
+    regressions = []
+    for result in results:
+        old = base.get((result[u"tool"], result[u"size"]))
+        if old is None or old[u"status"] != u"ok":
+            continue
+        if result[u"status"] != u"ok":
+            if result[u"status"] != u"skipped":
+                regressions.append((result, u"基準では成功: {0}".format(result[u"status"])))
+            continue
+        if old[u"wall_time"] < MIN_WALL_TIME:
+            continue
+        ratio = result[u"wall_time"] / old[u"wall_time"]
+        if ratio > 1 + threshold:
+            regressions.append((result, u"{0:.3f}s -> {1:.3f}s (x{2:.2f})".format(
+                old[u"wall_time"], result[u"wall_time"], ratio)))
+    return regressions
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog=u"python -m ejpyconv.benchmark",
+                                     description=u"合成データによる EJPyConv ツールのベンチマーク")
+    parser.add_argument(u"--tools", default=u",".join(CASES),
+                        help=u"計測するツール名（カンマ区切り、既定はすべて）")
+    parser.add_argument(u"--sizes", default=u",".join(str(size) for size in DEFAULT_SIZES),
+                        help=u"フィーチャ数（カンマ区切り）")
+    parser.add_argument(u"--seed", type=int, default=0, help=u"合成データの乱数のシード")
+    parser.add_argument(u"--workdir", default=os.path.join(tempfile.gettempdir(), u"ejpyconv_benchmark"),
+                        help=u"合成データと出力を置くフォルダ（合成データは次回の計測で再利用）")
+    parser.add_argument(u"--output", default=u"", help=u"結果の JSON ファイル（既定は workdir/benchmark.json）")
+    parser.add_argument(u"--baseline", default=u"", help=u"比較の基準とする結果の JSON ファイル")
+    parser.add_argument(u"--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=u"許容する処理時間の増加の割合")
+    parser.add_argument(u"--backend", default=u"",
+                        help=u"featureio の入出力バックエンド（arcpy / sqlite、既定は --fake-arcpy の場合 arcpy、"
+                             u"それ以外は sqlite）")
+    parser.add_argument(u"--fake-arcpy", action=u"store_true",
+                        help=u"arcpy の代わりに ejpyconv.fakearcpy（メモリ上の代替モジュール、shapely が必要）で実行")
+    parser.add_argument(u"--limit", type=int, default=0,
+                        help=u"SpiderGraph、Thiessen、ProportionalDivisionArea の対象件数の上限（EJPYCONV_LIMIT）")
+    parser.add_argument(u"--profile", action=u"store_true",
+                        help=u"段階ごとの処理時間を計測（EJPYCONV_PROFILE）")
+    parser.add_argument(u"--timeout", type=float, default=3600, help=u"1 回の計測の制限時間（秒）")
+    parser.add_argument(u"--repeat", type=int, default=1, help=u"計測の繰り返し回数（最短の結果を採用）")
+    parser.add_argument(u"--run-case", default=u"", help=argparse.SUPPRESS)
+    options = parser.parse_args(argv)
+
+    options.tools = [tool.strip() for tool in options.tools.split(u",") if tool.strip()]
+    for tool in options.tools:
+        if tool not in CASES:
+            parser.error(u"ツール名が不正です：{0}".format(tool))
+    options.sizes = [int(size) for size in options.sizes.split(u",") if size.strip()]
+    options.workdir = os.path.abspath(options.workdir)
+    if options.backend == u"":
+        options.backend = u"arcpy" if options.fake_arcpy else u"sqlite"
+    if options.output == u"":
+        options.output = os.path.join(options.workdir, u"benchmark.json")
+    return options
+
+
+def arcpy_available():
+    """
+    メソッド名 : arcpy_available メソッド
+    概要       : arcpy を読み込めるか
+    """
+    try:
+        import arcpy
+    except ImportError:
+        return False
+    return True
+
+
+def main(argv=None):
+    options = parse_args(argv)
+    if not os.path.isdir(options.workdir):
+        os.makedirs(options.workdir)
+
+    # ツールのスクリプトは arcpy を読み込むため、arcpy がない場合はすべて skipped になる
+    if not options.run_case and not options.fake_arcpy and not arcpy_available():
+        sys.stderr.write(u"arcpy を使用できません。ArcGIS Pro の Python で実行するか、--fake-arcpy を指定してください\n")
+        return 2
+    if not options.run_case and options.fake_arcpy:
+        from ejpyconv import fakearcpy
+        try:
+            fakearcpy.require()
+        except ImportError as e:
+            sys.stderr.write(u"{0}\n".format(e))
+            return 2
+
+    # 子プロセスでの 1 件の計測
+    if options.run_case:
+        result = run_case(options.run_case, options.sizes[0], options.workdir, options.seed, options.fake_arcpy)
+        with open(options.output, u"w", encoding=u"utf-8") as f:
+            json.dump(result, f, ensure_ascii=False)
+        return 0
+
+    results = run_benchmark(options)
+    report = OrderedDict([
+        (u"created", datetime.datetime.now().isoformat()),
+        (u"python", platform.python_version()),
+        (u"platform", platform.platform()),
+        (u"backend", options.backend),
+        (u"fake_arcpy", options.fake_arcpy),
+        (u"seed", options.seed),
+        (u"limit", options.limit or None),
+        (u"results", results),
+    ])
+    with open(options.output, u"w", encoding=u"utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(u"結果：{0}".format(options.output))
+
+    # 1 件も計測できなかった場合は成功として扱わない
+    if not any(result[u"status"] == u"ok" for result in results):
+        sys.stderr.write(u"計測できたツールがありません\n")
+        return 2
+
+    status = 0
+    if options.baseline:
+        with open(options.baseline, encoding=u"utf-8") as f:
+            baseline = json.load(f)[u"results"]
+        regressions = compare(results, baseline, options.threshold)
+        for result, message in regressions:
+            print(u"性能低下：{0} {1} 件 {2}".format(result[u"tool"], result[u"size"], message))
+        if regressions:
+            status = 1
+    return status
+
+
+if __name__ == u"__main__":
+    sys.exit(main())
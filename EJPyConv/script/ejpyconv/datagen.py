@@ -0,0 +1,298 @@
+﻿# coding:utf-8
+"""
+Tool name : EJPyConv 共通モジュール（ベンチマーク用の合成データ）
+Source    : ejpyconv/datagen.py
+Author    : Esri Japan Corporation
+Created   : 2026/10/19
+Updated   :
+"""
+
+import json
+import math
+import os
+
+import numpy as np
+
+from ejpyconv import featureio
+
+
+# 合成データの空間参照（JGD 2011 平面直角座標系 第 IX 系）
+SPATIAL_REFERENCE = 6677
+
+# 区画・道路の格子の間隔（m）
+CELL_SIZE = 100.0
+
+
+def grid_shape(n):
+    """
+    メソッド名 : grid_shape メソッド
+    引数 1     : セルの数
+    概要       : n 個以上のセルを持つ正方形に近い格子の列数・行数を取得
+    """
+    cols = max(int(math.ceil(math.sqrt(n))), 1)
+    rows = max(int(math.ceil(float(n) / cols)), 1)
+    return cols, rows
+
+
+def extent(n):
+    """
+    メソッド名 : extent メソッド
+    引数 1     : フィーチャ数
+    概要       : n 個のフィーチャを配置する範囲（xmin, ymin, xmax, ymax）を取得
+    """
+    cols, rows = grid_shape(n)
+    return 0.0, 0.0, cols * CELL_SIZE, rows * CELL_SIZE
+
+
+def polygon_json(rings):
+    return json.dumps({u"rings": rings, u"spatialReference": {u"wkid": SPATIAL_REFERENCE}})
+
+
+def square(x, y, size, clockwise=True):
+    """
+    メソッド名 : square メソッド
+    引数 1     : 左下の X 座標
+    引数 2     : 左下の Y 座標
+    引数 3     : 一辺の長さ
+    引数 4     : 時計回りの場合は True（exterior ring）、反時計回りの場合は False（interior ring）
+    概要       : 正方形のリングの座標（始終点は重複）を取得
+    """
+    ring = [[x, y], [x, y + size], [x + size, y + size], [x + size, y], [x, y]]
+    return ring if clockwise else ring[::-1]
+
+
+def random_points(n, seed=0):
+    """
+    メソッド名 : random_points メソッド
+    引数 1     : フィーチャ数
+    引数 2     : 乱数のシード
+    概要       : 範囲内に一様に分布するポイント
+                 属性は GROUP_ID（100 ポイントごとのグループ）、SORT_NO（グループ内の順番）、VALUE（実数）
+    """
+    rng = np.random.default_rng(seed)
+    xmin, ymin, xmax, ymax = extent(n)
+    xy = rng.uniform((xmin, ymin), (xmax, ymax), size=(n, 2))
+    values = rng.uniform(0, 1000, size=n)
+    fields = [(u"GROUP_ID", u"LONG"), (u"SORT_NO", u"LONG"), (u"VALUE", u"DOUBLE")]
+
+    def rows():
+        for i in range(n):
+            yield (i // 100 + 1, i % 100 + 1, float(values[i]), (float(xy[i, 0]), float(xy[i, 1])))
+
+    return u"POINT", fields, rows()
+
+
+def center_points(n, seed=0):
+    """
+    メソッド名 : center_points メソッド
+    引数 1     : 入力フィーチャ数（参照ポイントは 100 分の 1）
+    引数 2     : 乱数のシード
+    概要       : スパイダー グラフの参照ポイント（random_points と同じ範囲に入力の 100 分の 1 の件数）
+    """
+    count = max(n // 100, 1)
+    rng = np.random.default_rng(seed + 1)
+    xmin, ymin, xmax, ymax = extent(n)
+    xy = rng.uniform((xmin, ymin), (xmax, ymax), size=(count, 2))
+    fields = [(u"CENTER_ID", u"LONG")]
+
+    def rows():
+        for i in range(count):
+            yield (i + 1, (float(xy[i, 0]), float(xy[i, 1])))
+
+    return u"POINT", fields, rows()
+
+
+def grid_parcels(n, seed=0):
+    """
+    メソッド名 : grid_parcels メソッド
+    引数 1     : フィーチャ数
+    引数 2     : 乱数のシード
+    概要       : 格子状に並ぶ区画のポリゴン（頂点を少しずらした四角形）
+                 属性は PARCEL_ID、POP（面積按分する人口）
+    """
+    rng = np.random.default_rng(seed)
+    cols, rows_count = grid_shape(n)
+    # 隣り合う区画で頂点を共有するように格子点をずらす
+    jitter = rng.uniform(-0.2, 0.2, size=(rows_count + 1, cols + 1, 2)) * CELL_SIZE
+    jitter[0, :, 1] = jitter[-1, :, 1] = 0
+    jitter[:, 0, 0] = jitter[:, -1, 0] = 0
+    pops = rng.integers(0, 500, size=n)
+    fields = [(u"PARCEL_ID", u"LONG"), (u"POP", u"LONG")]
+
+    def node(col, row):
+        return [col * CELL_SIZE + float(jitter[row, col, 0]), row * CELL_SIZE + float(jitter[row, col, 1])]
+
+    def rows():
+        for i in range(n):
+            col, row = i % cols, i // cols
+            ring = [node(col, row), node(col, row + 1), node(col + 1, row + 1), node(col + 1, row), node(col, row)]
+            yield (i + 1, int(pops[i]), polygon_json([ring]))
+
+    return u"POLYGON", fields, rows()
+
+
+def road_network(n, seed=0):
+    """
+    メソッド名 : road_network メソッド
+    引数 1     : フィーチャ数
+    引数 2     : 乱数のシード
+    概要       : 格子点を結ぶ道路状のライン（交差点で端点を共有し、途中に 0 ～ 4 個の屈曲点）
+                 属性は ROAD_ID、ROAD_CLASS（道路種別）
+    """
+    rng = np.random.default_rng(seed)
+    # 格子の横方向・縦方向の辺で n 本以上になる格子
+    cols = max(int(math.ceil(math.sqrt(n / 2.0))), 1)
+    rows_count = max(int(math.ceil((n - cols) / (2.0 * cols + 1))), 1)
+    bends = rng.integers(0, 5, size=n)
+    offsets = rng.uniform(-0.1, 0.1, size=(n, 4)) * CELL_SIZE
+    classes = rng.integers(1, 4, size=n)
+    fields = [(u"ROAD_ID", u"LONG"), (u"ROAD_CLASS", u"SHORT")]
+
+    def edges():
+        for row in range(rows_count + 1):
+            for col in range(cols + 1):
+                if col < cols:
+                    yield (col, row), (col + 1, row)
+                if row < rows_count:
+                    yield (col, row), (col, row + 1)
+
+    def rows():
+        for i, (start, end) in enumerate(edges()):
+            if i >= n:
+                break
+            x0, y0 = start[0] * CELL_SIZE, start[1] * CELL_SIZE
+            x1, y1 = end[0] * CELL_SIZE, end[1] * CELL_SIZE
+            path = [[x0, y0]]
+            count = int(bends[i])
+            for k in range(count):
+                t = (k + 1.0) / (count + 1)
+                # 辺に直交する方向へずらした屈曲点
+                dx, dy = (0.0, float(offsets[i, k])) if y0 == y1 else (float(offsets[i, k]), 0.0)
+                path.append([x0 + (x1 - x0) * t + dx, y0 + (y1 - y0) * t + dy])
+            path.append([x1, y1])
+            yield (i + 1, int(classes[i]),
+                   json.dumps({u"paths": [path], u"spatialReference": {u"wkid": SPATIAL_REFERENCE}}))
+
+    return u"POLYLINE", fields, rows()
+
+
+def road_points(n, seed=0):
+    """
+    メソッド名 : road_points メソッド
+    引数 1     : ラインのフィーチャ数（ポイントは 10 分の 1）
+    引数 2     : 乱数のシード
+    概要       : road_network の横方向の辺の中点に置くライン分断用のポイント
+    """
+    count = max(n // 10, 1)
+    cols = max(int(math.ceil(math.sqrt(n / 2.0))), 1)
+    rows_count = max(int(math.ceil((n - cols) / (2.0 * cols + 1))), 1)
+    rng = np.random.default_rng(seed + 1)
+    cells = rng.choice(cols * (rows_count + 1), size=min(count, cols * (rows_count + 1)), replace=False)
+    fields = [(u"POINT_ID", u"LONG")]
+
+    def rows():
+        for i, cell in enumerate(cells):
+            col, row = int(cell) % cols, int(cell) // cols
+            yield (i + 1, ((col + 0.5) * CELL_SIZE, row * CELL_SIZE))
+
+    return u"POINT", fields, rows()
+
+
+def polygons_with_holes(n, seed=0):
+    """
+    メソッド名 : polygons_with_holes メソッド
+    引数 1     : フィーチャ数
+    引数 2     : 乱数のシード
+    概要       : 格子に 1 つずつ置く四角形のポリゴン（0 ～ 3 個の穴、1 割はマルチパート）
+                 属性は POLY_ID、BUF_DIST（内向きバッファーの距離）
+    """
+    rng = np.random.default_rng(seed)
+    cols, _ = grid_shape(n)
+    holes = rng.integers(0, 4, size=n)
+    multipart = rng.uniform(size=n) < 0.1
+    sizes = rng.uniform(0.6, 0.9, size=n) * CELL_SIZE
+    distances = rng.uniform(1, 10, size=n)
+    fields = [(u"POLY_ID", u"LONG"), (u"BUF_DIST", u"DOUBLE")]
+
+    def rows():
+        for i in range(n):
+            x = (i % cols) * CELL_SIZE + (CELL_SIZE - sizes[i]) / 2
+            y = (i // cols) * CELL_SIZE + (CELL_SIZE - sizes[i]) / 2
+            size = float(sizes[i])
+            if multipart[i]:
+                # 格子の中に小さな四角形を 2 つ並べる
+                half = size * 0.45
+                rings = [square(x, y, half), square(x + size - half, y + size - half, half)]
+            else:
+                rings = [square(x, y, size)]
+                # 外周を 3 × 3 に分けた左下・右上・中央に穴を開ける
+                step = size / 3.0
+                for k in range(int(holes[i])):
+                    col, row = [(0, 0), (2, 2), (1, 1)][k]
+                    rings.append(square(x + step * (col + 0.25), y + step * (row + 0.25), step * 0.5, False))
+            yield (i + 1, float(distances[i]), polygon_json(rings))
+
+    return u"POLYGON", fields, rows()
+
+
+# 名前と合成データの生成関数
+GENERATORS = {
+    u"random_points": random_points,
+    u"center_points": center_points,
+    u"grid_parcels": grid_parcels,
+    u"road_network": road_network,
+    u"road_points": road_points,
+    u"polygons_with_holes": polygons_with_holes,
+}
+
+
+def write_dataset(out_fc, shape_type, fields, rows):
+    """
+    メソッド名 : write_dataset メソッド
+    引数 1     : 出力フィーチャクラスのパス（GeoPackage のテーブル。例：C:/bench/data.gpkg/main.points）
+    引数 2     : ジオメトリタイプ（POINT、POLYLINE、POLYGON）
+    引数 3     : フィールド名とフィールドタイプのリスト
+    引数 4     : 属性値とジオメトリ（ポイントは XY 座標、それ以外は JSON）のタプルを返すイテレータ
+    概要       : 合成データを GeoPackage に書き込み（arcpy を使用しない SQLite バックエンドで作成）
+    """
+    backend = featureio.SQLiteBackend()
+    try:
+        db_path, table = featureio.split_sqlite_path(out_fc)
+        backend.create_featureclass(db_path, table, shape_type, u"", SPATIAL_REFERENCE)
+        for field_name, field_type in fields:
+            backend.add_field(out_fc, field_name, field_type)
+        shape_token = u"SHAPE@XY" if shape_type == u"POINT" else u"SHAPE@JSON"
+        count = 0
+        with backend.insert_cursor(out_fc, [name for name, _ in fields] + [shape_token]) as outcur:
+            for row in rows:
+                outcur.insertRow(row)
+                count += 1
+    finally:
+        backend.close()
+    return count
+
+
+def generate(name, n, workdir, seed=0):
+    """
+    メソッド名 : generate メソッド
+    引数 1     : 合成データの名前（GENERATORS のキー）
+    引数 2     : フィーチャ数
+    引数 3     : 合成データを置くフォルダ
+    引数 4     : 乱数のシード
+    概要       : 合成データの GeoPackage を作成してフィーチャクラスのパスを返す
+                 同じ名前・件数・シードのデータが作成済みの場合は再利用
+    """
+    if name not in GENERATORS:
+        raise ValueError(u"合成データの名前が不正です：{0}".format(name))
+    db_path = os.path.join(workdir, u"{0}_{1}_{2}.gpkg".format(name, n, seed))
+    out_fc = db_path + u"/main." + name
+    if not os.path.exists(db_path):
+        shape_type, fields, rows = GENERATORS[name](n, seed)
+        try:
+            write_dataset(out_fc, shape_type, fields, rows)
+        except Exception:
+            # 作成途中のファイルは次回に再利用しないように削除
+            if os.path.exists(db_path):
+                os.remove(db_path)
+            raise
+    return out_fc
@@ -0,0 +1,187 @@
+﻿# coding:utf-8
+"""
+Tool name : arcpy 代替モジュール
+Source    : ejpyconv/fakearcpy/__init__.py
+Author    : Esri Japan Corporation
+Created   : 2026/10/19
+Updated   : 2026/10/19
+
+ArcGIS がない環境でツールを実行・計測するための、メモリ上で動作する arcpy の代替モジュール
+ツールが使用する関数・クラスだけを実装し、呼び出し回数を calls に記録する
+install() で sys.modules の arcpy を置き換えると、ツールのスクリプトを変更せずに実行できる
+入力の GeoPackage/SQLite のテーブルは最初に参照されたときにメモリへ読み込み、出力はメモリ上だけに作成する
+
+必要なモジュール：
+    numpy
+    shapely（オーバーレイ、バッファー、ポリゴンの切断などのジオメトリ演算。install() で確認する）
+
+使用例：
+    from ejpyconv import fakearcpy
+    fakearcpy.install()
+    import arcpy
+"""
+
+import sys
+
+from ejpyconv.fakearcpy import da, geometries, management, workspace
+from ejpyconv.fakearcpy.geometries import (Array, AsShape, Extent, FromWKB, Geometry, Multipoint, Point,
+                                           PointGeometry, Polygon, Polyline, SpatialReference)
+from ejpyconv.fakearcpy.management import (AddField_management, Buffer_analysis, CalculateField_management,
+                                           Clip_analysis, CopyFeatures_management, CreateFeatureclass_management,
+                                           CreateTable_management, CreateUniqueName, DeleteField_management,
+                                           Delete_management, Describe, Dissolve_management, Exists,
+                                           GetCount_management, Intersect_analysis, ListFields,
+                                           MultipartToSinglepart_management, SelectLayerByLocation_management,
+                                           env)
+from ejpyconv.fakearcpy.workspace import ExecuteError, Field, Result, calls, counted
+
+
+class ExecuteWarning(Exception):
+    """
+    arcpy.ExecuteWarning
+    """
+    pass
+
+
+# SetParameter で設定された出力パラメータ（インデックス番号 → 値）
+outputs = {}
+
+
+# ---------------------------------------------------------------------------
+# メッセージ
+# ---------------------------------------------------------------------------
+
+def AddMessage(message):
+    calls[u"AddMessage"] += 1
+    workspace.add_message(0, message)
+
+
+def AddWarning(message):
+    calls[u"AddWarning"] += 1
+    workspace.add_message(1, message)
+
+
+def AddError(message):
+    calls[u"AddError"] += 1
+    workspace.add_message(2, message)
+
+
+def GetMessageCount():
+    return len(workspace.messages)
+
+
+def GetMessage(index):
+    return workspace.messages[index][1]
+
+
+def GetMessages(severity=None):
+    """
+    メソッド名 : GetMessages メソッド
+    引数 1     : 重要度（0：情報、1：警告、2：エラー。省略時はすべて）
+    概要       : 記録したメッセージを改行で連結して取得
+    """
+    return u"\n".join(message for level, message in workspace.messages
+                      if severity is None or level == int(severity))
+
+
+def GetMaxSeverity():
+    return max([level for level, _ in workspace.messages] or [0])
+
+
+# ---------------------------------------------------------------------------
+# パラメータ（sys.argv のコマンドライン引数。# は省略）
+# ---------------------------------------------------------------------------
+
+def GetArgumentCount():
+    return len(sys.argv) - 1
+
+
+def GetParameterAsText(index):
+    if index in outputs:
+        return u"{0}".format(outputs[index])
+    if index + 1 >= len(sys.argv) or sys.argv[index + 1] == u"#":
+        return u""
+    return sys.argv[index + 1]
+
+
+def GetParameter(index):
+    """
+    メソッド名 : GetParameter メソッド
+    引数 1     : パラメータのインデックス番号
+    概要       : パラメータの値（true/false は bool、数値は int または float、それ以外は文字列）
+    """
+    text = GetParameterAsText(index)
+    if text.lower() in (u"true", u"false"):
+        return text.lower() == u"true"
+    for convert in (int, float):
+        try:
+            return convert(text)
+        except ValueError:
+            pass
+    return text
+
+
+def SetParameter(index, value):
+    outputs[index] = value
+
+
+SetParameterAsText = SetParameter
+
+
+# ---------------------------------------------------------------------------
+# プログレッサー（呼び出し回数だけを記録）
+# ---------------------------------------------------------------------------
+
+@counted(u"SetProgressor")
+def SetProgressor(type, message=u"", min_range=0, max_range=100, step_value=1):
+    pass
+
+
+@counted(u"SetProgressorLabel")
+def SetProgressorLabel(label):
+    pass
+
+
+@counted(u"SetProgressorPosition")
+def SetProgressorPosition(position=None):
+    pass
+
+
+@counted(u"ResetProgressor")
+def ResetProgressor():
+    pass
+
+
+# ---------------------------------------------------------------------------
+# 置き換え
+# ---------------------------------------------------------------------------
+
+def require():
+    """
+    メソッド名 : require メソッド
+    概要       : 必要なモジュール（shapely）を読み込めない場合は ImportError を発生させる
+    """
+    geometries._require_shapely(u"ジオメトリ演算")
+
+
+def install():
+    """
+    メソッド名 : install メソッド
+    概要       : sys.modules の arcpy、arcpy.da をこのモジュールに置き換え
+                 ツールの実行の途中で失敗しないように、必要なモジュールを先に確認する
+    """
+    require()
+    module = sys.modules[__name__]
+    sys.modules[u"arcpy"] = module
+    sys.modules[u"arcpy.da"] = da
+    return module
+
+
+def reset():
+    """
+    メソッド名 : reset メソッド
+    概要       : データセット、メッセージ、呼び出し回数、環境設定、出力パラメータを初期化
+    """
+    workspace.clear()
+    env.reset()
+    outputs.clear()
@@ -0,0 +1,276 @@
+﻿# coding:utf-8
+"""
+Tool name : arcpy 代替モジュール（arcpy.da）
+Source    : ejpyconv/fakearcpy/da.py
+Author    : Esri Japan Corporation
+Created   : 2026/10/19
+Updated   : 2026/10/19
+
+メモリ上の Dataset の行を読み書きする SearchCursor、InsertCursor、UpdateCursor
+where_clause は属性を SQLite のメモリ上のデータベースへ書き出して評価する（GeoPackage/SQLite のワークスペースと同じ SQL）
+"""
+
+import sqlite3
+
+from ejpyconv.fakearcpy import geometries, workspace
+from ejpyconv.fakearcpy.geometries import Point, PointGeometry
+from ejpyconv.fakearcpy.workspace import calls
+
+
+def _field_names(dataset, field_names):
+    # フィールド名の文字列（; 区切り、* はすべてのフィールド）をリストに変換
+    if isinstance(field_names, str):
+        field_names = [field_names] if field_names == u"*" else field_names.split(u";")
+    names = []
+    for name in field_names:
+        if name == u"*":
+            names.extend(field.name for field in dataset.fields)
+        else:
+            names.append(name)
+    return names
+
+
+def _xy(geometry):
+    if geometry is None or geometry.isEmpty:
+        return None
+    point = geometry.centroid
+    return (point.X, point.Y)
+
+
+# ジオメトリのトークンごとの値の取得
+SHAPE_READERS = {
+    u"SHAPE@": lambda g: g,
+    u"SHAPE@XY": _xy,
+    u"SHAPE@TRUECENTROID": lambda g: None if g is None or g.isEmpty else (g.trueCentroid.X, g.trueCentroid.Y),
+    u"SHAPE@X": lambda g: None if g is None or g.isEmpty else g.centroid.X,
+    u"SHAPE@Y": lambda g: None if g is None or g.isEmpty else g.centroid.Y,
+    u"SHAPE@JSON": lambda g: None if g is None else g.JSON,
+    u"SHAPE@WKB": lambda g: None if g is None else g.WKB,
+    u"SHAPE@WKT": lambda g: None if g is None else g.WKT,
+    u"SHAPE@AREA": lambda g: None if g is None else g.area,
+    u"SHAPE@LENGTH": lambda g: None if g is None else g.length,
+}
+
+
+def _readers(dataset, field_names):
+    """
+    フィールド名ごとに、行から値を取得する (インデックス番号, 変換関数) のリストを作成
+    """
+    readers = []
+    for name in field_names:
+        token = name.upper()
+        if token == u"OID@":
+            readers.append((0, None))
+        elif token.startswith(u"SHAPE@"):
+            if dataset.shape_index is None or token not in SHAPE_READERS:
+                raise RuntimeError(u"A column was specified that does not exist: {0}".format(name))
+            readers.append((dataset.shape_index, None if token == u"SHAPE@" else SHAPE_READERS[token]))
+        else:
+            j = dataset.field_index(name)
+            if j is None:
+                raise RuntimeError(u"A column was specified that does not exist: {0}".format(name))
+            # ジオメトリのフィールド名を指定した場合は XY 座標
+            readers.append((j, _xy if dataset.fields[j].type == u"Geometry" else None))
+    return readers
+
+
+def _sqlite_value(value):
+    # SQLite で扱えない型（日付など）は文字列として評価
+    if value is None or isinstance(value, (int, float, str, bytes)):
+        return value
+    return u"{0}".format(value)
+
+
+def _where(dataset, where_clause):
+    """
+    where_clause に一致する行のインデックス番号の集合を取得
+    """
+    columns = [(j, field.name) for j, field in enumerate(dataset.fields) if field.type != u"Geometry"]
+    db = sqlite3.connect(u":memory:")
+    try:
+        db.execute(u"CREATE TABLE t (_k INTEGER, {0})".format(
+            u", ".join(u'"{0}"'.format(name.replace(u'"', u'""')) for _, name in columns)))
+        db.executemany(u"INSERT INTO t VALUES ({0})".format(u", ".join([u"?"] * (len(columns) + 1))),
+                       ([k] + [_sqlite_value(row[j]) for j, _ in columns] for k, row in enumerate(dataset.rows)))
+        try:
+            return set(k for k, in db.execute(u"SELECT _k FROM t WHERE {0}".format(where_clause)))
+        except sqlite3.Error as e:
+            raise RuntimeError(u"An invalid SQL statement was used. [{0}] ({1})".format(where_clause, e))
+    finally:
+        db.close()
+
+
+class _Cursor(object):
+    """
+    カーソルの共通処理（with 文、読み書きした行数の記録）
+    """
+    _name = u""
+    _rows = 0
+
+    def __init__(self, in_table, field_names):
+        calls[u"da." + self._name] += 1
+        self._dataset = workspace.get(in_table)
+        self.fields = tuple(_field_names(self._dataset, field_names))
+        self._rows = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._close()
+
+    def __del__(self):
+        self._close()
+
+    def _close(self):
+        if self._rows:
+            calls[u"da.{0}:rows".format(self._name)] += self._rows
+            self._rows = 0
+
+
+class SearchCursor(_Cursor):
+    """
+    arcpy.da.SearchCursor（sql_clause は未対応）
+    """
+    _name = u"SearchCursor"
+
+    def __init__(self, in_table, field_names, where_clause=None, spatial_reference=None,
+                 explode_to_points=False, sql_clause=(None, None), **kwargs):
+        _Cursor.__init__(self, in_table, field_names)
+        # where_clause に一致する行のインデックス番号（None の場合はすべての行）
+        self._selected = _where(self._dataset, where_clause) if where_clause else None
+        self._readers = _readers(self._dataset, self.fields)
+        self._explode = explode_to_points and not self._dataset.is_table
+        self._iter = self._generate()
+
+    def _generate(self):
+        readers = self._readers
+        selected = self._selected
+        for k, row in enumerate(self._dataset.rows):
+            if selected is not None and k not in selected:
+                continue
+            if self._explode and row[1] is not None:
+                # 頂点ごとに 1 行（ジオメトリは頂点のポイント）
+                spref = row[1].spatialReference
+                for x, y in row[1]._xy.tolist():
+                    exploded = list(row)
+                    exploded[1] = PointGeometry(Point(x, y), spref)
+                    self._rows += 1
+                    yield tuple(row_value(exploded, j, reader) for j, reader in readers)
+                continue
+            self._rows += 1
+            yield tuple(row_value(row, j, reader) for j, reader in readers)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._iter)
+
+    next = __next__
+
+    def reset(self):
+        self._iter = self._generate()
+
+
+def row_value(row, j, reader):
+    value = row[j]
+    return value if reader is None else reader(value)
+
+
+class InsertCursor(_Cursor):
+    """
+    arcpy.da.InsertCursor
+    """
+    _name = u"InsertCursor"
+
+    def __init__(self, in_table, field_names, datum_transformation=None, **kwargs):
+        _Cursor.__init__(self, in_table, field_names)
+        dataset = self._dataset
+        self._targets = []
+        for name in self.fields:
+            token = name.upper()
+            if token.startswith(u"SHAPE@"):
+                self._targets.append((dataset.shape_index, token))
+            else:
+                j = dataset.field_index(name)
+                if j is None or j == 0:
+                    raise RuntimeError(u"Cannot find field '{0}'".format(name))
+                self._targets.append((j, u"SHAPE@" if dataset.fields[j].type == u"Geometry" else None))
+
+    def insertRow(self, row):
+        """
+        メソッド名 : insertRow メソッド
+        引数 1     : 値のリスト
+        概要       : 行を追加して OID を返す
+        """
+        dataset = self._dataset
+        values = [None] * (len(dataset.fields) - 1)
+        for (j, token), value in zip(self._targets, row):
+            if token is not None:
+                if token in (u"SHAPE@X", u"SHAPE@Y"):
+                    raise RuntimeError(u"arcpy 代替モジュールでは {0} で挿入できません".format(token))
+                value = geometries.to_geometry(value, dataset.shapeType, dataset.spatialReference)
+                if value is not None and value.spatialReference.factoryCode == 0:
+                    value.spatialReference = geometries.as_spatial_reference(dataset.spatialReference)
+            values[j - 1] = value
+        self._rows += 1
+        return dataset.append(values)
+
+
+class UpdateCursor(SearchCursor):
+    """
+    arcpy.da.UpdateCursor（updateRow、deleteRow は直前に返した行が対象）
+    """
+    _name = u"UpdateCursor"
+    _deleted = ()
+
+    def __init__(self, in_table, field_names, where_clause=None, spatial_reference=None,
+                 explode_to_points=False, sql_clause=(None, None), **kwargs):
+        SearchCursor.__init__(self, in_table, field_names, where_clause, spatial_reference, False, sql_clause)
+        self._current = None
+        self._deleted = set()
+
+    def _generate(self):
+        readers = self._readers
+        selected = self._selected
+        for k, row in enumerate(self._dataset.rows):
+            if selected is not None and k not in selected:
+                continue
+            self._current = k
+            self._rows += 1
+            yield [row_value(row, j, reader) for j, reader in readers]
+        self._current = None
+        self._compact()
+
+    def updateRow(self, values):
+        if self._current is None:
+            raise RuntimeError(u"updateRow の前に行を取得していません")
+        calls[u"da.UpdateCursor.updateRow"] += 1
+        dataset = self._dataset
+        row = dataset.rows[self._current]
+        for (j, _), value in zip(self._readers, values):
+            if j == 0:
+                continue
+            # ジオメトリは SHAPE@、SHAPE@XY、SHAPE@JSON などの値から変換
+            if j == dataset.shape_index:
+                value = geometries.to_geometry(value, dataset.shapeType, dataset.spatialReference)
+            row[j] = value
+        dataset.version += 1
+
+    def deleteRow(self):
+        if self._current is None:
+            raise RuntimeError(u"deleteRow の前に行を取得していません")
+        calls[u"da.UpdateCursor.deleteRow"] += 1
+        self._deleted.add(self._current)
+
+    def _compact(self):
+        if self._deleted:
+            dataset = self._dataset
+            dataset.rows = [row for k, row in enumerate(dataset.rows) if k not in self._deleted]
+            dataset.version += 1
+            self._deleted = set()
+
+    def _close(self):
+        self._compact()
+        _Cursor._close(self)
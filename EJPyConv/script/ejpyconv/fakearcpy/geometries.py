@@ -0,0 +1,1314 @@
+﻿# coding:utf-8
+"""
+Tool name : arcpy 代替モジュール（ジオメトリ）
+Source    : ejpyconv/fakearcpy/geometries.py
+Author    : Esri Japan Corporation
+Created   : 2026/10/19
+Updated   : 2026/10/19
+
+Point、Array、PointGeometry、Multipoint、Polyline、Polygon と、ツールが使用する空間演算
+頂点は ejpyconv.geometry の配列で保持し、判定・計測は NumPy で計算
+ポリゴンの切断・差分・バッファーなどのオーバーレイは shapely がある場合のみ使用可能
+"""
+
+import json
+import math
+
+import numpy as np
+
+from ejpyconv import geometry as kernel
+from ejpyconv.featureio import json_to_wkb, point_wkb
+from ejpyconv.fakearcpy.workspace import counted
+
+
+# XY 許容値（ポイントがライン上にあるかの判定などに使用）
+XY_TOLERANCE = 0.001
+
+
+class Point(object):
+    """
+    arcpy.Point（X、Y、Z、M、ID）
+    """
+    __slots__ = ("X", "Y", "Z", "M", "ID")
+
+    def __init__(self, X=None, Y=None, Z=None, M=None, ID=0):
+        self.X = X
+        self.Y = Y
+        self.Z = Z
+        self.M = M
+        self.ID = ID
+
+    def __repr__(self):
+        return u"{0} {1} {2} {3}".format(self.X, self.Y, u"NaN" if self.Z is None else self.Z,
+                                         u"NaN" if self.M is None else self.M)
+
+    def equals(self, other):
+        return other is not None and self.X == other.X and self.Y == other.Y
+
+    def clone(self, point):
+        self.X, self.Y, self.Z, self.M, self.ID = point.X, point.Y, point.Z, point.M, point.ID
+
+
+class Array(object):
+    """
+    arcpy.Array（Point、Array、None の並び）
+    """
+
+    def __init__(self, items=None):
+        if items is None:
+            self._items = []
+        elif isinstance(items, (Point, Array)):
+            self._items = [items]
+        else:
+            self._items = list(items)
+
+    @property
+    def count(self):
+        return len(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __getitem__(self, index):
+        return self._items[index]
+
+    def __repr__(self):
+        return u"<Array {0}>".format(self._items)
+
+    def add(self, value):
+        self._items.append(value)
+
+    append = add
+
+    def extend(self, items):
+        self._items.extend(items)
+
+    def insert(self, index, value):
+        self._items.insert(index, value)
+
+    def getObject(self, index):
+        return self._items[index]
+
+    def replace(self, index, value):
+        self._items[index] = value
+
+    def remove(self, index):
+        del self._items[index]
+
+    def removeAll(self):
+        self._items = []
+
+    def clone(self, array):
+        self._items = list(array)
+
+
+class Extent(object):
+    """
+    arcpy.Extent
+    """
+
+    def __init__(self, XMin=None, YMin=None, XMax=None, YMax=None):
+        self.XMin = XMin
+        self.YMin = YMin
+        self.XMax = XMax
+        self.YMax = YMax
+
+    @property
+    def width(self):
+        return 0.0 if self.XMin is None else self.XMax - self.XMin
+
+    @property
+    def height(self):
+        return 0.0 if self.YMin is None else self.YMax - self.YMin
+
+    @property
+    def lowerLeft(self):
+        return Point(self.XMin, self.YMin)
+
+    @property
+    def upperRight(self):
+        return Point(self.XMax, self.YMax)
+
+    @property
+    def polygon(self):
+        return Polygon(Array([Point(self.XMin, self.YMin), Point(self.XMin, self.YMax),
+                              Point(self.XMax, self.YMax), Point(self.XMax, self.YMin)]))
+
+    def disjoint(self, other):
+        return (self.XMin is None or other.XMin is None or self.XMax < other.XMin or other.XMax < self.XMin
+                or self.YMax < other.YMin or other.YMax < self.YMin)
+
+    def __repr__(self):
+        return u"{0} {1} {2} {3} NaN NaN NaN NaN".format(self.XMin, self.YMin, self.XMax, self.YMax)
+
+
+class SpatialReference(object):
+    """
+    arcpy.SpatialReference（factoryCode と文字列表現のみ保持）
+    """
+
+    def __init__(self, item=None):
+        self.factoryCode = 0
+        self.name = u"Unknown"
+        if isinstance(item, SpatialReference):
+            self.factoryCode, self.name = item.factoryCode, item.name
+        elif item not in (None, u""):
+            try:
+                self.factoryCode = int(item)
+                self.name = u"EPSG:{0}".format(self.factoryCode)
+            except (TypeError, ValueError):
+                self.name = u"{0}".format(item)
+
+    @property
+    def type(self):
+        if self.factoryCode == 0:
+            return u"Unknown"
+        return u"Geographic" if self.factoryCode in (4326, 4612, 6668) else u"Projected"
+
+    @property
+    def linearUnitName(self):
+        return u"Meter" if self.type == u"Projected" else u""
+
+    def exportToString(self):
+        return json.dumps({u"wkid": self.factoryCode, u"name": self.name})
+
+    def loadFromString(self, string):
+        values = json.loads(string)
+        self.factoryCode = values.get(u"wkid", 0)
+        self.name = values.get(u"name", u"Unknown")
+
+    def __eq__(self, other):
+        return isinstance(other, SpatialReference) and self.factoryCode == other.factoryCode
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash(self.factoryCode)
+
+    def __repr__(self):
+        return u"<SpatialReference {0}>".format(self.name)
+
+
+def as_spatial_reference(value):
+    """
+    メソッド名 : as_spatial_reference メソッド
+    引数 1     : 空間参照のオブジェクト、コード、または None
+    概要       : SpatialReference のオブジェクトに変換
+    """
+    if isinstance(value, SpatialReference):
+        return value
+    return SpatialReference(getattr(value, u"factoryCode", value))
+
+
+# ---------------------------------------------------------------------------
+# 配列による計算の補助関数
+# ---------------------------------------------------------------------------
+
+def _cross(ax, ay, bx, by):
+    return ax * by - ay * bx
+
+
+def point_segment_distances(points, segments):
+    """
+    メソッド名 : point_segment_distances メソッド
+    引数 1     : ポイントの XY 座標の配列（k × 2）
+    引数 2     : セグメントの始終点の XY 座標の配列（m × 4）
+    概要       : ポイントとセグメントの距離の配列（k × m）と、セグメント上の最近傍の位置（0 ～ 1）を返す
+    """
+    a = segments[np.newaxis, :, 0:2]
+    d = segments[np.newaxis, :, 2:4] - a
+    length2 = (d * d).sum(axis=2)
+    p = points[:, np.newaxis, :]
+    t = ((p - a) * d).sum(axis=2) / np.where(length2 > 0.0, length2, 1.0)
+    t = np.clip(t, 0.0, 1.0)
+    nearest = a + t[:, :, np.newaxis] * d
+    return np.hypot(p[:, :, 0] - nearest[:, :, 0], p[:, :, 1] - nearest[:, :, 1]), t
+
+
+def segment_intersections(s, t, proper=False):
+    """
+    メソッド名 : segment_intersections メソッド
+    引数 1     : セグメントの始終点の XY 座標の配列（k × 4）
+    引数 2     : セグメントの始終点の XY 座標の配列（m × 4）
+    引数 3     : True の場合は両方のセグメントの内部で交差する組だけ
+                 （端点での接触、重なり、XY 許容値の範囲内で接する組を除く）
+    概要       : セグメントの組ごとに交差するかの配列（k × m）と、交差する位置（s 上の 0 ～ 1）を返す
+    """
+    px, py = s[:, np.newaxis, 0], s[:, np.newaxis, 1]
+    rx, ry = s[:, np.newaxis, 2] - px, s[:, np.newaxis, 3] - py
+    qx, qy = t[np.newaxis, :, 0], t[np.newaxis, :, 1]
+    ux, uy = t[np.newaxis, :, 2] - qx, t[np.newaxis, :, 3] - qy
+    denom = _cross(rx, ry, ux, uy)
+    nonparallel = denom != 0.0
+    safe = np.where(nonparallel, denom, 1.0)
+    a = _cross(qx - px, qy - py, ux, uy) / safe
+    b = _cross(qx - px, qy - py, rx, ry) / safe
+    if proper:
+        # 一方のセグメントの両端が、もう一方のセグメントを通る直線から XY 許容値より離れて反対側にある組
+        tol = XY_TOLERANCE
+        length_s = np.hypot(rx, ry)
+        length_t = np.hypot(ux, uy)
+        length_s = np.where(length_s > 0.0, length_s, np.inf)
+        length_t = np.where(length_t > 0.0, length_t, np.inf)
+        d1 = _cross(rx, ry, qx - px, qy - py) / length_s
+        d2 = _cross(rx, ry, qx + ux - px, qy + uy - py) / length_s
+        e1 = _cross(ux, uy, px - qx, py - qy) / length_t
+        e2 = _cross(ux, uy, px + rx - qx, py + ry - qy) / length_t
+        hit = (nonparallel & (d1 * d2 < 0.0) & (np.abs(d1) > tol) & (np.abs(d2) > tol) &
+               (e1 * e2 < 0.0) & (np.abs(e1) > tol) & (np.abs(e2) > tol))
+    else:
+        hit = nonparallel & (a >= 0.0) & (a <= 1.0) & (b >= 0.0) & (b <= 1.0)
+    return hit, a
+
+
+def points_in_rings(points, segments):
+    """
+    メソッド名 : points_in_rings メソッド
+    引数 1     : ポイントの XY 座標の配列（k × 2）
+    引数 2     : ポリゴンのすべてのリングのセグメントの配列（m × 4）
+    概要       : 偶奇規則でポイントがポリゴンの内側にあるかの配列を返す（境界上の判定は不定）
+    """
+    if len(segments) == 0:
+        return np.zeros(len(points), dtype=bool)
+    x1, y1, x2, y2 = (segments[np.newaxis, :, j] for j in range(4))
+    px, py = points[:, 0:1], points[:, 1:2]
+    straddle = (y1 > py) != (y2 > py)
+    dy = np.where(y2 != y1, y2 - y1, 1.0)
+    xint = x1 + (py - y1) * (x2 - x1) / dy
+    return ((straddle & (px < xint)).sum(axis=1) % 2) == 1
+
+
+def _bbox_filter(segments, extent):
+    # 範囲と外接矩形が重なるセグメントだけを抽出
+    if extent is None or len(segments) == 0:
+        return segments
+    xmin = np.minimum(segments[:, 0], segments[:, 2])
+    xmax = np.maximum(segments[:, 0], segments[:, 2])
+    ymin = np.minimum(segments[:, 1], segments[:, 3])
+    ymax = np.maximum(segments[:, 1], segments[:, 3])
+    tol = XY_TOLERANCE
+    keep = ((xmax >= extent.XMin - tol) & (xmin <= extent.XMax + tol) &
+            (ymax >= extent.YMin - tol) & (ymin <= extent.YMax + tol))
+    return segments[keep]
+
+
+def _shapely():
+    try:
+        import shapely.wkb
+        import shapely.ops
+    except ImportError:
+        return None
+    return shapely
+
+
+def _require_shapely(operation):
+    shapely = _shapely()
+    if shapely is None:
+        raise ImportError(u"arcpy 代替モジュールの {0} には shapely が必要です（pip install shapely）".format(operation))
+    return shapely
+
+
+# ---------------------------------------------------------------------------
+# ジオメトリ
+# ---------------------------------------------------------------------------
+
+class Geometry(object):
+    """
+    arcpy の Geometry に相当する基底クラス（頂点は ejpyconv.geometry.Geometry で保持）
+    """
+    type = u""
+
+    def __init__(self, kernel_geometry, spref=None):
+        self._kernel = kernel_geometry
+        self.spatialReference = as_spatial_reference(spref)
+
+    # --- 作成 ---------------------------------------------------------------
+
+    @classmethod
+    def _from_parts(cls, parts, spref=None):
+        # パートごとのリング（パス）の座標のリストから作成
+        raise NotImplementedError
+
+    def _empty(self):
+        return type(self)._from_parts([], self.spatialReference)
+
+    # --- 属性 ---------------------------------------------------------------
+
+    @property
+    def _xy(self):
+        return self._kernel.xy
+
+    @property
+    def isEmpty(self):
+        return len(self._xy) == 0
+
+    @property
+    def pointCount(self):
+        return len(self._xy)
+
+    @property
+    def partCount(self):
+        return len(self._kernel.part_offsets) - 1
+
+    @property
+    def isMultipart(self):
+        return self.partCount > 1
+
+    @property
+    def area(self):
+        return 0.0
+
+    @property
+    def length(self):
+        return 0.0
+
+    @property
+    def extent(self):
+        if self.isEmpty:
+            return Extent()
+        xmin, ymin = self._xy.min(axis=0).tolist()
+        xmax, ymax = self._xy.max(axis=0).tolist()
+        return Extent(xmin, ymin, xmax, ymax)
+
+    @property
+    def trueCentroid(self):
+        xy = self._kernel.centroid()
+        return None if xy is None else Point(xy[0], xy[1])
+
+    @property
+    def centroid(self):
+        return self.trueCentroid
+
+    @property
+    def labelPoint(self):
+        return self.centroid
+
+    @property
+    def firstPoint(self):
+        return None if self.isEmpty else Point(*self._xy[0].tolist())
+
+    @property
+    def lastPoint(self):
+        return None if self.isEmpty else Point(*self._xy[-1].tolist())
+
+    @property
+    def JSON(self):
+        return self._kernel.to_json({u"wkid": self.spatialReference.factoryCode}
+                                    if self.spatialReference.factoryCode else None)
+
+    @property
+    def WKB(self):
+        if self.type == u"point":
+            x, y = self._xy[0].tolist() if not self.isEmpty else (float(u"nan"), float(u"nan"))
+            return bytearray(point_wkb(x, y))
+        return bytearray(json_to_wkb(self.JSON))
+
+    @property
+    def WKT(self):
+        def coords(xy):
+            return u", ".join(u"{0} {1}".format(x, y) for x, y in xy.tolist())
+        if self.isEmpty:
+            return u"{0} EMPTY".format(self._wkt_name)
+        if self.type == u"point":
+            return u"POINT ({0})".format(coords(self._xy))
+        if self.type == u"multipoint":
+            return u"MULTIPOINT ({0})".format(u", ".join(u"({0})".format(coords(xy[np.newaxis]))
+                                                         for xy in self._xy))
+        rings = self._kernel.rings()
+        offsets = self._kernel.part_offsets.tolist()
+        parts = [u", ".join(u"({0})".format(coords(rings[k])) for k in range(start, end))
+                 for start, end in zip(offsets[:-1], offsets[1:])]
+        return u"{0} ({1})".format(self._wkt_name, u", ".join(u"({0})".format(part) for part in parts))
+
+    _wkt_name = u"GEOMETRY"
+
+    def __repr__(self):
+        return u"<{0} object>".format(type(self).__name__)
+
+    # --- 頂点へのアクセス ---------------------------------------------------
+
+    def getPart(self, index=None):
+        """
+        メソッド名 : getPart メソッド
+        引数 1     : パートのインデックス番号（省略時はすべてのパートの Array の Array）
+        概要       : パートの頂点の Array を返す（ポリゴンの interior ring は None で区切る）
+        """
+        if index is None:
+            return Array([self.getPart(i) for i in range(self.partCount)])
+        rings = self._kernel.rings()
+        offsets = self._kernel.part_offsets
+        points = []
+        for k in range(int(offsets[index]), int(offsets[index + 1])):
+            if k > offsets[index]:
+                points.append(None)
+            points.extend(Point(x, y) for x, y in rings[k].tolist())
+        return Array(points)
+
+    def __iter__(self):
+        for i in range(self.partCount):
+            yield self.getPart(i)
+
+    # --- 内部の計算 ---------------------------------------------------------
+
+    def _segments(self):
+        # パス（リング）の中の隣り合う頂点の組（m × 4）
+        xy = self._xy
+        if len(xy) < 2 or self.type in (u"point", u"multipoint"):
+            return np.zeros((0, 4), dtype=np.float64)
+        mask = self._kernel._segment_mask()
+        return np.hstack((xy[:-1], xy[1:]))[mask]
+
+    def _dimension(self):
+        return {u"point": 0, u"multipoint": 0, u"polyline": 1, u"polygon": 2}[self.type]
+
+    def _test_points(self):
+        # 内外判定に使用する代表点（ポイントは頂点、ライン・ポリゴンはセグメントの中点と頂点）
+        segments = self._segments()
+        if len(segments) == 0:
+            return self._xy
+        return np.vstack(((segments[:, 0:2] + segments[:, 2:4]) * 0.5, self._xy))
+
+    def _classify(self, points):
+        """
+        ポイントごとに、このジオメトリの内部（1）、境界（0）、外部（-1）のいずれかを返す
+        """
+        result = np.full(len(points), -1, dtype=np.int8)
+        if len(points) == 0 or self.isEmpty:
+            return result
+        dim = self._dimension()
+        if dim == 0:
+            d = np.hypot(points[:, np.newaxis, 0] - self._xy[np.newaxis, :, 0],
+                         points[:, np.newaxis, 1] - self._xy[np.newaxis, :, 1])
+            result[(d <= XY_TOLERANCE).any(axis=1)] = 1
+            return result
+        segments = self._segments()
+        distances, _ = point_segment_distances(points, segments)
+        on = (distances <= XY_TOLERANCE).any(axis=1)
+        if dim == 1:
+            # ラインの境界は閉じていないパスの端点
+            result[on] = 1
+            ends = self._line_ends()
+            if len(ends):
+                d = np.hypot(points[:, np.newaxis, 0] - ends[np.newaxis, :, 0],
+                             points[:, np.newaxis, 1] - ends[np.newaxis, :, 1])
+                result[on & (d <= XY_TOLERANCE).any(axis=1)] = 0
+            return result
+        inside = points_in_rings(points, segments)
+        result[inside] = 1
+        result[on] = 0
+        return result
+
+    def _line_ends(self):
+        ends = []
+        for ring in self._kernel.rings():
+            if len(ring) and not np.array_equal(ring[0], ring[-1]):
+                ends.append(ring[0])
+                ends.append(ring[-1])
+        return np.array(ends, dtype=np.float64).reshape(-1, 2)
+
+    def _proper_crossing(self, other):
+        extent = self.extent
+        other_extent = other.extent
+        if extent.disjoint(other_extent):
+            return False
+        s = _bbox_filter(self._segments(), other_extent)
+        t = _bbox_filter(other._segments(), extent)
+        if len(s) == 0 or len(t) == 0:
+            return False
+        hit, _ = segment_intersections(s, t, proper=True)
+        return bool(hit.any())
+
+    def _intersects(self, other):
+        if self.isEmpty or other.isEmpty or self.extent.disjoint(other.extent):
+            return False
+        if (self._classify(other._test_points()) >= 0).any():
+            return True
+        if (other._classify(self._test_points()) >= 0).any():
+            return True
+        s = _bbox_filter(self._segments(), other.extent)
+        t = _bbox_filter(other._segments(), self.extent)
+        if len(s) and len(t):
+            hit, _ = segment_intersections(s, t)
+            return bool(hit.any())
+        return False
+
+    # --- 判定 ---------------------------------------------------------------
+
+    @counted(u"Geometry.disjoint")
+    def disjoint(self, other):
+        return not self._intersects(other)
+
+    @counted(u"Geometry.contains")
+    def contains(self, other, relation=None):
+        """
+        メソッド名 : contains メソッド
+        引数 1     : 判定するジオメトリ
+        概要       : other のすべての代表点が内部か境界にあり、少なくとも 1 つが内部にあれば True
+        """
+        if other is None or self.isEmpty or other.isEmpty:
+            return False
+        if self._dimension() < other._dimension() or self.extent.disjoint(other.extent):
+            return False
+        if self._dimension() == 2 and other._dimension() > 0 and self._proper_crossing(other):
+            return False
+        states = self._classify(other._test_points())
+        return bool((states >= 0).all() and (states == 1).any())
+
+    @counted(u"Geometry.within")
+    def within(self, other, relation=None):
+        return other.contains(self)
+
+    @counted(u"Geometry.crosses")
+    def crosses(self, other):
+        """
+        メソッド名 : crosses メソッド
+        引数 1     : 判定するジオメトリ
+        概要       : ライン同士は内部で交差する場合、ラインとポリゴンはラインがポリゴンの内部と外部の両方を通る場合に True
+        """
+        if other is None or self.isEmpty or other.isEmpty:
+            return False
+        dims = sorted((self._dimension(), other._dimension()))
+        if dims == [1, 1]:
+            return self._proper_crossing(other)
+        if dims == [1, 2]:
+            line, polygon = (self, other) if self._dimension() == 1 else (other, self)
+            if line.extent.disjoint(polygon.extent):
+                return False
+            if line._proper_crossing(polygon):
+                return True
+            states = polygon._classify(line._test_points())
+            return bool((states == 1).any() and (states == -1).any())
+        return False
+
+    @counted(u"Geometry.overlaps")
+    def overlaps(self, other):
+        """
+        メソッド名 : overlaps メソッド
+        引数 1     : 判定するジオメトリ
+        概要       : 同じ次元のジオメトリが一部だけ重なる場合に True
+        """
+        if other is None or self._dimension() != other._dimension():
+            return False
+        if self.isEmpty or other.isEmpty or self.extent.disjoint(other.extent):
+            return False
+        if self._dimension() == 2 and self._proper_crossing(other):
+            return True
+        a = other._classify(self._test_points())
+        b = self._classify(other._test_points())
+        return bool((a == 1).any() and (a == -1).any() and (b == -1).any())
+
+    @counted(u"Geometry.touches")
+    def touches(self, other):
+        if not self._intersects(other):
+            return False
+        inner = other._classify(self._test_points()) == 1
+        return not inner.any() and not (self._classify(other._test_points()) == 1).any()
+
+    @counted(u"Geometry.equals")
+    def equals(self, other):
+        if other is None or self.type != other.type or self.pointCount == 0 or other.pointCount == 0:
+            return False
+        a = set(map(tuple, np.round(self._xy / XY_TOLERANCE).astype(np.int64).tolist()))
+        b = set(map(tuple, np.round(other._xy / XY_TOLERANCE).astype(np.int64).tolist()))
+        return a == b and abs(self.area - other.area) <= XY_TOLERANCE and abs(self.length - other.length) <= XY_TOLERANCE
+
+    # --- 計測 ---------------------------------------------------------------
+
+    @counted(u"Geometry.distanceTo")
+    def distanceTo(self, other):
+        """
+        メソッド名 : distanceTo メソッド
+        引数 1     : ジオメトリ
+        概要       : 2 つのジオメトリの最短距離（交差する場合は 0）
+        """
+        if isinstance(other, Point):
+            other = PointGeometry(other)
+        if self.type == u"point" and other.type == u"point" and not (self.isEmpty or other.isEmpty):
+            a, b = self._point, other._point
+            return math.hypot(a.X - b.X, a.Y - b.Y)
+        if self._intersects(other):
+            return 0.0
+        best = float(u"inf")
+        for a, b in ((self, other), (other, self)):
+            segments = b._segments()
+            if len(segments):
+                distances, _ = point_segment_distances(a._xy, segments)
+            else:
+                distances = np.hypot(a._xy[:, np.newaxis, 0] - b._xy[np.newaxis, :, 0],
+                                     a._xy[:, np.newaxis, 1] - b._xy[np.newaxis, :, 1])
+            if distances.size:
+                best = min(best, float(distances.min()))
+        return best
+
+    @counted(u"Geometry.convexHull")
+    def convexHull(self):
+        """
+        メソッド名 : convexHull メソッド
+        概要       : 頂点の凸包（Andrew の単調連鎖法）
+                     3 点以上で面積を持つ場合はポリゴン、2 点の場合はライン、1 点の場合はポイント
+        """
+        xy = np.unique(self._xy, axis=0)
+        if len(xy) == 0:
+            return Polygon(None, self.spatialReference)
+        if len(xy) == 1:
+            return PointGeometry(Point(*xy[0].tolist()), self.spatialReference)
+
+        def half(points):
+            chain = []
+            for p in points:
+                while len(chain) >= 2 and _cross(chain[-1][0] - chain[-2][0], chain[-1][1] - chain[-2][1],
+                                                 p[0] - chain[-2][0], p[1] - chain[-2][1]) <= 0:
+                    chain.pop()
+                chain.append(p)
+            return chain
+
+        points = xy.tolist()
+        lower = half(points)
+        upper = half(points[::-1])
+        hull = lower[:-1] + upper[:-1]
+        if len(hull) < 3:
+            return Polyline._from_parts([[hull]], self.spatialReference)
+        # 反時計回りの凸包を時計回りのリングにする
+        ring = hull[::-1] + [hull[-1]]
+        return Polygon._from_parts([[ring]], self.spatialReference)
+
+    @counted(u"Geometry.boundary")
+    def boundary(self):
+        """
+        メソッド名 : boundary メソッド
+        概要       : ポリゴンはリングのライン、ラインは閉じていないパスの端点のマルチポイント
+        """
+        if self.type == u"polygon":
+            return Polyline._from_parts([[ring.tolist()] for ring in self._kernel.rings()], self.spatialReference)
+        if self.type == u"polyline":
+            return Multipoint._from_parts([[self._line_ends().tolist()]], self.spatialReference)
+        return Multipoint(None, self.spatialReference)
+
+    @counted(u"Geometry.queryPointAndDistance")
+    def queryPointAndDistance(self, in_point, as_percentage=False):
+        """
+        メソッド名 : queryPointAndDistance メソッド
+        引数 1     : ポイント
+        引数 2     : True の場合は始点からの距離を長さに対する割合で返す
+        概要       : ライン上の最近傍のポイント、始点からの距離、ラインからの距離、右側にあるかを返す
+        """
+        if isinstance(in_point, Point):
+            in_point = PointGeometry(in_point)
+        segments = self._segments()
+        xy = in_point._xy[:1]
+        distances, t = point_segment_distances(xy, segments)
+        k = int(distances[0].argmin())
+        a, b = segments[k, 0:2], segments[k, 2:4]
+        nearest = a + t[0, k] * (b - a)
+
+        # 頂点ごとの累積距離（パスをまたいで累積）からセグメントの始点までの距離を取得
+        lengths = np.hypot(segments[:, 2] - segments[:, 0], segments[:, 3] - segments[:, 1])
+        along = float(lengths[:k].sum() + t[0, k] * lengths[k])
+        if as_percentage:
+            total = float(lengths.sum())
+            along = along / total if total > 0.0 else 0.0
+        right = _cross(b[0] - a[0], b[1] - a[1], xy[0, 0] - a[0], xy[0, 1] - a[1]) < 0.0
+        return (PointGeometry(Point(float(nearest[0]), float(nearest[1])), self.spatialReference),
+                along, float(distances[0, k]), bool(right))
+
+    # --- オーバーレイ -------------------------------------------------------
+
+    # shapely に変換したジオメトリ（頂点は変更されないため、変換は 1 回だけ）
+    _shapely_geometry = None
+
+    def _to_shapely(self):
+        if self._shapely_geometry is None:
+            shapely = _require_shapely(u"オーバーレイ")
+            self._shapely_geometry = shapely.wkb.loads(bytes(self.WKB))
+        return self._shapely_geometry
+
+    def _from_shapely(self, value, dimension=None):
+        # shapely のジオメトリを変換（GeometryCollection は指定の次元の要素だけを結合）
+        if value is None or value.is_empty:
+            return _class_for_dimension(dimension if dimension is not None else self._dimension())(
+                None, self.spatialReference)
+        if value.geom_type == u"GeometryCollection":
+            members = [m for m in value.geoms if dimension is None or _shapely_dimension(m) == dimension]
+            if not members:
+                return _class_for_dimension(dimension)(None, self.spatialReference)
+            return merge_parts([self._from_shapely(m) for m in members])
+        return FromWKB(bytearray(value.wkb), self.spatialReference)
+
+    @counted(u"Geometry.buffer")
+    def buffer(self, distance):
+        return self._from_shapely(self._to_shapely().buffer(distance), 2)
+
+    @counted(u"Geometry.difference")
+    def difference(self, other):
+        return self._from_shapely(self._to_shapely().difference(other._to_shapely()), self._dimension())
+
+    @counted(u"Geometry.intersect")
+    def intersect(self, other, dimension):
+        dimension = {1: 0, 2: 1, 4: 2}.get(int(dimension), int(dimension))
+        return self._from_shapely(self._to_shapely().intersection(other._to_shapely()), dimension)
+
+    @counted(u"Geometry.union")
+    def union(self, other):
+        return self._from_shapely(self._to_shapely().union(other._to_shapely()), self._dimension())
+
+    @counted(u"Geometry.symmetricDifference")
+    def symmetricDifference(self, other):
+        return self._from_shapely(self._to_shapely().symmetric_difference(other._to_shapely()),
+                                  self._dimension())
+
+    @counted(u"Geometry.clip")
+    def clip(self, envelope):
+        """
+        メソッド名 : clip メソッド
+        引数 1     : Extent
+        概要       : 範囲でクリップ（ポリゴンは Sutherland-Hodgman 法で計算）
+        """
+        return clip_geometry(self, envelope.polygon)
+
+    @counted(u"Geometry.cut")
+    def cut(self, cutter):
+        """
+        メソッド名 : cut メソッド
+        引数 1     : 切断するライン
+        概要       : ラインの左側と右側のジオメトリのリストを返す（切断されない場合は arcpy と同じく両方とも空）
+        """
+        if self.type == u"polyline":
+            return _cut_polyline(self, cutter)
+        if self.type == u"polygon":
+            return _cut_polygon(self, cutter)
+        raise ValueError(u"切断できないジオメトリです：{0}".format(self.type))
+
+
+class PointGeometry(Geometry):
+    """
+    arcpy.PointGeometry
+    """
+    type = u"point"
+    _wkt_name = u"POINT"
+
+    def __init__(self, inputs=None, spatial_reference=None, has_z=False, has_m=False):
+        if isinstance(inputs, Array):
+            inputs = inputs[0] if len(inputs) else None
+        if isinstance(inputs, (tuple, list)):
+            inputs = Point(inputs[0], inputs[1])
+        self._point = inputs if inputs is not None and inputs.X is not None else None
+        self._kernel_cache = None
+        self.spatialReference = as_spatial_reference(spatial_reference)
+
+    @property
+    def _kernel(self):
+        if self._kernel_cache is None:
+            rings = [] if self._point is None else [[(self._point.X, self._point.Y)]]
+            self._kernel_cache = kernel.from_rings(rings, kernel.POINT)
+        return self._kernel_cache
+
+    @classmethod
+    def _from_parts(cls, parts, spref=None):
+        points = [point for part in parts for ring in part for point in ring]
+        return cls(Point(*points[0][:2]) if points else None, spref)
+
+    @property
+    def isEmpty(self):
+        return self._point is None
+
+    @property
+    def pointCount(self):
+        return 0 if self._point is None else 1
+
+    @property
+    def partCount(self):
+        return self.pointCount
+
+    @property
+    def extent(self):
+        if self._point is None:
+            return Extent()
+        return Extent(self._point.X, self._point.Y, self._point.X, self._point.Y)
+
+    @property
+    def trueCentroid(self):
+        return None if self._point is None else Point(self._point.X, self._point.Y)
+
+    @property
+    def firstPoint(self):
+        return self.trueCentroid
+
+    @property
+    def lastPoint(self):
+        return self.trueCentroid
+
+    def getPart(self, index=None):
+        return self.trueCentroid
+
+    def __iter__(self):
+        if self._point is not None:
+            yield self.trueCentroid
+
+
+class Multipoint(Geometry):
+    """
+    arcpy.Multipoint
+    """
+    type = u"multipoint"
+    _wkt_name = u"MULTIPOINT"
+
+    def __init__(self, inputs=None, spatial_reference=None, has_z=False, has_m=False):
+        points = [(p.X, p.Y) for p in _flatten_points(inputs)]
+        Geometry.__init__(self, kernel.from_rings([[p] for p in points], kernel.MULTIPOINT), spatial_reference)
+
+    @classmethod
+    def _from_parts(cls, parts, spref=None):
+        points = [point[:2] for part in parts for ring in part for point in ring]
+        geometry = cls(None, spref)
+        geometry._kernel = kernel.from_rings([[p] for p in points], kernel.MULTIPOINT)
+        return geometry
+
+    @property
+    def partCount(self):
+        return self.pointCount
+
+    def getPart(self, index=None):
+        if index is None:
+            return Array([Point(x, y) for x, y in self._xy.tolist()])
+        return Point(*self._xy[index].tolist())
+
+    def __iter__(self):
+        for x, y in self._xy.tolist():
+            yield Point(x, y)
+
+
+class Polyline(Geometry):
+    """
+    arcpy.Polyline（パートごとに 1 つのパス）
+    """
+    type = u"polyline"
+    _wkt_name = u"MULTILINESTRING"
+
+    def __init__(self, inputs=None, spatial_reference=None, has_z=False, has_m=False):
+        paths = [ring for part in _array_parts(inputs) for ring in part]
+        geometry = Polyline._from_parts([[path] for path in paths], spatial_reference)
+        Geometry.__init__(self, geometry._kernel, spatial_reference)
+
+    @classmethod
+    def _from_parts(cls, parts, spref=None):
+        paths = [list(path) for part in parts for path in part if len(path) >= 2]
+        geometry = cls.__new__(cls)
+        Geometry.__init__(geometry, kernel.from_rings(paths, kernel.POLYLINE), spref)
+        return geometry
+
+    @property
+    def length(self):
+        return self._kernel.length
+
+    @counted(u"Polyline.positionAlongLine")
+    def positionAlongLine(self, value, use_percentage=False):
+        total = self.length
+        distance = value * total if use_percentage else value
+        xy = self._kernel.interpolate([0], [distance]) if self.partCount == 1 else None
+        if xy is None:
+            # マルチパートはパスをまたいで累積した距離で検索
+            measures = self._kernel.vertex_measures()
+            k = int(np.clip(np.searchsorted(measures, distance, side=u"right") - 1, 0, len(measures) - 2))
+            seg = measures[k + 1] - measures[k]
+            t = (distance - measures[k]) / seg if seg > 0 else 0.0
+            xy = (self._xy[k] + t * (self._xy[k + 1] - self._xy[k]))[np.newaxis]
+        return PointGeometry(Point(float(xy[0, 0]), float(xy[0, 1])), self.spatialReference)
+
+
+class Polygon(Geometry):
+    """
+    arcpy.Polygon（exterior ring は時計回り、interior ring は反時計回りに揃える）
+    """
+    type = u"polygon"
+    _wkt_name = u"MULTIPOLYGON"
+
+    def __init__(self, inputs=None, spatial_reference=None, has_z=False, has_m=False):
+        geometry = Polygon._from_parts(_array_parts(inputs), spatial_reference)
+        Geometry.__init__(self, geometry._kernel, spatial_reference)
+
+    @classmethod
+    def _from_parts(cls, parts, spref=None):
+        rings = []
+        part_offsets = [0]
+        for part in parts:
+            for k, ring in enumerate(part):
+                ring = [tuple(vertex[:2]) for vertex in ring]
+                if len(ring) and ring[0] != ring[-1]:
+                    ring.append(ring[0])
+                if len(ring) < 4:
+                    continue
+                # パートの先頭のリングは exterior ring（時計回り）、以降は interior ring（反時計回り）
+                if (kernel.ring_area(ring) < 0.0) != (len(rings) == part_offsets[-1]):
+                    ring = ring[::-1]
+                rings.append(ring)
+            if len(rings) > part_offsets[-1]:
+                part_offsets.append(len(rings))
+        geometry = cls.__new__(cls)
+        Geometry.__init__(geometry, kernel.from_rings(rings, kernel.POLYGON), spref)
+        geometry._kernel._part_offsets = np.asarray(part_offsets, dtype=np.int64)
+        return geometry
+
+    @property
+    def area(self):
+        return self._kernel.area
+
+    @property
+    def length(self):
+        return self._kernel.length
+
+    @property
+    def centroid(self):
+        # 重心がポリゴンの外にある場合はラベル ポイント
+        point = self.trueCentroid
+        if point is None:
+            return None
+        if self._classify(np.array([[point.X, point.Y]]))[0] >= 0:
+            return point
+        return self.labelPoint
+
+    @property
+    def labelPoint(self):
+        """
+        重心を通る水平線とリングの交点で区切られた内部の区間のうち、最も長い区間の中点
+        """
+        point = self.trueCentroid
+        if point is None:
+            return None
+        segments = self._segments()
+        y = point.Y
+        y1, y2 = segments[:, 1], segments[:, 3]
+        straddle = (y1 > y) != (y2 > y)
+        if not straddle.any():
+            return point
+        s = segments[straddle]
+        xs = np.sort(s[:, 0] + (y - s[:, 1]) * (s[:, 2] - s[:, 0]) / (s[:, 3] - s[:, 1]))
+        xs = xs[:len(xs) // 2 * 2]
+        widths = xs[1::2] - xs[0::2]
+        k = int(widths.argmax())
+        return Point(float((xs[2 * k] + xs[2 * k + 1]) * 0.5), y)
+
+
+def _class_for_dimension(dimension):
+    return {0: Multipoint, 1: Polyline, 2: Polygon}[dimension]
+
+
+def _shapely_dimension(value):
+    return {u"Point": 0, u"MultiPoint": 0, u"LineString": 1, u"MultiLineString": 1, u"LinearRing": 1,
+            u"Polygon": 2, u"MultiPolygon": 2}.get(value.geom_type, -1)
+
+
+def _flatten_points(inputs):
+    if inputs is None:
+        return []
+    if isinstance(inputs, Point):
+        return [inputs]
+    points = []
+    for item in inputs:
+        if isinstance(item, Point):
+            points.append(item)
+        elif isinstance(item, Array):
+            points.extend(_flatten_points(item))
+    return points
+
+
+def _array_parts(inputs):
+    """
+    Array（Point の Array、または Array の Array）からパートごとのリング（パス）の座標のリストを取得
+    パートの中の None は interior ring（ポリゴン）の区切り
+    """
+    if inputs is None:
+        return []
+    if isinstance(inputs, Point):
+        inputs = [inputs]
+    items = list(inputs)
+    if all(isinstance(item, Point) or item is None for item in items):
+        groups = [items]
+    else:
+        groups = [list(item) for item in items if isinstance(item, Array)]
+    parts = []
+    for group in groups:
+        rings = [[]]
+        for point in group:
+            if point is None:
+                rings.append([])
+            else:
+                rings[-1].append((point.X, point.Y))
+        rings = [ring for ring in rings if ring]
+        if rings:
+            parts.append(rings)
+    return parts
+
+
+def parts_of(geometry):
+    """
+    メソッド名 : parts_of メソッド
+    引数 1     : ジオメトリ
+    概要       : パートごとのリング（パス）の座標のリストを取得
+    """
+    rings = [ring.tolist() for ring in geometry._kernel.rings()]
+    offsets = geometry._kernel.part_offsets.tolist()
+    if geometry.type in (u"point", u"multipoint"):
+        return [[[point for ring in rings for point in ring]]]
+    return [rings[start:end] for start, end in zip(offsets[:-1], offsets[1:])]
+
+
+def merge_parts(geometries):
+    """
+    メソッド名 : merge_parts メソッド
+    引数 1     : 同じタイプのジオメトリのリスト
+    概要       : ジオメトリのパートを 1 つのマルチパートのジオメトリにまとめる（重なりは結合しない）
+    """
+    geometries = [g for g in geometries if g is not None]
+    if not geometries:
+        return None
+    cls = type(geometries[0])
+    spref = geometries[0].spatialReference
+    if cls is PointGeometry:
+        return Multipoint._from_parts([[[g._xy[0].tolist() for g in geometries if not g.isEmpty]]], spref)
+    parts = [part for g in geometries for part in parts_of(g)]
+    return cls._from_parts(parts, spref)
+
+
+# ---------------------------------------------------------------------------
+# 切断・クリップ
+# ---------------------------------------------------------------------------
+
+def _side(cutter_segments, points):
+    # ポイントごとに最も近い切断ラインのセグメントの左側（正）か右側（負）か
+    distances, _ = point_segment_distances(points, cutter_segments)
+    k = distances.argmin(axis=1)
+    s = cutter_segments[k]
+    return _cross(s[:, 2] - s[:, 0], s[:, 3] - s[:, 1], points[:, 0] - s[:, 0], points[:, 1] - s[:, 1])
+
+
+def _cut_polyline(line, cutter):
+    """
+    ラインを切断ラインとの交点で分割し、切断ラインの左側・右側のパートに振り分ける
+    """
+    spref = line.spatialReference
+    cutter_segments = cutter._segments()
+    pieces = []
+    for path in line._kernel.rings():
+        if len(path) < 2:
+            continue
+        segments = np.hstack((path[:-1], path[1:]))
+        hit, position = segment_intersections(segments, _bbox_filter(cutter_segments, line.extent))
+        piece = [tuple(path[0].tolist())]
+        for k in range(len(segments)):
+            for t in np.sort(np.unique(position[k][hit[k]])):
+                if 0.0 < t < 1.0 or (t == 1.0 and k < len(segments) - 1):
+                    xy = tuple((path[k] + t * (path[k + 1] - path[k])).tolist())
+                    piece.append(xy)
+                    pieces.append(piece)
+                    piece = [xy]
+            if piece[-1] != tuple(path[k + 1].tolist()):
+                piece.append(tuple(path[k + 1].tolist()))
+        pieces.append(piece)
+
+    pieces = [piece for piece in pieces if len(piece) >= 2]
+    if len(pieces) <= len(line._kernel.rings()):
+        return [Polyline(None, spref), Polyline(None, spref)]
+
+    # パートの中間の頂点（2 点の場合は中点）で左右を判定
+    mids = np.array([piece[len(piece) // 2] if len(piece) > 2 else
+                     ((piece[0][0] + piece[1][0]) * 0.5, (piece[0][1] + piece[1][1]) * 0.5)
+                     for piece in pieces], dtype=np.float64)
+    sides = _side(cutter_segments, mids)
+    left = [[piece] for piece, side in zip(pieces, sides) if side > 0.0]
+    right = [[piece] for piece, side in zip(pieces, sides) if side <= 0.0]
+    return [Polyline._from_parts(left, spref), Polyline._from_parts(right, spref)]
+
+
+def _cut_polygon(polygon, cutter):
+    """
+    ポリゴンを切断ラインで分割し（shapely を使用）、切断ラインの左側・右側のポリゴンにまとめる
+    """
+    shapely = _require_shapely(u"ポリゴンの切断")
+    # 切断ラインが境界と重なる場合に作成される、XY 許容値より細い断片、ポリゴンの外側の断片、
+    # ほかの断片と重なる断片は除外
+    shape = polygon._to_shapely()
+    pieces = []
+    for piece in sorted(shapely.ops.split(shape, cutter._to_shapely()).geoms, key=lambda g: -g.area):
+        point = piece.representative_point()
+        if (piece.area > XY_TOLERANCE * XY_TOLERANCE and shape.contains(point) and
+                not any(other.contains(point) for other in pieces)):
+            pieces.append(piece)
+    spref = polygon.spatialReference
+    if len(pieces) <= 1:
+        return [Polygon(None, spref), Polygon(None, spref)]
+    points = np.array([piece.representative_point().coords[0] for piece in pieces], dtype=np.float64)
+    sides = _side(cutter._segments(), points)
+    left = [polygon._from_shapely(piece, 2) for piece, side in zip(pieces, sides) if side > 0.0]
+    right = [polygon._from_shapely(piece, 2) for piece, side in zip(pieces, sides) if side <= 0.0]
+    return [merge_parts(left) or Polygon(None, spref), merge_parts(right) or Polygon(None, spref)]
+
+
+def is_convex_ring(ring):
+    """
+    メソッド名 : is_convex_ring メソッド
+    引数 1     : リングの座標の配列（始終点は重複）
+    概要       : 凸多角形のリングかどうか
+    """
+    d = np.diff(ring, axis=0)
+    if len(d) < 3:
+        return False
+    cross = _cross(d[:, 0], d[:, 1], np.roll(d[:, 0], -1), np.roll(d[:, 1], -1))
+    cross = cross[np.abs(cross) > 1e-12]
+    return len(cross) > 0 and ((cross > 0).all() or (cross < 0).all())
+
+
+def _clip_ring(ring, clip_ring):
+    # Sutherland-Hodgman 法（clip_ring は時計回りの凸多角形、内側は進行方向の右側）
+    output = [tuple(p) for p in ring[:-1]]
+    for (ax, ay), (bx, by) in zip(clip_ring[:-1], clip_ring[1:]):
+        if not output:
+            break
+        points = output
+        output = []
+
+        def inside(p):
+            return _cross(bx - ax, by - ay, p[0] - ax, p[1] - ay) <= 0.0
+
+        def crossing(p, q):
+            dx, dy = q[0] - p[0], q[1] - p[1]
+            denom = _cross(bx - ax, by - ay, dx, dy)
+            t = _cross(bx - ax, by - ay, ax - p[0], ay - p[1]) / denom if denom != 0.0 else 0.0
+            return (p[0] + t * dx, p[1] + t * dy)
+
+        previous = points[-1]
+        for current in points:
+            if inside(current):
+                if not inside(previous):
+                    output.append(crossing(previous, current))
+                output.append(current)
+            elif inside(previous):
+                output.append(crossing(previous, current))
+            previous = current
+    if len(output) < 3:
+        return None
+    return output + [output[0]]
+
+
+def clip_geometry(geometry, clip_polygon):
+    """
+    メソッド名 : clip_geometry メソッド
+    引数 1     : クリップするジオメトリ
+    引数 2     : クリップに使用するポリゴン
+    概要       : ジオメトリをポリゴンでクリップ
+                 ポリゴンを凸多角形（1 リング）でクリップする場合は Sutherland-Hodgman 法、
+                 ポイントは内外判定、それ以外は shapely で計算
+    """
+    spref = geometry.spatialReference
+    if geometry.isEmpty or geometry.extent.disjoint(clip_polygon.extent):
+        return type(geometry)(None, spref)
+    if geometry.type in (u"point", u"multipoint"):
+        keep = clip_polygon._classify(geometry._xy) >= 0
+        if geometry.type == u"point":
+            return geometry if keep[0] else PointGeometry(None, spref)
+        return Multipoint._from_parts([[geometry._xy[keep].tolist()]], spref)
+
+    clip_rings = clip_polygon._kernel.rings()
+    if geometry.type == u"polygon" and len(clip_rings) == 1 and is_convex_ring(clip_rings[0]):
+        clip_ring = clip_rings[0].tolist()
+        parts = []
+        for part in parts_of(geometry):
+            rings = [_clip_ring(ring, clip_ring) for ring in part]
+            # exterior ring がなくなったパートは、残った interior ring も除外
+            if rings and rings[0] is not None:
+                parts.append([ring for ring in rings if ring is not None])
+        return Polygon._from_parts(parts, spref)
+    return geometry._from_shapely(geometry._to_shapely().intersection(clip_polygon._to_shapely()),
+                                  geometry._dimension())
+
+
+# ---------------------------------------------------------------------------
+# 変換
+# ---------------------------------------------------------------------------
+
+def from_kernel(kernel_geometry, spref=None):
+    """
+    メソッド名 : from_kernel メソッド
+    引数 1     : ejpyconv.geometry.Geometry
+    引数 2     : 空間参照
+    概要       : 配列のジオメトリから arcpy 代替モジュールのジオメトリを作成
+    """
+    if kernel_geometry is None:
+        return None
+    if kernel_geometry.geometry_type == kernel.POINT:
+        if len(kernel_geometry.xy) == 0:
+            return PointGeometry(None, spref)
+        return PointGeometry(Point(*kernel_geometry.xy[0].tolist()), spref)
+    cls = {kernel.MULTIPOINT: Multipoint, kernel.POLYLINE: Polyline, kernel.POLYGON: Polygon}[
+        kernel_geometry.geometry_type]
+    geometry = cls.__new__(cls)
+    Geometry.__init__(geometry, kernel_geometry, spref)
+    return geometry
+
+
+@counted(u"FromWKB")
+def FromWKB(wkb, spatial_reference=None):
+    return from_kernel(kernel.from_wkb(bytes(wkb)), spatial_reference)
+
+
+@counted(u"AsShape")
+def AsShape(geojson_struct, esri_json=False):
+    """
+    メソッド名 : AsShape メソッド
+    引数 1     : JSON の辞書または文字列
+    引数 2     : True の場合は Esri JSON、False の場合は GeoJSON
+    概要       : JSON からジオメトリを作成（曲線は頂点だけを使用）
+    """
+    value = json.loads(geojson_struct) if isinstance(geojson_struct, str) else geojson_struct
+    if esri_json:
+        spref = value.get(u"spatialReference", {}).get(u"wkid")
+        geometry = kernel.from_json(value)
+        if geometry.geometry_type == kernel.POLYGON:
+            # Esri JSON のリングの向きから exterior ring（時計回り）ごとにパートに分ける
+            geometry._part_offsets = None
+        return from_kernel(geometry, spref)
+
+    geometry_type = value[u"type"]
+    coordinates = value[u"coordinates"]
+    if geometry_type == u"Point":
+        return PointGeometry(Point(*coordinates[:2]))
+    if geometry_type == u"MultiPoint":
+        return Multipoint._from_parts([[coordinates]])
+    if geometry_type == u"LineString":
+        return Polyline._from_parts([[coordinates]])
+    if geometry_type == u"MultiLineString":
+        return Polyline._from_parts([[path] for path in coordinates])
+    if geometry_type == u"Polygon":
+        return Polygon._from_parts([coordinates])
+    if geometry_type == u"MultiPolygon":
+        return Polygon._from_parts(coordinates)
+    raise ValueError(u"対応していない GeoJSON のジオメトリタイプです：{0}".format(geometry_type))
+
+
+def to_geometry(value, shape_type, spref=None):
+    """
+    メソッド名 : to_geometry メソッド
+    引数 1     : ジオメトリ、Point、Array、XY 座標、座標のリスト、JSON、WKB のいずれか
+    引数 2     : フィーチャクラスのジオメトリタイプ（Point、Multipoint、Polyline、Polygon）
+    引数 3     : 空間参照
+    概要       : 挿入カーソルに渡された値をフィーチャクラスのジオメトリに変換
+    """
+    if value is None or isinstance(value, Geometry):
+        return value
+    if isinstance(value, (bytes, bytearray)):
+        return FromWKB(value, spref)
+    if isinstance(value, str):
+        return AsShape(value, True)
+    cls = {u"Point": PointGeometry, u"Multipoint": Multipoint, u"Polyline": Polyline, u"Polygon": Polygon}[shape_type]
+    if isinstance(value, (Point, Array)):
+        return cls(value, spref)
+    # XY 座標（ポイント）または座標のリスト（1 パート）、座標のリストのリスト（マルチパート）
+    value = list(value)
+    if len(value) and isinstance(value[0], (int, float)):
+        return PointGeometry(Point(value[0], value[1]), spref)
+    if len(value) and len(value[0]) and isinstance(value[0][0], (int, float)):
+        return cls._from_parts([[value]], spref)
+    return cls._from_parts([[list(ring)] for ring in value], spref)
@@ -0,0 +1,552 @@
+﻿# coding:utf-8
+"""
+Tool name : arcpy 代替モジュール（ジオプロセシング ツール）
+Source    : ejpyconv/fakearcpy/management.py
+Author    : Esri Japan Corporation
+Created   : 2026/10/19
+Updated   :
+
+ツールが呼び出すジオプロセシング ツールと Describe などの関数を、メモリ上の Dataset に対して実行
+パラメータは arcpy と同じ順序で受け取り、ツールが使用しないオプションは無視する
+"""
+
+import math
+import os
+import re
+from collections import OrderedDict
+
+import numpy as np
+
+from ejpyconv.fakearcpy import geometries, workspace
+from ejpyconv.fakearcpy.geometries import Multipoint, PointGeometry
+from ejpyconv.fakearcpy.workspace import Dataset, ExecuteError, Field, Result, counted
+
+
+class _Environment(object):
+    """
+    arcpy.env（ツールが参照する環境設定だけを保持）
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.workspace = None
+        self.scratchWorkspace = None
+        self.overwriteOutput = False
+        self.outputCoordinateSystem = None
+        self.XYTolerance = None
+        self.parallelProcessingFactor = None
+        self.addOutputsToMap = False
+        # キャンセルの要求（ベンチマークなどから True にするとキャンセルされたものとして扱う）
+        self.isCancelled = False
+
+
+env = _Environment()
+
+
+def _names(value):
+    # フィールド名などの指定（; 区切りの文字列、リスト、None）をリストに変換
+    if value is None or value == u"":
+        return []
+    if isinstance(value, str):
+        return [name.strip() for name in value.split(u";") if name.strip()]
+    return [u"{0}".format(name) for name in value]
+
+
+def _path(value):
+    # Result、レイヤーなどのパスを文字列に変換
+    return u"{0}".format(value)
+
+
+def _join(out_path, out_name):
+    # ワークスペースのパスと名前を結合（Shape ファイルは拡張子を補う）
+    out_path = _path(out_path)
+    if out_path and workspace.workspace_type(out_path) == u"FileSystem" and not os.path.splitext(out_name)[1]:
+        out_name += u".shp"
+    return u"{0}/{1}".format(out_path.replace(u"\\", u"/").rstrip(u"/"), out_name) if out_path else out_name
+
+
+def _check_output(path):
+    # 出力が存在し、上書きが許可されていない場合はエラー
+    if workspace.find(path) is not None:
+        if not env.overwriteOutput:
+            raise ExecuteError(u"ERROR 000725: Output: Dataset {0} already exists.".format(path))
+        workspace.remove(path)
+
+
+def _copy_fields(source, target, names=None):
+    # OID、ジオメトリ以外のフィールドの定義をコピー
+    for field in source.fields:
+        if field.type in (u"OID", u"Geometry"):
+            continue
+        if names is not None and field.name.lower() not in names:
+            continue
+        if target.field_index(field.name) is None:
+            target.add_field(Field(field.name, field.type, field.length, field.isNullable, field.aliasName))
+
+
+def _new_dataset(path, shape_type, spref, source=None, field_names=None):
+    # 出力の Dataset を作成して登録
+    _check_output(path)
+    dataset = Dataset(path, shape_type, spref, is_table=shape_type == u"")
+    if source is not None:
+        _copy_fields(source, dataset, field_names)
+    return workspace.add(dataset)
+
+
+# ---------------------------------------------------------------------------
+# データの確認
+# ---------------------------------------------------------------------------
+
+@counted(u"Exists")
+def Exists(dataset):
+    key = workspace.normalize(dataset)
+    if key == u"memory" or workspace.find(dataset) is not None:
+        return True
+    db_path, table = workspace.featureio.split_sqlite_path(_path(dataset))
+    if db_path is not None and table:
+        return False
+    return os.path.exists(_path(dataset))
+
+
+@counted(u"Describe")
+def Describe(value, datatype=None):
+    """
+    メソッド名 : Describe メソッド
+    引数 1     : データセットまたはワークスペースのパス
+    概要       : データセットのプロパティ（ワークスペースの場合は workspaceType など）を取得
+    """
+    if isinstance(value, geometries.Geometry):
+        return workspace.Describe(dataType=u"Geometry", shapeType=value.type.capitalize(),
+                                  spatialReference=value.spatialReference, extent=value.extent)
+    dataset = workspace.find(value)
+    if dataset is not None:
+        return dataset.describe()
+    path = _path(value)
+    if workspace.normalize(path) == u"memory" or os.path.exists(path):
+        workspace_type = workspace.workspace_type(path)
+        return workspace.Describe(
+            name=os.path.basename(path), baseName=os.path.splitext(os.path.basename(path))[0],
+            catalogPath=path, path=os.path.dirname(path),
+            dataType=u"Folder" if workspace_type == u"FileSystem" and os.path.isdir(path) else u"Workspace",
+            workspaceType=workspace_type)
+    raise IOError(u"\"{0}\" does not exist".format(path))
+
+
+@counted(u"ListFields")
+def ListFields(dataset, wild_card=None, field_type=None):
+    fields = workspace.get(dataset).fields
+    if wild_card:
+        pattern = re.compile(u"^" + re.escape(wild_card).replace(u"\\*", u".*") + u"$", re.IGNORECASE)
+        fields = [field for field in fields if pattern.match(field.name)]
+    if field_type and field_type.upper() != u"ALL":
+        fields = [field for field in fields if field.type.lower() == field_type.lower()]
+    return list(fields)
+
+
+@counted(u"GetCount_management")
+def GetCount_management(in_rows):
+    return Result(u"{0}".format(len(workspace.get(in_rows).rows)))
+
+
+@counted(u"CreateUniqueName")
+def CreateUniqueName(base_name, workspace_path=None):
+    """
+    メソッド名 : CreateUniqueName メソッド
+    引数 1     : 名前
+    引数 2     : ワークスペースのパス（省略時は env.workspace）
+    概要       : ワークスペースに存在しない名前（末尾に 0、1、…を付加）のパスを作成
+    """
+    out_path = workspace_path or env.workspace or u""
+    path = _join(out_path, base_name) if out_path else base_name
+    stem, ext = os.path.splitext(path)
+    n = 0
+    while Exists(path):
+        path = u"{0}{1}{2}".format(stem, n, ext)
+        n += 1
+    return path
+
+
+# ---------------------------------------------------------------------------
+# データの作成・削除
+# ---------------------------------------------------------------------------
+
+@counted(u"CreateFeatureclass_management")
+def CreateFeatureclass_management(out_path, out_name, geometry_type=u"POLYGON", template=None, has_m=None,
+                                  has_z=None, spatial_reference=None, *args, **kwargs):
+    """
+    メソッド名 : CreateFeatureclass_management メソッド
+    引数 1     : ワークスペースのパス
+    引数 2     : フィーチャクラス名
+    引数 3     : ジオメトリタイプ（POINT、MULTIPOINT、POLYLINE、POLYGON）
+    引数 4     : テンプレートのフィーチャクラス（フィールドをコピー）
+    引数 7     : 空間参照
+    概要       : 空のフィーチャクラスを作成
+    """
+    path = _join(out_path, out_name)
+    shape_type = workspace.SHAPE_TYPES.get((geometry_type or u"POLYGON").upper())
+    if shape_type is None:
+        raise ExecuteError(u"ERROR 000800: The value is not a member of POINT | MULTIPOINT | POLYGON | POLYLINE.")
+    templates = [workspace.get(name) for name in _names(template)]
+    if spatial_reference in (None, u"") and templates:
+        spatial_reference = templates[0].spatialReference
+    dataset = _new_dataset(path, shape_type, geometries.as_spatial_reference(spatial_reference))
+    for source in templates:
+        _copy_fields(source, dataset)
+    return Result(path)
+
+
+@counted(u"CreateTable_management")
+def CreateTable_management(out_path, out_name, template=None, *args, **kwargs):
+    path = _join(out_path, out_name)
+    dataset = _new_dataset(path, u"", None)
+    for name in _names(template):
+        _copy_fields(workspace.get(name), dataset)
+    return Result(path)
+
+
+@counted(u"AddField_management")
+def AddField_management(in_table, field_name, field_type, field_precision=None, field_scale=None,
+                        field_length=None, field_alias=None, field_is_nullable=None, *args, **kwargs):
+    """
+    メソッド名 : AddField_management メソッド
+    引数 1     : テーブルのパス
+    引数 2     : フィールド名
+    引数 3     : フィールドタイプ（TEXT、LONG、SHORT、DOUBLE、FLOAT、DATE など）
+    概要       : フィールドを追加（同じ名前のフィールドがある場合は arcpy と同じく警告のみ）
+    """
+    dataset = workspace.get(in_table)
+    if dataset.field_index(field_name) is not None:
+        workspace.add_message(1, u"WARNING 000012: {0} already exists".format(field_name))
+        return Result(_path(in_table))
+    field = Field(field_name, workspace.FIELD_TYPES.get(field_type.upper(), field_type),
+                  int(field_length) if field_length else 0, field_is_nullable != u"NON_NULLABLE",
+                  field_alias or None)
+    dataset.add_field(field)
+    return Result(_path(in_table))
+
+
+@counted(u"DeleteField_management")
+def DeleteField_management(in_table, drop_field, *args, **kwargs):
+    dataset = workspace.get(in_table)
+    for name in _names(drop_field):
+        dataset.delete_field(name)
+    return Result(_path(in_table))
+
+
+@counted(u"Delete_management")
+def Delete_management(in_data, data_type=None):
+    for name in _names(in_data) if isinstance(in_data, (str, list, tuple)) else [_path(in_data)]:
+        workspace.remove(name)
+    return Result(u"true")
+
+
+@counted(u"CopyFeatures_management")
+def CopyFeatures_management(in_features, out_feature_class, *args, **kwargs):
+    source = workspace.get(in_features)
+    _check_output(out_feature_class)
+    workspace.add(source.copy(_path(out_feature_class)))
+    return Result(_path(out_feature_class))
+
+
+@counted(u"CalculateField_management")
+def CalculateField_management(in_table, field, expression, expression_type=u"PYTHON3", code_block=u"",
+                              field_type=None, *args, **kwargs):
+    """
+    メソッド名 : CalculateField_management メソッド
+    引数 1     : テーブルのパス
+    引数 2     : フィールド名
+    引数 3     : Python の式（!フィールド名! で行の値を参照）
+    引数 5     : コード ブロック
+    概要       : 行ごとに式を評価してフィールドに値を設定
+    """
+    dataset = workspace.get(in_table)
+    j = dataset.field_index(field)
+    if j is None:
+        if not field_type:
+            raise ExecuteError(u"ERROR 000728: Field {0} does not exist within table".format(field))
+        AddField_management(in_table, field, field_type)
+        j = dataset.field_index(field)
+
+    def replace(match):
+        k = dataset.field_index(match.group(1))
+        if k is None:
+            raise ExecuteError(u"ERROR 000539: Field {0} does not exist".format(match.group(1)))
+        return u"__row[{0}]".format(k)
+
+    code = compile(re.sub(u"!([^!]+)!", replace, expression), u"<expression>", u"eval")
+    namespace = {u"math": math}
+    if code_block:
+        exec(code_block, namespace)
+    for row in dataset.rows:
+        row[j] = eval(code, namespace, {u"__row": row})
+    dataset.version += 1
+    return Result(_path(in_table))
+
+
+# ---------------------------------------------------------------------------
+# ジオメトリの処理
+# ---------------------------------------------------------------------------
+
+@counted(u"MultipartToSinglepart_management")
+def MultipartToSinglepart_management(in_features, out_feature_class):
+    """
+    メソッド名 : MultipartToSinglepart_management メソッド
+    引数 1     : 入力フィーチャクラス
+    引数 2     : 出力フィーチャクラス
+    概要       : マルチパートをパートごとのフィーチャに分割（マルチポイントはポイントに分割）
+                 ORIG_FID フィールドに入力の OID を格納
+    """
+    source = workspace.get(in_features)
+    shape_type = u"Point" if source.shapeType == u"Multipoint" else source.shapeType
+    dataset = _new_dataset(_path(out_feature_class), shape_type, source.spatialReference, source)
+    dataset.add_field(Field(u"ORIG_FID", u"Integer"))
+    for row in source.rows:
+        geometry = row[1]
+        if geometry is None or geometry.isEmpty:
+            continue
+        attributes = row[2:]
+        if source.shapeType in (u"Point", u"Multipoint"):
+            pieces = [PointGeometry(geometries.Point(x, y), geometry.spatialReference)
+                      for x, y in geometry._xy.tolist()]
+        else:
+            pieces = [type(geometry)._from_parts([part], geometry.spatialReference)
+                      for part in geometries.parts_of(geometry)]
+        for piece in pieces:
+            dataset.append([piece] + attributes + [row[0]])
+    return Result(_path(out_feature_class))
+
+
+@counted(u"Dissolve_management")
+def Dissolve_management(in_features, out_feature_class, dissolve_field=None, statistics_fields=None,
+                        multi_part=u"MULTI_PART", *args, **kwargs):
+    """
+    メソッド名 : Dissolve_management メソッド
+    引数 1     : 入力フィーチャクラス
+    引数 2     : 出力フィーチャクラス
+    引数 3     : ディゾルブ フィールド（; 区切り）
+    概要       : ディゾルブ フィールドの値ごとにジオメトリをまとめる
+                 ポイントはマルチポイント、ラインはマルチパートのラインにまとめ、
+                 ポリゴンは shapely がある場合は結合し、ない場合は重ならないものとしてパートをまとめる
+    """
+    source = workspace.get(in_features)
+    names = _names(dissolve_field)
+    indexes = []
+    for name in names:
+        j = source.field_index(name)
+        if j is None:
+            raise ExecuteError(u"ERROR 000728: Field {0} does not exist within table".format(name))
+        indexes.append(j)
+    shape_type = u"Multipoint" if source.shapeType == u"Point" else source.shapeType
+    dataset = _new_dataset(_path(out_feature_class), shape_type, source.spatialReference, source,
+                           [name.lower() for name in names])
+
+    groups = OrderedDict()
+    for row in source.rows:
+        if row[1] is not None and not row[1].isEmpty:
+            groups.setdefault(tuple(row[j] for j in indexes), []).append(row[1])
+
+    shapely = geometries._shapely() if source.shapeType == u"Polygon" else None
+    if source.shapeType == u"Polygon" and shapely is None:
+        workspace.add_message(1, u"WARNING: shapely がないため、ポリゴンの重なりは結合していません")
+    for key, members in groups.items():
+        if shapely is not None:
+            union = shapely.ops.unary_union([member._to_shapely() for member in members])
+            merged = members[0]._from_shapely(union, 2)
+        else:
+            merged = geometries.merge_parts(members)
+        if multi_part == u"SINGLE_PART":
+            for part in geometries.parts_of(merged):
+                dataset.append([type(merged)._from_parts([part], merged.spatialReference)] + list(key))
+        else:
+            dataset.append([merged] + list(key))
+    return Result(_path(out_feature_class))
+
+
+def _segment_cells(segments, size):
+    # セグメントの外接矩形が重なる格子のセル（セル番号、セグメントの番号）の配列
+    x0 = np.floor(np.minimum(segments[:, 0], segments[:, 2]) / size).astype(np.int64)
+    x1 = np.floor(np.maximum(segments[:, 0], segments[:, 2]) / size).astype(np.int64)
+    y0 = np.floor(np.minimum(segments[:, 1], segments[:, 3]) / size).astype(np.int64)
+    y1 = np.floor(np.maximum(segments[:, 1], segments[:, 3]) / size).astype(np.int64)
+    single = (x0 == x1) & (y0 == y1)
+    cells = [np.stack([x0[single], y0[single], np.flatnonzero(single)], axis=1)]
+    for k in np.flatnonzero(~single).tolist():
+        cx, cy = np.meshgrid(np.arange(x0[k], x1[k] + 1), np.arange(y0[k], y1[k] + 1))
+        cells.append(np.stack([cx.ravel(), cy.ravel(), np.full(cx.size, k)], axis=1))
+    return np.concatenate(cells)
+
+
+def _line_intersections(dataset):
+    """
+    ラインのフィーチャクラスで、異なるフィーチャのセグメントが交わる位置を
+    フィーチャの組（OID の小さい順）ごとに集める
+    """
+    segments = []
+    owners = []
+    for k, row in enumerate(dataset.rows):
+        if row[1] is None or row[1].isEmpty:
+            continue
+        s = row[1]._segments()
+        segments.append(s)
+        owners.append(np.full(len(s), k))
+    pairs = OrderedDict()
+    if not segments:
+        return pairs
+    segments = np.concatenate(segments)
+    owners = np.concatenate(owners)
+
+    # セルの大きさはセグメントの外接矩形の大きさの中央値の 2 倍
+    extents = np.maximum(np.abs(segments[:, 2] - segments[:, 0]), np.abs(segments[:, 3] - segments[:, 1]))
+    size = max(float(np.median(extents)) * 2.0, 1e-6)
+    cells = _segment_cells(segments, size)
+    order = np.lexsort((cells[:, 2], cells[:, 1], cells[:, 0]))
+    cells = cells[order]
+    boundaries = np.flatnonzero((np.diff(cells[:, 0]) != 0) | (np.diff(cells[:, 1]) != 0)) + 1
+    found = set()
+    tol = geometries.XY_TOLERANCE
+    for members in np.split(cells[:, 2], boundaries):
+        if len(members) < 2 or len(np.unique(owners[members])) < 2:
+            continue
+        s = segments[members]
+        hit, a = geometries.segment_intersections(s, s)
+        i, j = np.nonzero(np.triu(hit, 1) & (owners[members][:, np.newaxis] != owners[members][np.newaxis, :]))
+        for p, q in zip(i.tolist(), j.tolist()):
+            seg_p, seg_q = int(members[p]), int(members[q])
+            if (seg_p, seg_q) in found:
+                continue
+            found.add((seg_p, seg_q))
+            x = s[p, 0] + a[p, q] * (s[p, 2] - s[p, 0])
+            y = s[p, 1] + a[p, q] * (s[p, 3] - s[p, 1])
+            key = tuple(sorted((int(owners[seg_p]), int(owners[seg_q]))))
+            points = pairs.setdefault(key, OrderedDict())
+            # 同じ位置（XY 許容値で丸めた位置）の交点は 1 つにまとめる
+            points.setdefault((round(x / tol), round(y / tol)), (float(x), float(y)))
+    return pairs
+
+
+@counted(u"Intersect_analysis")
+def Intersect_analysis(in_features, out_feature_class, join_attributes=u"ALL", cluster_tolerance=None,
+                       output_type=u"INPUT"):
+    """
+    メソッド名 : Intersect_analysis メソッド
+    引数 1     : 入力フィーチャクラス
+    引数 2     : 出力フィーチャクラス
+    引数 3     : 属性の結合（ALL、NO_FID、ONLY_FID）
+    引数 5     : 出力タイプ（POINT のみ対応）
+    概要       : 1 つのラインのフィーチャクラスの交点を、交わるフィーチャの組ごとのマルチポイントとして出力
+                 属性は組の OID の小さいフィーチャの値
+    """
+    names = _names(in_features)
+    source = workspace.get(names[0]) if names else None
+    if len(names) != 1 or source.shapeType != u"Polyline" or (output_type or u"").upper() != u"POINT":
+        raise ExecuteError(u"arcpy 代替モジュールの Intersect は 1 つのラインのポイント出力だけに対応しています")
+    join_attributes = (join_attributes or u"ALL").upper()
+    dataset = _new_dataset(_path(out_feature_class), u"Multipoint", source.spatialReference)
+    with_fid = join_attributes != u"NO_FID"
+    with_attributes = join_attributes != u"ONLY_FID"
+    if with_fid:
+        dataset.add_field(Field(u"FID_{0}".format(os.path.splitext(source.name)[0]), u"Integer"))
+    if with_attributes:
+        _copy_fields(source, dataset)
+    for (k, _), points in _line_intersections(source).items():
+        geometry = Multipoint._from_parts([[list(points.values())]], source.spatialReference)
+        row = source.rows[k]
+        dataset.append([geometry] + ([row[0]] if with_fid else []) + (row[2:] if with_attributes else []))
+    return Result(_path(out_feature_class))
+
+
+_RELATIONS = {
+    u"INTERSECT": lambda a, b: a._intersects(b),
+    u"CONTAINS": lambda a, b: a.contains(b),
+    u"WITHIN": lambda a, b: a.within(b),
+    u"CROSSED_BY_THE_OUTLINE_OF": lambda a, b: a.crosses(b),
+    u"ARE_IDENTICAL_TO": lambda a, b: a.equals(b),
+}
+
+
+@counted(u"SelectLayerByLocation_management")
+def SelectLayerByLocation_management(in_layer, overlap_type=u"INTERSECT", select_features=None,
+                                     search_distance=None, selection_type=u"NEW_SELECTION",
+                                     invert_spatial_relationship=u"NOT_INVERT"):
+    """
+    メソッド名 : SelectLayerByLocation_management メソッド
+    引数 1     : 入力フィーチャクラス（レイヤー）
+    引数 2     : 空間関係（INTERSECT、CONTAINS、WITHIN など）
+    引数 3     : 選択に使用するフィーチャクラス
+    概要       : 空間関係を満たすフィーチャを選択したレイヤー（メモリ ワークスペースの Dataset）を作成
+    """
+    source = workspace.get(in_layer)
+    relation = _RELATIONS.get((overlap_type or u"INTERSECT").upper())
+    if relation is None:
+        raise ExecuteError(u"arcpy 代替モジュールの SelectLayerByLocation は {0} に対応していません".format(
+            overlap_type))
+    selectors = workspace.get(select_features)
+    index = selectors.index()
+    invert = invert_spatial_relationship in (True, u"INVERT")
+
+    layer = Dataset(u"memory/{0}_selection".format(os.path.splitext(source.name)[0]), source.shapeType,
+                    source.spatialReference)
+    _copy_fields(source, layer)
+    for row in source.rows:
+        geometry = row[1]
+        selected = geometry is not None and not geometry.isEmpty and any(
+            relation(geometry, selectors.rows[i][1]) for i in index.query(geometry.extent))
+        if selected != invert:
+            layer.rows.append(row)
+    layer.next_oid = source.next_oid
+    workspace.remove(layer.path)
+    workspace.add(layer)
+    return Result(layer.path, layer.path, u"{0}".format(len(layer.rows)))
+
+
+@counted(u"Clip_analysis")
+def Clip_analysis(in_features, clip_features, out_feature_class, cluster_tolerance=None):
+    """
+    メソッド名 : Clip_analysis メソッド
+    引数 1     : 入力フィーチャクラス
+    引数 2     : クリップに使用するポリゴン（ジオメトリまたはフィーチャクラス）
+    引数 3     : 出力フィーチャクラス
+    概要       : 入力のフィーチャをポリゴンでクリップ（複数のポリゴンは重ならないものとしてまとめる）
+    """
+    source = workspace.get(in_features)
+    if isinstance(clip_features, geometries.Geometry):
+        clips = [clip_features]
+    else:
+        clips = [row[1] for row in workspace.get(clip_features).rows if row[1] is not None]
+    dataset = _new_dataset(_path(out_feature_class), source.shapeType, source.spatialReference, source)
+    index = source.index()
+    pieces = OrderedDict()
+    for clip in clips:
+        if clip.isEmpty:
+            continue
+        for i in index.query(clip.extent):
+            piece = geometries.clip_geometry(source.rows[i][1], clip)
+            if not piece.isEmpty:
+                pieces.setdefault(i, []).append(piece)
+    for i in sorted(pieces):
+        row = source.rows[i]
+        dataset.append([geometries.merge_parts(pieces[i]) if len(pieces[i]) > 1 else pieces[i][0]] + row[2:])
+    return Result(_path(out_feature_class))
+
+
+@counted(u"Buffer_analysis")
+def Buffer_analysis(in_features, out_feature_class, buffer_distance_or_field, *args, **kwargs):
+    """
+    メソッド名 : Buffer_analysis メソッド
+    引数 1     : 入力フィーチャクラス
+    引数 2     : 出力フィーチャクラス
+    引数 3     : バッファーの距離（"10 Meters" などの単位は無視）またはフィールド名
+    概要       : フィーチャごとのバッファーのポリゴンを作成（shapely が必要）
+    """
+    source = workspace.get(in_features)
+    value = _path(buffer_distance_or_field).split()
+    j = source.field_index(value[0]) if value else None
+    distance = None if j is not None else float(value[0])
+    dataset = _new_dataset(_path(out_feature_class), u"Polygon", source.spatialReference, source)
+    for row in source.rows:
+        if row[1] is None or row[1].isEmpty:
+            continue
+        dataset.append([row[1].buffer(row[j] if j is not None else distance)] + row[2:])
+    return Result(_path(out_feature_class))
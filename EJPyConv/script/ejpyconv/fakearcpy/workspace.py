@@ -0,0 +1,450 @@
+﻿# coding:utf-8
+"""
+Tool name : arcpy 代替モジュール（ワークスペース）
+Source    : ejpyconv/fakearcpy/workspace.py
+Author    : Esri Japan Corporation
+Created   : 2026/10/19
+Updated   :
+
+フィーチャクラス・テーブルを Python のリストで保持するメモリ上のワークスペースと、呼び出し回数のカウンタ
+GeoPackage/SQLite のテーブルは最初に参照されたときにメモリへ読み込み、書き込みはメモリ上だけで行う
+"""
+
+import functools
+import os
+from collections import Counter
+
+from ejpyconv import featureio
+
+
+# 関数・メソッドごとの呼び出し回数（カーソルは開いた回数と読み書きした行数）
+calls = Counter()
+
+# 正規化したパス → Dataset
+datasets = {}
+
+# メッセージ（重要度、メッセージ）のリスト（重要度は 0：情報、1：警告、2：エラー）
+messages = []
+
+# AddMessage などのメッセージを標準出力へ表示するか（スタンドアロンの arcpy と同じく既定は表示）
+echo = True
+
+# AddField のフィールドタイプ → Field.type
+FIELD_TYPES = {u"TEXT": u"String", u"STRING": u"String", u"LONG": u"Integer", u"INTEGER": u"Integer",
+               u"SHORT": u"SmallInteger", u"SMALLINTEGER": u"SmallInteger", u"DOUBLE": u"Double",
+               u"FLOAT": u"Single", u"SINGLE": u"Single", u"DATE": u"Date", u"BLOB": u"Blob",
+               u"GUID": u"Guid"}
+
+# CreateFeatureclass のジオメトリタイプ → Describe の shapeType
+SHAPE_TYPES = {u"POINT": u"Point", u"MULTIPOINT": u"Multipoint", u"POLYLINE": u"Polyline",
+               u"POLYGON": u"Polygon"}
+
+# メモリ ワークスペースの名前
+MEMORY_WORKSPACES = (u"memory", u"in_memory")
+
+
+class ExecuteError(Exception):
+    """
+    arcpy.ExecuteError（ジオプロセシング ツールの実行エラー）
+    """
+    pass
+
+
+def add_message(severity, message):
+    """
+    メソッド名 : add_message メソッド
+    引数 1     : 重要度（0：情報、1：警告、2：エラー）
+    引数 2     : メッセージ
+    概要       : メッセージを記録し、echo が True の場合は標準出力へ表示
+    """
+    message = u"{0}".format(message)
+    messages.append((severity, message))
+    if echo:
+        print(message)
+
+
+def counted(name):
+    """
+    メソッド名 : counted メソッド
+    引数 1     : カウンタの名前
+    概要       : 呼び出し回数を calls に記録するデコレータ
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            calls[name] += 1
+            return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class Field(object):
+    """
+    arcpy.Field（属性名は大文字・小文字を区別しない）
+    """
+
+    def __init__(self, name, field_type, length=0, is_nullable=True, alias=None):
+        self.name = name
+        self.baseName = name
+        self.aliasName = alias or name
+        self.type = field_type
+        self.length = length or (255 if field_type == u"String" else 0)
+        self.precision = 0
+        self.scale = 0
+        self.isNullable = is_nullable
+        self.required = field_type in (u"OID", u"Geometry")
+        self.editable = field_type != u"OID"
+        self.domain = u""
+
+    def __getattr__(self, name):
+        for key, value in self.__dict__.items():
+            if key.lower() == name.lower():
+                return value
+        raise AttributeError(name)
+
+    def __repr__(self):
+        return u"<Field {0} ({1})>".format(self.name, self.type)
+
+
+class Describe(object):
+    """
+    arcpy.Describe の結果（属性名は大文字・小文字を区別しない）
+    """
+
+    def __init__(self, **properties):
+        self.__dict__[u"_properties"] = dict((key.lower(), value) for key, value in properties.items())
+
+    def __getattr__(self, name):
+        try:
+            return self.__dict__[u"_properties"][name.lower()]
+        except KeyError:
+            raise AttributeError(name)
+
+
+class Result(object):
+    """
+    ジオプロセシング ツールの結果（arcpy.Result）
+    """
+
+    def __init__(self, *outputs):
+        self._outputs = outputs
+
+    @property
+    def outputCount(self):
+        return len(self._outputs)
+
+    def getOutput(self, index):
+        return self._outputs[index]
+
+    def __str__(self):
+        return u"{0}".format(self._outputs[0]) if self._outputs else u""
+
+    def __repr__(self):
+        return u"<Result '{0}'>".format(self)
+
+
+def normalize(path):
+    """
+    メソッド名 : normalize メソッド
+    引数 1     : データセットのパス（Result、レイヤーの名前も可）
+    概要       : データセットを検索するキーに変換（区切り文字、大文字・小文字、in_memory、GeoPackage の main. を統一）
+    """
+    path = u"{0}".format(path).replace(u"\\", u"/").rstrip(u"/")
+    lower = path.lower()
+    for workspace in MEMORY_WORKSPACES:
+        if lower == workspace:
+            return u"memory"
+        if lower.startswith(workspace + u"/"):
+            return u"memory/" + lower[len(workspace) + 1:]
+    db_path, table = featureio.split_sqlite_path(path)
+    if db_path is not None:
+        db_path = os.path.abspath(db_path).replace(u"\\", u"/").lower()
+        return db_path if not table else db_path + u"/" + table.lower()
+    return os.path.abspath(path).replace(u"\\", u"/").lower()
+
+
+def workspace_of(path):
+    """
+    メソッド名 : workspace_of メソッド
+    引数 1     : データセットのパス
+    概要       : データセットのワークスペースのパスを取得
+    """
+    path = u"{0}".format(path).replace(u"\\", u"/")
+    db_path, table = featureio.split_sqlite_path(path)
+    if db_path is not None and table:
+        return db_path
+    return os.path.dirname(path)
+
+
+def workspace_type(path):
+    """
+    メソッド名 : workspace_type メソッド
+    引数 1     : ワークスペースのパス
+    概要       : ワークスペースのタイプ（フォルダは FileSystem、それ以外は LocalDatabase）
+    """
+    key = normalize(path)
+    if key == u"memory" or key.endswith((u".gdb", u".gpkg", u".sqlite", u".db")):
+        return u"LocalDatabase"
+    return u"FileSystem"
+
+
+class Dataset(object):
+    """
+    フィーチャクラス・テーブル（先頭のフィールドは OID、フィーチャクラスの 2 番目はジオメトリ）
+    rows は行ごとの値のリストのリスト
+    """
+
+    def __init__(self, path, shape_type=u"", spref=None, is_table=False):
+        self.path = u"{0}".format(path)
+        self.name = os.path.basename(self.path.replace(u"\\", u"/"))
+        if self.name.lower().startswith(u"main."):
+            self.name = self.name[5:]
+        # Shape ファイルはフィールド名が 10 文字まで
+        self.is_shapefile = self.name.lower().endswith(u".shp")
+        self.shapeType = u"" if is_table else shape_type
+        self.spatialReference = spref
+        self.fields = [Field(u"FID" if self.is_shapefile else u"OBJECTID", u"OID", is_nullable=False)]
+        if not is_table:
+            self.fields.append(Field(u"Shape", u"Geometry"))
+        self.rows = []
+        self.next_oid = 1
+        # 変更のたびに増やす版数（空間インデックスの再作成に使用）
+        self.version = 0
+        self._index = None
+
+    @property
+    def is_table(self):
+        return self.shapeType == u""
+
+    @property
+    def shape_index(self):
+        return None if self.is_table else 1
+
+    def field_index(self, name):
+        """
+        メソッド名 : field_index メソッド
+        引数 1     : フィールド名
+        概要       : フィールドのインデックス番号（大文字・小文字を区別しない。ない場合は None）
+        """
+        lower = name.lower()
+        for j, field in enumerate(self.fields):
+            if field.name.lower() == lower:
+                return j
+        return None
+
+    def add_field(self, field):
+        if self.is_shapefile:
+            field.name = field.baseName = field.name[:10]
+        self.fields.append(field)
+        for row in self.rows:
+            row.append(None)
+        self.version += 1
+
+    def delete_field(self, name):
+        j = self.field_index(name)
+        if j is None or self.fields[j].type in (u"OID", u"Geometry"):
+            return
+        del self.fields[j]
+        for row in self.rows:
+            del row[j]
+        self.version += 1
+
+    def append(self, values):
+        """
+        メソッド名 : append メソッド
+        引数 1     : OID 以外のフィールドの値のリスト
+        概要       : 行を追加して OID を返す
+        """
+        oid = self.next_oid
+        self.next_oid += 1
+        self.rows.append([oid] + list(values))
+        self.version += 1
+        return oid
+
+    def copy(self, path):
+        """
+        メソッド名 : copy メソッド
+        引数 1     : コピー先のパス
+        概要       : フィールドと行をコピーした Dataset を作成（ジオメトリは共有）
+        """
+        dataset = Dataset(path, self.shapeType, self.spatialReference, self.is_table)
+        for field in self.fields[len(dataset.fields):]:
+            dataset.add_field(Field(field.name, field.type, field.length, field.isNullable, field.aliasName))
+        for row in self.rows:
+            dataset.append(row[1:])
+        return dataset
+
+    def describe(self):
+        return Describe(
+            name=self.name, baseName=os.path.splitext(self.name)[0], catalogPath=self.path,
+            path=workspace_of(self.path), dataType=u"Table" if self.is_table else u"FeatureClass",
+            datasetType=u"Table" if self.is_table else u"FeatureClass", featureType=u"Simple",
+            shapeType=self.shapeType, spatialReference=self.spatialReference, fields=list(self.fields),
+            hasOID=True, OIDFieldName=self.fields[0].name,
+            ShapeFieldName=u"" if self.is_table else self.fields[1].name, extent=self.extent(),
+            hasZ=False, hasM=False)
+
+    def extent(self):
+        from ejpyconv.fakearcpy.geometries import Extent
+        extents = [row[1].extent for row in self.rows if not self.is_table and row[1] is not None]
+        extents = [e for e in extents if e.XMin is not None]
+        if not extents:
+            return Extent()
+        return Extent(min(e.XMin for e in extents), min(e.YMin for e in extents),
+                      max(e.XMax for e in extents), max(e.YMax for e in extents))
+
+    def index(self):
+        """
+        メソッド名 : index メソッド
+        概要       : ジオメトリの外接矩形の格子による空間インデックス（変更されるまで再利用）
+        """
+        if self._index is None or self._index.version != self.version:
+            self._index = GridIndex([row[1] for row in self.rows], self.version)
+        return self._index
+
+
+class GridIndex(object):
+    """
+    外接矩形を格子のセルに登録する空間インデックス
+    """
+
+    def __init__(self, geometries, version=0):
+        self.version = version
+        self.extents = [None if g is None or g.isEmpty else g.extent for g in geometries]
+        valid = [e for e in self.extents if e is not None]
+        self.cells = {}
+        if not valid:
+            self.size = 1.0
+            return
+        # セルの大きさは外接矩形の平均的な大きさ（最小でも範囲の 1/1000）
+        xmin = min(e.XMin for e in valid)
+        ymin = min(e.YMin for e in valid)
+        span = max(max(e.XMax for e in valid) - xmin, max(e.YMax for e in valid) - ymin, 1e-9)
+        mean = sum(max(e.width, e.height) for e in valid) / len(valid)
+        self.size = max(mean, span / 1000.0, 1e-9)
+        for i, e in enumerate(self.extents):
+            if e is None:
+                continue
+            for cell in self._cells(e):
+                self.cells.setdefault(cell, []).append(i)
+
+    def _cells(self, e):
+        size = self.size
+        for cx in range(int(e.XMin // size), int(e.XMax // size) + 1):
+            for cy in range(int(e.YMin // size), int(e.YMax // size) + 1):
+                yield cx, cy
+
+    def query(self, extent):
+        """
+        メソッド名 : query メソッド
+        引数 1     : 検索する範囲（Extent）
+        概要       : 外接矩形が範囲と重なるジオメトリのインデックス番号のリスト（昇順）
+        """
+        if extent.XMin is None:
+            return []
+        # 範囲が格子のセル数より大きい場合はすべてを確認
+        cell_count = ((extent.XMax - extent.XMin) // self.size + 1) * ((extent.YMax - extent.YMin) // self.size + 1)
+        if cell_count > len(self.cells):
+            candidates = range(len(self.extents))
+        else:
+            candidates = set()
+            for cell in self._cells(extent):
+                candidates.update(self.cells.get(cell, ()))
+        return sorted(i for i in candidates
+                      if self.extents[i] is not None and not self.extents[i].disjoint(extent))
+
+
+def load(path):
+    """
+    メソッド名 : load メソッド
+    引数 1     : GeoPackage/SQLite のテーブルのパス
+    概要       : テーブルをメモリへ読み込んで Dataset を返す（読み込めない場合は None）
+    """
+    from ejpyconv.fakearcpy.geometries import FromWKB, SpatialReference
+
+    db_path, table = featureio.split_sqlite_path(u"{0}".format(path))
+    if db_path is None or not table or not os.path.exists(db_path):
+        return None
+    backend = featureio.SQLiteBackend()
+    try:
+        if not backend.exists(path):
+            return None
+        desc = backend.describe(path)
+        spref = SpatialReference(desc.spatialReference or None)
+        dataset = Dataset(path, desc.shapeType, spref, is_table=desc.shapeType == u"")
+        names = []
+        for field in desc.Fields:
+            if field.type in (u"OID", u"Geometry"):
+                continue
+            dataset.add_field(Field(field.name, field.type, field.length, field.isNullable))
+            names.append(field.name)
+        tokens = [u"OID@"] + names + ([] if dataset.is_table else [u"SHAPE@WKB"])
+        rows = []
+        max_oid = 0
+        for row in backend.search_cursor(path, tokens):
+            row = list(row)
+            if not dataset.is_table:
+                wkb = row.pop()
+                row.insert(1, None if wkb is None else FromWKB(wkb, spref))
+            rows.append(row)
+            max_oid = max(max_oid, row[0])
+        dataset.rows = rows
+        dataset.next_oid = max_oid + 1
+    finally:
+        backend.close()
+    calls[u"load"] += 1
+    datasets[normalize(path)] = dataset
+    return dataset
+
+
+def find(path):
+    """
+    メソッド名 : find メソッド
+    引数 1     : データセットのパス
+    概要       : Dataset を検索（メモリにない GeoPackage/SQLite のテーブルは読み込む。ない場合は None）
+    """
+    dataset = datasets.get(normalize(path))
+    if dataset is None:
+        dataset = load(path)
+    return dataset
+
+
+def get(path):
+    """
+    メソッド名 : get メソッド
+    引数 1     : データセットのパス
+    概要       : Dataset を取得（ない場合は arcpy と同じく ExecuteError）
+    """
+    dataset = find(path)
+    if dataset is None:
+        raise ExecuteError(u"ERROR 000732: Input Dataset: Dataset {0} does not exist or is not supported".format(path))
+    return dataset
+
+
+def add(dataset):
+    datasets[normalize(dataset.path)] = dataset
+    return dataset
+
+
+def remove(path):
+    """
+    メソッド名 : remove メソッド
+    引数 1     : データセットまたはメモリ ワークスペースのパス
+    概要       : データセットを削除（メモリ ワークスペースの場合はすべてのデータセットを削除）
+    """
+    key = normalize(path)
+    if key == u"memory":
+        for name in [name for name in datasets if name.startswith(u"memory/")]:
+            del datasets[name]
+    else:
+        datasets.pop(key, None)
+
+
+def clear():
+    """
+    メソッド名 : clear メソッド
+    概要       : すべてのデータセット、メッセージ、呼び出し回数を破棄
+    """
+    datasets.clear()
+    del messages[:]
+    calls.clear()
@@ -0,0 +1,709 @@
+﻿# coding:utf-8
+"""
+Tool name : EJPyConv 共通モジュール（フィーチャ入出力）
+Source    : ejpyconv/featureio.py
+Author    : Esri Japan Corporation
+Created   : 2026/10/19
+Updated   : 2026/10/19
+"""
+
+import json
+import math
+import os
+import sqlite3
+import struct
+
+from ejpyconv.geometry import WKB_TYPES, read_wkb, ring_area
+
+
+# 入出力バックエンドを指定する環境変数（arcpy / sqlite、未指定の場合は arcpy があれば arcpy）
+BACKEND_ENV = "EJPYCONV_BACKEND"
+
+# GeoPackage / SQLite として扱うファイルの拡張子
+SQLITE_EXTENSIONS = (".gpkg", ".sqlite", ".db")
+
+# 挿入カーソルでまとめて書き込む行数
+INSERT_BATCH_SIZE = 1000
+
+# 現在のバックエンド
+_backend = None
+
+
+def get_backend():
+    """
+    メソッド名 : get_backend メソッド
+    概要       : 現在の入出力バックエンドを返す
+                 環境変数 EJPYCONV_BACKEND が未指定の場合、arcpy を使用できれば arcpy、
+                 使用できなければ GeoPackage/SQLite を使用
+    """
+    global _backend
+    if _backend is None:
+        name = os.environ.get(BACKEND_ENV, u"")
+        if name == u"":
+            try:
+                import arcpy
+                name = u"arcpy"
+            except ImportError:
+                name = u"sqlite"
+        _backend = create_backend(name)
+    return _backend
+
+
+def set_backend(backend):
+    """
+    メソッド名 : set_backend メソッド
+    引数 1     : バックエンドの名前（arcpy / sqlite）、バックエンドのオブジェクト、または None
+    概要       : 入出力バックエンドを切り替え（None の場合は次回の get_backend で再選択）
+    """
+    global _backend
+    if _backend is not None and _backend is not backend:
+        _backend.close()
+    if isinstance(backend, str):
+        backend = create_backend(backend)
+    _backend = backend
+    return _backend
+
+
+def create_backend(name):
+    """
+    メソッド名 : create_backend メソッド
+    引数 1     : バックエンドの名前（arcpy / sqlite）
+    概要       : 名前からバックエンドのオブジェクトを作成
+    """
+    backends = {u"arcpy": ArcpyBackend, u"sqlite": SQLiteBackend}
+    if name.lower() not in backends:
+        raise ValueError(u"入出力バックエンドが不正です：{0}".format(name))
+    return backends[name.lower()]()
+
+
+# 現在のバックエンドへの委譲
+def describe(path):
+    return get_backend().describe(path)
+
+
+def exists(path):
+    return get_backend().exists(path)
+
+
+def get_count(path):
+    return get_backend().get_count(path)
+
+
+def list_fields(path):
+    return get_backend().list_fields(path)
+
+
+def create_featureclass(out_ws, out_name, shape_type, template, spref):
+    return get_backend().create_featureclass(out_ws, out_name, shape_type, template, spref)
+
+
+def add_field(path, field_name, field_type, field_length=None):
+    return get_backend().add_field(path, field_name, field_type, field_length)
+
+
+def delete_fields(path, field_names):
+    return get_backend().delete_fields(path, field_names)
+
+
+def search_cursor(path, fields):
+    return get_backend().search_cursor(path, fields)
+
+
+def insert_cursor(path, fields):
+    return get_backend().insert_cursor(path, fields)
+
+
+class ArcpyBackend(object):
+    """
+    arcpy によるフィーチャの入出力（ArcGIS Pro でのツールの動作）
+    """
+    name = u"arcpy"
+
+    def __init__(self):
+        import arcpy
+        self.arcpy = arcpy
+
+    def describe(self, path):
+        return self.arcpy.Describe(path)
+
+    def exists(self, path):
+        return self.arcpy.Exists(path)
+
+    def get_count(self, path):
+        return int(self.arcpy.GetCount_management(path).getOutput(0))
+
+    def list_fields(self, path):
+        return self.arcpy.ListFields(path)
+
+    def create_featureclass(self, out_ws, out_name, shape_type, template, spref):
+        self.arcpy.CreateFeatureclass_management(out_ws, out_name, shape_type, template, "", "", spref)
+
+    def add_field(self, path, field_name, field_type, field_length=None):
+        if field_length:
+            self.arcpy.AddField_management(path, field_name, field_type, field_length=field_length)
+        else:
+            self.arcpy.AddField_management(path, field_name, field_type)
+
+    def delete_fields(self, path, field_names):
+        self.arcpy.DeleteField_management(path, field_names)
+
+    def search_cursor(self, path, fields):
+        return self.arcpy.da.SearchCursor(path, fields)
+
+    def insert_cursor(self, path, fields):
+        return self.arcpy.da.InsertCursor(path, fields)
+
+    def close(self):
+        pass
+
+
+# ---------------------------------------------------------------------------
+# GeoPackage / SQLite
+# ---------------------------------------------------------------------------
+
+# ジオメトリタイプの名前
+GEOMETRY_TYPE_NAMES = set(WKB_TYPES.values()) | {u"GEOMETRY"}
+
+# CreateFeatureclass のジオメトリタイプ ⇔ GeoPackage のジオメトリタイプ
+# （ライン・ポリゴンはマルチパートを格納できるように MULTI* で作成）
+GPKG_GEOMETRY_TYPES = {u"POINT": u"POINT", u"MULTIPOINT": u"MULTIPOINT",
+                       u"POLYLINE": u"MULTILINESTRING", u"POLYGON": u"MULTIPOLYGON"}
+SHAPE_TYPES = {u"POINT": u"Point", u"MULTIPOINT": u"Multipoint",
+               u"LINESTRING": u"Polyline", u"MULTILINESTRING": u"Polyline",
+               u"POLYGON": u"Polygon", u"MULTIPOLYGON": u"Polygon"}
+
+# フィールドのタイプ（arcpy のフィールドタイプ・AddField のキーワード → SQLite の型）
+SQL_TYPES = {u"String": u"TEXT", u"TEXT": u"TEXT",
+             u"Integer": u"INTEGER", u"LONG": u"INTEGER",
+             u"SmallInteger": u"SMALLINT", u"SHORT": u"SMALLINT",
+             u"Double": u"DOUBLE", u"DOUBLE": u"DOUBLE",
+             u"Single": u"FLOAT", u"FLOAT": u"FLOAT",
+             u"Date": u"DATETIME", u"DATE": u"DATETIME",
+             u"Blob": u"BLOB", u"BLOB": u"BLOB",
+             u"Guid": u"TEXT", u"GUID": u"TEXT", u"GlobalID": u"TEXT"}
+
+# 新規 GeoPackage の必須テーブル
+GPKG_SCHEMA = u"""
+CREATE TABLE gpkg_spatial_ref_sys (
+    srs_name TEXT NOT NULL, srs_id INTEGER NOT NULL PRIMARY KEY, organization TEXT NOT NULL,
+    organization_coordsys_id INTEGER NOT NULL, definition TEXT NOT NULL, description TEXT);
+CREATE TABLE gpkg_contents (
+    table_name TEXT NOT NULL PRIMARY KEY, data_type TEXT NOT NULL, identifier TEXT UNIQUE,
+    description TEXT DEFAULT '', last_change DATETIME NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ','now')),
+    min_x DOUBLE, min_y DOUBLE, max_x DOUBLE, max_y DOUBLE,
+    srs_id INTEGER REFERENCES gpkg_spatial_ref_sys(srs_id));
+CREATE TABLE gpkg_geometry_columns (
+    table_name TEXT NOT NULL, column_name TEXT NOT NULL, geometry_type_name TEXT NOT NULL,
+    srs_id INTEGER NOT NULL, z TINYINT NOT NULL, m TINYINT NOT NULL,
+    CONSTRAINT pk_geom_cols PRIMARY KEY (table_name, column_name),
+    CONSTRAINT fk_gc_tn FOREIGN KEY (table_name) REFERENCES gpkg_contents(table_name),
+    CONSTRAINT fk_gc_srs FOREIGN KEY (srs_id) REFERENCES gpkg_spatial_ref_sys(srs_id));
+INSERT INTO gpkg_spatial_ref_sys VALUES ('Undefined cartesian SRS', -1, 'NONE', -1, 'undefined', NULL);
+INSERT INTO gpkg_spatial_ref_sys VALUES ('Undefined geographic SRS', 0, 'NONE', 0, 'undefined', NULL);
+INSERT INTO gpkg_spatial_ref_sys VALUES ('WGS 84 geodetic', 4326, 'EPSG', 4326, 'GEOGCS["WGS 84",DATUM["WGS_1984",SPHEROID["WGS 84",6378137,298.257223563,AUTHORITY["EPSG","7030"]],AUTHORITY["EPSG","6326"]],PRIMEM["Greenwich",0,AUTHORITY["EPSG","8901"]],UNIT["degree",0.0174532925199433,AUTHORITY["EPSG","9122"]],AUTHORITY["EPSG","4326"]]', NULL);
+"""
+
+
+class Field(object):
+    """
+    SQLite のフィールド情報（arcpy の Field と同じ属性名）
+    """
+    __slots__ = ("name", "type", "isNullable", "length")
+
+    def __init__(self, name, field_type, is_nullable=True, length=0):
+        self.name = name
+        self.type = field_type
+        self.isNullable = is_nullable
+        self.length = length
+
+
+class Describe(object):
+    """
+    SQLite のデータセットの情報（arcpy の Describe と同じ属性名）
+    """
+
+    def __init__(self, **kwargs):
+        self.name = u""
+        self.path = u""
+        self.dataType = u"Workspace"
+        self.workspacetype = u"LocalDatabase"
+        self.Fields = []
+        self.OIDFieldName = u""
+        self.ShapeFieldName = u""
+        self.shapeType = u""
+        self.spatialReference = 0
+        self.__dict__.update(kwargs)
+
+
+def split_sqlite_path(path):
+    """
+    メソッド名 : split_sqlite_path メソッド
+    引数 1     : データセットのパス（例：C:/data/sample.gpkg/roads）
+    概要       : GeoPackage/SQLite ファイルのパスとテーブル名に分割（ファイルのみの場合、テーブル名は None）
+    """
+    lower = path.replace(u"\\", u"/").lower()
+    for ext in SQLITE_EXTENSIONS:
+        index = lower.find(ext + u"/")
+        if index >= 0:
+            table = path[index + len(ext) + 1:]
+            if table.lower().startswith(u"main."):
+                table = table[5:]
+            return path[:index + len(ext)], table
+        if lower.endswith(ext):
+            return path, None
+    return None, None
+
+
+def field_type_from_sql(declared):
+    """
+    メソッド名 : field_type_from_sql メソッド
+    引数 1     : SQLite の列の宣言型
+    概要       : SQLite の宣言型から arcpy のフィールドタイプと長さを取得
+    """
+    decl = declared.upper()
+    length = 0
+    if u"(" in decl:
+        try:
+            length = int(decl[decl.index(u"(") + 1:decl.rindex(u")")].split(u",")[0])
+        except ValueError:
+            pass
+        decl = decl[:decl.index(u"(")].strip()
+
+    if decl in (u"TINYINT", u"SMALLINT", u"MEDIUMINT", u"BOOLEAN"):
+        return u"SmallInteger", 0
+    if u"INT" in decl:
+        return u"Integer", 0
+    if decl == u"FLOAT":
+        return u"Single", 0
+    if u"REAL" in decl or u"DOUB" in decl or u"FLOA" in decl or decl == u"NUMERIC":
+        return u"Double", 0
+    if decl in (u"DATE", u"DATETIME"):
+        return u"Date", 0
+    if decl == u"BLOB":
+        return u"Blob", 0
+    return u"String", length
+
+
+def quote(name):
+    return u'"{0}"'.format(name.replace(u'"', u'""'))
+
+
+# ---------------------------------------------------------------------------
+# WKB ⇔ Esri JSON
+# ---------------------------------------------------------------------------
+
+def gpkg_blob(wkb, srs_id):
+    """
+    メソッド名 : gpkg_blob メソッド
+    引数 1     : WKB
+    引数 2     : 空間参照 ID
+    概要       : WKB に GeoPackage のジオメトリヘッダー（エンベロープなし、リトルエンディアン）を付加
+    """
+    return b"GP\x00\x01" + struct.pack(u"<i", srs_id) + bytes(wkb)
+
+
+def gpkg_wkb(blob):
+    """
+    メソッド名 : gpkg_wkb メソッド
+    引数 1     : GeoPackage のジオメトリ（またはヘッダーのない WKB）
+    概要       : GeoPackage のジオメトリヘッダーを除いた WKB を取得
+    """
+    if blob[:2] != b"GP":
+        return bytes(blob)
+    envelope = (blob[3] >> 1) & 0x07
+    return bytes(blob[8 + (0, 32, 48, 48, 64)[envelope]:])
+
+
+def wkb_to_json(wkb, srs_id=None):
+    """
+    メソッド名 : wkb_to_json メソッド
+    引数 1     : WKB
+    引数 2     : 空間参照 ID（JSON の spatialReference に格納）
+    概要       : WKB を Esri JSON に変換
+                 ポリゴンの exterior ring は時計回り、interior ring は反時計回りに揃える
+    """
+    if wkb is None:
+        return None
+    geom_type, coords, _ = read_wkb(wkb)
+
+    if geom_type == 1:
+        x, y = coords
+        geometry = {u"x": None if math.isnan(x) else x, u"y": None if math.isnan(y) else y}
+    elif geom_type == 4:
+        geometry = {u"points": [list(point) for point in coords]}
+    elif geom_type in (2, 5):
+        paths = [coords] if geom_type == 2 else coords
+        geometry = {u"paths": [[list(point) for point in path] for path in paths]}
+    else:
+        polygons = [coords] if geom_type == 3 else coords
+        rings = []
+        for polygon in polygons:
+            for k, ring in enumerate(polygon):
+                # exterior ring（k == 0）は時計回り（面積が負）
+                if (ring_area(ring) < 0) != (k == 0):
+                    ring = ring[::-1]
+                rings.append([list(point) for point in ring])
+        geometry = {u"rings": rings}
+
+    if srs_id:
+        geometry[u"spatialReference"] = {u"wkid": srs_id}
+    return json.dumps(geometry)
+
+
+def write_points(points):
+    flat = [value for point in points for value in point[:2]]
+    return struct.pack(u"<I{0}d".format(len(flat)), len(points), *flat)
+
+
+def point_wkb(x, y):
+    """
+    メソッド名 : point_wkb メソッド
+    引数 1     : X 座標
+    引数 2     : Y 座標
+    概要       : ポイントの WKB を作成
+    """
+    return struct.pack(u"<BIdd", 1, 1, float(u"nan") if x is None else x, float(u"nan") if y is None else y)
+
+
+def json_to_wkb(shape_json):
+    """
+    メソッド名 : json_to_wkb メソッド
+    引数 1     : ジオメトリの Esri JSON
+    概要       : Esri JSON を WKB（2 次元、ライン・ポリゴンは MULTI*）に変換
+                 時計回りのリングから新しいポリゴンを開始し、反時計回りのリングはその穴とする
+    """
+    if shape_json is None:
+        return None
+    geometry = json.loads(shape_json) if isinstance(shape_json, str) else shape_json
+
+    if u"x" in geometry:
+        return point_wkb(geometry[u"x"], geometry[u"y"])
+    if u"points" in geometry:
+        points = geometry[u"points"]
+        return struct.pack(u"<BII", 1, 4, len(points)) + b"".join(point_wkb(p[0], p[1]) for p in points)
+    if u"paths" in geometry:
+        paths = geometry[u"paths"]
+        return struct.pack(u"<BII", 1, 5, len(paths)) + b"".join(
+            struct.pack(u"<BI", 1, 2) + write_points(path) for path in paths)
+    if u"rings" in geometry:
+        polygons = []
+        for ring in geometry[u"rings"]:
+            ring = [point[:2] for point in ring]
+            clockwise = ring_area(ring) < 0
+            # OGC の向き（exterior ring は反時計回り、interior ring は時計回り）で格納
+            if clockwise or len(polygons) == 0:
+                polygons.append([ring[::-1] if clockwise else ring])
+            else:
+                polygons[-1].append(ring[::-1])
+        return struct.pack(u"<BII", 1, 6, len(polygons)) + b"".join(
+            struct.pack(u"<BII", 1, 3, len(polygon)) + b"".join(write_points(ring) for ring in polygon)
+            for polygon in polygons)
+
+    raise ValueError(u"曲線を含むジオメトリは GeoPackage/SQLite に出力できません")
+
+
+class _SearchCursor(object):
+    """
+    SQLite の検索カーソル（arcpy.da.SearchCursor と同じく 1 回だけ反復可能）
+    """
+
+    def __init__(self, rows, fields):
+        self._rows = rows
+        self.fields = tuple(fields)
+
+    def __iter__(self):
+        return self._rows
+
+    def __next__(self):
+        return next(self._rows)
+
+    next = __next__
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._rows.close()
+
+
+class _InsertCursor(object):
+    """
+    SQLite の挿入カーソル（INSERT_BATCH_SIZE 行ごとにまとめて書き込み、閉じるときにコミット）
+    """
+
+    def __init__(self, conn, sql, converters, fields):
+        self._conn = conn
+        self._sql = sql
+        self._converters = converters
+        self._rows = []
+        self.fields = tuple(fields)
+
+    def insertRow(self, row):
+        if self._converters:
+            row = list(row)
+            for j, converter in self._converters:
+                row[j] = converter(row[j])
+        self._rows.append(row)
+        if len(self._rows) >= INSERT_BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        if self._rows:
+            self._conn.executemany(self._sql, self._rows)
+            self._rows = []
+
+    def close(self):
+        if self._conn is not None:
+            self.flush()
+            self._conn.commit()
+            self._conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __del__(self):
+        self.close()
+
+
+class SQLiteBackend(object):
+    """
+    GeoPackage / SQLite によるフィーチャの入出力（ジオメトリは WKB で格納）
+    データセットのパスは「ファイルのパス/テーブル名」（例：C:/data/sample.gpkg/roads）
+    """
+    name = u"sqlite"
+
+    def __init__(self):
+        self._connections = {}
+
+    def connect(self, db_path):
+        """
+        メソッド名 : connect メソッド
+        引数 1     : GeoPackage/SQLite ファイルのパス
+        概要       : ファイルごとの接続を取得（新規の GeoPackage は必須テーブルを作成）
+        """
+        conn = self._connections.get(db_path)
+        if conn is None:
+            is_new = not os.path.exists(db_path)
+            conn = sqlite3.connect(db_path)
+            if is_new and db_path.lower().endswith(u".gpkg"):
+                conn.execute(u"PRAGMA application_id = 1196444487")
+                conn.execute(u"PRAGMA user_version = 10200")
+                conn.executescript(GPKG_SCHEMA)
+                conn.commit()
+            self._connections[db_path] = conn
+        return conn
+
+    def close(self):
+        for conn in self._connections.values():
+            conn.commit()
+            conn.close()
+        self._connections = {}
+
+    def _dataset(self, path):
+        db_path, table = split_sqlite_path(path)
+        if db_path is None or not table:
+            raise ValueError(u"GeoPackage/SQLite のテーブルのパスではありません：{0}".format(path))
+        return self.connect(db_path), db_path, table
+
+    def _is_gpkg(self, conn):
+        return conn.execute(u"SELECT 1 FROM sqlite_master WHERE type = 'table' "
+                            u"AND name = 'gpkg_geometry_columns'").fetchone() is not None
+
+    def _geometry_column(self, conn, table, columns):
+        """
+        テーブルのジオメトリの列名、ジオメトリタイプ、空間参照 ID を取得
+        """
+        if self._is_gpkg(conn):
+            row = conn.execute(u"SELECT column_name, geometry_type_name, srs_id FROM gpkg_geometry_columns "
+                               u"WHERE lower(table_name) = lower(?)", (table,)).fetchone()
+            if row is not None:
+                return row[0], row[1].upper(), row[2]
+        # GeoPackage 以外は宣言型がジオメトリタイプの列をジオメトリとする
+        for column in columns:
+            if column[2].upper() in GEOMETRY_TYPE_NAMES:
+                return column[1], column[2].upper(), 0
+        return None, None, 0
+
+    def describe(self, path):
+        db_path, table = split_sqlite_path(path)
+        if db_path is None:
+            return Describe(path=os.path.dirname(path), name=os.path.basename(path), workspacetype=u"FileSystem")
+        if not table:
+            return Describe(path=os.path.dirname(db_path), name=os.path.basename(db_path))
+
+        conn = self.connect(db_path)
+        columns = conn.execute(u"PRAGMA table_info({0})".format(quote(table))).fetchall()
+        if len(columns) == 0:
+            raise ValueError(u"テーブルが存在しません：{0}".format(path))
+        shape_field, geometry_type, srs_id = self._geometry_column(conn, table, columns)
+
+        fields = []
+        oid_field = u""
+        for _, name, declared, notnull, _, pk in columns:
+            if pk and declared.upper() == u"INTEGER":
+                oid_field = name
+                fields.append(Field(name, u"OID", False))
+            elif name == shape_field:
+                fields.append(Field(name, u"Geometry", True))
+            else:
+                field_type, length = field_type_from_sql(declared)
+                fields.append(Field(name, field_type, not notnull, length))
+
+        return Describe(name=table, path=db_path, dataType=u"FeatureClass", Fields=fields,
+                        OIDFieldName=oid_field, ShapeFieldName=shape_field or u"",
+                        shapeType=SHAPE_TYPES.get(geometry_type, u""), spatialReference=srs_id)
+
+    def exists(self, path):
+        db_path, table = split_sqlite_path(path)
+        if db_path is None or not os.path.exists(db_path):
+            return os.path.exists(path)
+        if not table:
+            return True
+        return self.connect(db_path).execute(u"SELECT 1 FROM sqlite_master WHERE type IN ('table', 'view') "
+                                             u"AND lower(name) = lower(?)", (table,)).fetchone() is not None
+
+    def get_count(self, path):
+        conn, _, table = self._dataset(path)
+        return conn.execute(u"SELECT COUNT(*) FROM {0}".format(quote(table))).fetchone()[0]
+
+    def list_fields(self, path):
+        return self.describe(path).Fields
+
+    def create_featureclass(self, out_ws, out_name, shape_type, template, spref):
+        conn = self.connect(out_ws)
+        # GeoPackage の「main.」の接頭辞、Shape ファイルなどの拡張子は除いたテーブル名
+        table = out_name[5:] if out_name.lower().startswith(u"main.") else os.path.splitext(out_name)[0]
+        geometry_type = GPKG_GEOMETRY_TYPES[shape_type.upper()]
+
+        # テンプレートのフィールドをコピー（Shape_Length、Shape_Area は GDB の計算フィールドのため除外）
+        columns = [u'"fid" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL', u'"geom" {0}'.format(geometry_type)]
+        template_srs = 0
+        if template:
+            template_desc = self.describe(template)
+            template_srs = template_desc.spatialReference
+            for field in template_desc.Fields:
+                if field.type in (u"OID", u"Geometry") or field.name.lower() in (u"shape_length", u"shape_area"):
+                    continue
+                columns.append(self._column_definition(field.name, field.type, field.length))
+
+        # 空間参照 ID（arcpy の SpatialReference の場合は factoryCode）
+        srs_id = getattr(spref, u"factoryCode", spref)
+        if srs_id in (None, u""):
+            srs_id = template_srs
+        srs_id = int(srs_id)
+
+        conn.execute(u"CREATE TABLE {0} ({1})".format(quote(table), u", ".join(columns)))
+        if self._is_gpkg(conn):
+            if conn.execute(u"SELECT 1 FROM gpkg_spatial_ref_sys WHERE srs_id = ?", (srs_id,)).fetchone() is None:
+                conn.execute(u"INSERT INTO gpkg_spatial_ref_sys VALUES (?, ?, 'EPSG', ?, 'undefined', NULL)",
+                             (u"EPSG:{0}".format(srs_id), srs_id, srs_id))
+            conn.execute(u"INSERT INTO gpkg_contents (table_name, data_type, identifier, srs_id) "
+                         u"VALUES (?, 'features', ?, ?)", (table, table, srs_id))
+            conn.execute(u"INSERT INTO gpkg_geometry_columns VALUES (?, 'geom', ?, ?, 0, 0)",
+                         (table, geometry_type, srs_id))
+        conn.commit()
+
+    def _column_definition(self, field_name, field_type, field_length=None):
+        sql_type = SQL_TYPES.get(field_type, u"TEXT")
+        if sql_type == u"TEXT" and field_length:
+            sql_type = u"TEXT({0})".format(int(field_length))
+        return u"{0} {1}".format(quote(field_name), sql_type)
+
+    def add_field(self, path, field_name, field_type, field_length=None):
+        conn, _, table = self._dataset(path)
+        conn.execute(u"ALTER TABLE {0} ADD COLUMN {1}".format(
+            quote(table), self._column_definition(field_name, field_type, field_length)))
+        conn.commit()
+
+    def delete_fields(self, path, field_names):
+        conn, _, table = self._dataset(path)
+        if isinstance(field_names, str):
+            field_names = field_names.split(u";")
+        for field_name in field_names:
+            conn.execute(u"ALTER TABLE {0} DROP COLUMN {1}".format(quote(table), quote(field_name)))
+        conn.commit()
+
+    def search_cursor(self, path, fields):
+        """
+        メソッド名 : search_cursor メソッド
+        引数 1     : データセットのパス
+        引数 2     : フィールド名のリスト（OID@、SHAPE@WKB、SHAPE@JSON、SHAPE@XY、SHAPE@ も使用可能）
+        概要       : 行をタプルで 1 行ずつ返す検索カーソルを作成
+                     SHAPE@ はジオメトリのオブジェクトの代わりに WKB を返す
+        """
+        conn, _, table = self._dataset(path)
+        desc = self.describe(path)
+        srs_id = desc.spatialReference
+
+        columns = []
+        converters = []
+        for j, field in enumerate(fields):
+            token = field.upper()
+            if token == u"OID@":
+                columns.append(quote(desc.OIDFieldName))
+            elif token.startswith(u"SHAPE@"):
+                columns.append(quote(desc.ShapeFieldName))
+                if token in (u"SHAPE@", u"SHAPE@WKB"):
+                    converters.append((j, lambda blob: None if blob is None else gpkg_wkb(blob)))
+                elif token == u"SHAPE@JSON":
+                    converters.append((j, lambda blob: None if blob is None else wkb_to_json(gpkg_wkb(blob), srs_id)))
+                elif token == u"SHAPE@XY" and desc.shapeType == u"Point":
+                    converters.append((j, lambda blob: None if blob is None else read_wkb(gpkg_wkb(blob))[1]))
+                else:
+                    raise ValueError(u"GeoPackage/SQLite では使用できないフィールドです：{0}".format(field))
+            else:
+                columns.append(quote(field))
+
+        rows = conn.execute(u"SELECT {0} FROM {1}".format(u", ".join(columns), quote(table)))
+
+        def convert(rows):
+            for row in rows:
+                row = list(row)
+                for j, converter in converters:
+                    row[j] = converter(row[j])
+                yield tuple(row)
+
+        return _SearchCursor(convert(rows) if converters else iter(rows), fields)
+
+    def insert_cursor(self, path, fields):
+        """
+        メソッド名 : insert_cursor メソッド
+        引数 1     : データセットのパス
+        引数 2     : フィールド名のリスト（SHAPE@WKB、SHAPE@JSON、SHAPE@XY、SHAPE@（WKB）も使用可能）
+        概要       : insertRow で行を挿入する挿入カーソルを作成
+        """
+        conn, _, table = self._dataset(path)
+        desc = self.describe(path)
+        srs_id = desc.spatialReference
+        is_gpkg = self._is_gpkg(conn)
+        field_types = dict((field.name.lower(), field.type) for field in desc.Fields)
+
+        def to_blob(wkb):
+            return gpkg_blob(wkb, srs_id) if is_gpkg else bytes(wkb)
+
+        columns = []
+        converters = []
+        for j, field in enumerate(fields):
+            token = field.upper()
+            if token.startswith(u"SHAPE@"):
+                columns.append(quote(desc.ShapeFieldName))
+                if token in (u"SHAPE@", u"SHAPE@WKB"):
+                    converters.append((j, lambda wkb: None if wkb is None else to_blob(wkb)))
+                elif token == u"SHAPE@JSON":
+                    converters.append((j, lambda shape_json: None if shape_json is None else to_blob(json_to_wkb(shape_json))))
+                elif token == u"SHAPE@XY":
+                    converters.append((j, lambda xy: None if xy is None else to_blob(point_wkb(xy[0], xy[1]))))
+                else:
+                    raise ValueError(u"GeoPackage/SQLite では使用できないフィールドです：{0}".format(field))
+            else:
+                columns.append(quote(field))
+                # 日付は ISO 形式の文字列で格納
+                if field_types.get(field.lower()) == u"Date":
+                    converters.append((j, lambda value: value.isoformat(u" ") if hasattr(value, u"isoformat") else value))
+
+        sql = u"INSERT INTO {0} ({1}) VALUES ({2})".format(
+            quote(table), u", ".join(columns), u", ".join(u"?" * len(columns)))
+        return _InsertCursor(conn, sql, converters, fields)
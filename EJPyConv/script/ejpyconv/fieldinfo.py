@@ -0,0 +1,260 @@
+﻿# coding:utf-8
+"""
+Tool name : EJPyConv 共通モジュール（フィールド情報）
+Source    : ejpyconv/fieldinfo.py
+Author    : Esri Japan Corporation
+Created   : 2026/10/19
+Updated   : 2026/10/19
+"""
+
+import os
+
+from ejpyconv import featureio
+
+
+# Shape ファイルは NULL 値を格納できないため、フィールドのタイプごとの代替値
+SHAPEFILE_NULL_VALUES = {
+    u"String": u"",
+    u"Double": 0,
+    u"Integer": 0,
+    u"Single": 0,
+    u"SmallInteger": 0,
+}
+
+# Describe 結果のキャッシュ（パス → (更新日時, Describe オブジェクト)）
+_describe_cache = {}
+# 入力データごとのフィールド構成のキャッシュ（パス → (更新日時, フィールド構成)）
+_field_plan_cache = {}
+
+
+def modified_time(path):
+    """
+    メソッド名 : modified_time メソッド
+    引数 1     : データセットまたはワークスペースのパス
+    概要       : キャッシュの有効性の判定に使う更新日時を返す
+                 パスがファイルでない場合（GDB や GeoPackage のテーブル）は、存在する親のパスの更新日時
+                 Shape ファイルはフィールドを追加すると .dbf だけが更新されるため、.dbf の更新日時も含める
+                 （メモリ上のデータなど、ディスクに存在しない場合は None）
+    """
+    target = path
+    while target and not os.path.exists(target):
+        parent = os.path.dirname(target)
+        if parent == target:
+            return None
+        target = parent
+    if not target:
+        return None
+    try:
+        mtime = os.path.getmtime(target)
+        root, ext = os.path.splitext(target)
+        if ext.lower() == u".shp" and os.path.exists(root + u".dbf"):
+            mtime = max(mtime, os.path.getmtime(root + u".dbf"))
+    except OSError:
+        return None
+    return mtime
+
+
+def _cached(cache, path):
+    """
+    キャッシュの値を取得（同じパスでデータを作り直した、または更新した場合は None）
+    """
+    entry = cache.get(path)
+    if entry is None or entry[0] != modified_time(path):
+        return None
+    return entry[1]
+
+
+def describe(path):
+    """
+    メソッド名 : describe メソッド
+    引数 1     : データセットまたはワークスペースのパス
+    概要       : Describe の結果をパスと更新日時ごとにキャッシュして返す（現在の入出力バックエンドを使用）
+    """
+    desc = _cached(_describe_cache, path)
+    if desc is None:
+        desc = featureio.describe(path)
+        _describe_cache[path] = (modified_time(path), desc)
+    return desc
+
+
+def workspace_type(path):
+    """
+    メソッド名 : workspace_type メソッド
+    引数 1     : ワークスペースのパス
+    概要       : ワークスペースのタイプ（FileSystem / LocalDatabase など）を返す
+    """
+    return describe(path).workspacetype
+
+
+def clear_cache():
+    """
+    メソッド名 : clear_cache メソッド
+    概要       : Describe とフィールド構成のキャッシュを破棄
+                 （メモリ上のデータなど、更新日時で変更を判定できないデータを同じプロセスで作り直す場合に使用）
+    """
+    _describe_cache.clear()
+    _field_plan_cache.clear()
+
+
+def unique_field_name(out_fc, field_name):
+    """
+    メソッド名 : unique_field_name メソッド
+    引数 1     : 出力フィーチャ
+    引数 2     : 追加するフィールド名
+    概要       : 出力フィーチャにすでに同じ名前のフィールドがある場合は、末尾に _1、_2 … を付けた名前を返す
+                 シェープファイルの場合はフィールド名の長さ（10 文字）に収まるよう短縮
+    """
+    existing = set(field.name.lower() for field in featureio.list_fields(out_fc))
+    max_length = 10 if workspace_type(os.path.dirname(out_fc)) == "FileSystem" else None
+    name = field_name[:max_length]
+    n = 0
+    while name.lower() in existing:
+        n += 1
+        suffix = u"_{0}".format(n)
+        name = field_name[:max_length - len(suffix) if max_length else None] + suffix
+    return name
+
+
+def add_fields(out_fc, fields):
+    """
+    メソッド名 : add_fields メソッド
+    引数 1     : 出力フィーチャ
+    引数 2     : 追加するフィールドの (フィールド名, フィールドタイプ[, 長さ]) のリスト
+    概要       : 入力からコピーしたフィールドと重ならない名前（unique_field_name）でフィールドを追加し、
+                 追加したフィールド名のリストと、名前を変えたフィールドの (元の名前, 追加した名前) のリストを返す
+    """
+    names = []
+    renamed = []
+    for field in fields:
+        field_name = unique_field_name(out_fc, field[0])
+        if field_name != field[0]:
+            renamed.append((field[0], field_name))
+        featureio.add_field(out_fc, field_name, field[1], field[2] if len(field) > 2 else None)
+        names.append(field_name)
+    return names, renamed
+
+
+def field_plan(in_fc):
+    """
+    メソッド名 : field_plan メソッド
+    引数 1     : 入力フィーチャ
+    概要       : 属性情報コピーの対象となるフィールドの名前、タイプ、インデックス番号と
+                 Shape ファイル出力時に削除するフィールドのインデックス番号を取得
+    """
+    plan = _cached(_field_plan_cache, in_fc)
+    if plan is not None:
+        return plan
+
+    in_desc = describe(in_fc)
+
+    # 変数定義
+    search_fields_name = []
+    search_fields_type = []
+    search_fields_nullable = []
+    del_fields = []
+    use_fields = []
+
+    # 属性情報コピーの準備
+    for i, field in enumerate(in_desc.Fields):
+        if (field.type == u"OID") or (field.type == u"Geometry"):
+            pass
+        # 出力が Shape ファイルの場合は、削除対象
+        elif field.name.lower() == "shape_length" or field.name.lower() == "shape_area":
+            del_fields.append(i)
+        else:
+            search_fields_name.append(field.name)
+            search_fields_type.append(field.type)
+            search_fields_nullable.append(field.isNullable)
+            # 属性情報コピーの対象となるフィールドのインデックス番号を取得
+            use_fields.append(i)
+
+    plan = (tuple(search_fields_name), tuple(search_fields_type), tuple(search_fields_nullable),
+            tuple(use_fields), tuple(del_fields), in_desc.spatialReference, in_desc.path)
+    _field_plan_cache[in_fc] = (modified_time(in_fc), plan)
+    return plan
+
+
+# フィーチャクラスの作成と属性情報コピーの準備
+def create_fieldinfo(in_fc, out_fc, shape_type):
+    """
+    メソッド名 : create_fieldinfo メソッド
+    引数 1     : 入力フィーチャ
+    引数 2     : 出力フィーチャクラス
+    引数 3     : 出力フィーチャクラスのジオメトリタイプ（POINT / POLYLINE / POLYGON）
+    概要       : 出力フィーチャクラスを作成し、カーソル作成に用いるフィールド情報と
+                 入力行を出力行に変換する関数を作成
+    """
+    # 出力パスの取得
+    out_ws = os.path.dirname(out_fc)
+    out_fc_name = os.path.basename(out_fc)
+
+    # 入力データの情報を取得
+    search_fields, search_fields_type, search_fields_nullable, use_fields, del_fields, spref, in_path = field_plan(in_fc)
+
+    # フィーチャクラスの作成
+    featureio.create_featureclass(out_ws, out_fc_name, shape_type, in_fc, spref)
+
+    wstype = workspace_type(out_ws)
+
+    # 出力がShape ファイルの場合
+    if wstype == "FileSystem":
+        out_fields = featureio.list_fields(out_fc)
+
+        # 入力もShape ファイルの場合はスルー。
+        # Shape_Length、Shape_Area フィールドは削除
+        if workspace_type(in_path) != "FileSystem":
+            if len(del_fields) != 0:
+                del_fields_name = [out_fields[index].name for index in del_fields]
+                featureio.delete_fields(out_fc, del_fields_name)
+
+        # 属性情報コピーの対象とするフィールド名のリストを作成
+        # （インデックス番号を用いて Shape ファイルで短くなった名前を取得）
+        use_fields_name = [out_fields[index].name for index in use_fields]
+
+    # 出力が GDB の場合は、入力データと同じフィールド構造を使用
+    else:
+        use_fields_name = list(search_fields)
+
+    search_fields_name = list(search_fields) + ["SHAPE@"]
+    use_fields_name.append("SHAPE@")
+
+    row_transform = create_row_transform(search_fields_type, wstype, search_fields_nullable)
+
+    return search_fields_name, list(search_fields_type), use_fields_name, spref, row_transform
+
+
+def create_row_transform(search_fields_type, wstype, search_fields_nullable=None):
+    """
+    メソッド名 : create_row_transform メソッド
+    引数 1     : 属性情報コピーの対象となるフィールドのタイプのリスト
+    引数 2     : 出力先のワークスペースのタイプ
+    引数 3     : フィールドごとの NULL 許可のリスト（省略時はすべて NULL 許可とみなす）
+    概要       : 入力行（属性値 + ジオメトリ）を挿入用のリストに変換する関数を作成
+                 出力がShape ファイルの場合、NULL 値を格納できないため
+                 フィールドのタイプに合わせて、空白や 0 を格納する
+    """
+    # GDB は NULL 値を格納可能
+    if wstype != "FileSystem":
+        return list
+
+    if search_fields_nullable is None:
+        search_fields_nullable = [True] * len(search_fields_type)
+
+    # NULL 値を置き換える列のインデックス番号と代替値の組を 1 回だけ作成
+    # （NULL を許可しないフィールドと、代替値のないタイプの列は対象外）
+    substitutes = tuple((j, SHAPEFILE_NULL_VALUES[field_type])
+                        for j, (field_type, nullable) in enumerate(zip(search_fields_type, search_fields_nullable))
+                        if nullable and field_type in SHAPEFILE_NULL_VALUES)
+
+    # 置き換え対象の列がない場合は行をそのままリストにする
+    if len(substitutes) == 0:
+        return list
+
+    def row_transform(row):
+        newValue = list(row)
+        for j, substitute in substitutes:
+            if newValue[j] is None:
+                newValue[j] = substitute
+        return newValue
+
+    return row_transform
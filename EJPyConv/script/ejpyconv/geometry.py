@@ -0,0 +1,411 @@
+﻿# coding:utf-8
+"""
+Tool name : EJPyConv 共通モジュール（配列によるジオメトリ）
+Source    : ejpyconv/geometry.py
+Author    : Esri Japan Corporation
+Created   : 2026/10/19
+Updated   :
+"""
+
+import itertools
+import json
+import struct
+
+import numpy as np
+
+
+# ジオメトリタイプ
+POINT = u"point"
+MULTIPOINT = u"multipoint"
+POLYLINE = u"polyline"
+POLYGON = u"polygon"
+
+# WKB のジオメトリタイプ番号と名前
+WKB_TYPES = {1: u"POINT", 2: u"LINESTRING", 3: u"POLYGON", 4: u"MULTIPOINT",
+             5: u"MULTILINESTRING", 6: u"MULTIPOLYGON", 7: u"GEOMETRYCOLLECTION"}
+
+
+class Geometry(object):
+    """
+    頂点の座標を 1 つの配列で持つジオメトリ
+    xy           : すべての頂点の XY 座標（float64、頂点数 × 2）
+    ring_offsets : パス（ポリゴンの場合はリング）ごとの先頭の頂点のインデックス番号（末尾は頂点数）
+    part_offsets : パートごとの先頭のパス（リング）のインデックス番号（末尾はパス（リング）数）
+    ポリゴンのリングは ArcGIS と同じく exterior ring が時計回り、interior ring が反時計回りで、始終点は重複
+    """
+    __slots__ = ("geometry_type", "xy", "ring_offsets", "_part_offsets")
+
+    def __init__(self, geometry_type, xy, ring_offsets, part_offsets=None):
+        self.geometry_type = geometry_type
+        self.xy = xy
+        self.ring_offsets = ring_offsets
+        self._part_offsets = part_offsets
+
+    @property
+    def ring_count(self):
+        return len(self.ring_offsets) - 1
+
+    @property
+    def part_offsets(self):
+        # ポリゴンのパートは exterior ring（時計回り）から始まる
+        if self._part_offsets is None:
+            if self.geometry_type == POLYGON and self.ring_count > 0:
+                starts = np.flatnonzero(self.ring_areas() < 0.0)
+                self._part_offsets = np.union1d(starts, [0, self.ring_count]).astype(np.int64)
+            else:
+                self._part_offsets = np.arange(self.ring_count + 1, dtype=np.int64)
+        return self._part_offsets
+
+    def rings(self):
+        """
+        メソッド名 : rings メソッド
+        概要       : パス（リング）ごとの頂点の XY 座標の配列（xy のビュー）のリストを返す
+        """
+        offsets = self.ring_offsets.tolist()
+        return [self.xy[start:end] for start, end in zip(offsets[:-1], offsets[1:])]
+
+    def _segment_mask(self):
+        # 隣り合う頂点の組のうち、同じパス（リング）の中の組だけ True
+        mask = np.ones(max(len(self.xy) - 1, 0), dtype=bool)
+        ends = self.ring_offsets[1:-1] - 1
+        mask[ends[(ends >= 0) & (ends < len(mask))]] = False
+        return mask
+
+    def _ring_sums(self, values):
+        # 頂点の組ごとの値をパス（リング）ごとに合計（頂点が 2 つ未満のパスは 0）
+        starts = self.ring_offsets[:-1]
+        valid = (self.ring_offsets[1:] - starts) >= 2
+        sums = np.zeros(self.ring_count, dtype=np.float64)
+        if valid.any():
+            sums[valid] = np.add.reduceat(values, starts[valid])
+        return sums
+
+    def segment_lengths(self):
+        """
+        メソッド名 : segment_lengths メソッド
+        概要       : 隣り合う頂点の組ごとの距離の配列（パスの境界をまたぐ組は 0）を返す
+        """
+        d = np.diff(self.xy, axis=0)
+        return np.hypot(d[:, 0], d[:, 1]) * self._segment_mask()
+
+    def vertex_measures(self):
+        """
+        メソッド名 : vertex_measures メソッド
+        概要       : 頂点ごとの累積距離の配列を返す（パスの先頭の頂点の値を引くとパスの始点からの距離）
+        """
+        return np.concatenate(([0.0], np.cumsum(self.segment_lengths())))
+
+    def ring_lengths(self):
+        """
+        メソッド名 : ring_lengths メソッド
+        概要       : パス（リング）ごとの長さの配列を返す
+        """
+        if len(self.xy) < 2:
+            return np.zeros(self.ring_count, dtype=np.float64)
+        return self._ring_sums(self.segment_lengths())
+
+    @property
+    def length(self):
+        return float(self.ring_lengths().sum())
+
+    def ring_areas(self):
+        """
+        メソッド名 : ring_areas メソッド
+        概要       : 靴ひも公式によるリングごとの符号付き面積（時計回りが負）の配列を返す
+                     桁落ちを防ぐため、リングの先頭の頂点を原点とした座標で計算
+        """
+        if len(self.xy) < 2:
+            return np.zeros(self.ring_count, dtype=np.float64)
+        counts = np.diff(self.ring_offsets)
+        nonempty = counts > 0
+        origin = np.repeat(self.xy[self.ring_offsets[:-1][nonempty]], counts[nonempty], axis=0)
+        local = self.xy - origin
+        cross = (local[:-1, 0] * local[1:, 1] - local[1:, 0] * local[:-1, 1]) * self._segment_mask()
+        return 0.5 * self._ring_sums(cross)
+
+    @property
+    def area(self):
+        # exterior ring は時計回り（負）、interior ring は反時計回り（正）
+        return float(-self.ring_areas().sum())
+
+    def is_hole(self):
+        """
+        メソッド名 : is_hole メソッド
+        概要       : リングごとに interior ring（反時計回り）かどうかの配列を返す
+        """
+        return self.ring_areas() > 0.0
+
+    def centroid(self):
+        """
+        メソッド名 : centroid メソッド
+        概要       : 重心の XY 座標を返す
+                     ポリゴンは面積、ラインは長さで重み付けし、面積・長さが 0 の場合は頂点の平均
+        """
+        if len(self.xy) == 0:
+            return None
+        origin = self.xy[0]
+        local = self.xy - origin
+        mask = self._segment_mask()
+
+        if self.geometry_type == POLYGON and len(local) > 1:
+            cross = (local[:-1, 0] * local[1:, 1] - local[1:, 0] * local[:-1, 1]) * mask
+            area = cross.sum() * 0.5
+            if area != 0.0:
+                cx = np.dot(local[:-1, 0] + local[1:, 0], cross) / (6.0 * area)
+                cy = np.dot(local[:-1, 1] + local[1:, 1], cross) / (6.0 * area)
+                return (float(cx + origin[0]), float(cy + origin[1]))
+
+        if self.geometry_type in (POLYGON, POLYLINE) and len(local) > 1:
+            lengths = self.segment_lengths()
+            total = lengths.sum()
+            if total > 0.0:
+                mid = (local[:-1] + local[1:]) * 0.5
+                cx, cy = np.dot(lengths, mid) / total
+                return (float(cx + origin[0]), float(cy + origin[1]))
+
+        cx, cy = local.mean(axis=0)
+        return (float(cx + origin[0]), float(cy + origin[1]))
+
+    def interpolate(self, ring_indices, distances):
+        """
+        メソッド名 : interpolate メソッド
+        引数 1     : パスのインデックス番号の配列
+        引数 2     : パスの始点からの距離の配列（パスの長さの範囲に丸める）
+        概要       : 累積距離を二分探索してセグメント内を線形補間し、パス上のポイントの XY 座標の配列を返す
+                     頂点を持たないパスは指定できない
+        """
+        ring_indices = np.asarray(ring_indices, dtype=np.int64)
+        distances = np.asarray(distances, dtype=np.float64)
+        starts = self.ring_offsets[ring_indices]
+        ends = self.ring_offsets[ring_indices + 1]
+
+        measures = self.vertex_measures()
+        lengths = measures[ends - 1] - measures[starts]
+        target = measures[starts] + np.clip(distances, 0.0, lengths)
+
+        # 位置を含むセグメントの始点（同じパスの中に収める）
+        k = np.searchsorted(measures, target, side="right") - 1
+        k = np.clip(k, starts, np.maximum(ends - 2, starts))
+        k_next = np.minimum(k + 1, ends - 1)
+
+        seg = measures[k_next] - measures[k]
+        t = np.where(seg > 0.0, (target - measures[k]) / np.where(seg > 0.0, seg, 1.0), 0.0)
+        return self.xy[k] + t[:, np.newaxis] * (self.xy[k_next] - self.xy[k])
+
+    def vertex_angles(self):
+        """
+        メソッド名 : vertex_angles メソッド
+        概要       : ポリゴンの頂点ごとの内角（度）の配列を返す（重複する終点は始点と同じ値）
+                     ArcGIS のリングはポリゴンの内側が進行方向の右側になるため、内角は
+                     前の頂点への向きから次の頂点への向きまでの反時計回りの角度となる
+        """
+        counts = np.diff(self.ring_offsets)
+        index = np.arange(len(self.xy))
+        start = np.repeat(self.ring_offsets[:-1], counts)
+        end = np.repeat(self.ring_offsets[1:], counts)
+
+        prev = np.clip(np.where(index > start, index - 1, end - 2), start, end - 1)
+        following = np.clip(np.where(index < end - 1, index + 1, start + 1), start, end - 1)
+
+        to_prev = self.xy[prev] - self.xy
+        to_next = self.xy[following] - self.xy
+        cross = to_prev[:, 0] * to_next[:, 1] - to_prev[:, 1] * to_next[:, 0]
+        dot = to_prev[:, 0] * to_next[:, 0] + to_prev[:, 1] * to_next[:, 1]
+        return np.degrees(np.arctan2(cross, dot)) % 360.0
+
+    def to_json(self, spatial_reference=None):
+        """
+        メソッド名 : to_json メソッド
+        引数 1     : JSON の spatialReference に格納する辞書（省略可）
+        概要       : Esri JSON に変換
+        """
+        if self.geometry_type == POINT:
+            x, y = self.xy[0].tolist() if len(self.xy) else (None, None)
+            geometry = {u"x": x, u"y": y}
+        elif self.geometry_type == MULTIPOINT:
+            geometry = {u"points": self.xy.tolist()}
+        else:
+            key = u"rings" if self.geometry_type == POLYGON else u"paths"
+            geometry = {key: [ring.tolist() for ring in self.rings()]}
+        if spatial_reference:
+            geometry[u"spatialReference"] = spatial_reference
+        return json.dumps(geometry)
+
+
+def from_rings(rings, geometry_type=POLYLINE):
+    """
+    メソッド名 : from_rings メソッド
+    引数 1     : パス（リング）ごとの頂点の XY 座標のリスト
+    引数 2     : ジオメトリタイプ（polyline / polygon / multipoint / point）
+    概要       : 座標のリストから Geometry を作成
+    """
+    counts = [len(ring) for ring in rings]
+    offsets = np.zeros(len(rings) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum(counts)
+    try:
+        # Z 値・M 値を持つ頂点は先頭の 2 列（XY 座標）だけを使用
+        xy = np.array(list(itertools.chain.from_iterable(rings)), dtype=np.float64)
+        xy = xy.reshape(len(xy), -1)[:, :2]
+    except ValueError:
+        # 次元の異なる頂点が混在する場合
+        xy = np.array([vertex[:2] for ring in rings for vertex in ring], dtype=np.float64).reshape(-1, 2)
+    return Geometry(geometry_type, xy, offsets)
+
+
+def _vertices(geometry, key):
+    # 曲線を含む場合、曲線セグメントは {"c": [終点, 制御点]} などの形式で終点が先頭
+    if key in geometry:
+        return [[(vertex[0], vertex[1]) for vertex in path] for path in geometry[key]]
+
+    paths = []
+    for path in geometry.get(u"curve" + key.capitalize(), []):
+        vertices = []
+        for segment in path:
+            if isinstance(segment, dict):
+                segment = next(iter(segment.values()))[0]
+            vertices.append((segment[0], segment[1]))
+        paths.append(vertices)
+
+    return paths
+
+
+def json_vertices(shape_json, key):
+    """
+    メソッド名 : json_vertices メソッド
+    引数 1     : ジオメトリの JSON
+    引数 2     : 座標配列のキー（u"paths" または u"rings"）
+    概要       : JSON からパート（リング）ごとの頂点の XY 座標のリストを取得
+                 曲線は頂点（曲線セグメントの終点）だけを取得
+    """
+    if shape_json is None:
+        return []
+
+    return _vertices(json.loads(shape_json), key)
+
+
+def from_json(shape_json):
+    """
+    メソッド名 : from_json メソッド
+    引数 1     : ジオメトリの Esri JSON（文字列または辞書）
+    概要       : Esri JSON から Geometry を作成（NULL の場合は None）
+                 曲線は頂点（曲線セグメントの終点）だけを使用
+    """
+    if shape_json is None:
+        return None
+    geometry = json.loads(shape_json) if isinstance(shape_json, str) else shape_json
+
+    if u"x" in geometry:
+        if geometry[u"x"] is None or geometry[u"x"] == u"NaN":
+            return from_rings([], POINT)
+        return from_rings([[(geometry[u"x"], geometry[u"y"])]], POINT)
+    if u"points" in geometry:
+        return from_rings([[point] for point in geometry[u"points"]], MULTIPOINT)
+    if u"rings" in geometry or u"curveRings" in geometry:
+        return from_rings(_vertices(geometry, u"rings"), POLYGON)
+    return from_rings(_vertices(geometry, u"paths"), POLYLINE)
+
+
+def ring_area(ring):
+    """
+    メソッド名 : ring_area メソッド
+    引数 1     : リングの座標のリスト
+    概要       : 靴ひも公式によるリングの符号付き面積（時計回りが負）
+    """
+    xy = np.asarray(ring, dtype=np.float64)
+    if len(xy) < 2:
+        return 0.0
+    x = xy[:, 0] - xy[0, 0]
+    y = xy[:, 1] - xy[0, 1]
+    return float(0.5 * (np.dot(x[:-1], y[1:]) - np.dot(x[1:], y[:-1])))
+
+
+def read_wkb(data, offset=0):
+    """
+    メソッド名 : read_wkb メソッド
+    引数 1     : WKB
+    引数 2     : 読み込みを開始する位置
+    概要       : WKB からジオメトリタイプ（1〜6）と XY 座標の入れ子のリストを取得
+                 （Z 値・M 値は読み飛ばす。ISO と EWKB の両方の形式に対応）
+    """
+    order = u"<" if data[offset] == 1 else u">"
+    wkb_type = struct.unpack_from(order + u"I", data, offset + 1)[0]
+    offset += 5
+
+    # EWKB のフラグ
+    has_z = bool(wkb_type & 0x80000000)
+    has_m = bool(wkb_type & 0x40000000)
+    if wkb_type & 0x20000000:
+        offset += 4
+    wkb_type &= 0x0FFFFFFF
+    # ISO WKB の Z（1000 番台）、M（2000 番台）、ZM（3000 番台）
+    has_z = has_z or (wkb_type // 1000) in (1, 3)
+    has_m = has_m or (wkb_type // 1000) in (2, 3)
+    geom_type = wkb_type % 1000
+    dims = 2 + int(has_z) + int(has_m)
+
+    def read_points(count, offset):
+        values = struct.unpack_from(order + u"{0}d".format(count * dims), data, offset)
+        points = list(zip(values[0::dims], values[1::dims]))
+        return points, offset + 8 * dims * count
+
+    if geom_type == 1:
+        points, offset = read_points(1, offset)
+        return geom_type, points[0], offset
+    if geom_type == 2:
+        count = struct.unpack_from(order + u"I", data, offset)[0]
+        points, offset = read_points(count, offset + 4)
+        return geom_type, points, offset
+    if geom_type == 3:
+        ring_count = struct.unpack_from(order + u"I", data, offset)[0]
+        offset += 4
+        rings = []
+        for _ in range(ring_count):
+            count = struct.unpack_from(order + u"I", data, offset)[0]
+            points, offset = read_points(count, offset + 4)
+            rings.append(points)
+        return geom_type, rings, offset
+    if geom_type in (4, 5, 6):
+        count = struct.unpack_from(order + u"I", data, offset)[0]
+        offset += 4
+        members = []
+        for _ in range(count):
+            _, member, offset = read_wkb(data, offset)
+            members.append(member)
+        return geom_type, members, offset
+
+    raise ValueError(u"対応していない WKB のジオメトリタイプです：{0}".format(WKB_TYPES.get(geom_type, geom_type)))
+
+
+def from_wkb(wkb):
+    """
+    メソッド名 : from_wkb メソッド
+    引数 1     : WKB
+    概要       : WKB から Geometry を作成（NULL の場合は None）
+                 ポリゴンは exterior ring を時計回り、interior ring を反時計回りに揃える
+    """
+    if wkb is None:
+        return None
+    geom_type, coords, _ = read_wkb(bytes(wkb))
+
+    if geom_type == 1:
+        if coords[0] != coords[0]:
+            return from_rings([], POINT)
+        return from_rings([[coords]], POINT)
+    if geom_type == 4:
+        return from_rings([[point] for point in coords], MULTIPOINT)
+    if geom_type in (2, 5):
+        return from_rings([coords] if geom_type == 2 else coords, POLYLINE)
+
+    polygons = [coords] if geom_type == 3 else coords
+    rings = []
+    part_offsets = [0]
+    for polygon in polygons:
+        for k, ring in enumerate(polygon):
+            # exterior ring（k == 0）は時計回り（面積が負）
+            if (ring_area(ring) < 0.0) != (k == 0):
+                ring = ring[::-1]
+            rings.append(ring)
+        part_offsets.append(len(rings))
+    geometry = from_rings(rings, POLYGON)
+    geometry._part_offsets = np.asarray(part_offsets, dtype=np.int64)
+    return geometry
@@ -0,0 +1,409 @@
+﻿# coding:utf-8
+"""
+Tool name : EJPyConv 共通モジュール（プロファイル）
+Source    : ejpyconv/profiling.py
+Author    : Esri Japan Corporation
+Created   : 2026/10/19
+Updated   :
+
+環境変数 EJPYCONV_PROFILE を指定した場合だけ、ツールの処理時間を段階ごとに計測する
+    read          : カーソルの読み込み
+    geometry      : ジオメトリの演算（cut、crosses、buffer、difference、distanceTo など）
+    geoprocessing : ジオプロセシング ツール、Describe などの呼び出し
+    write         : カーソルの書き込み
+    other         : 上記以外（ツールの Python の処理）
+計測結果は処理時間の長いフィーチャの一覧とともに、出力の隣（EJPYCONV_PROFILE にフォルダを指定した場合はそのフォルダ）の
+<ツール名>_<出力名>.profile.json に出力
+
+使用例    : if __name__ == "__main__":
+                with profiling.profile(u"PolyToLine", arcpy.GetParameterAsText(1)):
+                    polygon_line()
+"""
+
+import contextlib
+import datetime
+import functools
+import heapq
+import json
+import os
+import time
+from collections import OrderedDict
+
+from ejpyconv import featureio, geometry
+
+
+# プロファイルを有効にする環境変数（1、true などは出力の隣、それ以外はレポートを置くフォルダ）
+PROFILE_ENV = u"EJPYCONV_PROFILE"
+
+# 処理時間の長いフィーチャの一覧の件数を指定する環境変数
+PROFILE_TOP_ENV = u"EJPYCONV_PROFILE_TOP"
+
+# 既定の処理時間の長いフィーチャの一覧の件数
+DEFAULT_TOP = 20
+
+# 段階
+READ = u"read"
+GEOMETRY = u"geometry"
+GEOPROCESSING = u"geoprocessing"
+WRITE = u"write"
+OTHER = u"other"
+STAGES = (READ, GEOMETRY, GEOPROCESSING, WRITE)
+
+# 計測するジオメトリのメソッド
+GEOMETRY_METHODS = (u"cut", u"crosses", u"buffer", u"difference", u"distanceTo", u"contains", u"within",
+                    u"overlaps", u"touches", u"disjoint", u"equals", u"intersect", u"union",
+                    u"symmetricDifference", u"clip", u"convexHull", u"boundary", u"queryPointAndDistance",
+                    u"positionAlongLine", u"projectAs", u"densify", u"generalize")
+
+# 計測する ejpyconv.geometry.Geometry のメソッド
+KERNEL_METHODS = (u"vertex_measures", u"ring_areas", u"centroid", u"interpolate", u"vertex_angles",
+                  u"to_json")
+
+# 計測するジオプロセシング ツール以外の arcpy の関数
+GEOPROCESSING_FUNCTIONS = (u"Describe", u"Exists", u"ListFields", u"CreateUniqueName")
+
+# ジオプロセシング ツールの関数名の末尾（ツールボックスのエイリアス）
+TOOLBOX_SUFFIXES = (u"_management", u"_analysis", u"_conversion", u"_cartography", u"_edit")
+
+# データベースのワークスペースの拡張子（レポートはその外側のフォルダに出力）
+DATABASE_EXTENSIONS = (u".gdb", u".gpkg", u".sqlite", u".db", u".sde", u".mdb")
+
+
+def enabled():
+    return os.environ.get(PROFILE_ENV, u"").strip().lower() not in (u"", u"0", u"false", u"no", u"off")
+
+
+def report_path(tool, out_path):
+    """
+    メソッド名 : report_path メソッド
+    引数 1     : ツール名
+    引数 2     : ツールの出力のパス
+    概要       : レポートのパスを取得（ジオデータベース、GeoPackage の中の出力はデータベースのファイルの隣）
+    """
+    out_path = u"{0}".format(out_path).replace(u"\\", u"/")
+    name = os.path.basename(out_path)
+    if name.lower().startswith(u"main."):
+        name = name[5:]
+    name = os.path.splitext(name)[0]
+    file_name = u"{0}_{1}.profile.json".format(tool, name or u"out")
+
+    setting = os.environ.get(PROFILE_ENV, u"").strip()
+    if setting.lower() not in (u"1", u"true", u"yes", u"on"):
+        return os.path.join(setting, file_name)
+    folder = os.path.dirname(out_path)
+    parts = folder.split(u"/")
+    for j, part in enumerate(parts):
+        if os.path.splitext(part)[1].lower() in DATABASE_EXTENSIONS:
+            folder = u"/".join(parts[:j])
+            break
+    if parts[0].lower() in (u"memory", u"in_memory") or not folder or not os.path.isdir(folder):
+        folder = os.getcwd()
+    return os.path.join(folder, file_name)
+
+
+class Profiler(object):
+    """
+    段階・関数ごとの処理時間と、フィーチャごとの処理時間の集計
+    関数の処理時間は、内側で計測された関数の時間を除いた時間（self_seconds）を段階に加算
+    """
+
+    def __init__(self, tool, out_path, top=DEFAULT_TOP):
+        self.tool = tool
+        self.out_path = u"{0}".format(out_path)
+        self.top = top
+        # 関数名 → [段階, 呼び出し回数, 処理時間, 内側を除いた処理時間]
+        self.operations = {}
+        self.stage_seconds = dict.fromkeys(STAGES, 0.0)
+        self.rows_read = 0
+        self.rows_written = 0
+        # (処理時間, 通し番号, フィーチャの情報) のヒープ
+        self._slowest = []
+        self._sequence = 0
+        # 計測中の関数ごとの、内側で計測された時間
+        self._children = []
+        self.start = time.perf_counter()
+        self.end = None
+
+    def timed(self, name, stage, func, *args, **kwargs):
+        """
+        メソッド名 : timed メソッド
+        引数 1     : 関数名
+        引数 2     : 段階
+        引数 3     : 関数
+        概要       : 関数を呼び出して処理時間を集計
+        """
+        self._children.append(0.0)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            seconds = time.perf_counter() - start
+            self_seconds = seconds - self._children.pop()
+            if self._children:
+                self._children[-1] += seconds
+            operation = self.operations.get(name)
+            if operation is None:
+                operation = self.operations[name] = [stage, 0, 0.0, 0.0]
+            operation[1] += 1
+            operation[2] += seconds
+            operation[3] += self_seconds
+            self.stage_seconds[stage] += self_seconds
+
+    def wrap(self, name, stage, func):
+        profiler = self
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return profiler.timed(name, stage, func, *args, **kwargs)
+        wrapper.__wrapped_by_profiler__ = True
+        return wrapper
+
+    def feature(self, dataset, key, seconds, stages):
+        """
+        メソッド名 : feature メソッド
+        引数 1     : データセットのパス
+        引数 2     : OID（取得していない場合は読み込んだ順番）
+        引数 3     : 処理時間
+        引数 4     : 段階ごとの処理時間
+        概要       : フィーチャの処理時間を記録し、長いものから top 件を保持
+        """
+        if self.top <= 0:
+            return
+        self._sequence += 1
+        item = (seconds, self._sequence, dataset, key, stages)
+        if len(self._slowest) < self.top:
+            heapq.heappush(self._slowest, item)
+        elif seconds > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, item)
+
+    def report(self):
+        """
+        メソッド名 : report メソッド
+        概要       : 計測結果の辞書を作成
+        """
+        wall_time = (self.end or time.perf_counter()) - self.start
+        stages = OrderedDict()
+        for stage in STAGES:
+            stages[stage] = OrderedDict([
+                (u"seconds", self.stage_seconds[stage]),
+                (u"calls", sum(op[1] for op in self.operations.values() if op[0] == stage))])
+        stages[OTHER] = OrderedDict([(u"seconds", max(wall_time - sum(self.stage_seconds.values()), 0.0))])
+        operations = [OrderedDict([(u"name", name), (u"stage", op[0]), (u"calls", op[1]), (u"seconds", op[2]),
+                                   (u"self_seconds", op[3])])
+                      for name, op in sorted(self.operations.items(), key=lambda item: -item[1][3])]
+        slowest = [OrderedDict([(u"dataset", dataset), (u"key", key), (u"seconds", seconds),
+                                (u"stages", OrderedDict((stage, value) for stage, value in feature_stages
+                                                        if value > 0.0))])
+                   for seconds, _, dataset, key, feature_stages in sorted(self._slowest, reverse=True)]
+        return OrderedDict([
+            (u"tool", self.tool),
+            (u"output", self.out_path),
+            (u"created", datetime.datetime.now().isoformat()),
+            (u"backend", featureio.get_backend().name),
+            (u"wall_time", wall_time),
+            (u"rows_read", self.rows_read),
+            (u"rows_written", self.rows_written),
+            (u"stages", stages),
+            (u"operations", operations),
+            (u"slowest_features", slowest),
+        ])
+
+
+class _ProfiledCursor(object):
+    """
+    カーソルの読み込み・書き込みの時間と、行ごとの処理時間（次の行を読み込むまでの時間）を計測するラッパー
+    """
+
+    def __init__(self, profiler, cursor, name, dataset, fields):
+        self._profiler = profiler
+        self._cursor = cursor
+        self._name = name
+        self._dataset = u"{0}".format(dataset)
+        fields = [u"{0}".format(field).upper() for field in fields]
+        self._oid_index = fields.index(u"OID@") if u"OID@" in fields else None
+        self._count = 0
+        self._row = None
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        self._finish_row()
+        profiler = self._profiler
+        row = profiler.timed(self._name + u".next", READ, next, self._cursor)
+        profiler.rows_read += 1
+        key = row[self._oid_index] if self._oid_index is not None else self._count
+        self._count += 1
+        self._row = (key, time.perf_counter(), [profiler.stage_seconds[stage] for stage in STAGES])
+        return row
+
+    next = __next__
+
+    def _finish_row(self):
+        if self._row is not None:
+            key, start, before = self._row
+            self._row = None
+            profiler = self._profiler
+            stages = [(stage, profiler.stage_seconds[stage] - value) for stage, value in zip(STAGES, before)]
+            profiler.feature(self._dataset, key, time.perf_counter() - start, stages)
+
+    def reset(self):
+        self._row = None
+        return self._cursor.reset()
+
+    def insertRow(self, row):
+        self._profiler.rows_written += 1
+        return self._profiler.timed(self._name + u".insertRow", WRITE, self._cursor.insertRow, row)
+
+    def updateRow(self, row):
+        self._profiler.rows_written += 1
+        return self._profiler.timed(self._name + u".updateRow", WRITE, self._cursor.updateRow, row)
+
+    def deleteRow(self, *args):
+        return self._profiler.timed(self._name + u".deleteRow", WRITE, self._cursor.deleteRow, *args)
+
+    def __enter__(self):
+        self._cursor.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._finish_row()
+        return self._cursor.__exit__(exc_type, exc_value, traceback)
+
+
+def _cursor_factory(profiler, name, open_cursor):
+    # カーソルを作成する関数を、作成の時間を計測してラッパーを返す関数に置き換え
+    @functools.wraps(open_cursor)
+    def factory(in_table, field_names, *args, **kwargs):
+        stage = WRITE if name.endswith(u"InsertCursor") else READ
+        cursor = profiler.timed(name, stage, open_cursor, in_table, field_names, *args, **kwargs)
+        fields = [field_names] if isinstance(field_names, str) else list(field_names)
+        return _ProfiledCursor(profiler, cursor, name, in_table, fields)
+    return factory
+
+
+def _backend_cursor_factory(profiler, name, open_cursor):
+    # SQLiteBackend の search_cursor、insert_cursor（self を受け取るメソッド）の置き換え
+    @functools.wraps(open_cursor)
+    def method(self, path, fields):
+        stage = WRITE if name.endswith(u"insert_cursor") else READ
+        cursor = profiler.timed(name, stage, open_cursor, self, path, fields)
+        return _ProfiledCursor(profiler, cursor, name, path, fields)
+    return method
+
+
+class _Patches(object):
+    """
+    計測のために置き換えた属性を記録し、元に戻す
+    """
+
+    def __init__(self):
+        self._originals = []
+
+    def replace(self, owner, name, value):
+        self._originals.append((owner, name, owner.__dict__.get(name) if isinstance(owner, type)
+                                else getattr(owner, name)))
+        setattr(owner, name, value)
+
+    def restore(self):
+        for owner, name, original in reversed(self._originals):
+            setattr(owner, name, original)
+        self._originals = []
+
+
+def install(profiler):
+    """
+    メソッド名 : install メソッド
+    引数 1     : Profiler
+    概要       : arcpy、featureio、ejpyconv.geometry の関数・メソッドを計測する関数に置き換え、_Patches を返す
+    """
+    patches = _Patches()
+
+    # ejpyconv.geometry の配列のジオメトリ
+    for name in KERNEL_METHODS:
+        if name in geometry.Geometry.__dict__:
+            patches.replace(geometry.Geometry, name,
+                            profiler.wrap(u"kernel." + name, GEOMETRY, geometry.Geometry.__dict__[name]))
+
+    # GeoPackage/SQLite の入出力
+    backend = featureio.SQLiteBackend
+    for name in (u"search_cursor", u"insert_cursor"):
+        patches.replace(backend, name, _backend_cursor_factory(profiler, u"sqlite." + name, backend.__dict__[name]))
+    for name in (u"describe", u"exists", u"get_count", u"list_fields", u"create_featureclass", u"add_field",
+                 u"delete_fields"):
+        patches.replace(backend, name, profiler.wrap(u"sqlite." + name, GEOPROCESSING, backend.__dict__[name]))
+
+    try:
+        import arcpy
+    except ImportError:
+        return patches
+
+    # カーソル
+    for name in (u"SearchCursor", u"UpdateCursor", u"InsertCursor"):
+        if hasattr(arcpy.da, name):
+            patches.replace(arcpy.da, name, _cursor_factory(profiler, u"da." + name, getattr(arcpy.da, name)))
+
+    # ジオメトリのメソッド（メソッドを定義しているクラスで置き換え）
+    classes = [getattr(arcpy, name) for name in (u"Geometry", u"PointGeometry", u"Multipoint", u"Polyline",
+                                                 u"Polygon") if hasattr(arcpy, name)]
+    for cls in classes:
+        for name in GEOMETRY_METHODS:
+            method = cls.__dict__.get(name)
+            if callable(method) and not getattr(method, u"__wrapped_by_profiler__", False):
+                patches.replace(cls, name, profiler.wrap(u"Geometry." + name, GEOMETRY, method))
+    for name in (u"AsShape", u"FromWKB", u"FromWKT"):
+        if hasattr(arcpy, name):
+            patches.replace(arcpy, name, profiler.wrap(name, GEOMETRY, getattr(arcpy, name)))
+
+    # ジオプロセシング ツール
+    for name in dir(arcpy):
+        if name.endswith(TOOLBOX_SUFFIXES) or name in GEOPROCESSING_FUNCTIONS:
+            func = getattr(arcpy, name)
+            if callable(func):
+                patches.replace(arcpy, name, profiler.wrap(name, GEOPROCESSING, func))
+    return patches
+
+
+def write_report(profiler, path):
+    """
+    メソッド名 : write_report メソッド
+    引数 1     : Profiler
+    引数 2     : レポートのパス
+    概要       : 計測結果を JSON で出力
+    """
+    folder = os.path.dirname(path)
+    if folder and not os.path.isdir(folder):
+        os.makedirs(folder)
+    with open(path, u"w", encoding=u"utf-8") as f:
+        json.dump(profiler.report(), f, ensure_ascii=False, indent=2)
+
+
+@contextlib.contextmanager
+def profile(tool, out_path):
+    """
+    メソッド名 : profile メソッド
+    引数 1     : ツール名
+    引数 2     : ツールの出力のパス
+    概要       : EJPYCONV_PROFILE が指定されている場合、with 文の中の処理を計測してレポートを出力
+                 指定されていない場合は何もしない
+    """
+    if not enabled():
+        yield None
+        return
+    profiler = Profiler(tool, out_path, int(os.environ.get(PROFILE_TOP_ENV) or DEFAULT_TOP))
+    patches = install(profiler)
+    try:
+        yield profiler
+    finally:
+        profiler.end = time.perf_counter()
+        patches.restore()
+        path = report_path(tool, out_path)
+        write_report(profiler, path)
+        try:
+            import arcpy
+            arcpy.AddMessage(u"プロファイル：{0}".format(path))
+        except ImportError:
+            print(u"プロファイル：{0}".format(path))
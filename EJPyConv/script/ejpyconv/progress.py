@@ -0,0 +1,169 @@
+﻿# coding:utf-8
+"""
+Tool name : EJPyConv 共通モジュール（進捗表示）
+Source    : ejpyconv/progress.py
+Author    : Esri Japan Corporation
+Created   : 2026/10/19
+Updated   :
+
+処理件数の進捗を、一定の時間ごとに 1 秒あたりの処理件数と残り時間の目安とともにメッセージに出力し、
+プログレッサーの位置を更新する
+arcpy.env.isCancelled を確認し、キャンセルされた場合は CancelledError を発生させる
+
+使用例    : progress = Progress(num)
+            for inrow in incur:
+                i = i + 1
+                progress.update(i)
+"""
+
+import os
+import time
+
+
+# メッセージを出力する間隔（秒）を指定する環境変数
+PROGRESS_INTERVAL_ENV = u"EJPYCONV_PROGRESS_INTERVAL"
+
+# 既定のメッセージを出力する間隔（秒）
+DEFAULT_INTERVAL = 10.0
+
+# キャンセルの確認とプログレッサーの位置の更新の間隔（秒）
+CHECK_INTERVAL = 0.5
+
+
+class CancelledError(Exception):
+    """
+    処理がキャンセルされた場合の例外
+    """
+
+    def __init__(self, message=u"処理がキャンセルされました"):
+        Exception.__init__(self, message)
+
+
+def format_seconds(seconds):
+    """
+    メソッド名 : format_seconds メソッド
+    引数 1     : 秒数
+    概要       : 秒数を h:mm:ss（1 時間未満は m:ss）の文字列に変換
+    """
+    seconds = int(round(seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    if hours:
+        return u"{0}:{1:02d}:{2:02d}".format(hours, minutes, seconds)
+    return u"{0}:{1:02d}".format(minutes, seconds)
+
+
+class Progress(object):
+    """
+    処理件数の進捗の表示
+    update はフィーチャごとに呼び出しても、メッセージの出力とプログレッサーの更新は一定の時間ごとにだけ行う
+    """
+
+    def __init__(self, total, label=u"処理中", interval=None):
+        """
+        引数 1     : 処理する件数（不明な場合は None）
+        引数 2     : プログレッサーのラベル
+        引数 3     : メッセージを出力する間隔（秒、省略時は EJPYCONV_PROGRESS_INTERVAL または 10 秒）
+        """
+        try:
+            import arcpy
+        except ImportError:
+            arcpy = None
+        self._arcpy = arcpy
+        self.total = int(total) if total else None
+        self.label = label
+        if interval is None:
+            interval = float(os.environ.get(PROGRESS_INTERVAL_ENV) or DEFAULT_INTERVAL)
+        self.interval = interval
+        self.count = 0
+        self.start = time.perf_counter()
+        self._next_check = self.start + CHECK_INTERVAL
+        # 最初の 1 件は処理の開始として出力
+        self._next_message = self.start
+        self._finished = False
+        if arcpy is not None:
+            if self.total:
+                arcpy.SetProgressor(u"step", label, 0, self.total, 1)
+            else:
+                arcpy.SetProgressor(u"default", label)
+
+    def _message(self, message):
+        if self._arcpy is not None:
+            self._arcpy.AddMessage(message)
+        else:
+            print(message)
+
+    def cancelled(self):
+        """
+        メソッド名 : cancelled メソッド
+        概要       : ジオプロセシングの実行がキャンセルされたか（arcpy.env.isCancelled）
+        """
+        if self._arcpy is None:
+            return False
+        return bool(getattr(self._arcpy.env, u"isCancelled", False))
+
+    def rate(self):
+        elapsed = time.perf_counter() - self.start
+        return self.count / elapsed if elapsed > 0 else None
+
+    def text(self):
+        """
+        メソッド名 : text メソッド
+        概要       : 進捗のメッセージ（件数、1 秒あたりの件数、残り時間の目安）を作成
+        """
+        rate = self.rate()
+        if self.total:
+            s = u"{0}/{1}の処理中・・・".format(self.count, self.total)
+        else:
+            s = u"{0}件目の処理中・・・".format(self.count)
+        if rate:
+            s += u"（{0:.1f} 件/秒".format(rate)
+            if self.total and self.count < self.total:
+                s += u"、残り約 {0}".format(format_seconds((self.total - self.count) / rate))
+            s += u"）"
+        return s
+
+    def update(self, count=None):
+        """
+        メソッド名 : update メソッド
+        引数 1     : 処理した件数（省略時は 1 件追加）
+        概要       : 一定の時間ごとにキャンセルを確認してプログレッサーの位置を更新し、メッセージを出力
+                     最後の 1 件は時間にかかわらず出力
+        """
+        self.count = self.count + 1 if count is None else count
+        now = time.perf_counter()
+        last = self.total is not None and self.count >= self.total
+        if now < self._next_check and now < self._next_message and not last:
+            return
+        if now >= self._next_check:
+            self._next_check = now + CHECK_INTERVAL
+            if self.cancelled():
+                self.finish(False)
+                raise CancelledError()
+            if self._arcpy is not None and self.total:
+                self._arcpy.SetProgressorPosition(min(self.count, self.total))
+        if now >= self._next_message or last:
+            self._next_message = now + self.interval
+            self._message(self.text())
+        if last:
+            self.finish(False)
+
+    def finish(self, message=True):
+        """
+        メソッド名 : finish メソッド
+        引数 1     : True の場合は最後の進捗をメッセージに出力
+        概要       : プログレッサーを元に戻す
+        """
+        if self._finished:
+            return
+        self._finished = True
+        if message:
+            self._message(self.text())
+        if self._arcpy is not None:
+            self._arcpy.ResetProgressor()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.finish(False)
@@ -0,0 +1,105 @@
+﻿# coding:utf-8
+"""
+Tool name : EJPyConv 共通モジュール（ツールの関数）
+Source    : ejpyconv/tools.py
+Author    : Esri Japan Corporation
+Created   : 2026/10/19
+Updated   :
+
+各ツールの処理を、ツールのパラメータと同じ順の引数をとる関数として呼び出す
+ツールのスクリプト（と arcpy、scipy）は最初に呼び出されたときに読み込み、以降は読み込んだ関数を再利用する
+このモジュールの読み込み自体では arcpy を読み込まない
+
+使用例    : from ejpyconv import tools
+            tools.run(u"PolyToLine", r"C:\\data\\city.gdb\\parcel", r"C:\\data\\city.gdb\\parcel_line")
+            polygon_line = tools.load(u"PolyToLine")
+"""
+
+import importlib
+import os
+import sys
+from collections import OrderedDict
+
+
+# ツールのスクリプトを置くフォルダ
+SCRIPT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# ツール名（スクリプトのモジュール名） → （処理の関数名、出力のパラメータのインデックス番号）
+TOOLS = OrderedDict([
+    (u"CreateConvexhull", (u"create_convexhull", 1)),
+    (u"CreateInsideBuffer", (u"create_inside_buffer", 1)),
+    (u"CutPolyWithLine", (u"cut_polygon", 2)),
+    (u"DelOverlapPoly", (u"del_overlap_poly", 2)),
+    (u"LineJunctionPtToPt", (u"linejunction_point", 1)),
+    (u"LineMidPtToPt", (u"linemiddlepoint_point", 1)),
+    (u"LineStartingAndEndingPtToPt", (u"lineendpoint_point", 1)),
+    (u"LineVertexToPt", (u"linevertex_point", 1)),
+    (u"PolyCenterToPt", (u"polygon_point", 1)),
+    (u"PolyFillingUp", (u"poly_filling_up", 1)),
+    (u"PolyToLine", (u"polygon_line", 1)),
+    (u"PolyVertexToPt", (u"polyvertex_point", 1)),
+    (u"ProportionalDivisionArea", (u"proportional_division_area", 3)),
+    (u"PtToPoly", (u"point_polygon", 1)),
+    (u"SpiderGraph", (u"spider_graph", 2)),
+    (u"SplitLineAtPt", (u"split_line_pt", 2)),
+    (u"Thiessen", (u"thiessen", 1)),
+])
+
+
+class ToolNotFoundError(KeyError):
+    """
+    指定したツールがない場合の例外
+    """
+
+    def __init__(self, name):
+        KeyError.__init__(self, u"ツール {0} はありません（{1}）".format(name, u", ".join(TOOLS)))
+
+    def __str__(self):
+        # KeyError は引用符付きの表記になるため、メッセージをそのまま返す
+        return self.args[0]
+
+
+def names():
+    """
+    メソッド名 : names メソッド
+    概要       : ツール名のリスト
+    """
+    return list(TOOLS)
+
+
+def output_index(name):
+    """
+    メソッド名 : output_index メソッド
+    引数 1     : ツール名
+    概要       : 出力のパラメータのインデックス番号（関数の引数の位置）
+    """
+    if name not in TOOLS:
+        raise ToolNotFoundError(name)
+    return TOOLS[name][1]
+
+
+def load(name):
+    """
+    メソッド名 : load メソッド
+    引数 1     : ツール名
+    概要       : ツールの処理の関数を取得（スクリプトは最初の 1 回だけ読み込む）
+    """
+    if name not in TOOLS:
+        raise ToolNotFoundError(name)
+    # ツールのスクリプトは ejpyconv と同じフォルダにあるため、モジュール名で読み込めるようにする
+    # （CreateInsideBuffer のプロセス プールの子プロセスも同じ名前で読み込む）
+    if SCRIPT_DIR not in sys.path:
+        sys.path.insert(0, SCRIPT_DIR)
+    module = importlib.import_module(name)
+    return getattr(module, TOOLS[name][0])
+
+
+def run(name, *args, **kwargs):
+    """
+    メソッド名 : run メソッド
+    引数 1     : ツール名
+    引数 2 以降: ツールのパラメータ（ツールのパラメータと同じ順、またはキーワード引数）
+    概要       : ツールの処理を実行
+                 エラーは各ツールと同じく arcpy.AddError でメッセージに出力する
+    """
+    return load(name)(*args, **kwargs)
@@ -0,0 +1,462 @@
+﻿# coding:utf-8
+"""
+Tool name : EJPyConv 共通モジュール（常駐ワーカー）
+Source    : ejpyconv/worker.py
+Author    : Esri Japan Corporation
+Created   : 2026/10/19
+Updated   : 2026/10/19
+
+ツールの関数を読み込んだプロセス プールを常駐させ、ローカルのソケットで受け付けたジョブ（ツール名とパラメータ）を実行する
+arcpy の読み込みとライセンスの取得はプールの各プロセスの起動時に 1 回だけ行い、ジョブごとの処理時間を短縮する
+ジョブごとに ejpyconv.fieldinfo のキャッシュ、インメモリ ワークスペース、環境設定を初期化し、
+ツールのメッセージ、状態、処理時間を結果として返す
+
+接続の認証キーは環境変数 EJPYCONV_WORKER_KEY、未設定の場合はホーム フォルダの .ejpyconv_worker_key
+（serve の初回に乱数で作成し、所有者だけが読み書きできるようにする）を使用する
+要求は pickle で受け取るため、認証キーを知っている利用者はワーカーで任意のコードを実行できる
+ローカル以外のアドレスで待ち受ける場合は、EJPYCONV_WORKER_KEY の指定が必要
+
+使用例    : python -m ejpyconv.worker serve --processes 4
+            python -m ejpyconv.worker submit jobs.json --output results.json
+            python -m ejpyconv.worker status
+            python -m ejpyconv.worker shutdown
+            jobs.json はジョブのリスト（例：[{"tool": "PolyToLine", "params": ["C:/data/a.gdb/poly", "C:/data/a.gdb/line"]}]）
+            params はツールのパラメータと同じ順の値（Boolean、数値は JSON の true/false、数値で指定）
+
+            Python からの使用例：
+            from ejpyconv import worker
+            results = worker.submit([{u"tool": u"PolyToLine", u"params": [in_fc, out_fc]}])
+"""
+
+import argparse
+import ipaddress
+import json
+import os
+import secrets
+import socket
+import stat
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+
+from ejpyconv import fieldinfo, profiling, tools
+
+
+# 既定の待ち受けのアドレス（ローカルのみ）とポート番号
+DEFAULT_HOST = u"127.0.0.1"
+DEFAULT_PORT = 6543
+
+# 接続の認証キーを指定する環境変数
+AUTHKEY_ENV = u"EJPYCONV_WORKER_KEY"
+
+# 環境変数を指定しない場合の認証キーのファイル
+KEY_FILE = os.path.join(os.path.expanduser(u"~"), u".ejpyconv_worker_key")
+
+
+def read_key_file(path):
+    """
+    メソッド名 : read_key_file メソッド
+    引数 1     : 認証キーのファイル
+    概要       : 認証キーを読み込む（所有者以外も読み書きできるファイルは使用しない）
+    """
+    if os.name == u"posix" and os.stat(path).st_mode & (stat.S_IRWXG | stat.S_IRWXO):
+        raise RuntimeError(u"{0} は所有者以外も読み書きできるため使用できません（chmod 600 を実行してください）".format(path))
+    with open(path, encoding=u"utf-8") as f:
+        key = f.read().strip()
+    if not key:
+        raise RuntimeError(u"{0} に認証キーがありません".format(path))
+    return key
+
+
+def create_key_file(path):
+    """
+    メソッド名 : create_key_file メソッド
+    引数 1     : 認証キーのファイル
+    概要       : 乱数の認証キーを所有者だけが読み書きできるファイルに作成
+    """
+    key = secrets.token_hex(32)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, u"w", encoding=u"utf-8") as f:
+        f.write(key)
+    return key
+
+
+def authkey(create=False):
+    """
+    メソッド名 : authkey メソッド
+    引数 1     : True の場合は認証キーのファイルがなければ作成（serve）
+    概要       : 接続の認証キー（環境変数 EJPYCONV_WORKER_KEY、未設定の場合は認証キーのファイル）
+    """
+    key = os.environ.get(AUTHKEY_ENV)
+    if not key:
+        if os.path.exists(KEY_FILE):
+            key = read_key_file(KEY_FILE)
+        elif create:
+            key = create_key_file(KEY_FILE)
+        else:
+            raise RuntimeError(u"認証キーがありません。{0} を指定するか、先にワーカーを起動してください".format(AUTHKEY_ENV))
+    return key.encode(u"utf-8")
+
+
+def is_loopback(host):
+    """
+    メソッド名 : is_loopback メソッド
+    引数 1     : アドレスまたはホスト名
+    概要       : ローカル（ループバック）のアドレスか
+    """
+    try:
+        return ipaddress.ip_address(socket.gethostbyname(host)).is_loopback
+    except (OSError, ValueError):
+        return False
+
+
+# ---------------------------------------------------------------------------
+# プールのプロセスで実行する処理
+# ---------------------------------------------------------------------------
+
+# プールのプロセスで ejpyconv.fakearcpy を使用しているか
+_FAKE_ARCPY = False
+
+
+def init_process(fake_arcpy=False):
+    """
+    メソッド名 : init_process メソッド
+    引数 1     : True の場合は arcpy を ejpyconv.fakearcpy に置き換える
+    概要       : プールのプロセスの初期化（arcpy とツールの関数を読み込む）
+    """
+    global _FAKE_ARCPY
+    _FAKE_ARCPY = fake_arcpy
+    if fake_arcpy:
+        from ejpyconv import fakearcpy
+        fakearcpy.install()
+        fakearcpy.workspace.echo = False
+    # arcpy の読み込み（ライセンスの取得）はプロセスごとに 1 回だけ
+    import arcpy
+    for name in tools.names():
+        tools.load(name)
+
+
+def run_job(job):
+    """
+    メソッド名 : run_job メソッド
+    引数 1     : ジョブの辞書（id、tool、params、kwargs、submitted）
+    概要       : ツールの関数を実行し、状態、メッセージ、処理時間の辞書を返す
+                 ツールは例外を AddError で出力するため、AddError の有無でエラーを判定
+    """
+    import arcpy
+
+    start = time.time()
+    result = OrderedDict([(u"id", job.get(u"id")), (u"tool", job.get(u"tool")), (u"status", u"ok"),
+                          (u"message", u""), (u"pid", os.getpid()),
+                          (u"queued", max(start - job.get(u"submitted", start), 0.0)),
+                          (u"wall_time", None), (u"messages", [])])
+    messages = result[u"messages"]
+
+    def recorder(severity):
+        def record(message):
+            messages.append([severity, u"{0}".format(message)])
+        return record
+
+    # 前のジョブの出力を同じパスに作り直す場合があるため、Describe とフィールドの情報を読み直す
+    fieldinfo.clear_cache()
+    if _FAKE_ARCPY:
+        from ejpyconv import fakearcpy
+        fakearcpy.reset()
+    else:
+        # 前のジョブ（エラーで終了したジョブを含む）の一時データと環境設定を残さない
+        # （memory/dissolve などが残っていると、同じ名前で作成するツールが失敗する）
+        for memory_workspace in (u"memory", u"in_memory"):
+            try:
+                arcpy.Delete_management(memory_workspace)
+            except Exception:
+                pass
+        arcpy.ResetEnvironments()
+    originals = (arcpy.AddMessage, arcpy.AddWarning, arcpy.AddError)
+    arcpy.AddMessage, arcpy.AddWarning, arcpy.AddError = recorder(0), recorder(1), recorder(2)
+    begin = time.perf_counter()
+    try:
+        tool = job.get(u"tool")
+        params = list(job.get(u"params") or [])
+        kwargs = dict(job.get(u"kwargs") or {})
+        index = tools.output_index(tool)
+        out_path = params[index] if index < len(params) else u""
+        with profiling.profile(tool, out_path):
+            tools.run(tool, *params, **kwargs)
+    except Exception as e:
+        messages.append([2, u"{0}: {1}".format(type(e).__name__, e)])
+    finally:
+        arcpy.AddMessage, arcpy.AddWarning, arcpy.AddError = originals
+    result[u"wall_time"] = time.perf_counter() - begin
+
+    errors = [message for severity, message in messages if severity == 2]
+    if errors:
+        result[u"status"] = u"error"
+        result[u"message"] = errors[0]
+    return result
+
+
+# ---------------------------------------------------------------------------
+# サーバー
+# ---------------------------------------------------------------------------
+
+class WorkerServer(object):
+    """
+    ジョブを受け付けてプロセス プールで実行するサーバー
+    接続ごとにスレッドで要求（run、status、shutdown）を処理する
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, processes=None, fake_arcpy=False):
+        # ローカル以外から接続できる場合は、ファイルに作成した認証キーではなく明示的に指定した認証キーに限る
+        if not is_loopback(host) and not os.environ.get(AUTHKEY_ENV):
+            raise RuntimeError(u"ローカル以外のアドレス {0} で待ち受けるには {1} を指定してください".format(host, AUTHKEY_ENV))
+        self.address = (host, port)
+        self.processes = processes or os.cpu_count() or 1
+        self.fake_arcpy = fake_arcpy
+        self.started = None
+        self.executor = None
+        self.listener = None
+        self._lock = threading.Lock()
+        self._next_id = 0
+        self._running = 0
+        self._counts = OrderedDict([(u"ok", 0), (u"error", 0)])
+        self._stopping = False
+
+    def _job_id(self):
+        with self._lock:
+            self._next_id += 1
+            return self._next_id
+
+    def _done(self, future):
+        with self._lock:
+            self._running -= 1
+            try:
+                status = future.result()[u"status"]
+            except Exception:
+                status = u"error"
+            self._counts[status] = self._counts.get(status, 0) + 1
+
+    def submit(self, job):
+        """
+        メソッド名 : submit メソッド
+        引数 1     : ジョブの辞書（tool、params、kwargs、id は省略可）
+        概要       : ジョブをプロセス プールに追加し、Future を返す
+        """
+        job = dict(job)
+        if job.get(u"id") is None:
+            job[u"id"] = self._job_id()
+        job[u"submitted"] = time.time()
+        with self._lock:
+            self._running += 1
+        future = self.executor.submit(run_job, job)
+        future.add_done_callback(self._done)
+        return future
+
+    def status(self):
+        with self._lock:
+            return OrderedDict([(u"pid", os.getpid()), (u"processes", self.processes),
+                                (u"fake_arcpy", self.fake_arcpy),
+                                (u"uptime", time.time() - self.started), (u"running", self._running),
+                                (u"completed", dict(self._counts))])
+
+    def handle(self, conn):
+        """
+        メソッド名 : handle メソッド
+        引数 1     : クライアントとの接続
+        概要       : 要求を処理して応答を返す（run はすべてのジョブの完了を待って結果のリストを返す）
+        """
+        try:
+            while True:
+                try:
+                    request = conn.recv()
+                except EOFError:
+                    break
+                command = request.get(u"command")
+                if command == u"run":
+                    jobs = request.get(u"jobs") or []
+                    futures = []
+                    for job in jobs:
+                        try:
+                            futures.append(self.submit(job))
+                        except Exception as e:
+                            futures.append(e)
+                    results = []
+                    for job, future in zip(jobs, futures):
+                        try:
+                            if isinstance(future, Exception):
+                                raise future
+                            results.append(future.result())
+                        except Exception as e:
+                            # プロセスの異常終了などでジョブの結果を取得できない場合
+                            results.append(OrderedDict([(u"id", job.get(u"id")), (u"tool", job.get(u"tool")),
+                                                        (u"status", u"error"),
+                                                        (u"message", u"{0}: {1}".format(type(e).__name__, e))]))
+                    conn.send(OrderedDict([(u"status", u"ok"), (u"results", results)]))
+                elif command == u"status":
+                    conn.send(OrderedDict([(u"status", u"ok"), (u"server", self.status())]))
+                elif command == u"shutdown":
+                    conn.send(OrderedDict([(u"status", u"ok")]))
+                    self.stop()
+                    break
+                else:
+                    conn.send(OrderedDict([(u"status", u"error"),
+                                           (u"message", u"不明な要求です：{0}".format(command))]))
+        finally:
+            conn.close()
+
+    def stop(self):
+        """
+        メソッド名 : stop メソッド
+        概要       : 受け付けを終了（待ち受けているスレッドを接続して起こす）
+        """
+        self._stopping = True
+        try:
+            Client(self.address, authkey=authkey()).close()
+        except (OSError, EOFError):
+            pass
+
+    def serve_forever(self):
+        """
+        メソッド名 : serve_forever メソッド
+        概要       : プロセス プールを起動し、shutdown の要求まで接続を受け付ける
+                     実行中のジョブは完了を待ってから終了
+        """
+        self.started = time.time()
+        self.executor = ProcessPoolExecutor(self.processes, initializer=init_process,
+                                            initargs=(self.fake_arcpy,))
+        # 最初のジョブの前に、すべてのプロセスで arcpy とツールを読み込んでおく
+        for future in [self.executor.submit(os.getpid) for _ in range(self.processes)]:
+            future.result()
+        self.listener = Listener(self.address, authkey=authkey(create=True))
+        print(u"待ち受け中：{0}:{1}（プロセス数 {2}）".format(self.address[0], self.address[1], self.processes))
+        sys.stdout.flush()
+        try:
+            while not self._stopping:
+                try:
+                    conn = self.listener.accept()
+                except (OSError, EOFError, AuthenticationError):
+                    # 認証に失敗した接続など
+                    continue
+                if self._stopping:
+                    conn.close()
+                    break
+                thread = threading.Thread(target=self.handle, args=(conn,))
+                thread.daemon = True
+                thread.start()
+        finally:
+            self.listener.close()
+            self.executor.shutdown(wait=True)
+        print(u"終了：{0}".format(json.dumps(self.status()[u"completed"], ensure_ascii=False)))
+
+
+# ---------------------------------------------------------------------------
+# クライアント
+# ---------------------------------------------------------------------------
+
+def request(message, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """
+    メソッド名 : request メソッド
+    引数 1     : 要求の辞書
+    引数 2     : サーバーのアドレス
+    引数 3     : サーバーのポート番号
+    概要       : サーバーに要求を送り、応答の辞書を返す
+    """
+    conn = Client((host, port), authkey=authkey())
+    try:
+        conn.send(message)
+        return conn.recv()
+    finally:
+        conn.close()
+
+
+def submit(jobs, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """
+    メソッド名 : submit メソッド
+    引数 1     : ジョブの辞書のリスト（tool：ツール名、params：パラメータのリスト、kwargs：キーワード引数）
+    引数 2     : サーバーのアドレス
+    引数 3     : サーバーのポート番号
+    概要       : ジョブを実行し、ジョブごとの結果（status、message、queued、wall_time、messages）のリストを返す
+    """
+    response = request({u"command": u"run", u"jobs": list(jobs)}, host, port)
+    if response[u"status"] != u"ok":
+        raise RuntimeError(response.get(u"message"))
+    return response[u"results"]
+
+
+def format_result(result):
+    wall_time = result.get(u"wall_time")
+    return u"{0:>6} {1:<28} {2:<6} {3:>10} {4:>9}  {5}".format(
+        result.get(u"id"), result.get(u"tool"), result[u"status"],
+        u"{0:.3f}s".format(wall_time) if wall_time is not None else u"-",
+        u"{0:.3f}s".format(result[u"queued"]) if result.get(u"queued") is not None else u"-",
+        result.get(u"message", u""))
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog=u"python -m ejpyconv.worker",
+                                     description=u"EJPyConv ツールの常駐ワーカー")
+    parser.add_argument(u"--host", default=DEFAULT_HOST, help=u"待ち受け（接続先）のアドレス（ローカル以外は EJPYCONV_WORKER_KEY の指定が必要）")
+    parser.add_argument(u"--port", type=int, default=DEFAULT_PORT, help=u"待ち受け（接続先）のポート番号")
+    commands = parser.add_subparsers(dest=u"command")
+    commands.required = True
+
+    serve = commands.add_parser(u"serve", help=u"ワーカーを起動")
+    serve.add_argument(u"--processes", type=int, default=0,
+                       help=u"同時に実行するジョブの数（既定は CPU のコア数）")
+    serve.add_argument(u"--fake-arcpy", action=u"store_true",
+                       help=u"arcpy の代わりに ejpyconv.fakearcpy（メモリ上の代替モジュール、shapely が必要）で実行")
+
+    run = commands.add_parser(u"submit", help=u"ジョブの JSON ファイルを実行")
+    run.add_argument(u"jobs", help=u"ジョブのリストの JSON ファイル（- の場合は標準入力）")
+    run.add_argument(u"--output", default=u"", help=u"結果の JSON ファイル")
+
+    commands.add_parser(u"status", help=u"ワーカーの状態を表示")
+    commands.add_parser(u"shutdown", help=u"ワーカーを終了")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    options = parse_args(argv)
+    try:
+        return run_command(options)
+    except (RuntimeError, OSError, AuthenticationError) as e:
+        sys.stderr.write(u"{0}\n".format(e))
+        return 2
+
+
+def run_command(options):
+    """
+    メソッド名 : run_command メソッド
+    引数 1     : コマンドラインのオプション
+    概要       : serve、submit、status、shutdown を実行して終了コードを返す
+    """
+    if options.command == u"serve":
+        WorkerServer(options.host, options.port, options.processes or None, options.fake_arcpy).serve_forever()
+        return 0
+
+    if options.command == u"submit":
+        if options.jobs == u"-":
+            jobs = json.load(sys.stdin)
+        else:
+            with open(options.jobs, encoding=u"utf-8") as f:
+                jobs = json.load(f)
+        if isinstance(jobs, dict):
+            jobs = [jobs]
+        results = submit(jobs, options.host, options.port)
+        for result in results:
+            print(format_result(result))
+        if options.output:
+            with open(options.output, u"w", encoding=u"utf-8") as f:
+                json.dump(results, f, ensure_ascii=False, indent=2)
+        return 1 if any(result[u"status"] != u"ok" for result in results) else 0
+
+    response = request({u"command": options.command}, options.host, options.port)
+    print(json.dumps(response, ensure_ascii=False, indent=2))
+    return 0 if response[u"status"] == u"ok" else 1
+
+
+if __name__ == u"__main__":
+    sys.exit(main())
@@ -0,0 +1,11 @@
+﻿# coding:utf-8
+"""
+Tool name : EJPyConv テスト
+Source    : tests/__init__.py
+Author    : Esri Japan Corporation
+Created   : 2026/10/19
+Updated   :
+
+ejpyconv の共通モジュールとツールの処理のテスト（arcpy を使用しない部分）
+実行方法  : EJPyConv/script フォルダで python -m pytest -q tests
+"""
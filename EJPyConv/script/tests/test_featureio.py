@@ -0,0 +1,145 @@
+﻿# coding:utf-8
+"""
+Tool name : EJPyConv テスト（GeoPackage/SQLite の入出力）
+Source    : tests/test_featureio.py
+Author    : Esri Japan Corporation
+Created   : 2026/10/19
+Updated   :
+"""
+
+import json
+import sqlite3
+import struct
+
+import pytest
+
+from ejpyconv import featureio
+
+
+SRS_ID = 6668
+
+# 穴のあるポリゴンと穴のないポリゴンのマルチパートのポリゴン
+MULTIPOLYGON = {u"rings": [[[0.0, 0.0], [0.0, 10.0], [10.0, 10.0], [10.0, 0.0], [0.0, 0.0]],
+                           [[1.0, 1.0], [3.0, 1.0], [3.0, 3.0], [1.0, 3.0], [1.0, 1.0]],
+                           [[20.0, 0.0], [20.0, 10.0], [30.0, 10.0], [30.0, 0.0], [20.0, 0.0]]]}
+MULTILINE = {u"paths": [[[0.0, 0.0], [1.0, 1.0]], [[2.0, 2.0], [3.0, 3.0], [4.0, 2.0]]]}
+
+
+@pytest.fixture
+def backend():
+    backend = featureio.SQLiteBackend()
+    yield backend
+    backend.close()
+
+
+def create(backend, tmp_path, name, shape_type):
+    db_path = str(tmp_path / u"test.gpkg")
+    backend.create_featureclass(db_path, name, shape_type, u"", SRS_ID)
+    backend.add_field(db_path + u"/" + name, u"NAME", u"String", 20)
+    return db_path
+
+
+def shapes(backend, path, token=u"SHAPE@JSON"):
+    with backend.search_cursor(path, [u"NAME", token]) as cursor:
+        return dict((row[0], row[1]) for row in cursor)
+
+
+def test_polygon_round_trip_with_null_and_multipart(backend, tmp_path):
+    db_path = create(backend, tmp_path, u"main.parcels", u"POLYGON")
+    path = db_path + u"/main.parcels"
+    with backend.insert_cursor(path, [u"NAME", u"SHAPE@JSON"]) as cursor:
+        cursor.insertRow([u"multi", json.dumps(MULTIPOLYGON)])
+        cursor.insertRow([u"null", None])
+
+    result = shapes(backend, path)
+    assert result[u"null"] is None
+    assert json.loads(result[u"multi"]) == dict(MULTIPOLYGON, spatialReference={u"wkid": SRS_ID})
+
+
+def test_polyline_round_trip_through_wkb(backend, tmp_path):
+    db_path = create(backend, tmp_path, u"roads", u"POLYLINE")
+    path = db_path + u"/roads"
+    wkb = featureio.json_to_wkb(json.dumps(MULTILINE))
+    with backend.insert_cursor(path, [u"NAME", u"SHAPE@WKB"]) as cursor:
+        cursor.insertRow([u"multi", wkb])
+        cursor.insertRow([u"null", None])
+
+    result = shapes(backend, path, u"SHAPE@WKB")
+    assert result[u"multi"] == wkb
+    assert result[u"null"] is None
+    assert json.loads(featureio.wkb_to_json(result[u"multi"])) == MULTILINE
+
+
+def test_main_prefix_is_stripped_from_table_name(backend, tmp_path):
+    db_path = create(backend, tmp_path, u"main.parcels", u"POLYGON")
+    with backend.insert_cursor(db_path + u"/parcels", [u"NAME", u"SHAPE@JSON"]) as cursor:
+        cursor.insertRow([u"multi", json.dumps(MULTIPOLYGON)])
+
+    conn = sqlite3.connect(db_path)
+    try:
+        tables = [row[0] for row in conn.execute(u"SELECT name FROM sqlite_master WHERE type = 'table'")]
+        assert u"parcels" in tables
+        assert u"main.parcels" not in tables
+        assert conn.execute(u"SELECT table_name, data_type, srs_id FROM gpkg_contents").fetchall() == \
+            [(u"parcels", u"features", SRS_ID)]
+        assert conn.execute(u"SELECT table_name, column_name, geometry_type_name FROM gpkg_geometry_columns") \
+            .fetchall() == [(u"parcels", u"geom", u"MULTIPOLYGON")]
+    finally:
+        conn.close()
+
+    for name in (u"parcels", u"main.parcels", u"MAIN.parcels"):
+        assert backend.exists(db_path + u"/" + name)
+        assert backend.get_count(db_path + u"/" + name) == 1
+    assert not backend.exists(db_path + u"/main.roads")
+
+    desc = backend.describe(db_path + u"/main.parcels")
+    assert desc.name == u"parcels"
+    assert desc.shapeType == u"Polygon"
+    assert desc.spatialReference == SRS_ID
+    assert [field.name for field in desc.Fields] == [u"fid", u"geom", u"NAME"]
+
+
+def test_geometry_is_stored_with_geopackage_header(backend, tmp_path):
+    db_path = create(backend, tmp_path, u"roads", u"POLYLINE")
+    with backend.insert_cursor(db_path + u"/roads", [u"NAME", u"SHAPE@JSON"]) as cursor:
+        cursor.insertRow([u"multi", json.dumps(MULTILINE)])
+
+    conn = sqlite3.connect(db_path)
+    try:
+        assert conn.execute(u"PRAGMA application_id").fetchone()[0] == 1196444487
+        blob = bytes(conn.execute(u"SELECT geom FROM roads").fetchone()[0])
+    finally:
+        conn.close()
+
+    # マジック「GP」、バージョン 0、フラグ（エンベロープなし、リトルエンディアン）、空間参照 ID
+    assert blob[:4] == b"GP\x00\x01"
+    assert struct.unpack(u"<i", blob[4:8])[0] == SRS_ID
+    assert featureio.gpkg_wkb(blob) == featureio.json_to_wkb(json.dumps(MULTILINE))
+    # ヘッダーのない WKB はそのまま返す
+    assert featureio.gpkg_wkb(blob[8:]) == blob[8:]
+
+
+def test_gpkg_wkb_skips_envelope():
+    wkb = featureio.point_wkb(1.0, 2.0)
+    # エンベロープ [minx, maxx, miny, maxy]（フラグ 0x03）
+    blob = b"GP\x00\x03" + struct.pack(u"<i4d", SRS_ID, 1.0, 1.0, 2.0, 2.0) + wkb
+    assert featureio.gpkg_wkb(blob) == wkb
+
+
+def test_insert_cursor_writes_in_batches(backend, tmp_path, monkeypatch):
+    monkeypatch.setattr(featureio, u"INSERT_BATCH_SIZE", 3)
+    db_path = create(backend, tmp_path, u"main.points", u"POINT")
+    path = db_path + u"/main.points"
+
+    cursor = backend.insert_cursor(path, [u"NAME", u"SHAPE@XY"])
+    for i in range(7):
+        cursor.insertRow([u"p{0}".format(i), (float(i), float(i * 2))])
+        # INSERT_BATCH_SIZE 行ごとに executemany で書き込み、残りはバッファーに保持
+        assert backend.get_count(path) == (i + 1) // 3 * 3
+    cursor.close()
+    assert backend.get_count(path) == 7
+
+    backend.close()
+    with backend.search_cursor(path, [u"NAME", u"SHAPE@XY"]) as cursor:
+        rows = sorted(cursor)
+    assert rows == [(u"p{0}".format(i), (float(i), float(i * 2))) for i in range(7)]
@@ -0,0 +1,96 @@
+﻿# coding:utf-8
+"""
+Tool name : EJPyConv テスト（フィールド情報）
+Source    : tests/test_fieldinfo.py
+Author    : Esri Japan Corporation
+Created   : 2026/10/19
+Updated   :
+"""
+
+import os
+
+import pytest
+
+from ejpyconv import featureio, fieldinfo
+
+
+@pytest.fixture
+def sqlite_backend():
+    backend = featureio.set_backend(featureio.SQLiteBackend())
+    fieldinfo.clear_cache()
+    yield backend
+    featureio.set_backend(None)
+    fieldinfo.clear_cache()
+
+
+def create_table(db_path, name, fields):
+    featureio.create_featureclass(db_path, name, u"POINT", u"", 6668)
+    for field_name, field_type in fields:
+        featureio.add_field(db_path + u"/" + name, field_name, field_type)
+    featureio.get_backend().close()
+
+
+def test_row_transform_substitutes_nulls_for_shapefile():
+    transform = fieldinfo.create_row_transform(
+        [u"String", u"Double", u"Integer", u"SmallInteger", u"Single", u"Date"], u"FileSystem")
+    row = (None, None, None, None, None, None, b"wkb")
+    assert transform(row) == [u"", 0, 0, 0, 0, None, b"wkb"]
+    # NULL 以外の値はそのまま
+    assert transform((u"a", 1.5, 2, 3, 4.5, None, None)) == [u"a", 1.5, 2, 3, 4.5, None, None]
+
+
+def test_row_transform_keeps_nulls_of_non_nullable_fields():
+    transform = fieldinfo.create_row_transform([u"String", u"Double"], u"FileSystem", [False, True])
+    assert transform((None, None, b"wkb")) == [None, 0, b"wkb"]
+
+
+def test_row_transform_is_list_without_substitutes():
+    # GDB は NULL 値を格納可能
+    assert fieldinfo.create_row_transform([u"String", u"Double"], u"LocalDatabase") is list
+    # 代替値のないタイプと NULL を許可しないフィールドだけの場合
+    assert fieldinfo.create_row_transform([u"Date", u"String"], u"FileSystem", [True, False]) is list
+
+
+def test_field_plan_is_cached(sqlite_backend, tmp_path, monkeypatch):
+    db_path = str(tmp_path / u"test.gpkg")
+    create_table(db_path, u"points", [(u"NAME", u"String"), (u"VALUE", u"Double")])
+
+    calls = []
+    describe = featureio.describe
+    monkeypatch.setattr(featureio, u"describe", lambda path: calls.append(path) or describe(path))
+
+    plan = fieldinfo.field_plan(db_path + u"/points")
+    assert plan[0] == (u"NAME", u"VALUE")
+    assert plan[1] == (u"String", u"Double")
+    assert fieldinfo.field_plan(db_path + u"/points") is plan
+    assert calls == [db_path + u"/points"]
+
+
+def test_field_plan_is_reread_when_dataset_is_recreated(sqlite_backend, tmp_path):
+    db_path = str(tmp_path / u"test.gpkg")
+    create_table(db_path, u"points", [(u"NAME", u"String")])
+    # 作り直したファイルと更新日時が必ず異なるよう、過去の日時にする
+    os.utime(db_path, (0, 0))
+    assert fieldinfo.field_plan(db_path + u"/points")[0] == (u"NAME",)
+
+    # 同じパスに別のフィールド構成のテーブルを作り直す
+    featureio.get_backend().close()
+    os.remove(db_path)
+    create_table(db_path, u"points", [(u"CODE", u"Integer"), (u"LABEL", u"String")])
+    plan = fieldinfo.field_plan(db_path + u"/points")
+    assert plan[0] == (u"CODE", u"LABEL")
+    assert plan[1] == (u"Integer", u"String")
+
+
+def test_clear_cache_drops_describe_results(monkeypatch):
+    calls = []
+    monkeypatch.setattr(featureio, u"describe", lambda path: calls.append(path) or object())
+    fieldinfo.clear_cache()
+
+    # ディスクに存在しないデータは更新日時で判定できないため、clear_cache まではキャッシュを使用
+    desc = fieldinfo.describe(u"memory/points")
+    assert fieldinfo.describe(u"memory/points") is desc
+    fieldinfo.clear_cache()
+    assert fieldinfo.describe(u"memory/points") is not desc
+    assert calls == [u"memory/points", u"memory/points"]
+    fieldinfo.clear_cache()
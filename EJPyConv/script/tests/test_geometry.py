@@ -0,0 +1,111 @@
+﻿# coding:utf-8
+"""
+Tool name : EJPyConv テスト（配列によるジオメトリ）
+Source    : tests/test_geometry.py
+Author    : Esri Japan Corporation
+Created   : 2026/10/19
+Updated   :
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+from ejpyconv import featureio, geometry
+
+
+# ArcGIS の向き（exterior ring は時計回り、interior ring は反時計回り）の 10 × 10 の正方形と 2 × 2 の穴
+SQUARE = [[0, 0], [0, 10], [10, 10], [10, 0], [0, 0]]
+HOLE = [[1, 1], [3, 1], [3, 3], [1, 3], [1, 1]]
+
+
+def polygon(*rings):
+    return geometry.from_json({u"rings": list(rings)})
+
+
+def test_ring_areas_are_signed_by_orientation():
+    poly = polygon(SQUARE, HOLE)
+    np.testing.assert_allclose(poly.ring_areas(), [-100.0, 4.0])
+    assert poly.is_hole().tolist() == [False, True]
+    assert poly.area == pytest.approx(96.0)
+
+
+def test_from_wkb_orients_exterior_clockwise_and_holes_counterclockwise():
+    # OGC の向き（exterior ring は反時計回り、interior ring は時計回り）の WKB
+    wkb = featureio.json_to_wkb(json.dumps({u"rings": [SQUARE, HOLE]}))
+    poly = geometry.from_wkb(wkb)
+    np.testing.assert_allclose(poly.ring_areas(), [-100.0, 4.0])
+    assert poly.area == pytest.approx(96.0)
+
+
+def test_ring_areas_keep_precision_with_large_coordinates():
+    # 平面直角座標系の値に近い大きな座標でも、リングの先頭の頂点を原点として計算する
+    x0, y0 = 1.0e7, -1.0e7
+    ring = [[x0 + x, y0 + y] for x, y in [[0, 0], [0, 0.1], [0.1, 0.1], [0.1, 0], [0, 0]]]
+    assert polygon(ring).area == pytest.approx(0.01, rel=1e-6)
+
+
+def test_centroid_of_square_with_hole():
+    # (100 × (5, 5) − 4 × (2, 2)) / 96
+    cx, cy = polygon(SQUARE, HOLE).centroid()
+    assert cx == pytest.approx(492.0 / 96.0)
+    assert cy == pytest.approx(492.0 / 96.0)
+
+
+def test_centroid_of_square_with_large_coordinates():
+    ring = [[x + 5.0e6, y + 5.0e6] for x, y in SQUARE]
+    cx, cy = polygon(ring).centroid()
+    assert cx == pytest.approx(5.0e6 + 5.0, abs=1e-6)
+    assert cy == pytest.approx(5.0e6 + 5.0, abs=1e-6)
+
+
+def test_interpolate_at_ends_and_across_parts():
+    # 2 つのパートのライン（パートの境界をまたぐ組は距離に含めない）
+    line = geometry.from_json({u"paths": [[[0, 0], [10, 0]], [[100, 0], [100, 5], [100, 10]]]})
+    np.testing.assert_allclose(line.ring_lengths(), [10.0, 10.0])
+    points = line.interpolate([0, 0, 0, 1, 1, 1], [0.0, 4.0, 10.0, 0.0, 7.0, 10.0])
+    np.testing.assert_allclose(points, [[0, 0], [4, 0], [10, 0], [100, 0], [100, 7], [100, 10]])
+
+
+def test_interpolate_clips_to_the_part():
+    line = geometry.from_json({u"paths": [[[0, 0], [10, 0]], [[100, 0], [100, 10]]]})
+    points = line.interpolate([0, 0, 1], [-5.0, 50.0, 50.0])
+    np.testing.assert_allclose(points, [[0, 0], [10, 0], [100, 10]])
+
+
+def assert_same_geometry(actual, expected):
+    assert actual.geometry_type == expected.geometry_type
+    np.testing.assert_allclose(actual.xy, expected.xy)
+    assert actual.ring_offsets.tolist() == expected.ring_offsets.tolist()
+
+
+def test_wkb_round_trip_multipart_polygon_with_hole():
+    # 1 つ目のパートは穴あき、2 つ目のパートは穴なし
+    second = [[20, 0], [20, 5], [25, 5], [25, 0], [20, 0]]
+    poly = polygon(SQUARE, HOLE, second)
+    result = geometry.from_wkb(featureio.json_to_wkb(poly.to_json()))
+    assert_same_geometry(result, poly)
+    assert result.part_offsets.tolist() == [0, 2, 3]
+    assert result.is_hole().tolist() == [False, True, False]
+    assert result.area == pytest.approx(96.0 + 25.0)
+
+
+def test_wkb_round_trip_multipart_polyline():
+    line = geometry.from_json({u"paths": [[[0, 0], [10, 0]], [[100, 0], [100, 5], [100, 10]]]})
+    result = geometry.from_wkb(featureio.json_to_wkb(line.to_json()))
+    assert_same_geometry(result, line)
+    assert result.length == pytest.approx(20.0)
+
+
+def test_wkb_round_trip_multipoint_and_null():
+    points = geometry.from_json({u"points": [[1, 2], [3, 4], [5, 6]]})
+    assert_same_geometry(geometry.from_wkb(featureio.json_to_wkb(points.to_json())), points)
+    assert geometry.from_wkb(None) is None
+
+
+def test_vertex_angles_of_square_and_hole():
+    # 内角は exterior ring の頂点で 90 度、穴の頂点はポリゴンの内側から見て 270 度
+    angles = polygon(SQUARE, HOLE).vertex_angles()
+    np.testing.assert_allclose(angles[:5], 90.0)
+    np.testing.assert_allclose(angles[5:], 270.0)
@@ -0,0 +1,86 @@
+﻿# coding:utf-8
+"""
+Tool name : EJPyConv テスト（ポリゴンの到達不能極）
+Source    : tests/test_polycenter.py
+Author    : Esri Japan Corporation
+Created   : 2026/10/19
+Updated   :
+"""
+
+import importlib
+import math
+import sys
+
+import numpy as np
+import pytest
+
+from ejpyconv import fakearcpy
+
+
+# 幅 4 の L 字形のポリゴン（時計回り）
+L_SHAPE = [[0, 0], [0, 10], [4, 10], [4, 4], [10, 4], [10, 0], [0, 0]]
+# 10 × 10 の正方形（時計回り）と中央の 2 × 2 の穴（反時計回り）
+SQUARE = [[0, 0], [0, 10], [10, 10], [10, 0], [0, 0]]
+CENTER_HOLE = [[4, 4], [6, 4], [6, 6], [4, 6], [4, 4]]
+# 凹角・穴の角から √2 (4 - t) 離れた対角線上の点 (t, t) で、辺までの距離 t が最大
+EXPECTED_DISTANCE = 4.0 * math.sqrt(2.0) / (1.0 + math.sqrt(2.0))
+PRECISION = 0.001
+
+
+@pytest.fixture(scope=u"module")
+def tool():
+    # ツールのスクリプトは arcpy を読み込むため、arcpy がない場合は ejpyconv.fakearcpy に置き換える
+    # （到達不能極の計算は arcpy と shapely を使用しない）
+    saved = dict((name, sys.modules.get(name)) for name in (u"arcpy", u"arcpy.da"))
+    try:
+        import arcpy
+    except ImportError:
+        sys.modules[u"arcpy"] = fakearcpy
+        sys.modules[u"arcpy.da"] = fakearcpy.da
+    yield importlib.import_module(u"PolyCenterToPt")
+    for name, module in saved.items():
+        if module is None:
+            sys.modules.pop(name, None)
+        else:
+            sys.modules[name] = module
+
+
+def shift(rings, dx, dy):
+    return [[[x + dx, y + dy] for x, y in ring] for ring in rings]
+
+
+def check_pole(tool, rings, expected_xy):
+    pole, distance = tool.pole_of_inaccessibility(rings, PRECISION)
+    assert distance == pytest.approx(EXPECTED_DISTANCE, abs=PRECISION)
+    assert pole == pytest.approx(expected_xy, abs=0.01)
+    # 返した距離は到達不能極からポリゴンの辺（穴を含む）までの距離
+    segments = [[], [], [], []]
+    for ring in rings:
+        for (ax, ay), (bx, by) in zip(ring[:-1], ring[1:]):
+            for values, value in zip(segments, (ax, ay, bx, by)):
+                values.append(value)
+    segments = tuple(np.array(values, dtype=np.float64) for values in segments)
+    assert tool.signed_distance([pole[0]], [pole[1]], segments)[0] == pytest.approx(distance)
+
+
+def test_pole_of_l_shape(tool):
+    # 重心は L 字の内側にあるが、到達不能極は凹角から離れた角の近く
+    check_pole(tool, [L_SHAPE], (EXPECTED_DISTANCE, EXPECTED_DISTANCE))
+
+
+def test_pole_of_polygon_with_hole(tool):
+    # 重心（中心）は穴の中にあるため、到達不能極は穴と外周の間の 4 つの角のいずれか
+    pole, distance = tool.pole_of_inaccessibility([SQUARE, CENTER_HOLE], PRECISION)
+    assert distance == pytest.approx(EXPECTED_DISTANCE, abs=PRECISION)
+    corner = tuple(EXPECTED_DISTANCE if value < 5.0 else 10.0 - EXPECTED_DISTANCE for value in pole)
+    assert pole == pytest.approx(corner, abs=0.01)
+
+
+@pytest.mark.parametrize(u"rings", [[L_SHAPE], [SQUARE, CENTER_HOLE]])
+def test_pole_is_translation_invariant(tool, rings):
+    # 平面直角座標系の原点から離れた座標でも同じ位置・距離になる
+    dx, dy = -45000.0, 3999000.0
+    pole, distance = tool.pole_of_inaccessibility(rings, PRECISION)
+    far_pole, far_distance = tool.pole_of_inaccessibility(shift(rings, dx, dy), PRECISION)
+    assert far_distance == pytest.approx(distance, abs=PRECISION)
+    assert far_pole == pytest.approx((pole[0] + dx, pole[1] + dy), abs=0.01)